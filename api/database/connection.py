@@ -1,16 +1,83 @@
 """Database connection and session management."""
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from api.config import config
+from src.utils.metrics import registry
+
+
+POOL_WAIT_SECONDS = registry.histogram(
+    "shadowscribe_db_pool_wait_seconds", "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+POOL_CHECKOUTS_TOTAL = registry.counter(
+    "shadowscribe_db_pool_checkouts_total", "Connection checkouts by outcome", ["result"])
+POOL_CHECKOUT_SECONDS = registry.histogram(
+    "shadowscribe_db_pool_checkout_seconds", "Time a connection stays checked out")
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            POOL_CHECKOUTS_TOTAL.inc(result="timeout")
+            raise
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - start)
+        POOL_CHECKOUTS_TOTAL.inc(result="ok")
+        return connection
+
 
-# Create async engine
+# Create async engine (pool sized per worker, see Config)
 engine = create_async_engine(
     config.DATABASE_URL,
-    echo=config.ENVIRONMENT == 'development',
+    echo=config.DB_ECHO,
+    poolclass=InstrumentedQueuePool,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    query_cache_size=config.DB_QUERY_CACHE_SIZE
+)
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    connection_record.info['checked_out_at'] = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    checked_out_at = connection_record.info.pop('checked_out_at', None)
+    if checked_out_at is not None:
+        POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - checked_out_at)
+
+
+def _pool_stats():
+    """Connection pool usage, read at scrape time."""
+    pool = engine.sync_engine.pool
+    return {
+        ('size',): pool.size(),
+        ('checked_out',): pool.checkedout(),
+        ('checked_in',): pool.checkedin(),
+        ('overflow',): max(pool.overflow(), 0)  # Negative until the pool is full
+    }
+
+
+registry.gauge(
+    "shadowscribe_db_pool_connections",
+    "SQLAlchemy connection pool usage",
+    ["state"],
+    callback=_pool_stats
 )
 
 # Create session factory
@@ -1,23 +1,52 @@
 """SQLAlchemy database models."""
-from sqlalchemy import Column, String, Integer, JSON, TIMESTAMP
+import dataclasses
+from sqlalchemy import Column, String, Integer, JSON, TIMESTAMP, ForeignKey
+from sqlalchemy.orm import relationship
 from datetime import datetime
 
 from api.database.connection import Base
+from src.rag.character.character_types import Character as CharacterDataclass
+
+
+# Top-level Character fields in dataclass order; each is stored as one character_sections row
+SECTION_ORDER = {f.name: i for i, f in enumerate(dataclasses.fields(CharacterDataclass))}
 
 
 class Character(Base):
-    """Character model - stores full character data as JSON."""
+    """Character model - summary columns; the character data lives in character_sections."""
     __tablename__ = 'characters'
-    
+
     id = Column(String(255), primary_key=True)
-    name = Column(String(255), nullable=False, index=True)
+    name = Column(String(255), nullable=False, unique=True)  # Lookup key of get_by_name
     race = Column(String(100))
     character_class = Column(String(100))
     level = Column(Integer)
-    data = Column(JSON, nullable=False)
+    data = Column(JSON(none_as_null=True), nullable=True)  # Legacy whole-document storage, moved to sections on first write
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every write to any section
+    dndbeyond_id = Column(String(32), index=True)  # Source character on D&D Beyond (set by re-sync)
+    source_hashes = Column(JSON(none_as_null=True), nullable=True)  # Hash per D&D Beyond input region at the last sync
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
     updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
+
+    # Loaded explicitly by CharacterRepository (all sections, a subset, or none)
+    sections = relationship(
+        'CharacterSection',
+        cascade='all, delete-orphan',
+        passive_deletes=True,
+        lazy='raise'
+    )
+
+    def section_data(self) -> dict:
+        """Character data assembled from the loaded sections (legacy `data` if there are none)."""
+        if not self.sections and self.data:
+            return self.data
+        ordered = sorted(self.sections, key=lambda s: SECTION_ORDER.get(s.section, len(SECTION_ORDER)))
+        return {s.section: s.data for s in ordered}
+
+    def section_versions(self) -> dict:
+        """Version counter per loaded section."""
+        return {s.section: s.version for s in self.sections}
+
     def to_dict(self):
         """Convert model to dictionary."""
         return {
@@ -26,7 +55,19 @@ class Character(Base):
             'race': self.race,
             'character_class': self.character_class,
             'level': self.level,
-            'data': self.data,
+            'data': self.section_data(),
+            'version': self.version,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class CharacterSection(Base):
+    """One top-level section of a character (inventory, spell_list, ...) as JSON."""
+    __tablename__ = 'character_sections'
+
+    character_id = Column(String(255), ForeignKey('characters.id', ondelete='CASCADE'), primary_key=True)
+    section = Column(String(64), primary_key=True)
+    data = Column(JSON)
+    version = Column(Integer, nullable=False, default=1)  # Bumped whenever this section changes
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,169 +1,592 @@
 """Character repository for database operations."""
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from typing import List, Optional
-from dataclasses import asdict
+from sqlalchemy import select, update, delete, insert, and_, or_, event, bindparam
+from sqlalchemy.orm import Session, selectinload, noload
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
-import re
+import base64
 import json
+import re
 
-from api.database.models import Character as CharacterModel
+from api.database.models import Character as CharacterModel, CharacterSection, SECTION_ORDER
 from src.rag.character.character_types import Character as CharacterDataclass
+from api.services.http_cache import character_responses
+from api.services.character_changes import character_changes
+from src.rag.character.character_codec import character_to_dict, encode_any
+
+
+# Valid section names based on Character dataclass
+VALID_SECTIONS = frozenset({
+    'character_base',
+    'characteristics',
+    'ability_scores',
+    'combat_stats',
+    'background_info',
+    'personality',
+    'backstory',
+    'organizations',
+    'allies',
+    'enemies',
+    'proficiencies',
+    'damage_modifiers',
+    'passive_scores',
+    'senses',
+    'action_economy',
+    'features_and_traits',
+    'inventory',
+    'spell_list',
+    'objectives_and_contracts',
+    'notes'
+})
+
+
+# Columns returned by list queries (never the section data)
+SUMMARY_COLUMNS = (
+    CharacterModel.id,
+    CharacterModel.name,
+    CharacterModel.race,
+    CharacterModel.character_class,
+    CharacterModel.level,
+    CharacterModel.version,
+    CharacterModel.updated_at,
+)
+
+# Hot lookups are built once; SQLAlchemy caches their compiled SQL (query_cache_size),
+# so a call only binds parameters
+_SELECT_BY_ID = (
+    select(CharacterModel)
+    .where(CharacterModel.id == bindparam('key'))
+    .execution_options(populate_existing=True)
+)
+_SELECT_BY_NAME = (
+    select(CharacterModel)
+    .where(CharacterModel.name == bindparam('key'))  # Unique index
+    .execution_options(populate_existing=True)
+)
+_SELECT_SECTIONS = (
+    select(CharacterSection.section, CharacterSection.data)
+    .where(
+        CharacterSection.character_id == bindparam('character_id'),
+        CharacterSection.section.in_(bindparam('sections', expanding=True))
+    )
+)
+_SELECT_SECTION_VERSIONS = (
+    select(CharacterSection.section, CharacterSection.version)
+    .where(CharacterSection.character_id == bindparam('character_id'))
+)
+_LOAD_ALL_SECTIONS = selectinload(CharacterModel.sections)
+_LOAD_NO_SECTIONS = noload(CharacterModel.sections)
+
+# Session.info key: characters written in the current transaction
+# (character ID -> written sections, or None when all of it may have changed)
+_CHANGED_CHARACTERS = 'changed_characters'
+
 
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_characters(session):
+    """Invalidate cached responses again, and tell in-process caches, once writes are visible."""
+    for character_id, sections in session.info.pop(_CHANGED_CHARACTERS, {}).items():
+        character_responses.invalidate(character_id)
+        character_changes.publish(character_id, sections)
 
-def default_json_serializer(obj):
-    """JSON serializer for objects not serializable by default json code."""
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f"Type {type(obj)} not serializable")
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back_characters(session):
+    session.info.pop(_CHANGED_CHARACTERS, None)
+
+
+def encode_cursor(name: str, character_id: str) -> str:
+    """Opaque keyset cursor for the (name, id) list order."""
+    return base64.urlsafe_b64encode(json.dumps([name, character_id]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of encode_cursor; raises ValueError on malformed input."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        name, character_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    if not isinstance(name, str) or not isinstance(character_id, str):
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return name, character_id
 
 
 class CharacterRepository:
-    """Repository for character CRUD operations."""
-    
+    """
+    Repository for character CRUD operations.
+
+    Character data is stored one row per top-level section (character_sections), so
+    reads can load only the sections they need and a section update writes one row.
+    Every section carries a version counter, and the character row a version bumped
+    on any write, for cache invalidation.
+    """
+
     def __init__(self, session: AsyncSession):
         self.session = session
-    
+
+    def _changed(self, character_id: str, sections: Optional[Iterable[str]] = None) -> None:
+        """
+        Invalidate cached responses for a character now and again after commit, when
+        the written sections (None = any) are also published to character_changes.
+        """
+        character_responses.invalidate(character_id)
+        changed = self.session.info.setdefault(_CHANGED_CHARACTERS, {})
+        if sections is None or (character_id in changed and changed[character_id] is None):
+            changed[character_id] = None
+        else:
+            changed.setdefault(character_id, set()).update(sections)
+
+    def _sections_option(self, sections: Optional[Iterable[str]]):
+        """Loader option: all sections (None), a subset, or none (empty)"""
+        if sections is None:
+            return _LOAD_ALL_SECTIONS
+        names = list(sections)
+        if not names:
+            return _LOAD_NO_SECTIONS
+        return selectinload(CharacterModel.sections.and_(CharacterSection.section.in_(names)))
+
+    async def _select_one(self, statement, key: str, sections: Optional[Iterable[str]]) -> Optional[CharacterModel]:
+        result = await self.session.execute(
+            statement.options(self._sections_option(sections)),
+            {'key': key}
+        )
+        return result.scalar_one_or_none()
+
     async def create(self, character: CharacterDataclass) -> CharacterModel:
         """Create a new character in the database."""
-        character_data = asdict(character)
-        
-        # Convert to JSON string then back to dict to handle datetime serialization
-        character_data_json = json.dumps(character_data, default=default_json_serializer)
-        character_data = json.loads(character_data_json)
-        
+        # JSON-compatible dict (datetimes as ISO strings) from the generated encoder
+        character_data = character_to_dict(character)
+        character_id = self._generate_id(character.character_base.name)
+
         db_character = CharacterModel(
-            id=self._generate_id(character.character_base.name),
+            id=character_id,
             name=character.character_base.name,
             race=character.character_base.race,
             character_class=character.character_base.character_class,
             level=character.character_base.total_level,
-            data=character_data
+            version=1,
+            sections=[
+                CharacterSection(character_id=character_id, section=section, data=value, version=1)
+                for section, value in character_data.items()
+            ]
         )
-        
+
         self.session.add(db_character)
         await self.session.flush()
+        self._changed(character_id)
         return db_character
-    
-    async def get_by_id(self, character_id: str) -> Optional[CharacterModel]:
-        """Get character by ID."""
+
+    async def get_by_id(self, character_id: str, sections: Optional[Iterable[str]] = None) -> Optional[CharacterModel]:
+        """
+        Get character by ID.
+
+        Args:
+            character_id: Character ID
+            sections: Section names to load (None = all, empty = summary columns only)
+        """
+        return await self._select_one(_SELECT_BY_ID, character_id, sections)
+
+    async def get_by_name(self, name: str, sections: Optional[Iterable[str]] = None) -> Optional[CharacterModel]:
+        """Get character by name (sections as in get_by_id)."""
+        return await self._select_one(_SELECT_BY_NAME, name, sections)
+
+    async def get_all(self, sections: Optional[Iterable[str]] = None) -> List[CharacterModel]:
+        """Get all characters (sections as in get_by_id)."""
         result = await self.session.execute(
-            select(CharacterModel).where(CharacterModel.id == character_id)
+            select(CharacterModel)
+            .options(self._sections_option(sections))
+            .execution_options(populate_existing=True)
         )
-        return result.scalar_one_or_none()
-    
-    async def get_by_name(self, name: str) -> Optional[CharacterModel]:
-        """Get character by name."""
+        return list(result.scalars().all())
+
+    async def list_summaries(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+        race: Optional[str] = None,
+        character_class: Optional[str] = None,
+        min_level: Optional[int] = None,
+        max_level: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of character summaries ordered by (name, id), using keyset pagination.
+
+        Only SUMMARY_COLUMNS are selected. Returns the rows and the cursor of the next
+        page (None on the last page).
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = select(*SUMMARY_COLUMNS)
+        if cursor:
+            after_name, after_id = decode_cursor(cursor)
+            query = query.where(or_(
+                CharacterModel.name > after_name,
+                and_(CharacterModel.name == after_name, CharacterModel.id > after_id)
+            ))
+        if search:
+            query = query.where(CharacterModel.name.contains(search, autoescape=True))
+        if race:
+            query = query.where(CharacterModel.race == race)
+        if character_class:
+            query = query.where(CharacterModel.character_class == character_class)
+        if min_level is not None:
+            query = query.where(CharacterModel.level >= min_level)
+        if max_level is not None:
+            query = query.where(CharacterModel.level <= max_level)
+
+        # One extra row tells whether another page exists
         result = await self.session.execute(
-            select(CharacterModel).where(CharacterModel.name == name)
+            query.order_by(CharacterModel.name, CharacterModel.id).limit(limit + 1)
         )
-        return result.scalar_one_or_none()
-    
-    async def get_all(self) -> List[CharacterModel]:
-        """Get all characters."""
-        result = await self.session.execute(select(CharacterModel))
-        return list(result.scalars().all())
-    
+        rows = [dict(row) for row in result.mappings().all()]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['name'], rows[-1]['id'])
+        return rows, next_cursor
+
+    async def get_sections(self, character_id: str, sections: Iterable[str]) -> Dict[str, Any]:
+        """Data of the requested sections only (sections the character lacks are omitted)."""
+        names = list(sections)
+        result = await self.session.execute(
+            _SELECT_SECTIONS, {'character_id': character_id, 'sections': names}
+        )
+        found = dict(result.all())
+        if found:
+            return found
+        # Characters saved before section storage keep their data in the legacy column
+        legacy = await self.session.execute(
+            select(CharacterModel.data).where(CharacterModel.id == character_id)
+        )
+        data = legacy.scalar_one_or_none() or {}
+        return {name: data[name] for name in names if name in data}
+
+    async def get_section_versions(self, character_id: str) -> Dict[str, int]:
+        """Version counter per section, without loading any section data."""
+        result = await self.session.execute(
+            _SELECT_SECTION_VERSIONS, {'character_id': character_id}
+        )
+        return dict(result.all())
+
     async def update(self, character_id: str, character: CharacterDataclass) -> Optional[CharacterModel]:
-        """Update character."""
-        character_data = asdict(character)
-        
-        # Convert to JSON string then back to dict to handle datetime serialization
-        character_data_json = json.dumps(character_data, default=default_json_serializer)
-        character_data = json.loads(character_data_json)
-        
-        await self.session.execute(
-            update(CharacterModel)
-            .where(CharacterModel.id == character_id)
-            .values(
-                name=character.character_base.name,
-                race=character.character_base.race,
-                character_class=character.character_base.character_class,
-                level=character.character_base.total_level,
-                data=character_data,
-                updated_at=datetime.utcnow()
+        """Update character; only sections whose data changed are written (and versioned)."""
+        db_character = await self.get_by_id(character_id)
+        if not db_character:
+            return None
+
+        # JSON-compatible dict (datetimes as ISO strings) from the generated encoder
+        character_data = character_to_dict(character)
+        now = datetime.utcnow()
+
+        existing = {s.section: s for s in db_character.sections}
+        written = []
+        for section, value in character_data.items():
+            row = existing.get(section)
+            if row is None:
+                db_character.sections.append(
+                    CharacterSection(character_id=character_id, section=section, data=value, version=1)
+                )
+                written.append(section)
+            elif row.data != value:
+                row.data = value
+                row.version += 1
+                row.updated_at = now
+                written.append(section)
+
+        db_character.name = character.character_base.name
+        db_character.race = character.character_base.race
+        db_character.character_class = character.character_base.character_class
+        db_character.level = character.character_base.total_level
+        db_character.data = None
+        db_character.version += 1
+        db_character.updated_at = now
+
+        await self.session.flush()
+        # Characters still in the legacy column had no section rows to compare against
+        self._changed(character_id, written if existing else None)
+        return db_character
+
+    async def bulk_upsert(
+        self,
+        characters: List[CharacterDataclass],
+        skip_existing: bool = False
+    ) -> Dict[str, str]:
+        """
+        Create or update many characters with a fixed number of statements.
+
+        One SELECT finds the existing IDs and one loads their section rows, then one
+        batched upsert writes the character rows and one the section rows (INSERT ...
+        ON DUPLICATE KEY UPDATE on MySQL, ON CONFLICT DO UPDATE elsewhere). As in
+        update(), only sections whose data changed are written (and versioned), and an
+        existing character with no changed section is left untouched. The caller
+        commits, so a whole batch is one transaction. Later duplicates of an ID in
+        `characters` win.
+
+        Args:
+            characters: Characters to write
+            skip_existing: Leave characters that already exist untouched
+
+        Returns:
+            Character ID -> 'created', 'updated' (also when no section changed) or 'skipped'
+        """
+        by_id = {self._generate_id(c.character_base.name): c for c in characters}
+        if not by_id:
+            return {}
+
+        result = await self.session.execute(
+            select(CharacterModel.id).where(CharacterModel.id.in_(list(by_id)))
+        )
+        existing = set(result.scalars().all())
+        statuses = {
+            character_id: ('skipped' if skip_existing else 'updated') if character_id in existing else 'created'
+            for character_id in by_id
+        }
+        to_write = {cid: c for cid, c in by_id.items() if statuses[cid] != 'skipped'}
+        if not to_write:
+            return statuses
+
+        stored: Dict[str, Dict[str, Any]] = {}
+        updating = [cid for cid in to_write if cid in existing]
+        if updating:
+            result = await self.session.execute(
+                select(CharacterSection.character_id, CharacterSection.section, CharacterSection.data)
+                .where(CharacterSection.character_id.in_(updating))
+            )
+            for character_id, section, data in result.all():
+                stored.setdefault(character_id, {})[section] = data
+
+        now = datetime.utcnow()
+        character_rows, section_rows = [], []
+        changed: Dict[str, Optional[List[str]]] = {}
+        for character_id, character in to_write.items():
+            current = stored.get(character_id, {})
+            values = character_to_dict(character)
+            written = [
+                section for section, value in values.items()
+                if section not in current or current[section] != value
+            ]
+            if not written:
+                continue
+            # Created characters, and ones still in the legacy column, changed as a whole
+            changed[character_id] = written if current else None
+            base = character.character_base
+            character_rows.append({
+                'id': character_id, 'name': base.name, 'race': base.race,
+                'character_class': base.character_class, 'level': base.total_level,
+                'data': None, 'version': 1, 'created_at': now, 'updated_at': now,
+            })
+            section_rows.extend(
+                {'character_id': character_id, 'section': section, 'data': values[section], 'version': 1, 'updated_at': now}
+                for section in written
             )
+
+        if not character_rows:
+            return statuses
+        await self.session.execute(
+            self._upsert(CharacterModel, ['id'], ['name', 'race', 'character_class', 'level', 'data', 'updated_at']),
+            character_rows
+        )
+        await self.session.execute(
+            self._upsert(CharacterSection, ['character_id', 'section'], ['data', 'updated_at']),
+            section_rows
+        )
+        for character_id, sections in changed.items():
+            self._changed(character_id, sections)
+        return statuses
+
+    def _upsert(self, model, key_columns: List[str], update_columns: List[str]):
+        """Dialect-specific INSERT that updates `update_columns` and bumps `version` on key conflict."""
+        table = model.__table__
+        if self.session.bind.dialect.name == 'mysql':
+            from sqlalchemy.dialects.mysql import insert as mysql_insert
+            stmt = mysql_insert(table)
+            values = {column: stmt.inserted[column] for column in update_columns}
+            return stmt.on_duplicate_key_update(version=table.c.version + 1, **values)
+
+        if self.session.bind.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as conflict_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as conflict_insert
+        stmt = conflict_insert(table)
+        values = {column: stmt.excluded[column] for column in update_columns}
+        return stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={'version': table.c.version + 1, **values}
         )
-        
-        return await self.get_by_id(character_id)
-    
+
+    async def update_sections(
+        self,
+        character_id: str,
+        sections: Dict[str, Any],
+        touch: Optional[Dict[str, Any]] = None,
+        dndbeyond_id: Optional[str] = None,
+        source_hashes: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, int]]:
+        """
+        Write several sections at once, skipping those whose data did not change.
+
+        Only the given sections are loaded and compared. `touch` sections (e.g.
+        last_updated) are written only if another section changed. Summary columns
+        follow character_base when it changed. `dndbeyond_id` / `source_hashes`
+        record the D&D Beyond source of a re-sync.
+
+        Returns:
+            Section -> new version for each section written, or None if character not found
+
+        Raises:
+            ValueError: If a section name is not a Character field
+        """
+        touch = touch or {}
+        invalid = (set(sections) | set(touch)) - set(SECTION_ORDER)
+        if invalid:
+            raise ValueError(
+                f"Invalid section(s) {', '.join(sorted(invalid))}. "
+                f"Valid sections: {', '.join(SECTION_ORDER)}"
+            )
+
+        names = list(sections) + [name for name in touch if name not in sections]
+        db_character = await self.get_by_id(character_id, sections=names)
+        if not db_character:
+            return None
+        if db_character.data:
+            await self._migrate_legacy(character_id)
+            db_character = await self.get_by_id(character_id, sections=names)
+
+        now = datetime.utcnow()
+        existing = {s.section: s for s in db_character.sections}
+        written = {}
+
+        def write(section: str, value: Any) -> None:
+            section_data = encode_any(value)
+            row = existing.get(section)
+            if row is None:
+                row = CharacterSection(character_id=character_id, section=section, data=section_data, version=1)
+                db_character.sections.append(row)
+            elif row.data != section_data:
+                row.data = section_data
+                row.version += 1
+                row.updated_at = now
+            else:
+                return
+            written[section] = row.version
+
+        for section, value in sections.items():
+            write(section, value)
+        if written:
+            for section, value in touch.items():
+                write(section, value)
+
+        if dndbeyond_id is not None:
+            db_character.dndbeyond_id = dndbeyond_id
+        if source_hashes is not None:
+            db_character.source_hashes = source_hashes
+        if written:
+            if 'character_base' in written:
+                base = sections['character_base']
+                db_character.name = base.name
+                db_character.race = base.race
+                db_character.character_class = base.character_class
+                db_character.level = base.total_level
+            db_character.version += 1
+            db_character.updated_at = now
+            self._changed(character_id, written)
+
+        await self.session.flush()
+        return written
+
     async def delete(self, character_id: str) -> bool:
-        """Delete character."""
+        """Delete character (sections are removed by the foreign key cascade)."""
         result = await self.session.execute(
             delete(CharacterModel).where(CharacterModel.id == character_id)
         )
+        self._changed(character_id)
         return result.rowcount > 0
-    
-    async def update_section(self, character_id: str, section: str, data: dict) -> Optional[CharacterModel]:
+
+    async def update_section(self, character_id: str, section: str, data: Any) -> Optional[int]:
         """
         Update a specific section of a character.
-        
+
+        Writes only that section's row and bumps its version; the rest of the
+        character is neither read nor rewritten.
+
         Args:
             character_id: Character ID to update
             section: Section name (e.g., 'ability_scores', 'inventory', 'spell_list')
             data: Dictionary containing the updated section data
-            
+
         Returns:
-            Updated CharacterModel or None if character not found
-            
+            New version of the section, or None if character not found
+
         Raises:
             ValueError: If section name is invalid
         """
-        # Valid section names based on Character dataclass
-        valid_sections = {
-            'character_base',
-            'characteristics',
-            'ability_scores',
-            'combat_stats',
-            'background_info',
-            'personality',
-            'backstory',
-            'organizations',
-            'allies',
-            'enemies',
-            'proficiencies',
-            'damage_modifiers',
-            'passive_scores',
-            'senses',
-            'action_economy',
-            'features_and_traits',
-            'inventory',
-            'spell_list',
-            'objectives_and_contracts',
-            'notes'
-        }
-        
-        if section not in valid_sections:
+        if section not in VALID_SECTIONS:
             raise ValueError(
                 f"Invalid section '{section}'. "
-                f"Valid sections: {', '.join(sorted(valid_sections))}"
+                f"Valid sections: {', '.join(sorted(VALID_SECTIONS))}"
             )
-        
-        # Get current character
-        character = await self.get_by_id(character_id)
-        if not character:
-            return None
-        
-        # Update the specific section in the data JSON
-        character_data = character.data.copy()
-        character_data[section] = data
-        
+
         # Handle serialization of datetime objects
-        character_data_json = json.dumps(character_data, default=default_json_serializer)
-        character_data = json.loads(character_data_json)
-        
-        # Update database record
-        await self.session.execute(
+        section_data = encode_any(data)
+        now = datetime.utcnow()
+
+        result = await self.session.execute(
             update(CharacterModel)
             .where(CharacterModel.id == character_id)
-            .values(
-                data=character_data,
-                updated_at=datetime.utcnow()
+            .values(version=CharacterModel.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            return None
+        self._changed(character_id, [section])
+
+        result = await self.session.execute(
+            update(CharacterSection)
+            .where(CharacterSection.character_id == character_id, CharacterSection.section == section)
+            .values(data=section_data, version=CharacterSection.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            # Section not stored yet (new section, or a character still in the legacy column)
+            migrated = await self._migrate_legacy(character_id)
+            if section not in migrated:
+                await self.session.execute(
+                    insert(CharacterSection).values(
+                        character_id=character_id, section=section, data=section_data, version=1, updated_at=now
+                    )
+                )
+                return 1
+            await self.session.execute(
+                update(CharacterSection)
+                .where(CharacterSection.character_id == character_id, CharacterSection.section == section)
+                .values(data=section_data, version=CharacterSection.version + 1, updated_at=now)
             )
+
+        versions = await self.session.execute(
+            select(CharacterSection.version)
+            .where(CharacterSection.character_id == character_id, CharacterSection.section == section)
         )
-        
-        return await self.get_by_id(character_id)
-    
+        return versions.scalar_one()
+
+    async def _migrate_legacy(self, character_id: str) -> set:
+        """Move a legacy whole-document `data` column into section rows; returns the sections moved."""
+        result = await self.session.execute(
+            select(CharacterModel.data).where(CharacterModel.id == character_id)
+        )
+        data = result.scalar_one_or_none()
+        if not data:
+            return set()
+        await self.session.execute(
+            insert(CharacterSection),
+            [{'character_id': character_id, 'section': section, 'data': value, 'version': 1}
+             for section, value in data.items()]
+        )
+        await self.session.execute(
+            update(CharacterModel).where(CharacterModel.id == character_id).values(data=None)
+        )
+        return set(data)
+
     @staticmethod
     def _generate_id(name: str) -> str:
         """Generate URL-safe ID from character name."""
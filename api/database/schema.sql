@@ -7,16 +7,38 @@ CREATE DATABASE IF NOT EXISTS shadowscribe
 
 USE shadowscribe;
 
--- Characters table: stores full character data as JSON
+-- Characters table: summary columns plus a version bumped on every write
 CREATE TABLE IF NOT EXISTS characters (
     id VARCHAR(255) PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
     race VARCHAR(100),
     character_class VARCHAR(100),
     level INT,
-    data JSON NOT NULL,
+    data JSON NULL,  -- legacy whole-document storage, moved to character_sections on first write
+    version INT NOT NULL DEFAULT 1,
+    dndbeyond_id VARCHAR(32) NULL,  -- source character on D&D Beyond (set by re-sync)
+    source_hashes JSON NULL,  -- hash per D&D Beyond input region at the last sync
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    INDEX idx_name (name),
-    INDEX idx_updated (updated_at)
+    UNIQUE KEY uq_name (name),
+    INDEX idx_updated (updated_at),
+    INDEX idx_dndbeyond_id (dndbeyond_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Character sections: one row per top-level Character field (inventory, spell_list, ...)
+CREATE TABLE IF NOT EXISTS character_sections (
+    character_id VARCHAR(255) NOT NULL,
+    section VARCHAR(64) NOT NULL,
+    data JSON,
+    version INT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (character_id, section),
+    CONSTRAINT fk_character_sections_character
+        FOREIGN KEY (character_id) REFERENCES characters (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Upgrading an existing database (rows are split into sections on their next write):
+-- ALTER TABLE characters MODIFY data JSON NULL, ADD COLUMN version INT NOT NULL DEFAULT 1;
+-- ALTER TABLE characters DROP INDEX idx_name, ADD UNIQUE KEY uq_name (name);
+-- ALTER TABLE characters ADD COLUMN dndbeyond_id VARCHAR(32) NULL, ADD COLUMN source_hashes JSON NULL,
+--     ADD INDEX idx_dndbeyond_id (dndbeyond_id);
@@ -1,20 +1,27 @@
 """FastAPI main application entry point."""
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 
 from api.database.connection import init_db, close_db
 from api.routers import websocket, characters
+from api.services.dndbeyond_service import DndBeyondService
+from src.utils.tracing import tracer, RingBufferExporter
+from src.utils.metrics import registry
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
-    # Startup
+    # Startup: same RAG_TRACING_* settings as the scripts and engine
+    tracer.configure_from_config()
     await init_db()
     yield
     # Shutdown
     await close_db()
+    await DndBeyondService.close()
+    tracer.configure([])
 
 
 app = FastAPI(
@@ -52,3 +59,22 @@ async def root():
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/traces/{request_id}")
+async def get_trace(request_id: str):
+    """Spans recorded for a request (requires the 'memory' tracing exporter)."""
+    buffer = tracer.get_exporter(RingBufferExporter)
+    if buffer is None:
+        raise HTTPException(status_code=404, detail="In-memory tracing is not enabled")
+    spans = buffer.get_spans(trace_id=request_id)
+    return {
+        "request_id": request_id,
+        "spans": [span.to_dict() for span in sorted(spans, key=lambda s: s.start_time_ns)]
+    }
@@ -1,49 +1,148 @@
 """Character REST API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from dacite import from_dict
-import dacite
+from typing import List, Optional
 
-from api.database.connection import get_db
-from api.database.repositories.character_repo import CharacterRepository
+from api.config import config
+from api.database.connection import get_db, AsyncSessionLocal
+from api.database.repositories.character_repo import CharacterRepository, VALID_SECTIONS
 from api.schemas.character import (
     CharacterResponse, 
     CharacterListResponse,
     FetchCharacterRequest,
     FetchCharacterResponse,
+    BatchFetchRequest,
+    BatchFetchResponse,
     CharacterCreateRequest,
     CharacterUpdateRequest,
     SectionUpdateRequest,
-    SectionUpdateResponse
+    SectionUpdateResponse,
+    BulkImportRequest,
+    CharacterSyncRequest,
+    CharacterSyncResponse
 )
 from api.services.dndbeyond_service import DndBeyondService
+from api.services.character_import import CharacterImporter
+from api.services.character_sync import CharacterSyncService
+from api.services.http_cache import make_etag, etag_matches, character_responses
 from src.rag.character.character_types import Character
+from src.rag.character.character_codec import character_from_dict
 
 router = APIRouter()
 
 
 @router.get("/characters", response_model=CharacterListResponse)
-async def list_characters(db: AsyncSession = Depends(get_db)):
-    """List all characters."""
+async def list_characters(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    search: Optional[str] = Query(None, description="Case-insensitive substring of the name"),
+    race: Optional[str] = None,
+    character_class: Optional[str] = None,
+    min_level: Optional[int] = Query(None, ge=1),
+    max_level: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    List characters (summary columns only), ordered by name.
+    
+    Uses keyset pagination: pass the returned next_cursor to get the following page.
+    Responses carry an ETag; a matching If-None-Match returns 304 Not Modified.
+    """
     repo = CharacterRepository(db)
-    characters = await repo.get_all()
+    try:
+        rows, next_cursor = await repo.list_summaries(
+            limit=limit,
+            cursor=cursor,
+            search=search,
+            race=race,
+            character_class=character_class,
+            min_level=min_level,
+            max_level=max_level
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    for row in rows:
+        row['updated_at'] = row['updated_at'].isoformat() if row['updated_at'] else None
+    
+    # The page changes iff a listed row, the page boundary or the query changes
+    etag = make_etag(
+        str(request.query_params),
+        [(row['id'], row['version'], row['updated_at']) for row in rows],
+        next_cursor
+    )
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    response.headers['ETag'] = etag
     
     return {
-        'characters': [char.to_dict() for char in characters]
+        'characters': rows,
+        'next_cursor': next_cursor
     }
 
 
 @router.get("/characters/{character_id}", response_model=CharacterResponse)
-async def get_character(character_id: str, db: AsyncSession = Depends(get_db)):
-    """Get character by ID."""
+async def get_character(
+    character_id: str,
+    request: Request,
+    sections: Optional[str] = Query(
+        None,
+        description="Comma-separated section names to load (e.g. 'inventory,spell_list'); all if omitted"
+    ),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get character by ID, optionally with only some sections of its data.
+    
+    Responses carry a strong ETag derived from the character version; a matching
+    If-None-Match returns 304 Not Modified. Serialized responses are cached in
+    process until the character is written, so repeated reads skip the database.
+    """
+    names = None
+    if sections:
+        names = [name.strip() for name in sections.split(',') if name.strip()]
+        invalid = sorted(set(names) - VALID_SECTIONS)
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid sections: {', '.join(invalid)}")
+        names = sorted(set(names))
+    cache_key = tuple(names) if names is not None else None
+    
+    cached = character_responses.get(character_id, cache_key)
+    if cached is not None:
+        if etag_matches(request, cached.etag):
+            return Response(status_code=304, headers={'ETag': cached.etag})
+        return Response(content=cached.body, media_type='application/json', headers={'ETag': cached.etag})
+    
+    # Taken before reading so a write during the read keeps the result out of the cache
+    generation = character_responses.generation(character_id)
     repo = CharacterRepository(db)
-    character = await repo.get_by_id(character_id)
     
+    # Conditional request: check the summary row first so an unchanged character is
+    # answered without loading its data
+    if request.headers.get('if-none-match'):
+        summary = await repo.get_by_id(character_id, sections=())
+        if not summary:
+            raise HTTPException(status_code=404, detail="Character not found")
+        
+        etag = make_etag(character_id, summary.version, summary.updated_at, cache_key)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={'ETag': etag})
+    
+    character = await repo.get_by_id(character_id, sections=names)
     if not character:
         raise HTTPException(status_code=404, detail="Character not found")
+    etag = make_etag(character_id, character.version, character.updated_at, cache_key)
     
-    return character.to_dict()
+    # Same fields as CharacterResponse, serialized once and reused until the next write
+    body = json.dumps(character.to_dict(), ensure_ascii=False, separators=(',', ':')).encode()
+    character_responses.put(character_id, cache_key, body, etag, generation)
+    return Response(content=body, media_type='application/json', headers={'ETag': etag})
 
 
 @router.delete("/characters/{character_id}")
@@ -93,6 +192,54 @@ async def fetch_character_from_dndbeyond(request: FetchCharacterRequest):
     }
 
 
+@router.post("/characters/fetch/batch", response_model=BatchFetchResponse)
+async def fetch_characters_from_dndbeyond(request: BatchFetchRequest):
+    """
+    Fetch many characters from D&D Beyond concurrently.
+
+    Requests share the rate limit, retries and response cache of single fetches.
+    A failed character does not fail the batch; it is reported with status "error".
+
+    Args:
+        request: D&D Beyond character URLs and/or IDs
+
+    Returns:
+        One result per character, in request order (URLs first), and totals
+
+    Raises:
+        HTTPException: If a URL is invalid or the batch is empty or too large
+    """
+    character_ids = []
+    for url in request.urls:
+        character_id = DndBeyondService.extract_character_id(url)
+        if not character_id:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid D&D Beyond URL: {url}. Expected format: https://dndbeyond.com/characters/{{id}}"
+            )
+        character_ids.append(character_id)
+    for character_id in request.character_ids:
+        if not character_id.isdigit():
+            raise HTTPException(status_code=400, detail=f"Invalid D&D Beyond character ID: {character_id}")
+        character_ids.append(character_id)
+
+    if not character_ids:
+        raise HTTPException(status_code=400, detail="Provide at least one url or character_id")
+    if len(character_ids) > config.DNDBEYOND_BATCH_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.DNDBEYOND_BATCH_MAX} characters per batch"
+        )
+
+    results = await DndBeyondService.fetch_many(character_ids)
+    return {
+        'results': [result.to_dict(include_data=request.include_data) for result in results],
+        'fetched': sum(1 for result in results if result.status == 'fetched'),
+        'not_modified': sum(1 for result in results if result.status == 'not_modified'),
+        'failed': sum(1 for result in results if not result.ok)
+    }
+
+
 @router.post("/characters", response_model=CharacterResponse)
 async def create_character(
     request: CharacterCreateRequest,
@@ -116,21 +263,14 @@ async def create_character(
         HTTPException: If character data is invalid or creation fails
     """
     try:
-        # Convert dict to Character dataclass using from_dict with lenient type checking
-        character = from_dict(
-            data_class=Character, 
-            data=request.character,
-            config=dacite.Config(
-                strict=False,
-                check_types=False  # Allow type flexibility for nested structures
-            )
-        )
+        # Convert dict to Character dataclass (generated decoder, lenient on primitive types)
+        character = character_from_dict(request.character)
         
         # Create in database (or update if already exists)
         repo = CharacterRepository(db)
         
         # Check if character already exists by name
-        existing = await repo.get_by_name(character.character_base.name)
+        existing = await repo.get_by_name(character.character_base.name, sections=())
         
         if existing:
             # Update existing character
@@ -156,6 +296,71 @@ async def create_character(
         )
 
 
+@router.post("/characters/import")
+async def import_characters(request: BulkImportRequest):
+    """
+    Bulk-create or update characters.
+    
+    Items (Character JSON or D&D Beyond exports) are parsed concurrently and
+    upserted in chunks, one transaction per chunk. Progress is streamed as
+    newline-delimited JSON events: import_started, item_parsed, item_failed,
+    item_saved, chunk_committed and a final import_complete with the summary.
+    A failed chunk is reported per item and does not stop the import.
+    """
+    importer = CharacterImporter(
+        AsyncSessionLocal,
+        chunk_size=request.chunk_size,
+        skip_existing=request.skip_existing
+    )
+    
+    async def events():
+        async for event in importer.run(request.items):
+            yield json.dumps(event) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.post("/characters/{character_id}/sync", response_model=CharacterSyncResponse)
+async def sync_character(character_id: str, request: CharacterSyncRequest):
+    """
+    Re-sync a stored character from D&D Beyond.
+    
+    Only the parsers whose D&D Beyond input regions (inventory, spells, classes,
+    notes, ...) changed since the last sync run, and only changed sections are
+    written. The first sync of a character, or `full`, runs every parser.
+    
+    The export comes from `json_data`, the `url`, or the D&D Beyond ID stored at
+    the previous sync (in that order).
+    
+    Args:
+        character_id: Character ID to re-sync
+        request: Optional source and full flag
+        
+    Returns:
+        Changed regions, parsers run, sections written with their new versions, timing
+        
+    Raises:
+        HTTPException: If the character is not found, the URL is invalid, fetching fails
+            or a parser fails (502 naming the parser)
+    """
+    json_data = request.json_data
+    if json_data is None and request.url:
+        json_data = await DndBeyondService.fetch_from_url(request.url)
+    
+    try:
+        result = await CharacterSyncService(AsyncSessionLocal).resync(
+            character_id, json_data, full=request.full
+        )
+    except IntegrityError:
+        raise HTTPException(
+            status_code=409,
+            detail="Another character already has the synced character's name"
+        )
+    if result is None:
+        raise HTTPException(status_code=404, detail="Character not found")
+    return result.to_dict()
+
+
 @router.put("/characters/{character_id}", response_model=CharacterResponse)
 async def update_character(
     character_id: str,
@@ -180,15 +385,8 @@ async def update_character(
         HTTPException: If character not found or update fails
     """
     try:
-        # Convert dict to Character dataclass with lenient type checking
-        character = from_dict(
-            data_class=Character, 
-            data=request.character,
-            config=dacite.Config(
-                strict=False,
-                check_types=False  # Allow type flexibility for nested structures
-            )
-        )
+        # Convert dict to Character dataclass (generated decoder, lenient on primitive types)
+        character = character_from_dict(request.character)
         
         # Update in database
         repo = CharacterRepository(db)
@@ -253,16 +451,16 @@ async def update_character_section(
         db: Database session
         
     Returns:
-        Update status and section name
+        Update status, section name and the section's new version
         
     Raises:
         HTTPException: If character not found, section invalid, or update fails
     """
     try:
         repo = CharacterRepository(db)
-        db_character = await repo.update_section(character_id, section, request.data)
+        version = await repo.update_section(character_id, section, request.data)
         
-        if not db_character:
+        if version is None:
             raise HTTPException(status_code=404, detail="Character not found")
         
         await db.commit()
@@ -270,6 +468,7 @@ async def update_character_section(
         return {
             'updated': True,
             'section': section,
+            'version': version,
             'message': f"Successfully updated {section}"
         }
     
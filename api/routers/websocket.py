@@ -1,46 +1,127 @@
 """WebSocket router for real-time chat and character creation."""
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import dataclasses
 import json
 import uuid
 import sys
 from pathlib import Path
+from contextlib import aclosing
 from typing import Dict
 
 # Add project root to path for character builder imports
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+from api.config import config
 from api.database.connection import get_db
 from api.services.chat_service import ChatService
+from api.services.chat_stream import ChatStreamConnection, SlowClientError
 from api.services.dndbeyond_service import DndBeyondService
 from src.character_creation.async_character_builder import AsyncCharacterBuilder
+from src.rag.character.character_codec import character_to_dict, encode_any
+from src.utils.tracing import tracer, request_context, new_request_id
+from src.utils.metrics import registry
 
 router = APIRouter()
 
 # Active WebSocket connections
 active_connections: Dict[str, WebSocket] = {}
+registry.gauge(
+    "shadowscribe_websocket_connections",
+    "Open WebSocket connections (chat and character creation)",
+    callback=lambda: len(active_connections)
+)
 
 
 @router.websocket("/ws/chat")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time chat."""
+    """
+    WebSocket endpoint for real-time chat.
+    
+    Every query gets a request id (the client's "request_id" or a generated one) that
+    is on every frame of its answer. Protocol 1 (default) answers one query at a time:
+    a new message cancels the answer in progress. Protocol 2 (/ws/chat?protocol=2) runs
+    up to WS_MAX_CONCURRENT_QUERIES at once, so clients must route frames by request_id.
+    Response chunks are coalesced into frames (see api/services/chat_stream.py).
+    
+    Cancelling a query (cancel message, superseding message, disconnect) cancels its
+    task, which closes the pipeline's stream: pending LLM calls and retrieval stop and
+    the provider's response stream is closed, so the rest of the answer is not generated.
+    
+    Message Types (Client -> Server):
+        - {"message": ..., "character_name": ..., "request_id": ... (optional)}: Query
+        - cancel: Stop a query ({"type": "cancel", "request_id": ...}) or all of them
+          (no request_id)
+        - clear_history: Clear a character's conversation history
+        - ping: Keep-alive ping
+    
+    Message Types (Server -> Client):
+        - message_received: Query accepted
+        - routing_metadata / entities_metadata / context_sources / performance_metrics:
+          Pipeline metadata ({"request_id": ..., "data": {...}})
+        - response_chunk: Part of the answer ({"request_id": ..., "content": ...})
+        - response_complete / response_cancelled: Query finished or was cancelled
+        - error: Query or message failed
+        - history_cleared, pong
+    """
     await websocket.accept()
     
     connection_id = str(uuid.uuid4())
     active_connections[connection_id] = websocket
     
+    protocol = 2 if websocket.query_params.get('protocol') == '2' else 1
+    max_concurrent = config.WS_MAX_CONCURRENT_QUERIES if protocol == 2 else 1
+    
     # Initialize chat service
     chat_service = ChatService()
+    stream = ChatStreamConnection(websocket)
+    query_slots = asyncio.Semaphore(max_concurrent)
+    queries: Dict[str, asyncio.Task] = {}
     
-    async def emit_metadata(event_type: str, data: dict):
-        """Callback to emit metadata events to the client."""
-        await websocket.send_json({
-            'type': event_type,
-            'data': data
-        })
+    async def run_query(request_id: str, user_message: str, character_name: str):
+        """Answer one query, streaming its frames through the connection's sender."""
+        async def emit_metadata(event_type: str, data: dict):
+            """Callback to emit metadata events to the client."""
+            await stream.send_event({'type': event_type, 'request_id': request_id, 'data': data}, request_id)
+        
+        try:
+            async with query_slots:
+                # Every message gets a request id that tags all spans of its pipeline run
+                with request_context(request_id), \
+                        tracer.span("ws.send_stream", connection_id=connection_id) as span:
+                    chunks = 0
+                    async with aclosing(chat_service.process_query_stream(
+                        user_message,
+                        character_name,
+                        metadata_callback=emit_metadata
+                    )) as response_stream:
+                        async for chunk in response_stream:
+                            await stream.send_chunk(request_id, chunk)
+                            chunks += 1
+                    span.set_attributes({"chunks": chunks, "protocol": protocol})
+            
+            # Send completion signal
+            await stream.send_event({'type': 'response_complete', 'request_id': request_id}, request_id, final=True)
+        
+        except asyncio.CancelledError:
+            try:
+                stream.post({'type': 'response_cancelled', 'request_id': request_id}, request_id, final=True)
+            except ConnectionError:
+                pass
+            raise
+        except (SlowClientError, ConnectionError):
+            raise
+        except Exception as e:
+            await stream.send_event({
+                'type': 'error',
+                'request_id': request_id,
+                'error': f'Error processing query: {str(e)}'
+            }, request_id, final=True)
     
-    try:
+    async def receive_messages():
+        """Read client messages; queries run as tasks so cancel and ping are handled meanwhile."""
         while True:
             # Receive message from client
             data = await websocket.receive_text()
@@ -50,50 +131,78 @@ async def websocket_endpoint(websocket: WebSocket):
             message_type = message_data.get('type')
             
             if message_type == 'ping':
-                await websocket.send_json({'type': 'pong'})
+                await stream.send_event({'type': 'pong'})
                 continue
             
             if message_type == 'clear_history':
                 character_name = message_data.get('character_name')
                 if character_name:
                     chat_service.clear_conversation_history(character_name)
-                    await websocket.send_json({'type': 'history_cleared'})
+                    await stream.send_event({'type': 'history_cleared'})
+                continue
+            
+            if message_type == 'cancel':
+                request_id = message_data.get('request_id')
+                for task_id in ([request_id] if request_id else list(queries)):
+                    task = queries.get(task_id)
+                    if task:
+                        task.cancel()
                 continue
             
             user_message = message_data.get('message')
             character_name = message_data.get('character_name')
+            request_id = message_data.get('request_id') or new_request_id()
             
             # Validate input
             if not user_message or not character_name:
-                await websocket.send_json({
+                await stream.send_event({
                     'type': 'error',
                     'error': 'Missing required fields: message, character_name'
                 })
                 continue
+            if request_id in queries:
+                await stream.send_event({
+                    'type': 'error',
+                    'request_id': request_id,
+                    'error': 'A query with this request_id is already running'
+                })
+                continue
+            if len(queries) >= config.WS_MAX_PENDING_QUERIES:
+                await stream.send_event({
+                    'type': 'error',
+                    'request_id': request_id,
+                    'error': f'Too many queries in flight (max {config.WS_MAX_PENDING_QUERIES})'
+                })
+                continue
+            
+            # Protocol 1 clients show one answer at a time: a new question replaces the current
+            # one, whose response_cancelled goes out before this query's frames
+            if protocol == 1 and queries:
+                superseded = list(queries.values())
+                for task in superseded:
+                    task.cancel()
+                await asyncio.wait(superseded)
             
             # Send acknowledgment
-            await websocket.send_json({'type': 'message_received'})
+            await stream.send_event({'type': 'message_received', 'request_id': request_id})
             
-            # Stream response from CentralEngine
-            try:
-                async for chunk in chat_service.process_query_stream(
-                    user_message, 
-                    character_name,
-                    metadata_callback=emit_metadata
-                ):
-                    await websocket.send_json({
-                        'type': 'response_chunk',
-                        'content': chunk
-                    })
-                
-                # Send completion signal
-                await websocket.send_json({'type': 'response_complete'})
-                
-            except Exception as e:
-                await websocket.send_json({
-                    'type': 'error',
-                    'error': f'Error processing query: {str(e)}'
-                })
+            task = asyncio.create_task(run_query(request_id, user_message, character_name))
+            queries[request_id] = task
+            task.add_done_callback(lambda task, request_id=request_id: query_done(request_id, task))
+    
+    def query_done(request_id: str, task: asyncio.Task):
+        queries.pop(request_id, None)
+        # Failures other than query errors mean the connection is going away (the sender reports them)
+        if not task.cancelled():
+            task.exception()
+    
+    sender = asyncio.create_task(stream.run_sender())
+    receiver = asyncio.create_task(receive_messages())
+    try:
+        # Runs until the client disconnects or the sender fails (e.g. a slow client)
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
     
     except WebSocketDisconnect:
         print(f"Client disconnected: {connection_id}")
@@ -107,6 +216,12 @@ async def websocket_endpoint(websocket: WebSocket):
         except:
             pass
     finally:
+        # Stop the connection's queries and sender
+        tasks = [receiver, *queries.values(), sender]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
         # Clean up connection
         if connection_id in active_connections:
             del active_connections[connection_id]
@@ -125,16 +240,22 @@ async def character_creation_websocket(websocket: WebSocket):
         - create_character: Start character creation
           {
             "type": "create_character",
-            "url": "https://dndbeyond.com/characters/152248393"
+            "url": "https://dndbeyond.com/characters/152248393",
+            "stream_sections": true   (optional)
           }
         - ping: Keep-alive ping
     
     Message Types (Server -> Client):
         - parser_started: Parser has begun execution
-        - parser_complete: Parser has finished
+        - parser_complete: Parser has finished (llm_cache reports parse cache hits/misses)
+        - section_complete: With stream_sections, the Character sections of a finished
+          parser ({"parser": "core", "sections": {"character_base": {...}, ...}}), sent
+          right after its parser_complete (actions after features)
         - parser_error: Parser encountered an error
         - assembly_started: Character object assembly begun
-        - creation_complete: Character creation finished
+        - creation_complete: Character creation finished. character_data holds the full
+          character, or with stream_sections only the fields not already streamed
+          (objectives_and_contracts, notes, created_date, last_updated)
         - creation_error: Character creation failed
         - pong: Keep-alive response
     """
@@ -160,6 +281,7 @@ async def character_creation_websocket(websocket: WebSocket):
             if message_type == 'create_character':
                 url = message_data.get('url')
                 json_data = message_data.get('json_data')
+                stream_sections = bool(message_data.get('stream_sections'))
                 
                 # Validate input - need either URL or json_data
                 if not url and not json_data:
@@ -205,33 +327,40 @@ async def character_creation_websocket(websocket: WebSocket):
                         if event['type'] != 'creation_complete':
                             await websocket.send_json(event)
                     
-                    builder = AsyncCharacterBuilder(json_data)
-                    character = await builder.build_async(progress_callback=progress_callback)
-                    
-                    # Step 3: Serialize character for response
-                    from dataclasses import asdict
-                    from datetime import datetime
-                    import json as json_lib
-                    
-                    def serialize_datetime(obj):
-                        """Custom JSON encoder for datetime objects."""
-                        if isinstance(obj, datetime):
-                            return obj.isoformat()
-                        raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+                    streamed = set()
                     
-                    character_dict = asdict(character)
+                    async def section_callback(parser_name, sections):
+                        """Send a finished parser's sections (encoded straight to JSON-compatible dicts)."""
+                        await websocket.send_json({
+                            'type': 'section_complete',
+                            'parser': parser_name,
+                            'sections': {name: encode_any(value) for name, value in sections.items()}
+                        })
+                        streamed.update(sections)
                     
-                    # Pre-serialize character_data to handle datetime objects
-                    character_data_json = json_lib.loads(
-                        json_lib.dumps(character_dict, default=serialize_datetime)
+                    builder = AsyncCharacterBuilder(json_data)
+                    character = await builder.build_async(
+                        progress_callback=progress_callback,
+                        section_callback=section_callback if stream_sections else None
                     )
                     
+                    # Step 3: Serialize character for response (datetimes as ISO strings),
+                    # skipping sections the client already received
+                    if streamed:
+                        character_data_json = {
+                            field.name: encode_any(getattr(character, field.name))
+                            for field in dataclasses.fields(character) if field.name not in streamed
+                        }
+                    else:
+                        character_data_json = character_to_dict(character)
+                    
                     # Send full parsed character data for frontend editing
                     await websocket.send_json({
                         'type': 'creation_complete',
                         'character_id': character.character_base.name,
                         'character_name': character.character_base.name,
                         'character_data': character_data_json,
+                        'streamed_sections': sorted(streamed),
                         'character_summary': {
                             'name': character.character_base.name,
                             'race': character.character_base.race,
@@ -11,13 +11,26 @@ class CharacterResponse(BaseModel):
     character_class: Optional[str] = None
     level: Optional[int] = None
     data: Dict[str, Any]
+    version: Optional[int] = None
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
 
 
+class CharacterSummaryResponse(BaseModel):
+    """Character list entry schema (summary columns only, no character data)."""
+    id: str
+    name: str
+    race: Optional[str] = None
+    character_class: Optional[str] = None
+    level: Optional[int] = None
+    version: Optional[int] = None
+    updated_at: Optional[str] = None
+
+
 class CharacterListResponse(BaseModel):
-    """Character list response schema."""
-    characters: List[CharacterResponse]
+    """Character list response schema (one keyset page)."""
+    characters: List[CharacterSummaryResponse]
+    next_cursor: Optional[str] = None
 
 
 class FetchCharacterRequest(BaseModel):
@@ -38,6 +51,40 @@ class FetchCharacterResponse(BaseModel):
     character_id: str
 
 
+class BatchFetchRequest(BaseModel):
+    """Request schema for fetching many characters from D&D Beyond."""
+    urls: List[str] = Field(default_factory=list, description="D&D Beyond character URLs")
+    character_ids: List[str] = Field(default_factory=list, description="D&D Beyond character IDs")
+    include_data: bool = Field(True, description="Return each character's JSON (false: status only)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "urls": ["https://www.dndbeyond.com/characters/152248393"],
+                "character_ids": ["140237850"]
+            }
+        }
+
+
+class BatchFetchResult(BaseModel):
+    """One character of a batch fetch."""
+    character_id: str
+    status: str
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    elapsed_ms: float = 0.0
+    json_data: Optional[Dict[str, Any]] = None
+
+
+class BatchFetchResponse(BaseModel):
+    """Response schema for a batch fetch, results in request order (urls first)."""
+    results: List[BatchFetchResult]
+    fetched: int
+    not_modified: int
+    failed: int
+
+
 class CharacterCreateRequest(BaseModel):
     """Request schema for creating a new character."""
     character: Dict[str, Any] = Field(
@@ -102,4 +149,36 @@ class SectionUpdateResponse(BaseModel):
     """Response schema for section update."""
     updated: bool
     section: str
+    version: Optional[int] = None
     message: Optional[str] = None
+
+
+class BulkImportRequest(BaseModel):
+    """Request schema for bulk character import."""
+    items: List[Dict[str, Any]] = Field(
+        ...,
+        description="Character JSON dictionaries and/or D&D Beyond character exports"
+    )
+    skip_existing: bool = Field(False, description="Leave characters that already exist untouched")
+    chunk_size: int = Field(25, ge=1, le=500, description="Characters written per transaction")
+
+
+class CharacterSyncRequest(BaseModel):
+    """Request schema for re-syncing a character from D&D Beyond."""
+    url: Optional[str] = Field(None, description="D&D Beyond character URL (default: the character's stored source)")
+    json_data: Optional[Dict[str, Any]] = Field(None, description="D&D Beyond export to sync from instead of fetching")
+    full: bool = Field(False, description="Run every parser even if its inputs are unchanged")
+
+
+class CharacterSyncResponse(BaseModel):
+    """Response schema for a character re-sync."""
+    character_id: str
+    dndbeyond_id: Optional[str] = None
+    full: bool
+    changed_regions: List[str]
+    parsers_run: List[str]
+    sections_written: Dict[str, int]
+    version: Optional[int] = None
+    parser_times: Dict[str, float]
+    llm_usage: Dict[str, Any]
+    total_ms: float
@@ -0,0 +1,47 @@
+"""
+Committed character changes, for in-process caches built from character data.
+
+CharacterRepository records which sections of which characters a transaction wrote
+and publishes them once the transaction commits. Subscribers (ChatService instances,
+whose CentralEngines hold decoded characters, snapshots and entity indexes) drop or
+refresh what they derived from those sections. Writes made by other processes are
+not seen.
+
+Usage:
+    from api.services.character_changes import character_changes
+
+    class Service:
+        def __init__(self):
+            character_changes.subscribe(self)  # Held weakly
+
+        def character_changed(self, character_id: str, sections: Optional[Set[str]]) -> None:
+            ...  # sections is None when the whole character changed (create, delete, bulk import)
+"""
+import weakref
+from typing import Iterable, Optional, Protocol, Set
+
+
+class CharacterChangeSubscriber(Protocol):
+    def character_changed(self, character_id: str, sections: Optional[Set[str]]) -> None: ...
+
+
+class CharacterChangeFeed:
+    """Fans committed character changes out to weakly held subscribers."""
+
+    def __init__(self):
+        self._subscribers: 'weakref.WeakSet[CharacterChangeSubscriber]' = weakref.WeakSet()
+
+    def subscribe(self, subscriber: CharacterChangeSubscriber) -> None:
+        self._subscribers.add(subscriber)
+
+    def publish(self, character_id: str, sections: Optional[Iterable[str]] = None) -> None:
+        """Notify subscribers that sections of a character changed (None = all of it)."""
+        changed = set(sections) if sections is not None else None
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.character_changed(character_id, changed)
+            except Exception as e:
+                print(f"⚠️  Character change subscriber {type(subscriber).__name__} failed: {e}")
+
+
+character_changes = CharacterChangeFeed()
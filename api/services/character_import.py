@@ -0,0 +1,195 @@
+"""
+Bulk character import.
+
+Parses many characters concurrently and writes them in chunks, one transaction per
+chunk (CharacterRepository.bulk_upsert), streaming a progress event per item.
+
+Accepted item formats (auto-detected):
+- Character JSON (as stored / returned by the API, has 'character_base')
+- D&D Beyond character export (has 'data'), parsed with AsyncCharacterBuilder
+- Character dataclass instances (e.g. loaded from pickle files)
+
+Usage:
+    importer = CharacterImporter(AsyncSessionLocal, chunk_size=25)
+    async for event in importer.run(items):
+        print(event)
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.database.repositories.character_repo import CharacterRepository
+from src.rag.character.character_types import Character
+from src.rag.character.character_codec import character_from_dict
+
+
+@dataclass
+class ImportSummary:
+    """Totals of one bulk import"""
+    total: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    chunks: int = 0
+    parse_ms: float = 0.0
+    write_ms: float = 0.0
+    total_ms: float = 0.0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'created': self.created,
+            'updated': self.updated,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'chunks': self.chunks,
+            'parse_ms': round(self.parse_ms, 2),
+            'write_ms': round(self.write_ms, 2),
+            'total_ms': round(self.total_ms, 2),
+            'characters_per_second': round(self.total / (self.total_ms / 1000), 1) if self.total_ms else None,
+            'errors': self.errors,
+        }
+
+
+async def parse_item(item: Any) -> Character:
+    """Character from any accepted item format"""
+    if isinstance(item, Character):
+        return item
+    if isinstance(item, Exception):
+        # Item that could not be read (e.g. invalid JSON file)
+        raise item
+    if not isinstance(item, dict):
+        raise ValueError(f"Expected a JSON object, got {type(item).__name__}")
+    if 'character_base' in item:
+        return character_from_dict(item)
+    if 'data' in item:
+        # Imported here: the builder pulls in the LLM-backed parsers
+        from src.character_creation.async_character_builder import AsyncCharacterBuilder
+        return await AsyncCharacterBuilder(item).build_async()
+    raise ValueError("Unrecognized item: expected Character JSON or a D&D Beyond export")
+
+
+class CharacterImporter:
+    """Concurrent parse + chunked upsert pipeline with per-item progress events"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        chunk_size: int = 25,
+        parse_concurrency: int = 8,
+        skip_existing: bool = False
+    ):
+        self.session_factory = session_factory
+        self.chunk_size = max(1, chunk_size)
+        self.parse_concurrency = max(1, parse_concurrency)
+        self.skip_existing = skip_existing
+        self.summary = ImportSummary()
+
+    async def run(self, items: Iterable[Any], labels: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Import `items`, yielding events as they happen:
+        - item_parsed / item_failed (stage 'parse' or 'write')
+        - item_saved (status created / updated / skipped) after its chunk commits
+        - chunk_committed
+        - import_complete (summary)
+
+        `labels` name the items in events (file names, URLs); defaults to the index.
+        """
+        items = list(items)
+        labels = labels or [str(i) for i in range(len(items))]
+        summary = self.summary = ImportSummary(total=len(items))
+        start = time.perf_counter()
+
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.parse_concurrency)
+
+        async def parse(index: int, item: Any) -> None:
+            async with semaphore:
+                parse_start = time.perf_counter()
+                try:
+                    character = await parse_item(item)
+                    await queue.put((index, character, None))
+                except Exception as e:
+                    await queue.put((index, None, e))
+                finally:
+                    summary.parse_ms += (time.perf_counter() - parse_start) * 1000
+
+        tasks = [asyncio.create_task(parse(i, item)) for i, item in enumerate(items)]
+        pending: List[Tuple[int, Character]] = []
+        try:
+            yield {'type': 'import_started', 'total': len(items), 'chunk_size': self.chunk_size}
+            for _ in range(len(items)):
+                index, character, error = await queue.get()
+                if error is not None:
+                    yield self._failed(index, labels[index], 'parse', error)
+                    continue
+                yield {
+                    'type': 'item_parsed',
+                    'index': index,
+                    'item': labels[index],
+                    'name': character.character_base.name
+                }
+                pending.append((index, character))
+                if len(pending) >= self.chunk_size:
+                    async for event in self._write_chunk(pending, labels):
+                        yield event
+                    pending = []
+
+            if pending:
+                async for event in self._write_chunk(pending, labels):
+                    yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        summary.total_ms = (time.perf_counter() - start) * 1000
+        yield {'type': 'import_complete', 'summary': summary.to_dict()}
+
+    async def _write_chunk(self, chunk: List[Tuple[int, Character]], labels: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Upsert one chunk in its own transaction"""
+        summary = self.summary
+        write_start = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                repo = CharacterRepository(session)
+                statuses = await repo.bulk_upsert([c for _, c in chunk], skip_existing=self.skip_existing)
+                await session.commit()
+        except Exception as e:
+            summary.write_ms += (time.perf_counter() - write_start) * 1000
+            for index, _ in chunk:
+                yield self._failed(index, labels[index], 'write', e)
+            return
+        summary.write_ms += (time.perf_counter() - write_start) * 1000
+        summary.chunks += 1
+
+        # Items sharing an ID were merged into one row (the last one wins)
+        last_index = {CharacterRepository._generate_id(c.character_base.name): index for index, c in chunk}
+        for index, character in chunk:
+            character_id = CharacterRepository._generate_id(character.character_base.name)
+            status = statuses[character_id] if last_index[character_id] == index else 'skipped'
+            setattr(summary, status, getattr(summary, status) + 1)
+            yield {
+                'type': 'item_saved',
+                'index': index,
+                'item': labels[index],
+                'id': character_id,
+                'name': character.character_base.name,
+                'status': status
+            }
+        yield {
+            'type': 'chunk_committed',
+            'chunk': summary.chunks,
+            'size': len(chunk),
+            'write_ms': round((time.perf_counter() - write_start) * 1000, 2)
+        }
+
+    def _failed(self, index: int, label: str, stage: str, error: Exception) -> Dict[str, Any]:
+        self.summary.failed += 1
+        event = {'type': 'item_failed', 'index': index, 'item': label, 'stage': stage, 'error': str(error)}
+        self.summary.errors.append({k: event[k] for k in ('index', 'item', 'stage', 'error')})
+        return event
@@ -0,0 +1,157 @@
+"""
+Incremental character re-sync from D&D Beyond.
+
+Hashes every region of the D&D Beyond JSON the parsers read (inventory, spells,
+classes, notes, ...) and compares the hashes with the ones stored at the last sync.
+Only parsers with a changed input region run, and only sections whose data changed
+are written (CharacterRepository.update_sections). A character without stored
+hashes (never synced) or a `full` sync runs every parser.
+
+No database connection is held while the parsers run: the stored hashes are read
+in one short session and the changed sections written in another.
+
+Usage:
+    result = await CharacterSyncService(AsyncSessionLocal).resync(character_id, json_data)
+    print(result.to_dict())
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.database.repositories.character_repo import CharacterRepository
+from api.services.dndbeyond_service import DndBeyondService
+from src.character_creation.async_character_builder import AsyncCharacterBuilder, ProgressCallback
+
+
+@dataclass
+class SyncResult:
+    """Outcome of one character re-sync"""
+    character_id: str
+    dndbeyond_id: Optional[str]
+    full: bool
+    changed_regions: List[str] = field(default_factory=list)
+    parsers_run: List[str] = field(default_factory=list)
+    sections_written: Dict[str, int] = field(default_factory=dict)
+    version: Optional[int] = None
+    parser_times: Dict[str, float] = field(default_factory=dict)
+    llm_usage: Dict[str, Any] = field(default_factory=dict)
+    total_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'character_id': self.character_id,
+            'dndbeyond_id': self.dndbeyond_id,
+            'full': self.full,
+            'changed_regions': self.changed_regions,
+            'parsers_run': self.parsers_run,
+            'sections_written': self.sections_written,
+            'version': self.version,
+            'parser_times': {k: round(v, 2) for k, v in self.parser_times.items()},
+            'llm_usage': self.llm_usage,
+            'total_ms': round(self.total_ms, 2),
+        }
+
+
+class CharacterSyncService:
+    """Re-sync stored characters from D&D Beyond, running only the parsers whose inputs changed"""
+
+    def __init__(self, session_factory: Callable[[], AsyncSession]):
+        self.session_factory = session_factory
+
+    async def resync(
+        self,
+        character_id: str,
+        json_data: Optional[Dict[str, Any]] = None,
+        full: bool = False,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> Optional[SyncResult]:
+        """
+        Re-sync a character from a D&D Beyond export.
+
+        Args:
+            character_id: Stored character to update
+            json_data: D&D Beyond export; fetched with the stored D&D Beyond ID if omitted
+            full: Run every parser even if its inputs are unchanged
+            progress_callback: Receives the builder's parser progress events
+
+        Returns:
+            SyncResult, or None if the character does not exist
+
+        Raises:
+            HTTPException: If there is no export and no stored D&D Beyond ID, fetching fails,
+                or a parser fails (502 naming the parser; nothing is written)
+        """
+        start = time.perf_counter()
+
+        async with self.session_factory() as session:
+            stored = await CharacterRepository(session).get_by_id(character_id, sections=())
+            if stored is None:
+                return None
+            stored_id, stored_hashes = stored.dndbeyond_id, stored.source_hashes
+
+        if json_data is None:
+            if not stored_id:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Character {character_id} has no D&D Beyond source yet; provide a url or json_data"
+                )
+            json_data = await DndBeyondService.fetch_character_json(stored_id)
+
+        source_id = json_data.get("data", {}).get("id")
+        new_hashes = AsyncCharacterBuilder.source_hashes(json_data)
+        old_hashes = None if full else stored_hashes
+        result = SyncResult(
+            character_id=character_id,
+            dndbeyond_id=str(source_id) if source_id is not None else stored_id,
+            full=not old_hashes,
+            changed_regions=sorted(
+                region for region, digest in new_hashes.items()
+                if not old_hashes or old_hashes.get(region) != digest
+            )
+        )
+
+        sections = {}
+        parsers = AsyncCharacterBuilder.changed_parsers(old_hashes, new_hashes)
+        if parsers:
+            builder = AsyncCharacterBuilder(json_data)
+            failed: List[str] = []
+
+            async def track_progress(event: Dict[str, Any]) -> None:
+                if event.get('type') == 'parser_error':
+                    failed.append(f"{event['parser']}: {event['error']}")
+                if progress_callback:
+                    await progress_callback(event)
+
+            try:
+                sections, result.parser_times, llm_usage = await builder.build_sections_async(parsers, track_progress)
+            except Exception as e:
+                # The parsers run in a TaskGroup (ExceptionGroup); their error events name them
+                raise HTTPException(
+                    status_code=502,
+                    detail=f"Re-sync failed, nothing was written. Parser {'; '.join(failed) or e}"
+                )
+            result.parsers_run = list(result.parser_times)
+            result.llm_usage = llm_usage.to_dict()
+
+        async with self.session_factory() as session:
+            repo = CharacterRepository(session)
+            written = await repo.update_sections(
+                character_id,
+                sections,
+                touch={'last_updated': datetime.now()},
+                dndbeyond_id=result.dndbeyond_id,
+                source_hashes=new_hashes
+            )
+            if written is None:
+                # Deleted while the parsers ran
+                return None
+            await session.commit()
+            result.sections_written = written
+            result.version = (await repo.get_by_id(character_id, sections=())).version
+
+        result.total_ms = (time.perf_counter() - start) * 1000
+        return result
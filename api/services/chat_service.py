@@ -1,7 +1,10 @@
 """Chat service for processing queries through CentralEngine."""
+import asyncio
+import copy
 import sys
+from contextlib import aclosing
 from pathlib import Path
-from typing import AsyncGenerator, Callable, Optional
+from typing import AsyncGenerator, Callable, Dict, Optional, Set, Tuple
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
@@ -10,65 +13,173 @@ sys.path.insert(0, str(project_root))
 from src.central_engine import CentralEngine
 from src.llm.central_prompt_manager import CentralPromptManager
 from src.rag.context_assembler import ContextAssembler
+from src.rag.character.character_types import Character
 from src.utils.character_manager import CharacterManager
 from src.rag.rulebook.rulebook_storage import RulebookStorage
 from src.rag.session_notes.session_notes_storage import SessionNotesStorage
 from src.config import get_config
 from api.database.connection import AsyncSessionLocal
+from api.database.repositories.character_repo import CharacterRepository
+from api.services.character_changes import character_changes
 
 
-class ChatService:
-    """Service for handling chat queries."""
-    
-    def __init__(self):
-        """Initialize chat service with CentralEngine."""
-        self._engines = {}
-        self._rulebook_storage = None
-        self._session_notes_storage = None
-        self._initialize_storage()
-    
-    def _initialize_storage(self):
-        """Initialize rulebook and session notes storage."""
+# Rulebook / session notes storage, loaded once per process and shared by all connections
+_storage = None
+
+# In-flight database loads by character name, so concurrent first-time loads share one query
+_character_loads: Dict[str, asyncio.Task] = {}
+
+
+def _load_storage():
+    """(rulebook_storage, session_notes_storage), loaded on first use."""
+    global _storage
+    if _storage is None:
+        rulebook_storage, session_notes_storage = None, None
         try:
             # Load rulebook storage
-            self._rulebook_storage = RulebookStorage()
+            rulebook_storage = RulebookStorage()
             rulebook_path = Path(project_root) / "knowledge_base" / "processed_rulebook" / "rulebook_storage.pkl"
             if rulebook_path.exists():
-                self._rulebook_storage.load_from_disk(str(rulebook_path))
+                rulebook_storage.load_from_disk(str(rulebook_path))
             
             # Load session notes storage
             session_storage = SessionNotesStorage()
-            self._session_notes_storage = session_storage.get_campaign("main_campaign")
+            session_notes_storage = session_storage.get_campaign("main_campaign")
         except Exception as e:
             print(f"Warning: Could not load storage: {e}")
+        _storage = (rulebook_storage, session_notes_storage)
+    return _storage
+
+
+async def _fetch_character_data(character_name: str) -> Optional[Tuple[str, dict]]:
+    """(character ID, stored character data); the session is held only for the query."""
+    async with AsyncSessionLocal() as db_session:
+        db_character = await CharacterRepository(db_session).get_by_name(character_name)
+        return (db_character.id, db_character.section_data()) if db_character else None
+
+
+async def _fetch_character_data_by_id(character_id: str) -> Optional[dict]:
+    async with AsyncSessionLocal() as db_session:
+        db_character = await CharacterRepository(db_session).get_by_id(character_id)
+        return db_character.section_data() if db_character else None
+
+
+async def load_character_data(character_name: str) -> Optional[Tuple[str, dict]]:
+    """(character ID, stored data), sharing one database query between concurrent callers."""
+    task = _character_loads.get(character_name)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_character_data(character_name))
+        _character_loads[character_name] = task
+        task.add_done_callback(lambda _: _character_loads.pop(character_name, None))
+    return await asyncio.shield(task)
+
+
+class ChatService:
+    """
+    Service for handling chat queries.
+    
+    Engines keep their decoded character between queries. Committed edits of a
+    character (api/services/character_changes.py) mark the edited sections stale, and
+    the next query reloads them into an updated copy of the engine's character that is
+    swapped in whole (queries in flight keep the old one). Snapshots and entity indexes
+    of the unchanged sections are kept. Queries arriving during a refresh wait for it.
+    """
+    
+    def __init__(self):
+        """Initialize chat service with CentralEngine."""
+        self._engines = {}
+        self._engine_creations: Dict[str, asyncio.Task] = {}  # Concurrent queries share one creation
+        self._engine_refreshes: Dict[str, asyncio.Task] = {}  # ... and one refresh
+        self._engine_ids: Dict[str, str] = {}  # Character ID -> name of the engine built from it
+        self._stale_sections: Dict[str, Optional[Set[str]]] = {}  # Engine name -> edited sections (None = all)
+        self._rulebook_storage, self._session_notes_storage = _load_storage()
+        character_changes.subscribe(self)
+    
+    def character_changed(self, character_id: str, sections: Optional[Set[str]]) -> None:
+        """Mark edited sections of an engine's character for reload on its next query."""
+        character_name = self._engine_ids.get(character_id)
+        if character_name is not None:
+            self._mark_stale(character_name, sections)
+    
+    def _mark_stale(self, character_name: str, sections: Optional[Set[str]]) -> None:
+        if character_name in self._stale_sections:
+            pending = self._stale_sections[character_name]
+            sections = None if pending is None or sections is None else pending | sections
+        self._stale_sections[character_name] = sections
+    
+    async def _load_character(self, character_name: str) -> Tuple[Optional[str], Character]:
+        """(character ID, character) from the database, with pickle fallback (no ID)."""
+        loaded = await load_character_data(character_name)
+        if loaded is not None:
+            character_id, data = loaded
+            # Decoded per engine so engines never share a Character object
+            return character_id, CharacterManager.character_from_data(data)
+        return None, CharacterManager().load_character(character_name)
+    
+    async def _refresh_engine(self, character_name: str) -> None:
+        """Swap an updated copy of an engine's character in; drop the engine if it was deleted."""
+        sections = self._stale_sections.pop(character_name)
+        character_id = next(cid for cid, name in self._engine_ids.items() if name == character_name)
+        try:
+            data = await _fetch_character_data_by_id(character_id)
+        except BaseException:
+            # Retried by the next query
+            self._mark_stale(character_name, sections)
+            raise
+        if data is None:
+            del self._engines[character_name]
+            del self._engine_ids[character_id]
+            return
+        
+        engine = self._engines[character_name]
+        character = CharacterManager.character_from_data(data)
+        if sections is not None:
+            # Shares the unchanged section objects, so their snapshots and indexes stay valid
+            fresh, character = character, copy.copy(engine.character)
+            for section in sections:
+                setattr(character, section, getattr(fresh, section))
+        engine.replace_character(character)
     
     async def _get_or_create_engine(self, character_name: str) -> CentralEngine:
         """Get or create CentralEngine for character."""
+        task = self._engine_refreshes.get(character_name)
+        if task is None and character_name in self._stale_sections and character_name in self._engines:
+            task = asyncio.ensure_future(self._refresh_engine(character_name))
+            self._engine_refreshes[character_name] = task
+            task.add_done_callback(lambda _: self._engine_refreshes.pop(character_name, None))
+        if task is not None:
+            await asyncio.shield(task)
         if character_name in self._engines:
             return self._engines[character_name]
         
-        # Create database session and character manager
-        async with AsyncSessionLocal() as db_session:
-            character_manager = CharacterManager(db_session=db_session)
-            
-            # Load character from database (with pickle fallback)
-            character = await character_manager.load_character_async(character_name)
-            if not character:
-                raise ValueError(f"Character '{character_name}' not found")
-            
-            # Create engine
-            context_assembler = ContextAssembler()
-            prompt_manager = CentralPromptManager(context_assembler)
-            
-            engine = CentralEngine.create_from_config(
-                prompt_manager,
-                character=character,
-                rulebook_storage=self._rulebook_storage,
-                campaign_session_notes=self._session_notes_storage
-            )
-            
-            self._engines[character_name] = engine
-            return engine
+        task = self._engine_creations.get(character_name)
+        if task is None:
+            task = asyncio.ensure_future(self._create_engine(character_name))
+            self._engine_creations[character_name] = task
+            task.add_done_callback(lambda _: self._engine_creations.pop(character_name, None))
+        return await asyncio.shield(task)
+    
+    async def _create_engine(self, character_name: str) -> CentralEngine:
+        """Load the character and build its CentralEngine."""
+        character_id, character = await self._load_character(character_name)
+        if not character:
+            raise ValueError(f"Character '{character_name}' not found")
+        
+        # Create engine
+        context_assembler = ContextAssembler()
+        prompt_manager = CentralPromptManager(context_assembler)
+        
+        engine = CentralEngine.create_from_config(
+            prompt_manager,
+            character=character,
+            rulebook_storage=self._rulebook_storage,
+            campaign_session_notes=self._session_notes_storage
+        )
+        
+        self._engines[character_name] = engine
+        if character_id is not None:
+            self._engine_ids[character_id] = character_name
+        return engine
     
     def clear_conversation_history(self, character_name: str):
         """Clear conversation history for a character."""
@@ -82,7 +193,8 @@ class ChatService:
         metadata_callback: Optional[Callable] = None
     ) -> AsyncGenerator[str, None]:
         """
-        Process query and stream response chunks.
+        Process query and stream response chunks. Closing this stream closes the
+        engine's, which stops its pending LLM calls and retrieval.
         
         Args:
             user_query: User's question
@@ -91,5 +203,6 @@ class ChatService:
         """
         engine = await self._get_or_create_engine(character_name)
         
-        async for chunk in engine.process_query_stream(user_query, character_name, metadata_callback):
-            yield chunk
+        async with aclosing(engine.process_query_stream(user_query, character_name, metadata_callback)) as stream:
+            async for chunk in stream:
+                yield chunk
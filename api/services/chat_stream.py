@@ -0,0 +1,216 @@
+"""
+Multiplexed, coalesced chat streaming over one WebSocket.
+
+Several queries can stream over the same connection, so every frame carries its
+request id. All frames go through one outbound queue drained by a single sender task:
+- Response chunks of a request are coalesced into one response_chunk frame. The first
+  chunk of a response is sent right away (time to first token); later ones are held
+  for up to WS_FRAME_WINDOW_MS, and a frame grows while it waits behind a busy socket,
+  up to WS_FRAME_MAX_CHARS
+- A control frame (metadata, completion, error) of a request first closes its open
+  chunk frame, so every request's frames stay in order
+- The sender sends the first frame in the queue that is ready: a chunk frame waiting
+  out its window only holds back its own request (whose only unready frame it is,
+  being the open one), not the frames of other requests queued behind it
+- Backpressure: producers wait once more than WS_MAX_BUFFERED_CHARS are queued for the
+  connection (until half of it is sent). A client that does not accept a frame within
+  WS_SEND_TIMEOUT fails the connection with SlowClientError instead of holding memory
+
+Usage:
+    stream = ChatStreamConnection(websocket)
+    sender = asyncio.create_task(stream.run_sender())
+
+    await stream.send_event({'type': 'message_received', 'request_id': request_id})
+    async for chunk in chat_service.process_query_stream(...):
+        await stream.send_chunk(request_id, chunk)
+    await stream.send_event({'type': 'response_complete', 'request_id': request_id},
+                            request_id, final=True)
+"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from fastapi import WebSocket
+
+from api.config import config
+from src.utils.metrics import registry
+
+
+WS_FRAMES_TOTAL = registry.counter(
+    "shadowscribe_ws_frames_total", "WebSocket frames sent by the chat stream", ["type"])
+WS_CHUNKS_TOTAL = registry.counter(
+    "shadowscribe_ws_chunks_total", "LLM response chunks handed to the chat stream (before coalescing)")
+WS_BACKPRESSURE_TOTAL = registry.counter(
+    "shadowscribe_ws_backpressure_total", "Chat stream producers paused on a full send buffer")
+WS_SLOW_CLIENTS_TOTAL = registry.counter(
+    "shadowscribe_ws_slow_clients_total", "Chat connections failed because the client stopped reading")
+
+# Buffer accounting for control frames (their JSON size is only known when sent)
+_CONTROL_FRAME_CHARS = 256
+
+
+class SlowClientError(Exception):
+    """The client did not accept frames within the send timeout."""
+
+
+@dataclass(eq=False)
+class _Frame:
+    request_id: Optional[str]
+    payload: Optional[Dict[str, Any]]  # Control frame; None for a response_chunk frame
+    ready_at: float  # Loop time from which the sender may send it
+    chunks: List[str] = field(default_factory=list)
+    size: int = 0
+
+
+class ChatStreamConnection:
+    """Outbound side of a chat WebSocket: one queue, one sender task, coalesced chunks."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        window_ms: Optional[float] = None,
+        max_frame_chars: Optional[int] = None,
+        max_buffered_chars: Optional[int] = None,
+        send_timeout: Optional[float] = None
+    ):
+        self.websocket = websocket
+        self.window = (config.WS_FRAME_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_frame_chars = max_frame_chars if max_frame_chars is not None else config.WS_FRAME_MAX_CHARS
+        self.max_buffered_chars = max_buffered_chars or config.WS_MAX_BUFFERED_CHARS
+        self.send_timeout = send_timeout or config.WS_SEND_TIMEOUT
+
+        self.frames_sent = 0
+        self.chunks_received = 0
+
+        self._queue: Deque[_Frame] = deque()
+        self._open: Dict[str, _Frame] = {}  # Request id -> chunk frame still accepting chunks
+        self._streaming: Set[str] = set()  # Requests that already had a chunk frame
+        self._buffered = 0
+        self._wakeup = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._error: Optional[BaseException] = None
+
+    def post(self, payload: Dict[str, Any], request_id: Optional[str] = None, final: bool = False) -> None:
+        """
+        Queue a control frame without waiting for buffer space (replies to the client's
+        own messages, cancellation notices).
+
+        Args:
+            payload: JSON-compatible message
+            request_id: Request the frame belongs to; closes its open chunk frame
+            final: Last frame of the request
+        """
+        self._raise_if_failed()
+        loop = asyncio.get_running_loop()
+        if request_id is not None:
+            self._close_frame(request_id, loop.time())
+            if final:
+                self._streaming.discard(request_id)
+        self._queue.append(_Frame(request_id, payload, loop.time(), size=_CONTROL_FRAME_CHARS))
+        self._buffered += _CONTROL_FRAME_CHARS
+        self._wakeup.set()
+
+    async def send_event(self, payload: Dict[str, Any], request_id: Optional[str] = None, final: bool = False) -> None:
+        """Queue a control frame (see post), then wait while the send buffer is full."""
+        self.post(payload, request_id, final)
+        await self._wait_writable()
+
+    async def send_chunk(self, request_id: str, text: str) -> None:
+        """Queue a response chunk of a request, then wait while the send buffer is full."""
+        if not text:
+            return
+        self._raise_if_failed()
+        self.chunks_received += 1
+        WS_CHUNKS_TOTAL.inc()
+        now = asyncio.get_running_loop().time()
+
+        frame = self._open.get(request_id)
+        if frame is not None and frame.size + len(text) > self.max_frame_chars:
+            self._close_frame(request_id, now)
+            frame = None
+        if frame is None:
+            first = request_id not in self._streaming
+            self._streaming.add(request_id)
+            frame = _Frame(request_id, None, now if first else now + self.window)
+            self._open[request_id] = frame
+            self._queue.append(frame)
+            self._wakeup.set()
+
+        # Appending to a queued frame needs no wakeup: the sender takes the text with it
+        frame.chunks.append(text)
+        frame.size += len(text)
+        self._buffered += len(text)
+        if frame.size >= self.max_frame_chars:
+            self._close_frame(request_id, now)
+        await self._wait_writable()
+
+    async def run_sender(self) -> None:
+        """Send queued frames until cancelled; raises SlowClientError or the socket's error."""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                now = loop.time()
+                index = next((i for i, queued in enumerate(self._queue) if queued.ready_at <= now), None)
+                if index is None:
+                    # Wait for the earliest window to pass, or for a new or closed frame
+                    delay = min(queued.ready_at for queued in self._queue) - now
+                    self._wakeup.clear()
+                    timer = loop.call_later(delay, self._wakeup.set)
+                    await self._wakeup.wait()
+                    timer.cancel()
+                    continue
+
+                frame = self._queue[index]
+                del self._queue[index]
+                if frame.request_id is not None and self._open.get(frame.request_id) is frame:
+                    del self._open[frame.request_id]
+                payload = frame.payload
+                if payload is None:
+                    payload = {'type': 'response_chunk', 'request_id': frame.request_id, 'content': ''.join(frame.chunks)}
+
+                try:
+                    await asyncio.wait_for(self.websocket.send_json(payload), self.send_timeout)
+                except TimeoutError:
+                    WS_SLOW_CLIENTS_TOTAL.inc()
+                    raise SlowClientError(f"Client did not accept a frame within {self.send_timeout:.0f}s")
+                self.frames_sent += 1
+                WS_FRAMES_TOTAL.inc(type=payload.get('type', 'unknown'))
+
+                self._buffered -= frame.size
+                if self._buffered <= self.max_buffered_chars // 2:
+                    self._writable.set()
+        except BaseException as e:
+            # Wake paused producers so they fail instead of waiting for a dead sender
+            self._error = e
+            self._writable.set()
+            raise
+
+    def _close_frame(self, request_id: str, now: float) -> None:
+        """Stop a request's open chunk frame from growing and make it sendable now."""
+        frame = self._open.pop(request_id, None)
+        if frame is not None:
+            frame.ready_at = min(frame.ready_at, now)
+            self._wakeup.set()
+
+    async def _wait_writable(self) -> None:
+        if self._buffered <= self.max_buffered_chars:
+            return
+        self._writable.clear()
+        WS_BACKPRESSURE_TOTAL.inc()
+        try:
+            await asyncio.wait_for(self._writable.wait(), self.send_timeout)
+        except TimeoutError:
+            WS_SLOW_CLIENTS_TOTAL.inc()
+            raise SlowClientError(f"Send buffer full for {self.send_timeout:.0f}s")
+        self._raise_if_failed()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise ConnectionError("Chat stream sender stopped") from self._error
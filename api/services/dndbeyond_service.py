@@ -1,30 +1,349 @@
-"""D&D Beyond character fetching service."""
+"""
+D&D Beyond character fetching service.
+
+All fetches go through one DndBeyondFetcher per event loop:
+- one shared httpx.AsyncClient (connection reuse)
+- at most DNDBEYOND_CONCURRENCY requests in flight and a token bucket limiting them
+  to DNDBEYOND_RATE per second, shared by single fetches and batches
+- timeouts, connection errors, 429 and 5xx are retried with exponential backoff and
+  jitter (Retry-After is honored)
+- 200 responses are cached on disk with their ETag / Last-Modified; the next fetch of
+  the same character is a conditional request and a 304 returns the cached JSON
+
+Usage:
+    json_data = await DndBeyondService.fetch_character_json("152248393")
+
+    results = await DndBeyondService.fetch_many(["152248393", "140237850"])
+    for result in results:
+        print(result.character_id, result.status, result.attempts)
+"""
+import asyncio
+import json
+import os
+import random
 import re
-from typing import Dict, Any, Optional
+import tempfile
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
 import httpx
 from fastapi import HTTPException
 
+from api.config import config
+from src.utils.metrics import registry
+
+
+DNDBEYOND_REQUESTS_TOTAL = registry.counter(
+    "shadowscribe_dndbeyond_requests_total", "HTTP requests to the D&D Beyond character service", ["result"])
+DNDBEYOND_FETCH_SECONDS = registry.histogram(
+    "shadowscribe_dndbeyond_fetch_seconds", "D&D Beyond character fetch latency (including retries)", ["status"])
+
+# Responses worth another attempt; everything else >= 400 is final
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_RETRY_DELAY = 30.0
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, at most `capacity` banked."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Take one token, waiting for it if necessary. Returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        start = time.monotonic()
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - start
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class DndBeyondResponseCache:
+    """
+    Last 200 response per character: `<id>.json` holds the character JSON and
+    `<id>.meta.json` its validators, so building a conditional request reads only
+    the small file and the large one is read (off the event loop) only on a 304.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _paths(self, character_id: str):
+        return self.directory / f"{character_id}.meta.json", self.directory / f"{character_id}.json"
+
+    def get_validators(self, character_id: str, url: str) -> Optional[Dict[str, Any]]:
+        """{'etag', 'last_modified', ...} of the cached response for this URL, or None"""
+        meta_path, data_path = self._paths(character_id)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Entries fetched from another endpoint (e.g. a stub server) don't count
+        if meta.get('url') != url or not data_path.exists():
+            return None
+        return meta
+
+    def load(self, character_id: str) -> Optional[Dict[str, Any]]:
+        """Cached character JSON, or None if missing or unreadable"""
+        try:
+            with open(self._paths(character_id)[1], 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, character_id: str, url: str, headers: Dict[str, str], body: bytes) -> None:
+        """Store a 200 response body (raw bytes, as received) and its validators"""
+        meta_path, data_path = self._paths(character_id)
+        meta = {
+            'url': url,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'fetched_at': time.time()
+        }
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Data first: validators must never point at a missing or older body
+            for path, content in ((data_path, body), (meta_path, json.dumps(meta).encode())):
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not write D&D Beyond cache entry {data_path}: {e}")
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching one character in a batch"""
+    character_id: str
+    status: str                 # "fetched", "not_modified" (served from cache) or "error"
+    json_data: Optional[Dict[str, Any]] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    elapsed_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status != "error"
+
+    def to_dict(self, include_data: bool = False) -> Dict[str, Any]:
+        result = {
+            'character_id': self.character_id,
+            'status': self.status,
+            'status_code': self.status_code,
+            'error': self.error,
+            'attempts': self.attempts,
+            'elapsed_ms': round(self.elapsed_ms, 2),
+        }
+        if include_data:
+            result['json_data'] = self.json_data
+        return result
+
+
+class DndBeyondFetcher:
+    """Rate-limited, retrying, caching fetcher of D&D Beyond character JSON."""
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        timeout: Optional[float] = None,
+        cache_dir: Optional[str] = None
+    ):
+        self.api_url = api_url or config.DNDBEYOND_API_URL
+        self.max_retries = config.DNDBEYOND_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = config.DNDBEYOND_BACKOFF if backoff is None else backoff
+        cache_dir = config.DNDBEYOND_CACHE_DIR if cache_dir is None else cache_dir
+        self.cache = DndBeyondResponseCache(cache_dir) if cache_dir else None
+        self.bucket = TokenBucket(
+            config.DNDBEYOND_RATE if rate is None else rate,
+            config.DNDBEYOND_BURST if burst is None else burst
+        )
+        self._semaphore = asyncio.Semaphore(max(1, config.DNDBEYOND_CONCURRENCY if concurrency is None else concurrency))
+        self._client = httpx.AsyncClient(
+            timeout=config.DNDBEYOND_TIMEOUT if timeout is None else timeout,
+            headers={'Accept': 'application/json'}
+        )
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> 'DndBeyondFetcher':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Retry-After if the server sent one, else exponential backoff with full jitter"""
+        if response is not None:
+            retry_after = response.headers.get('retry-after')
+            if retry_after:
+                try:
+                    return min(MAX_RETRY_DELAY, max(0.0, float(retry_after)))
+                except ValueError:
+                    try:
+                        return min(MAX_RETRY_DELAY, max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()))
+                    except (TypeError, ValueError):
+                        pass
+        return random.uniform(0, min(MAX_RETRY_DELAY, self.backoff * (2 ** attempt)))
+
+    async def _fetch(self, character_id: str, result: FetchResult) -> Dict[str, Any]:
+        url = self.api_url.format(character_id=character_id)
+        cached = self.cache.get_validators(character_id, url) if self.cache else None
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        attempt = 0
+        async with self._semaphore:
+            while True:
+                await self.bucket.acquire()
+                result.attempts = attempt + 1
+                response = None
+                try:
+                    response = await self._client.get(url, headers=headers)
+                except httpx.TimeoutException:
+                    error = HTTPException(status_code=504, detail="Request to D&D Beyond timed out. Please try again.")
+                except httpx.RequestError as e:
+                    error = HTTPException(status_code=502, detail=f"Failed to connect to D&D Beyond: {str(e)}")
+                else:
+                    result.status_code = response.status_code
+                    if response.status_code == 304 and cached:
+                        data = await asyncio.to_thread(self.cache.load, character_id)
+                        if data is not None:
+                            DNDBEYOND_REQUESTS_TOTAL.inc(result="not_modified")
+                            result.status = "not_modified"
+                            return data
+                        # Cache file vanished: fetch again unconditionally (not a failed attempt)
+                        cached, headers = None, {}
+                        continue
+                    if response.status_code == 404:
+                        DNDBEYOND_REQUESTS_TOTAL.inc(result="error")
+                        raise HTTPException(status_code=404, detail=f"Character {character_id} not found on D&D Beyond")
+                    if response.status_code == 403:
+                        DNDBEYOND_REQUESTS_TOTAL.inc(result="error")
+                        raise HTTPException(status_code=403, detail=f"Character {character_id} is private or access denied")
+                    if response.status_code < 400:
+                        try:
+                            data = response.json()
+                        except ValueError:
+                            DNDBEYOND_REQUESTS_TOTAL.inc(result="error")
+                            raise HTTPException(status_code=502, detail="D&D Beyond returned invalid JSON")
+                        DNDBEYOND_REQUESTS_TOTAL.inc(result="ok")
+                        if self.cache:
+                            await asyncio.to_thread(
+                                self.cache.put, character_id, url, dict(response.headers), response.content
+                            )
+                        result.status = "fetched"
+                        return data
+                    error = HTTPException(
+                        status_code=response.status_code,
+                        detail=f"D&D Beyond API error: {response.status_code}"
+                    )
+                    if response.status_code not in RETRY_STATUS_CODES:
+                        DNDBEYOND_REQUESTS_TOTAL.inc(result="error")
+                        raise error
+
+                if attempt == self.max_retries:
+                    DNDBEYOND_REQUESTS_TOTAL.inc(result="error")
+                    raise error
+                DNDBEYOND_REQUESTS_TOTAL.inc(result="retry")
+                delay = self._retry_delay(attempt, response)
+                print(f"⚠️  D&D Beyond fetch of {character_id} failed ({error.detail}), "
+                      f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def fetch_result(self, character_id: str) -> FetchResult:
+        """Fetch one character; errors are reported in the result instead of raised"""
+        result = FetchResult(character_id=character_id, status="error")
+        start = time.perf_counter()
+        try:
+            result.json_data = await self._fetch(character_id, result)
+        except HTTPException as e:
+            result.status = "error"
+            result.status_code = e.status_code
+            result.error = e.detail
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        DNDBEYOND_FETCH_SECONDS.observe(result.elapsed_ms / 1000, status=result.status)
+        return result
+
+    async def fetch(self, character_id: str) -> Dict[str, Any]:
+        """
+        Fetch one character's JSON.
+
+        Raises:
+            HTTPException: If fetching fails after retries or the character is not found
+        """
+        result = await self.fetch_result(character_id)
+        if not result.ok:
+            raise HTTPException(status_code=result.status_code or 502, detail=result.error)
+        return result.json_data
+
+    async def fetch_many(self, character_ids: Iterable[str]) -> List[FetchResult]:
+        """Fetch many characters concurrently (within the fetcher's limits), in input order"""
+        # Duplicates are fetched once
+        unique = list(dict.fromkeys(character_ids))
+        results = await asyncio.gather(*(self.fetch_result(character_id) for character_id in unique))
+        by_id = dict(zip(unique, results))
+        return [by_id[character_id] for character_id in character_ids]
+
+
+# Shared fetcher, recreated when used from a different event loop (the client,
+# semaphore and token bucket belong to the loop they were first used on)
+_fetcher: Optional[DndBeyondFetcher] = None
+_fetcher_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_fetcher() -> DndBeyondFetcher:
+    """Shared DndBeyondFetcher for the running event loop"""
+    global _fetcher, _fetcher_loop
+    loop = asyncio.get_running_loop()
+    if _fetcher is None or _fetcher_loop is not loop:
+        _fetcher = DndBeyondFetcher()
+        _fetcher_loop = loop
+    return _fetcher
+
 
 class DndBeyondService:
     """Service for fetching character data from D&D Beyond."""
-    
-    # D&D Beyond character service API endpoint
-    CHARACTER_API_URL = "https://character-service.dndbeyond.com/character/v5/character/{character_id}"
-    
-    # Timeout for HTTP requests (30 seconds)
-    REQUEST_TIMEOUT = 30.0
-    
+
     @staticmethod
     def extract_character_id(url: str) -> Optional[str]:
         """
         Extract character ID from D&D Beyond URL.
-        
+
         Args:
             url: D&D Beyond character URL
-            
+
         Returns:
             Character ID as string, or None if not found
-            
+
         Examples:
             https://www.dndbeyond.com/characters/152248393 -> "152248393"
             https://dndbeyond.com/characters/140237850 -> "140237850"
@@ -32,87 +351,73 @@ class DndBeyondService:
         # Pattern matches /characters/{id} where id is one or more digits
         pattern = r'/characters/(\d+)'
         match = re.search(pattern, url)
-        
+
         if match:
             return match.group(1)
-        
+
         return None
-    
+
     @staticmethod
     async def fetch_character_json(character_id: str) -> Dict[str, Any]:
         """
         Fetch character JSON from D&D Beyond character service API.
-        
+
         Args:
             character_id: D&D Beyond character ID
-            
+
         Returns:
             Complete character JSON data from D&D Beyond
-            
+
         Raises:
             HTTPException: If fetching fails or character not found
         """
-        url = DndBeyondService.CHARACTER_API_URL.format(character_id=character_id)
-        
-        async with httpx.AsyncClient(timeout=DndBeyondService.REQUEST_TIMEOUT) as client:
-            try:
-                response = await client.get(url)
-                
-                # Handle different response codes
-                if response.status_code == 404:
-                    raise HTTPException(
-                        status_code=404,
-                        detail=f"Character {character_id} not found on D&D Beyond"
-                    )
-                elif response.status_code == 403:
-                    raise HTTPException(
-                        status_code=403,
-                        detail=f"Character {character_id} is private or access denied"
-                    )
-                elif response.status_code >= 400:
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"D&D Beyond API error: {response.status_code}"
-                    )
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.TimeoutException:
-                raise HTTPException(
-                    status_code=504,
-                    detail="Request to D&D Beyond timed out. Please try again."
-                )
-            except httpx.RequestError as e:
-                raise HTTPException(
-                    status_code=502,
-                    detail=f"Failed to connect to D&D Beyond: {str(e)}"
-                )
-    
+        return await get_fetcher().fetch(character_id)
+
+    @staticmethod
+    async def fetch_many(character_ids: Iterable[str]) -> List[FetchResult]:
+        """
+        Fetch many characters from D&D Beyond concurrently.
+
+        Args:
+            character_ids: D&D Beyond character IDs
+
+        Returns:
+            One FetchResult per ID, in input order (failed fetches have status "error")
+        """
+        return await get_fetcher().fetch_many(character_ids)
+
     @staticmethod
     async def fetch_from_url(url: str) -> Dict[str, Any]:
         """
         Fetch character JSON from D&D Beyond URL.
-        
+
         This is a convenience method that combines ID extraction and fetching.
-        
+
         Args:
             url: D&D Beyond character URL
-            
+
         Returns:
             Complete character JSON data from D&D Beyond
-            
+
         Raises:
             HTTPException: If URL is invalid or fetching fails
         """
         # Extract character ID
         character_id = DndBeyondService.extract_character_id(url)
-        
+
         if not character_id:
             raise HTTPException(
                 status_code=400,
                 detail="Invalid D&D Beyond URL. Expected format: https://dndbeyond.com/characters/{id}"
             )
-        
+
         # Fetch character data
         return await DndBeyondService.fetch_character_json(character_id)
+
+    @staticmethod
+    async def close() -> None:
+        """Close the shared fetcher's HTTP client (application shutdown)."""
+        global _fetcher, _fetcher_loop
+        if _fetcher is not None:
+            await _fetcher.close()
+            _fetcher = _fetcher_loop = None
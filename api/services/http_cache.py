@@ -0,0 +1,105 @@
+"""HTTP conditional request helpers (ETag / If-None-Match) and serialized response cache."""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+from fastapi import Request
+
+from api.config import config
+from src.utils.metrics import registry
+
+
+RESPONSE_CACHE_TOTAL = registry.counter(
+    "shadowscribe_response_cache_total", "Serialized response cache lookups", ["cache", "result"])
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the given values (their repr, in order)."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header matches `etag` (weak comparison, per RFC 9110)."""
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """Serialized JSON body and its ETag."""
+    body: bytes
+    etag: str
+    stored_at: float
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized responses, grouped by owner (e.g. character ID).
+
+    Every owner has a generation counter bumped by `invalidate(owner)`. Readers take
+    `generation(owner)` before loading from the database and pass it to `put`, which
+    drops the entry if a write happened in between, so a stale read never gets cached.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: 'OrderedDict[tuple, CachedResponse]' = OrderedDict()
+        self._generations: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, owner: Hashable) -> int:
+        with self._lock:
+            return self._generations.get(owner, 0)
+
+    def get(self, owner: Hashable, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get((owner, key))
+            if entry is not None and time.monotonic() - entry.stored_at > self.ttl:
+                del self._entries[(owner, key)]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end((owner, key))
+        RESPONSE_CACHE_TOTAL.inc(cache=self.name, result="hit" if entry else "miss")
+        return entry
+
+    def put(self, owner: Hashable, key: Hashable, body: bytes, etag: str, generation: int) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if self._generations.get(owner, 0) != generation:
+                return
+            self._entries[(owner, key)] = CachedResponse(body, etag, time.monotonic())
+            self._entries.move_to_end((owner, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, owner: Hashable) -> None:
+        """Drop every entry of an owner and reject in-flight `put`s for it."""
+        with self._lock:
+            self._generations[owner] = self._generations.get(owner, 0) + 1
+            for cache_key in [k for k in self._entries if k[0] == owner]:
+                del self._entries[cache_key]
+
+
+# Serialized GET /api/characters/{id} responses, keyed by character ID and requested sections
+character_responses = ResponseCache(
+    "character_detail",
+    max_entries=config.CHARACTER_CACHE_SIZE,
+    ttl=config.CHARACTER_CACHE_TTL
+)
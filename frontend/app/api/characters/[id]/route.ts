@@ -15,13 +15,23 @@ export async function GET(
     
     console.log(`[API Route] Forwarding GET to: ${apiUrl}/api/characters/${characterId}`)
     
-    const response = await fetch(`${apiUrl}/api/characters/${characterId}`, {
+    // Forward ?sections= and If-None-Match so an unchanged character comes back as 304
+    const headers: Record<string, string> = { 'Content-Type': 'application/json' }
+    const ifNoneMatch = request.headers.get('if-none-match')
+    if (ifNoneMatch) {
+      headers['If-None-Match'] = ifNoneMatch
+    }
+    
+    const response = await fetch(`${apiUrl}/api/characters/${characterId}${request.nextUrl.search}`, {
       method: 'GET',
-      headers: {
-        'Content-Type': 'application/json',
-      },
+      headers,
     })
     
+    const etag = response.headers.get('etag')
+    if (response.status === 304) {
+      return new NextResponse(null, { status: 304, headers: etag ? { ETag: etag } : {} })
+    }
+    
     if (!response.ok) {
       const errorData = await response.json().catch(() => ({ detail: 'Unknown error' }))
       return NextResponse.json(
@@ -31,7 +41,7 @@ export async function GET(
     }
     
     const data = await response.json()
-    return NextResponse.json(data)
+    return NextResponse.json(data, { headers: etag ? { ETag: etag } : {} })
   } catch (error) {
     console.error('Error proxying character fetch:', error)
     return NextResponse.json(
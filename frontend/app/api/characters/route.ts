@@ -13,13 +13,23 @@ export async function GET(request: NextRequest) {
     
     console.log(`[API Route] Forwarding GET to: ${apiUrl}/api/characters`)
     
-    const response = await fetch(`${apiUrl}/api/characters`, {
+    // Forward paging/filter params and If-None-Match so unchanged pages come back as 304
+    const headers: Record<string, string> = { 'Content-Type': 'application/json' }
+    const ifNoneMatch = request.headers.get('if-none-match')
+    if (ifNoneMatch) {
+      headers['If-None-Match'] = ifNoneMatch
+    }
+    
+    const response = await fetch(`${apiUrl}/api/characters${request.nextUrl.search}`, {
       method: 'GET',
-      headers: {
-        'Content-Type': 'application/json',
-      },
+      headers,
     })
     
+    const etag = response.headers.get('etag')
+    if (response.status === 304) {
+      return new NextResponse(null, { status: 304, headers: etag ? { ETag: etag } : {} })
+    }
+    
     if (!response.ok) {
       const errorData = await response.json().catch(() => ({ detail: 'Unknown error' }))
       return NextResponse.json(
@@ -29,7 +39,7 @@ export async function GET(request: NextRequest) {
     }
     
     const data = await response.json()
-    return NextResponse.json(data)
+    return NextResponse.json(data, { headers: etag ? { ETag: etag } : {} })
   } catch (error) {
     console.error('Error proxying character list:', error)
     return NextResponse.json(
@@ -2,9 +2,33 @@
 
 import { useEffect, useState } from 'react'
 import { useCharacterStore } from '@/lib/stores/characterStore'
-import { fetchCharacters } from '@/lib/services/api'
 import { Character } from '@/lib/types/character'
 
+// Largest page the API serves (GET /api/characters limit)
+const PAGE_SIZE = 500
+
+/**
+ * All characters, following next_cursor through the keyset-paged list.
+ */
+async function fetchAllCharacters(): Promise<Character[]> {
+  const characters: Character[] = []
+  let cursor: string | null = null
+  do {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) })
+    if (cursor) {
+      params.set('cursor', cursor)
+    }
+    const response = await fetch(`/api/characters?${params}`)
+    if (!response.ok) {
+      throw new Error(`Failed to fetch characters: ${response.status}`)
+    }
+    const page: { characters: Character[]; next_cursor: string | null } = await response.json()
+    characters.push(...page.characters)
+    cursor = page.next_cursor
+  } while (cursor)
+  return characters
+}
+
 interface CharacterSelectorProps {
   selectedCharacter: string | null
   onSelectCharacter: (characterName: string) => void
@@ -28,8 +52,7 @@ export default function CharacterSelector({ selectedCharacter, onSelectCharacter
     
     for (let attempt = 1; attempt <= maxRetries; attempt++) {
       try {
-        const response = await fetchCharacters()
-        setCharacters(response.characters)
+        setCharacters(await fetchAllCharacters())
         setError(null)
         setLoading(false)
         return // Success!
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Character deserialization/serialization.
+
+Load paths (JSON column dict -> Character):
+- constructor: the previous CharacterManager.load_character_from_db (top-level `**data`,
+               nested sections left as raw dicts)
+- dacite:      dacite.from_dict(Character, strict=False, check_types=False) (previous API
+               create/update path; skipped if dacite is not installed)
+- codec:       generated decoder (src/rag/character/character_codec.py)
+- pickle:      pickle.loads of the saved .pkl bytes (file fallback)
+
+Save paths (Character -> JSON column dict):
+- asdict+json: json.loads(json.dumps(asdict(c), default=isoformat)) (previous CharacterRepository)
+- codec:       generated encoder
+
+Usage:
+    python scripts/benchmark_character_codec.py
+    python scripts/benchmark_character_codec.py --character "Duskryn Nightwarden" --iterations 500
+"""
+
+import argparse
+import json
+import pickle
+import sys
+import timeit
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    import dacite  # Optional: previous API decode path, only used for comparison
+except ImportError:
+    dacite = None
+
+from src.rag.character.character_types import (
+    Character, CharacterBase, PhysicalCharacteristics, AbilityScores, CombatStats,
+    BackgroundInfo, PersonalityTraits, Backstory, Organization, Ally, Enemy, Proficiency,
+    DamageModifier, PassiveScores, Senses, ActionEconomy, FeaturesAndTraits, Inventory,
+    SpellList, ObjectivesAndContracts
+)
+from src.rag.character.character_codec import character_from_dict, character_to_dict
+
+
+def isoformat_default(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def constructor_load(data: dict) -> Character:
+    """Previous load_character_from_db reconstruction"""
+    return Character(
+        character_base=CharacterBase(**data['character_base']),
+        characteristics=PhysicalCharacteristics(**data['characteristics']),
+        ability_scores=AbilityScores(**data['ability_scores']),
+        combat_stats=CombatStats(**data['combat_stats']),
+        background_info=BackgroundInfo(**data['background_info']),
+        personality=PersonalityTraits(**data['personality']),
+        backstory=Backstory(**data['backstory']) if data.get('backstory') else None,
+        organizations=[Organization(**org) for org in data.get('organizations', [])],
+        allies=[Ally(**ally) for ally in data.get('allies', [])],
+        enemies=[Enemy(**enemy) for enemy in data.get('enemies', [])],
+        proficiencies=[Proficiency(**prof) for prof in data.get('proficiencies', [])],
+        damage_modifiers=[DamageModifier(**mod) for mod in data.get('damage_modifiers', [])],
+        passive_scores=PassiveScores(**data['passive_scores']) if data.get('passive_scores') else None,
+        senses=Senses(**data['senses']) if data.get('senses') else None,
+        action_economy=ActionEconomy(**data['action_economy']) if data.get('action_economy') else None,
+        features_and_traits=FeaturesAndTraits(**data['features_and_traits']) if data.get('features_and_traits') else None,
+        inventory=Inventory(**data['inventory']) if data.get('inventory') else None,
+        spell_list=SpellList(**data['spell_list']) if data.get('spell_list') else None,
+        objectives_and_contracts=ObjectivesAndContracts(**data['objectives_and_contracts']) if data.get('objectives_and_contracts') else None,
+        notes=data.get('notes', {}),
+        created_date=datetime.fromisoformat(data['created_date']) if data.get('created_date') else None,
+        last_updated=datetime.fromisoformat(data['last_updated']) if data.get('last_updated') else datetime.now()
+    )
+
+
+def dacite_load(data: dict) -> Character:
+    return dacite.from_dict(Character, data, config=dacite.Config(strict=False, check_types=False))
+
+
+def asdict_json_save(character: Character) -> dict:
+    return json.loads(json.dumps(asdict(character), default=isoformat_default))
+
+
+def bench(func, arg, iterations: int) -> float:
+    """Best-of-3 mean milliseconds per call"""
+    return min(timeit.repeat(lambda: func(arg), number=iterations, repeat=3)) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Character decode/encode paths")
+    parser.add_argument("--character", default="Duskryn Nightwarden", help="Saved character name")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per measurement")
+    args = parser.parse_args()
+
+    pickle_bytes = (project_root / "knowledge_base" / "saved_characters" / f"{args.character}.pkl").read_bytes()
+    character = pickle.loads(pickle_bytes)
+    data = asdict_json_save(character)
+
+    # Correctness before timing: the codec must match the old encoding and round-trip exactly
+    assert character_to_dict(character) == data
+    assert character_from_dict(data) == character
+    # The constructor path leaves nested sections as raw dicts
+    nested_typed = not isinstance(constructor_load(data).inventory.backpack[0], dict) if character.inventory.backpack else True
+
+    print("=" * 60)
+    print("CHARACTER CODEC BENCHMARK")
+    print("=" * 60)
+    print(f"  Character: {character.character_base.name}  ({len(json.dumps(data)) / 1024:.0f} KB JSON, "
+          f"{len(pickle_bytes) / 1024:.0f} KB pickle)")
+    print(f"  Constructor path builds nested dataclasses: {nested_typed}")
+    print()
+    print(f"  {'load path':<16} {'ms/char':>10}")
+    load_paths = [("constructor", constructor_load, data)]
+    if dacite is not None:
+        load_paths.append(("dacite", dacite_load, data))
+    load_paths += [("pickle.loads", pickle.loads, pickle_bytes), ("codec", character_from_dict, data)]
+    for label, func, arg in load_paths:
+        print(f"  {label:<16} {bench(func, arg, args.iterations):>10.3f}")
+    print()
+    print(f"  {'save path':<16} {'ms/char':>10}")
+    for label, func in (("asdict+json", asdict_json_save), ("codec", character_to_dict)):
+        print(f"  {label:<16} {bench(func, character, args.iterations):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
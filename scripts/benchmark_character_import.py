@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark for bulk character import vs the single-item path.
+
+- single: what POST /api/characters and the old migrate script did per character:
+          decode, get_by_name existence check, create or update, commit
+- bulk:   CharacterImporter (concurrent decode, one SELECT + two batched upserts
+          and one commit per chunk)
+
+Both run a "create" round on an empty database and an "update" round over the same
+characters (Character JSON copies of a saved character with distinct names).
+
+The default database is a temporary SQLite file per path (needs aiosqlite). To
+benchmark MySQL, pass --database-url pointing at an EMPTY scratch database; the
+script refuses to use a database that already contains characters, and removes
+its rows after each path.
+
+Usage:
+    python scripts/benchmark_character_import.py
+    python scripts/benchmark_character_import.py --characters 500 --chunk-size 50
+"""
+
+import argparse
+import asyncio
+import copy
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from api.database.connection import Base
+from api.database.models import Character as CharacterModel, CharacterSection
+from api.database.repositories.character_repo import CharacterRepository
+from api.services.character_import import CharacterImporter
+from src.rag.character.character_codec import character_from_dict, character_to_dict
+
+
+async def single_import(session_factory, items) -> None:
+    """One existence check, write and commit per character"""
+    async with session_factory() as session:
+        repo = CharacterRepository(session)
+        for item in items:
+            character = character_from_dict(item)
+            existing = await repo.get_by_name(character.character_base.name, sections=())
+            if existing:
+                await repo.update(existing.id, character)
+            else:
+                await repo.create(character)
+            await session.commit()
+
+
+async def bulk_import(session_factory, items, chunk_size: int) -> None:
+    importer = CharacterImporter(session_factory, chunk_size=chunk_size)
+    async for event in importer.run(items):
+        if event['type'] == 'item_failed':
+            raise RuntimeError(event['error'])
+
+
+async def run_path(label: str, database_url: str, import_path, items, *args) -> dict:
+    """Create round then update round on a fresh database; returns seconds per round"""
+    engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with session_factory() as session:
+        existing = (await session.execute(select(func.count()).select_from(CharacterModel))).scalar_one()
+    if existing:
+        await engine.dispose()
+        raise SystemExit(f"❌ {existing} characters already in the target database; use an empty scratch database")
+
+    timings = {}
+    try:
+        for round_name in ('create', 'update'):
+            start = time.perf_counter()
+            await import_path(session_factory, items, *args)
+            timings[round_name] = time.perf_counter() - start
+        async with session_factory() as session:
+            stored = (await session.execute(select(func.count()).select_from(CharacterModel))).scalar_one()
+        assert stored == len(items), (label, stored)
+    finally:
+        async with session_factory() as session:
+            await session.execute(delete(CharacterSection).where(CharacterSection.character_id.like('bench-%')))
+            await session.execute(delete(CharacterModel).where(CharacterModel.id.like('bench-%')))
+            await session.commit()
+        await engine.dispose()
+    return timings
+
+
+async def run(args) -> None:
+    with open(project_root / "knowledge_base" / "saved_characters" / f"{args.character}.pkl", "rb") as f:
+        template = character_to_dict(pickle.load(f))
+    items = []
+    for i in range(args.characters):
+        item = copy.deepcopy(template)
+        item['character_base']['name'] = f"Bench Import {i:05d}"
+        items.append(item)
+
+    results = {}
+    for label, import_path, extra in (("single", single_import, ()), ("bulk", bulk_import, (args.chunk_size,))):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            url = args.database_url or f"sqlite+aiosqlite:///{tmpdir}/characters.db"
+            results[label] = await run_path(label, url, import_path, items, *extra)
+
+    print("=" * 60)
+    print("CHARACTER IMPORT BENCHMARK")
+    print("=" * 60)
+    print(f"  Characters:  {args.characters}  (chunk size {args.chunk_size})")
+    print(f"  {'path':<10} {'round':<8} {'seconds':>9} {'chars/s':>9}")
+    for label, timings in results.items():
+        for round_name, seconds in timings.items():
+            print(f"  {label:<10} {round_name:<8} {seconds:>9.2f} {args.characters / seconds:>9.1f}")
+    for round_name in ('create', 'update'):
+        print(f"  Speedup ({round_name}): {results['single'][round_name] / results['bulk'][round_name]:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk character import")
+    parser.add_argument("--database-url", default=None, help="Empty scratch database (default: temporary SQLite)")
+    parser.add_argument("--character", default="Duskryn Nightwarden", help="Saved character used as the template")
+    parser.add_argument("--characters", type=int, default=200, help="Characters to import")
+    parser.add_argument("--chunk-size", type=int, default=25)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the deterministic D&D Beyond parsers on large multiclass characters.
+
+Times core, inventory, spells, features and the structured part of actions (LLM
+item spell extraction is skipped) for:
+- the example export as-is
+- a synthetic multiclass character: --classes classes (copies of the example's,
+  renamed) with their features and class spells, and modifiers, inventory and
+  actions repeated --scale times
+
+Each parser round either shares one DndBeyondIndex (what the builders do) or lets
+every parser index the export itself (--no-shared-index, standalone parser use).
+
+Usage:
+    python scripts/benchmark_character_parsers.py
+    python scripts/benchmark_character_parsers.py --classes 6 --scale 8 --rounds 20
+"""
+
+import argparse
+import copy
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.character_creation.parsing.dndbeyond_index import DndBeyondIndex
+from src.character_creation.parsing.parse_actions import DNDBeyondActionsParser
+from src.character_creation.parsing.parse_core_character import DNDBeyondCoreParser
+from src.character_creation.parsing.parse_features_traits import DNDBeyondFeaturesParser
+from src.character_creation.parsing.parse_inventory import DNDBeyondInventoryParser
+from src.character_creation.parsing.parse_spelllist import DNDBeyondSpellParser
+
+PARSERS = {
+    'core': (DNDBeyondCoreParser, lambda p: p.parse_all_core_data()),
+    'inventory': (DNDBeyondInventoryParser, lambda p: p.parse_inventory()),
+    'spells': (DNDBeyondSpellParser, lambda p: p.parse_all_spells()),
+    'features': (DNDBeyondFeaturesParser, lambda p: p.parse_all_features()),
+    'actions': (DNDBeyondActionsParser, lambda p: p._parse_structured_actions()),
+}
+
+
+def make_multiclass(json_data: dict, classes: int, scale: int) -> dict:
+    """Synthetic large multiclass character derived from an export"""
+    result = copy.deepcopy(json_data)
+    data = result['data']
+    base_classes = data.get('classes', [])
+    base_class_spells = {entry.get('characterClassId'): entry for entry in data.get('classSpells', [])}
+
+    new_classes, new_class_spells = [], []
+    for i in range(classes):
+        source = copy.deepcopy(base_classes[i % len(base_classes)])
+        class_id = source.get('id')
+        if i >= len(base_classes):
+            source['id'] = (class_id or 0) * 100 + i
+            source['isStartingClass'] = False
+            source['definition']['name'] = f"{source['definition']['name']} {i + 1}"
+        new_classes.append(source)
+        if class_id in base_class_spells:
+            spells = copy.deepcopy(base_class_spells[class_id])
+            spells['characterClassId'] = source['id']
+            new_class_spells.append(spells)
+    data['classes'] = new_classes
+    data['classSpells'] = new_class_spells
+
+    for category, modifiers in list(data.get('modifiers', {}).items()):
+        data['modifiers'][category] = [copy.deepcopy(m) for _ in range(scale) for m in modifiers or []]
+    for category, actions in list(data.get('actions', {}).items()):
+        data['actions'][category] = [copy.deepcopy(a) for _ in range(scale) for a in actions or []]
+    inventory = []
+    for copy_number in range(scale):
+        for item in data.get('inventory', []):
+            item = copy.deepcopy(item)
+            item['id'] = (item.get('id') or 0) * 100 + copy_number
+            inventory.append(item)
+    data['inventory'] = inventory
+    return result
+
+
+def time_parsers(json_data: dict, rounds: int, shared_index: bool) -> dict:
+    """Median ms per parser (and for building the index) over `rounds` runs"""
+    samples = {name: [] for name in ['index', *PARSERS]}
+    for _ in range(rounds):
+        index = None
+        if shared_index:
+            start = time.perf_counter()
+            index = DndBeyondIndex(json_data)
+            samples['index'].append((time.perf_counter() - start) * 1000)
+        for name, (parser_class, parse) in PARSERS.items():
+            start = time.perf_counter()
+            parse(parser_class(json_data, index=index))
+            samples[name].append((time.perf_counter() - start) * 1000)
+    return {name: statistics.median(values) for name, values in samples.items() if values}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the deterministic D&D Beyond parsers")
+    parser.add_argument("--json", default=str(project_root / "DNDBEYONDEXAMPLE.json"), help="D&D Beyond character export")
+    parser.add_argument("--classes", type=int, default=4, help="Classes of the synthetic multiclass character")
+    parser.add_argument("--scale", type=int, default=5, help="Copies of modifiers, inventory and actions")
+    parser.add_argument("--rounds", type=int, default=10, help="Runs per character (median reported)")
+    parser.add_argument("--no-shared-index", action="store_true", help="Let every parser index the export itself")
+    args = parser.parse_args()
+
+    with open(args.json, "r", encoding="utf-8") as f:
+        json_data = json.load(f)
+    characters = {
+        'example': json_data,
+        f'multiclass x{args.classes}/{args.scale}': make_multiclass(json_data, args.classes, args.scale)
+    }
+
+    print("=" * 72)
+    print("D&D BEYOND PARSER BENCHMARK " + ("(per-parser index)" if args.no_shared_index else "(shared index)"))
+    print("=" * 72)
+    header = ''.join(f"{name:>10}" for name in ['index', *PARSERS])
+    print(f"  {'character':<18}{header}{'total':>10}")
+    for label, data in characters.items():
+        timings = time_parsers(data, args.rounds, not args.no_shared_index)
+        row = ''.join(f"{timings.get(name, 0.0):>10.2f}" for name in ['index', *PARSERS])
+        print(f"  {label:<18}{row}{sum(timings.values()):>10.2f}")
+    print("  (median ms per run)")
+
+
+if __name__ == "__main__":
+    main()
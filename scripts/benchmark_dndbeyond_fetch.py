@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Benchmark for batch D&D Beyond fetching against a local stub server.
+
+The stub server serves DNDBEYONDEXAMPLE.json for every character ID (with the ID
+substituted), honors If-None-Match / If-Modified-Since, adds --latency-ms per request
+and answers every --fail-every'th request with 503 or 429 (Retry-After).
+
+Rounds:
+- serial: the previous behavior, a new client per character, no retries, no cache
+- cold:   DndBeyondFetcher.fetch_many with an empty response cache
+- warm:   the same IDs again (conditional requests, 304 from the stub)
+
+peak/s is the most requests the stub saw within any one second of the round.
+
+Usage:
+    python scripts/benchmark_dndbeyond_fetch.py
+    python scripts/benchmark_dndbeyond_fetch.py --characters 50 --rate 10 --concurrency 8 --fail-every 7
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from api.services.dndbeyond_service import DndBeyondFetcher
+
+
+class StubState:
+    """Responses and request log shared by the stub server's handler threads"""
+
+    def __init__(self, json_data: dict, latency_ms: float, fail_every: int):
+        self.json_data = json_data
+        self.latency_ms = latency_ms
+        self.fail_every = fail_every
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self.lock = threading.Lock()
+        self.requests = []  # (monotonic arrival time, status)
+        self._bodies = {}
+
+    def body(self, character_id: str) -> bytes:
+        with self.lock:
+            if character_id not in self._bodies:
+                data = dict(self.json_data)
+                data['data'] = dict(data['data'], id=int(character_id))
+                self._bodies[character_id] = json.dumps(data).encode()
+            return self._bodies[character_id]
+
+    def record(self, arrived: float, status: int) -> int:
+        with self.lock:
+            self.requests.append((arrived, status))
+            return len(self.requests)
+
+    def peak_rate(self, first: int = 0) -> int:
+        """Most requests arriving within any one-second window, counting requests[first:]"""
+        times = sorted(t for t, _ in self.requests[first:])
+        peak = start = 0
+        for end in range(len(times)):
+            while times[end] - times[start] > 1.0:
+                start += 1
+            peak = max(peak, end - start + 1)
+        return peak
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, like the real service
+
+        def log_message(self, *args):
+            pass
+
+        def send(self, status: int, body: bytes = b"", headers: dict = None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            arrived = time.monotonic()
+            time.sleep(state.latency_ms / 1000)
+            character_id = self.path.rstrip('/').rsplit('/', 1)[-1]
+            if not self.path.startswith('/character/v5/character/') or not character_id.isdigit():
+                state.record(arrived, 404)
+                return self.send(404, b'{"success": false}')
+
+            count = len(state.requests) + 1
+            if state.fail_every and count % state.fail_every == 0:
+                status = 429 if (count // state.fail_every) % 2 else 503
+                state.record(arrived, status)
+                return self.send(status, headers={"Retry-After": "0.2"} if status == 429 else None)
+
+            body = state.body(character_id)
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get('If-None-Match') == etag:
+                state.record(arrived, 304)
+                return self.send(304, headers={"ETag": etag})
+            state.record(arrived, 200)
+            self.send(200, body, {
+                "Content-Type": "application/json", "ETag": etag, "Last-Modified": state.last_modified
+            })
+
+    return Handler
+
+
+async def serial_fetch(api_url: str, character_ids) -> int:
+    """One character after another with a new client each (no retries); returns failures"""
+    failures = 0
+    for character_id in character_ids:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.get(api_url.format(character_id=character_id))
+            if response.status_code >= 400:
+                failures += 1
+            else:
+                response.json()
+    return failures
+
+
+async def run(args, api_url: str, state: StubState, cache_dir: str) -> None:
+    character_ids = [str(100000000 + i) for i in range(args.characters)]
+    rounds = {}
+
+    def record(label, start, before, failures, retried=0):
+        statuses = [status for _, status in state.requests[before:]]
+        rounds[label] = {
+            'ms': (time.perf_counter() - start) * 1000,
+            'requests': len(statuses),
+            '200': statuses.count(200),
+            '304': statuses.count(304),
+            'retried': retried,
+            'failed': failures,
+            'peak': state.peak_rate(before)
+        }
+
+    before, start = len(state.requests), time.perf_counter()
+    failures = await serial_fetch(api_url, character_ids)
+    record('serial', start, before, failures)
+
+    async with DndBeyondFetcher(
+        api_url=api_url, concurrency=args.concurrency, rate=args.rate, burst=args.burst,
+        max_retries=args.max_retries, backoff=0.1, cache_dir=cache_dir
+    ) as fetcher:
+        for label in ('cold', 'warm'):
+            before, start = len(state.requests), time.perf_counter()
+            results = await fetcher.fetch_many(character_ids)
+            record(label, start, before,
+                   sum(1 for r in results if not r.ok),
+                   sum(r.attempts - 1 for r in results))
+            assert all(r.json_data['data']['id'] == int(r.character_id) for r in results if r.ok)
+
+    print("=" * 72)
+    print("D&D BEYOND BATCH FETCH BENCHMARK (local stub server)")
+    print("=" * 72)
+    print(f"  Characters: {args.characters}  latency: {args.latency_ms:.0f} ms  "
+          f"fail every: {args.fail_every or '-'}  rate: {args.rate}/s (burst {args.burst})  "
+          f"concurrency: {args.concurrency}")
+    print(f"  {'round':<8} {'ms':>9} {'requests':>9} {'200':>5} {'304':>5} {'retried':>8} {'failed':>7} {'peak/s':>7}")
+    for label, r in rounds.items():
+        print(f"  {label:<8} {r['ms']:>9.1f} {r['requests']:>9} {r['200']:>5} {r['304']:>5} "
+              f"{r['retried']:>8} {r['failed']:>7} {r['peak']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch D&D Beyond fetching against a stub server")
+    parser.add_argument("--json", default=str(project_root / "DNDBEYONDEXAMPLE.json"), help="D&D Beyond character export to serve")
+    parser.add_argument("--characters", type=int, default=30, help="Characters per round")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Stub server latency per request")
+    parser.add_argument("--fail-every", type=int, default=10, help="Answer every Nth request with 503/429 (0 = never)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    parser.add_argument("--rate", type=float, default=20.0, help="Requests per second (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=5, help="Token bucket capacity")
+    parser.add_argument("--max-retries", type=int, default=3, help="Retries per character")
+    args = parser.parse_args()
+
+    with open(args.json, "r", encoding="utf-8") as f:
+        state = StubState(json.load(f), args.latency_ms, args.fail_every)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_port}/character/v5/character/{{character_id}}"
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            asyncio.run(run(args, api_url, state, cache_dir))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for character entity resolution.
+
+Compares EntitySearchEngine.search_all_character_sections against the pre-index path:
+- legacy:  flatten inventory/spells/features into lists and run match_entity_name over
+           every object, normalize every backstory section, on every entity of every query
+- indexed: lookups in the per-character CharacterEntityIndex (built once, outside the timing);
+           "cold" resolves each name for the first time, "warm" hits the per-index match cache
+
+Entity names are drawn from the character itself (exact, lowercase, partial, typo) plus
+names that match nothing, and both paths must return identical results.
+
+Usage:
+    python scripts/benchmark_entity_search.py
+    python scripts/benchmark_entity_search.py --character "Duskryn Nightwarden" --iterations 20
+"""
+
+import argparse
+import pickle
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import List, Optional
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.rag.character.character_query_types import EntitySearchResult
+from src.utils.entity_search_engine import EntitySearchEngine
+from src.utils.character_entity_index import CharacterEntityIndex, _SECTION_WALKERS, _item_name
+
+
+def legacy_match(engine: EntitySearchEngine, entity_name: str, candidate_name: str) -> Optional[tuple]:
+    """Pre-index match_entity_name: normalize both names and run SequenceMatcher every time"""
+    if not candidate_name:
+        return None
+    normalized_search = engine.normalize_text(entity_name)
+    normalized_candidate = engine.normalize_text(candidate_name)
+    if normalized_search == normalized_candidate:
+        return (1.0, "exact", candidate_name)
+    if normalized_search in normalized_candidate or normalized_candidate in normalized_search:
+        return (0.9, "substring", candidate_name)
+    similarity = SequenceMatcher(None, normalized_search, normalized_candidate).ratio()
+    if similarity >= engine.threshold:
+        return (similarity, "fuzzy", candidate_name)
+    return None
+
+
+def legacy_search_section(engine: EntitySearchEngine, character, section: str, entity_name: str) -> Optional[EntitySearchResult]:
+    """Pre-index path: walk the section, match every object by name"""
+    value = getattr(character, section, None)
+    if not value:
+        return None
+    best_match, best_confidence = None, 0.0
+    for obj, _ in _SECTION_WALKERS[section](value):
+        name = _item_name(obj)
+        if not name:
+            continue
+        match_result = legacy_match(engine, entity_name, name)
+        if match_result and match_result[0] > best_confidence:
+            best_match, best_confidence = match_result, match_result[0]
+            if best_confidence == 1.0:
+                break
+    if not best_match:
+        return None
+    confidence, strategy, matched_text = best_match
+    return EntitySearchResult(entity_name, [section], confidence, matched_text, strategy)
+
+
+def legacy_search_backstory(engine: EntitySearchEngine, character, entity_name: str) -> Optional[EntitySearchResult]:
+    """Pre-index path: normalize title, headings and content on every call"""
+    backstory = character.backstory
+    if not backstory:
+        return None
+    best = (None, 0.0, None, None)
+    match_result = legacy_match(engine, entity_name, backstory.title)
+    if match_result and match_result[0] > best[1]:
+        best = (match_result[2], match_result[0], 'backstory.title', match_result[1])
+    for idx, section in enumerate(backstory.sections or []):
+        if section.heading:
+            match_result = legacy_match(engine, entity_name, section.heading)
+            if match_result and match_result[0] > best[1]:
+                best = (match_result[2], match_result[0], f'backstory.sections[{idx}].heading', match_result[1])
+        if section.content:
+            if engine.normalize_text(entity_name) in engine.normalize_text(section.content) and 0.85 > best[1]:
+                best = (section.heading or f"Section {idx}", 0.85, f'backstory.sections[{idx}].content', "content_match")
+    matched_text, confidence, found_in, strategy = best
+    if matched_text and confidence >= engine.threshold:
+        return EntitySearchResult(entity_name, [found_in], confidence, matched_text, strategy)
+    return None
+
+
+def legacy_search_all(engine: EntitySearchEngine, character, entity_name: str) -> List[EntitySearchResult]:
+    results = [legacy_search_section(engine, character, section, entity_name) for section in CharacterEntityIndex.NAME_SECTIONS]
+    results.append(legacy_search_backstory(engine, character, entity_name))
+    results = [r for r in results if r]
+    results.sort(key=lambda r: r.match_confidence, reverse=True)
+    return results
+
+
+def sample_entity_names(character, count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    index = CharacterEntityIndex(character)
+    names = [entry.name for section in index.NAME_SECTIONS if index.names(section)
+             for entry in index.names(section).entries]
+    backstory = index.backstory()
+    if backstory:
+        names += [s.heading for s in backstory.sections if s.heading]
+        names += [" ".join(s.content_normalized.split()[3:6]) for s in backstory.sections if s.content_normalized]
+    samples = []
+    for _ in range(count):
+        name = rng.choice(names)
+        variant = rng.randrange(5)
+        if variant == 1:
+            name = name.lower()
+        elif variant == 2 and len(name) > 6:
+            name = name[: len(name) // 2 + 2]
+        elif variant == 3 and len(name) > 4:
+            i = rng.randrange(len(name) - 1)
+            name = name[:i] + name[i + 1] + name[i] + name[i + 2:]
+        elif variant == 4:
+            name = rng.choice(["Bag of Holding", "Vecna", "Waterdeep", "Fireball", "Lady Vexthorne"])
+        samples.append(name)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark character entity resolution")
+    parser.add_argument("--character", default="Duskryn Nightwarden", help="Saved character name")
+    parser.add_argument("--entities", type=int, default=200, help="Entity names to resolve per iteration")
+    parser.add_argument("--iterations", type=int, default=10, help="Timed passes over the entity names")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    path = project_root / "knowledge_base" / "saved_characters" / f"{args.character}.pkl"
+    with open(path, "rb") as f:
+        character = pickle.load(f)
+
+    engine = EntitySearchEngine()
+    names = sample_entity_names(character, args.entities, args.seed)
+
+    build_start = time.perf_counter()
+    engine.get_character_index(character).warm()
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    # Both paths must agree before timing them
+    for name in names:
+        assert legacy_search_all(engine, character, name) == [
+            EntitySearchResult(r.entity_name, r.found_in_sections, r.match_confidence, r.matched_text, r.match_strategy)
+            for r in engine.search_all_character_sections(character, name)
+        ], name
+
+    def timed(func, iterations: int) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for name in names:
+                func(name)
+        return (time.perf_counter() - start) / (iterations * len(names)) * 1_000_000
+
+    legacy_us = timed(lambda name: legacy_search_all(engine, character, name), args.iterations)
+    cold_engine = EntitySearchEngine()
+    cold_engine.get_character_index(character).warm()
+    cold_us = timed(lambda name: cold_engine.search_all_character_sections(character, name), 1)
+    warm_us = timed(lambda name: cold_engine.search_all_character_sections(character, name), args.iterations)
+
+    print("=" * 60)
+    print("CHARACTER ENTITY RESOLUTION MICROBENCHMARK")
+    print("=" * 60)
+    print(f"  Character:        {character.character_base.name}")
+    print(f"  Entity names:     {len(names)} (results identical on both paths)")
+    print(f"  Index build:      {build_ms:.2f} ms (once per character)")
+    print(f"  Legacy:           {legacy_us:.1f} µs per entity")
+    print(f"  Indexed (cold):   {cold_us:.1f} µs per entity ({legacy_us / cold_us:.1f}x)")
+    print(f"  Indexed (warm):   {warm_us:.1f} µs per entity ({legacy_us / warm_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
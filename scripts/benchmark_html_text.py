@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the shared HTML-to-text normalizer against the per-parser cleaners.
+
+Every string in the export that contains HTML or whitespace to collapse is cleaned
+with each entity set by:
+- legacy: the regex/replace chains the parsers used before (copied below)
+- cold:   html_to_text with an empty memo (first character of a backfill)
+- warm:   html_to_text again (descriptions repeated across characters)
+
+The outputs of legacy and html_to_text are compared for every string first, plus a
+few entity edge cases.
+
+Usage:
+    python scripts/benchmark_html_text.py
+    python scripts/benchmark_html_text.py --json path/to/export.json --rounds 50
+"""
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from html import unescape
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.character_creation.parsing.html_text import (
+    html_to_text, clear_cache, cache_info,
+    ENTITIES_NONE, ENTITIES_BASIC, ENTITIES_EXTENDED, ENTITIES_ALL
+)
+
+
+def legacy_basic(description: str) -> str:
+    """DNDBeyondActionsParser / DNDBeyondFeaturesParser.clean_html_description"""
+    if not description:
+        return ""
+    clean_text = re.sub(r'<[^>]+>', '', description)
+    replacements = {
+        '&amp;': '&', '&lt;': '<', '&gt;': '>', '&nbsp;': ' ',
+        '&rsquo;': "'", '&ldquo;': '"', '&rdquo;': '"'
+    }
+    for old, new in replacements.items():
+        clean_text = clean_text.replace(old, new)
+    return re.sub(r'\s+', ' ', clean_text).strip()
+
+
+def legacy_extended(description: str) -> str:
+    """DNDBeyondBackgroundParser.clean_html_description"""
+    if not description:
+        return ""
+    clean_text = re.sub(r'<[^>]+>', '', description)
+    replacements = {
+        '&amp;': '&', '&lt;': '<', '&gt;': '>', '&nbsp;': ' ',
+        '&rsquo;': "'", '&ldquo;': '"', '&rdquo;': '"',
+        '&mdash;': '—', '&ndash;': '–', '&hellip;': '...',
+        '\u003C': '<', '\u003E': '>', '\r\n': '\n'
+    }
+    for old, new in replacements.items():
+        clean_text = clean_text.replace(old, new)
+    return re.sub(r'\s+', ' ', clean_text).strip()
+
+
+def legacy_none(text: str) -> str:
+    """parse_inventory.clean_html"""
+    if not text:
+        return text
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'\r\n', ' ', text)
+    text = re.sub(r'\n', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def legacy_all(text: str) -> str:
+    """DNDBeyondSpellParser._clean_html"""
+    if not text:
+        return ""
+    clean = re.sub(r'<[^>]+>', '', text)
+    clean = unescape(clean)
+    return re.sub(r'\s+', ' ', clean).strip()
+
+
+LEGACY = {
+    ENTITIES_NONE: legacy_none,
+    ENTITIES_BASIC: legacy_basic,
+    ENTITIES_EXTENDED: legacy_extended,
+    ENTITIES_ALL: legacy_all,
+}
+
+EDGE_CASES = [
+    "&amp;lt;b&amp;gt; &amp;amp; &amp;amp;lt; &amp;&amp;lt;",
+    "a &nbsp; b  c \r\n d\t",
+    "<p>Fire&mdash;and&nbsp;<em>ice</em>&hellip;</p> &ndash; &rsquo;&ldquo;&rdquo;",
+    "&l<i>t;tag&g</i>t; &unknown; & &#39; &#x27;",
+    "   ", "<br/>", "&amp",
+]
+
+
+def collect_strings(value, out):
+    """Every string in the export with markup, entities or whitespace to collapse"""
+    if isinstance(value, str):
+        if value != ' '.join(value.split()) or '<' in value or '&' in value:
+            out.append(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            collect_strings(item, out)
+    elif isinstance(value, list):
+        for item in value:
+            collect_strings(item, out)
+    return out
+
+
+def time_round(clean, texts) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        clean(text)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared HTML-to-text normalizer")
+    parser.add_argument("--json", default=str(project_root / "DNDBEYONDEXAMPLE.json"), help="D&D Beyond character export")
+    parser.add_argument("--rounds", type=int, default=20, help="Rounds per cleaner (median reported)")
+    args = parser.parse_args()
+
+    with open(args.json, "r", encoding="utf-8") as f:
+        texts = collect_strings(json.load(f), [])
+
+    mismatches = 0
+    for entities, legacy in LEGACY.items():
+        for text in texts + EDGE_CASES:
+            if legacy(text) != html_to_text(text, entities) and (text or entities != ENTITIES_NONE):
+                mismatches += 1
+                print(f"  ✗ {entities}: {text[:60]!r}")
+
+    print("=" * 72)
+    print("HTML-TO-TEXT NORMALIZER BENCHMARK")
+    print("=" * 72)
+    print(f"  Strings: {len(texts)} ({len(set(texts))} distinct, "
+          f"{sum(len(t) for t in texts) / 1024:.0f} KB)  mismatches vs legacy: {mismatches}")
+    print(f"  {'entity set':<12} {'legacy ms':>10} {'cold ms':>10} {'warm ms':>10} {'speedup':>9} {'warm x':>9}")
+    for entities, legacy in LEGACY.items():
+        legacy_ms, cold_ms, warm_ms = [], [], []
+        for _ in range(args.rounds):
+            legacy_ms.append(time_round(legacy, texts))
+            clear_cache()
+            cold_ms.append(time_round(lambda t: html_to_text(t, entities), texts))
+            warm_ms.append(time_round(lambda t: html_to_text(t, entities), texts))
+        legacy_med, cold_med, warm_med = (statistics.median(v) for v in (legacy_ms, cold_ms, warm_ms))
+        print(f"  {entities:<12} {legacy_med:>10.2f} {cold_med:>10.2f} {warm_med:>10.2f} "
+              f"{legacy_med / cold_med:>8.1f}x {legacy_med / warm_med:>8.1f}x")
+    print(f"  (median over {args.rounds} rounds; memo: {cache_info().currsize} entries)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark for magic-item spell extraction in DNDBeyondActionsParser.
+
+- serial:     the previous behavior, one LLM call after another, a new router client per item
+- concurrent: parse_item_spell_actions_async with an empty item spell cache
+- cached:     the same character again (every item is a cache hit)
+- batch:      --characters copies of the character built concurrently on a cold cache
+              (shared items are extracted once)
+
+LLM calls use the deterministic local provider; --latency-ms sets the simulated
+round trip. The persistent LLM parse cache is disabled.
+
+Usage:
+    python scripts/benchmark_item_spells.py
+    python scripts/benchmark_item_spells.py --json DNDBEYONDEXAMPLE.json --latency-ms 800 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import RAGConfig, set_config
+from src.llm.llm_client import LLMClientFactory
+
+
+async def serial_extraction(parser) -> int:
+    """One item after another, each with its own client (no cache)"""
+    spells = 0
+    for item_name, text in parser._spell_granting_items():
+        parser._llm_client = LLMClientFactory.create_router_client()
+        spells += len(await parser._request_spell_infos(text, item_name))
+    return spells
+
+
+async def run(args) -> None:
+    from src.character_creation.parsing.parse_actions import DNDBeyondActionsParser, item_spell_cache
+
+    with open(args.json, "r", encoding="utf-8") as f:
+        json_data = json.load(f)
+    items = DNDBeyondActionsParser(json_data)._spell_granting_items()
+
+    timings = {}
+    start = time.perf_counter()
+    await serial_extraction(DNDBeyondActionsParser(json_data))
+    timings['serial'] = time.perf_counter() - start
+
+    item_spell_cache.clear()
+    start = time.perf_counter()
+    await DNDBeyondActionsParser(json_data).parse_item_spell_actions_async()
+    timings['concurrent'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await DNDBeyondActionsParser(json_data).parse_item_spell_actions_async()
+    timings['cached'] = time.perf_counter() - start
+
+    item_spell_cache.clear()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        DNDBeyondActionsParser(json_data).parse_item_spell_actions_async() for _ in range(args.characters)
+    ))
+    timings['batch'] = time.perf_counter() - start
+
+    print("=" * 60)
+    print("ITEM SPELL EXTRACTION BENCHMARK")
+    print("=" * 60)
+    print(f"  Spell-granting items: {len(items)}  LLM latency: {args.latency_ms:.0f} ms  "
+          f"concurrency: {args.concurrency}")
+    for label, seconds in timings.items():
+        suffix = f"  ({args.characters} characters)" if label == 'batch' else ""
+        print(f"  {label:<12} {seconds * 1000:>9.1f} ms{suffix}")
+    print(f"  Speedup (concurrent vs serial): {timings['serial'] / timings['concurrent']:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark magic-item spell extraction")
+    parser.add_argument("--json", default=str(project_root / "DNDBEYONDEXAMPLE.json"), help="D&D Beyond character export")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Simulated LLM round trip")
+    parser.add_argument("--concurrency", type=int, default=4, help="Extractions in flight per character")
+    parser.add_argument("--characters", type=int, default=10, help="Characters in the batch round")
+    args = parser.parse_args()
+
+    set_config(RAGConfig(
+        primary_llm_provider="local",
+        router_llm_provider="local",
+        final_response_llm_provider="local",
+        embedding_provider="local",
+        local_latency_distribution="fixed",
+        local_latency_ms=args.latency_ms,
+        item_spell_concurrency=args.concurrency,
+        llm_parse_cache_enabled=False  # Measure the in-process cache only
+    ))
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the persistent LLM parse cache in character creation.
+
+Builds the same D&D Beyond export three times with AsyncCharacterBuilder:
+- cold:    empty cache (every LLM-backed section calls the LLM)
+- resync:  unchanged export (every section is a cache hit)
+- edited:  HP and one note section changed (only that section calls the LLM)
+
+The in-process item spell cache is cleared between builds, so every build reads
+the persistent cache like a fresh process would. LLM calls use the deterministic
+local provider; the cache lives in a temporary directory.
+
+Usage:
+    python scripts/benchmark_parse_cache.py
+    python scripts/benchmark_parse_cache.py --json DNDBEYONDEXAMPLE.json --latency-ms 1500
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import RAGConfig, set_config
+
+
+async def build(json_data) -> dict:
+    from src.character_creation.async_character_builder import AsyncCharacterBuilder
+    from src.character_creation.parsing.parse_actions import item_spell_cache
+
+    item_spell_cache.clear()
+    events = []
+
+    async def collect(event):
+        events.append(event)
+
+    start = time.perf_counter()
+    await AsyncCharacterBuilder(json_data).build_async(progress_callback=collect)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    hits = misses = 0
+    for event in events:
+        cache = event.get('llm_cache') if event['type'] == 'parser_complete' else None
+        if cache:
+            hits += cache['hits']
+            misses += cache['misses']
+    return {
+        'time_ms': elapsed_ms,
+        'llm_calls': events[-1]['llm_usage']['calls'],
+        'hits': hits,
+        'misses': misses
+    }
+
+
+async def run(args) -> None:
+    with open(args.json, "r", encoding="utf-8") as f:
+        json_data = json.load(f)
+
+    edited = copy.deepcopy(json_data)
+    edited['data']['baseHitPoints'] = (edited['data'].get('baseHitPoints') or 0) + 7
+    notes = edited['data'].setdefault('notes', {})
+    notes['enemies'] = (notes.get('enemies') or '') + "\nThe Benchmark Baron"
+
+    results = {
+        'cold': await build(json_data),
+        'resync': await build(json_data),
+        'edited': await build(edited)
+    }
+
+    print("=" * 60)
+    print("LLM PARSE CACHE BENCHMARK")
+    print("=" * 60)
+    print(f"  LLM latency: {args.latency_ms:.0f} ms")
+    print(f"  {'build':<8} {'ms':>9} {'LLM calls':>10} {'hits':>6} {'misses':>7}")
+    for label, result in results.items():
+        print(f"  {label:<8} {result['time_ms']:>9.1f} {result['llm_calls']:>10} "
+              f"{result['hits']:>6} {result['misses']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the persistent LLM parse cache")
+    parser.add_argument("--json", default=str(project_root / "DNDBEYONDEXAMPLE.json"), help="D&D Beyond character export")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Simulated LLM round trip")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        set_config(RAGConfig(
+            primary_llm_provider="local",
+            router_llm_provider="local",
+            final_response_llm_provider="local",
+            embedding_provider="local",
+            local_latency_distribution="fixed",
+            local_latency_ms=args.latency_ms,
+            llm_parse_cache_dir=cache_dir
+        ))
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
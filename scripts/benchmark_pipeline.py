@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark for CentralEngine.
+
+Replays the markdown question sets through CentralEngine.process_query_stream at a
+configurable concurrency and reports latency percentiles (p50/p95/p99), throughput,
+per-stage timing and per-router performance metrics. Results are saved as JSON so
+runs from different commits can be compared with --compare.
+
+Usage:
+    # Offline run with the deterministic local provider
+    python scripts/benchmark_pipeline.py --provider local --concurrency 8
+
+    # Real providers from config/.env, first 20 questions, compare against a previous run
+    python scripts/benchmark_pipeline.py --limit 20 --compare benchmark_results/pipeline_abc123.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, TextIO
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import RAGConfig, get_config, set_config
+
+
+DEFAULT_QUESTION_FILES = [
+    "docs/test_questions/character-data-testqs.md",
+    "docs/test_questions/session-notes-testqs.md",
+    "docs/rulebook-testqs.md",
+    "docs/character-questions.md",
+]
+
+_NUMBERED_RE = re.compile(r'^\s*\d+\.\s+(.+?)\s*$')
+_HEADING_RE = re.compile(r'^#{2,4}\s+(.+?)\s*$')
+
+
+@dataclass
+class BenchmarkQuestion:
+    """A single question parsed from a question set"""
+    text: str
+    source: str
+    section: str
+
+
+@dataclass
+class QueryRecord:
+    """Measurements for one replayed query"""
+    question: str
+    source: str
+    section: str
+    worker: int
+    started_at_ms: float
+    ttft_ms: Optional[float] = None
+    total_ms: float = 0.0
+    chunks: int = 0
+    response_chars: int = 0
+    timing: Dict[str, float] = field(default_factory=dict)
+    rag_metrics: Dict[str, Any] = field(default_factory=dict)
+    usage: Dict[str, Any] = field(default_factory=dict)
+    tools: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def load_questions(paths: List[str]) -> List[BenchmarkQuestion]:
+    """Parse numbered questions (plain, quoted or bold-quoted) from markdown files"""
+    questions = []
+    for path in paths:
+        file_path = project_root / path
+        if not file_path.exists():
+            print(f"⚠️  Question file not found: {path}")
+            continue
+
+        section = ""
+        in_code_block = False
+        for line in file_path.read_text(encoding='utf-8').splitlines():
+            if line.strip().startswith("```"):
+                in_code_block = not in_code_block
+                continue
+            if in_code_block:
+                continue
+
+            heading = _HEADING_RE.match(line)
+            if heading:
+                section = re.sub(r'^\d+\.\s*', '', heading.group(1).replace('*', '')).strip()
+                continue
+
+            numbered = _NUMBERED_RE.match(line)
+            if numbered:
+                text = numbered.group(1).replace('**', '').strip().strip('"').strip()
+                if text and section.lower() != "usage":
+                    questions.append(BenchmarkQuestion(text=text, source=path, section=section))
+    return questions
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Percentile summary for a list of samples"""
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values),
+        'min': min(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values),
+    }
+
+
+def flatten_numeric(data: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Flatten nested metric dictionaries into dotted keys, keeping numeric leaves only"""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten_numeric(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def build_report(records: List[QueryRecord], wall_time_s: float) -> Dict[str, Any]:
+    """Aggregate per-query records into percentile reports"""
+    ok = [r for r in records if not r.error]
+
+    stage_samples: Dict[str, List[float]] = {}
+    router_samples: Dict[str, List[float]] = {}
+    usage_samples: Dict[str, List[float]] = {}
+    usage_totals = {'calls': 0, 'input_tokens': 0, 'output_tokens': 0, 'cached_tokens': 0, 'cost_usd': 0.0}
+    for record in ok:
+        for key in usage_totals:
+            usage_totals[key] += record.usage.get(key, 0)
+        for key in ('input_tokens', 'output_tokens', 'cost_usd'):
+            if key in record.usage:
+                usage_samples.setdefault(key, []).append(record.usage[key])
+        for stage, stage_usage in record.usage.get('by_stage', {}).items():
+            for key in ('input_tokens', 'output_tokens', 'ttft_ms'):
+                if stage_usage.get(key) is not None:
+                    usage_samples.setdefault(f"{stage}.{key}", []).append(stage_usage[key])
+        for stage, value in record.timing.items():
+            stage_samples.setdefault(stage, []).append(value)
+        for tool, metrics in record.rag_metrics.items():
+            for name, value in flatten_numeric(metrics).items():
+                router_samples.setdefault(f"{tool}.{name}", []).append(value)
+
+    return {
+        'queries': len(records),
+        'errors': len(records) - len(ok),
+        'wall_time_s': wall_time_s,
+        'throughput_qps': len(ok) / wall_time_s if wall_time_s > 0 else 0.0,
+        'latency_ms': {
+            'total': summarize([r.total_ms for r in ok]),
+            'ttft': summarize([r.ttft_ms for r in ok if r.ttft_ms is not None]),
+        },
+        'stage_timing_ms': {stage: summarize(values) for stage, values in sorted(stage_samples.items())},
+        'router_metrics': {name: summarize(values) for name, values in sorted(router_samples.items())},
+        'llm_usage_total': usage_totals,
+        'llm_usage_per_query': {name: summarize(values) for name, values in sorted(usage_samples.items())},
+    }
+
+
+def load_storage(verbose: bool):
+    """
+    Load the character, rulebook and session notes storage shared by all workers.
+    Exits if the rulebook storage cannot be loaded: without it the rulebook tool is
+    skipped and the results would not be comparable.
+    """
+    from src.utils.character_manager import CharacterManager
+    from src.rag.rulebook.rulebook_storage import RulebookStorage
+    from src.rag.session_notes.session_notes_storage import SessionNotesStorage
+
+    character = None
+    try:
+        character = CharacterManager().load_character("Duskryn Nightwarden")
+        if verbose:
+            print(f"   ✅ Character loaded: {character.character_base.name}")
+    except Exception as e:
+        print(f"   ⚠️  Failed to load character: {e}")
+
+    rulebook_path = project_root / "knowledge_base" / "processed_rulebook" / "rulebook_storage.pkl"
+    try:
+        rulebook_storage = RulebookStorage()
+        loaded = rulebook_storage.load_from_disk(str(rulebook_path))
+    except Exception as e:
+        print(f"❌ Failed to load rulebook storage: {e}")
+        sys.exit(1)
+    if not loaded:
+        print(f"❌ Rulebook storage not found at {rulebook_path} (build it with scripts/build_rulebook_storage.py)")
+        sys.exit(1)
+    if verbose:
+        print(f"   ✅ Rulebook loaded: {len(rulebook_storage.sections)} sections")
+
+    campaign = None
+    try:
+        campaign = SessionNotesStorage().get_campaign("main_campaign")
+    except Exception as e:
+        print(f"   ⚠️  Failed to load session notes: {e}")
+
+    return character, rulebook_storage, campaign
+
+
+def create_engines(count: int, character, rulebook_storage, campaign) -> List[Any]:
+    """One engine per worker so conversation history is never shared between concurrent queries"""
+    from src.central_engine import CentralEngine
+    from src.llm.central_prompt_manager import CentralPromptManager
+    from src.rag.context_assembler import ContextAssembler
+
+    engines = []
+    for _ in range(count):
+        prompt_manager = CentralPromptManager(ContextAssembler())
+        engines.append(CentralEngine.create_from_config(
+            prompt_manager,
+            character=character,
+            rulebook_storage=rulebook_storage,
+            campaign_session_notes=campaign
+        ))
+    return engines
+
+
+async def run_query(engine, worker: int, question: BenchmarkQuestion, character_name: str,
+                    bench_start: float, keep_history: bool) -> QueryRecord:
+    """Replay a single question and capture streaming latency plus emitted metrics"""
+    if not keep_history:
+        engine.clear_conversation_history()
+
+    record = QueryRecord(
+        question=question.text,
+        source=question.source,
+        section=question.section,
+        worker=worker,
+        started_at_ms=(time.perf_counter() - bench_start) * 1000
+    )
+
+    async def on_metadata(event_type: str, data: Dict[str, Any]):
+        if event_type == 'routing_metadata':
+            record.tools = [t.get("tool") for t in data.get('tools_needed', [])]
+        elif event_type == 'performance_metrics':
+            record.timing = data.get('timing', {})
+            record.rag_metrics = data.get('rag_metrics', {})
+            record.usage = data.get('usage', {})
+
+    start = time.perf_counter()
+    try:
+        async for chunk in engine.process_query_stream(question.text, character_name, metadata_callback=on_metadata):
+            if record.ttft_ms is None:
+                record.ttft_ms = (time.perf_counter() - start) * 1000
+            record.chunks += 1
+            record.response_chars += len(chunk)
+    except Exception as e:
+        record.error = f"{type(e).__name__}: {e}"
+    record.total_ms = (time.perf_counter() - start) * 1000
+    return record
+
+
+async def run_benchmark(engines: List[Any], questions: List[BenchmarkQuestion], character_name: str,
+                        keep_history: bool, progress: Optional[TextIO] = None) -> Tuple[List[QueryRecord], float]:
+    """Drain the question queue with one task per engine"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for question in questions:
+        queue.put_nowait(question)
+
+    records: List[QueryRecord] = []
+    bench_start = time.perf_counter()
+
+    async def worker(worker_id: int, engine):
+        while True:
+            try:
+                question = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            record = await run_query(engine, worker_id, question, character_name, bench_start, keep_history)
+            records.append(record)
+            if progress:
+                status = "❌" if record.error else "✓"
+                print(f"  {status} [{len(records):4d}/{len(questions)}] {record.total_ms:8.1f}ms  {question.text[:70]}",
+                      file=progress, flush=True)
+
+    await asyncio.gather(*(worker(i, engine) for i, engine in enumerate(engines)))
+    return records, time.perf_counter() - bench_start
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+def print_report(report: Dict[str, Any]):
+    print("\n" + "=" * 80)
+    print("PIPELINE BENCHMARK REPORT")
+    print("=" * 80)
+    print(f"Queries: {report['queries']}  Errors: {report['errors']}  "
+          f"Wall time: {report['wall_time_s']:.2f}s  Throughput: {report['throughput_qps']:.2f} q/s")
+
+    def row(name: str, stats: Dict[str, float]):
+        if stats.get('count'):
+            print(f"  {name:<55} {stats['p50']:>10.1f} {stats['p95']:>10.1f} {stats['p99']:>10.1f} {stats['max']:>10.1f}")
+
+    print(f"\n  {'metric':<55} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}")
+    for name, stats in report['latency_ms'].items():
+        row(f"latency.{name}_ms", stats)
+    for name, stats in report['stage_timing_ms'].items():
+        row(f"stage.{name}_ms", stats)
+    for name, stats in report['router_metrics'].items():
+        row(name, stats)
+    for name, stats in report.get('llm_usage_per_query', {}).items():
+        row(f"usage.{name}", stats)
+
+    totals = report.get('llm_usage_total')
+    if totals and totals['calls']:
+        print(f"\n  LLM usage: {totals['calls']} calls, {totals['input_tokens']} input / "
+              f"{totals['output_tokens']} output / {totals['cached_tokens']} cached tokens, "
+              f"${totals['cost_usd']:.4f}")
+
+
+def print_comparison(current: Dict[str, Any], baseline_path: str):
+    """Print p50/p95 deltas against a previous results file"""
+    baseline = json.loads(Path(baseline_path).read_text(encoding='utf-8'))['report']
+    print("\n" + "=" * 80)
+    print(f"COMPARISON vs {baseline_path}")
+    print("=" * 80)
+    print(f"  {'metric':<45} {'p50 base':>10} {'p50 now':>10} {'Δ%':>8} {'p95 base':>10} {'p95 now':>10} {'Δ%':>8}")
+
+    def delta(before: float, after: float) -> str:
+        return f"{(after - before) / before * 100:+7.1f}%" if before else "     n/a"
+
+    for group in ('latency_ms', 'stage_timing_ms', 'llm_usage_per_query'):
+        for name, stats in current[group].items():
+            base = baseline.get(group, {}).get(name)
+            if not base or not base.get('count') or not stats.get('count'):
+                continue
+            print(f"  {group + '.' + name:<45} {base['p50']:>10.1f} {stats['p50']:>10.1f} {delta(base['p50'], stats['p50'])} "
+                  f"{base['p95']:>10.1f} {stats['p95']:>10.1f} {delta(base['p95'], stats['p95'])}")
+
+
+def configure_local_provider(args):
+    """Switch all LLM and embedding calls to the deterministic local provider"""
+    cfg = get_config()
+    set_config(RAGConfig(
+        openai_api_key=cfg.openai_api_key,
+        anthropic_api_key=cfg.anthropic_api_key,
+        primary_llm_provider="local",
+        router_llm_provider="local",
+        final_response_llm_provider="local",
+        embedding_model=cfg.embedding_model,
+        embedding_provider="local",
+        local_latency_distribution=args.latency_distribution,
+        local_latency_ms=args.latency_ms,
+        local_latency_jitter_ms=args.latency_jitter_ms,
+        local_tail_probability=args.tail_probability,
+        local_tail_latency_ms=args.tail_latency_ms,
+        local_tokens_per_second=args.tokens_per_second,
+        local_seed=args.seed,
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CentralEngine end-to-end latency")
+    parser.add_argument("--provider", choices=["config", "local"], default="config",
+                        help="'config' uses providers from config/.env, 'local' uses the deterministic stand-in")
+    parser.add_argument("--questions", action="append", help="Question markdown file (repeatable, relative to project root)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of concurrent engines/workers")
+    parser.add_argument("--limit", type=int, help="Only replay the first N questions")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the question set N times")
+    parser.add_argument("--character-name", default="Duskryn Nightwarden")
+    parser.add_argument("--keep-history", action="store_true", help="Keep conversation history between queries on a worker")
+    parser.add_argument("--output", help="Results JSON path (default: benchmark_results/pipeline_<rev>_<timestamp>.json)")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    parser.add_argument("--show-engine-output", action="store_true", help="Do not suppress engine debug prints")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final report")
+    # Local provider settings
+    parser.add_argument("--latency-distribution", default="normal", choices=["fixed", "uniform", "normal", "lognormal"])
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=75.0)
+    parser.add_argument("--tail-probability", type=float, default=0.0)
+    parser.add_argument("--tail-latency-ms", type=float, default=1500.0)
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.provider == "local":
+        configure_local_provider(args)
+    cfg = get_config()
+
+    question_files = args.questions or DEFAULT_QUESTION_FILES
+    questions = load_questions(question_files)
+    if args.limit:
+        questions = questions[:args.limit]
+    questions = questions * max(1, args.repeat)
+    if not questions:
+        print("❌ No questions found")
+        sys.exit(1)
+
+    verbose = not args.quiet
+    if verbose:
+        print(f"🚀 Benchmarking {len(questions)} queries at concurrency {args.concurrency} "
+              f"(router={cfg.router_llm_provider}, final={cfg.final_response_llm_provider})")
+
+    character, rulebook_storage, campaign = load_storage(verbose)
+    engines = create_engines(max(1, args.concurrency), character, rulebook_storage, campaign)
+
+    # Engine debug prints dominate the console (and add I/O cost) - swallow them unless asked
+    sink = contextlib.nullcontext() if args.show_engine_output else contextlib.redirect_stdout(io.StringIO())
+    progress = sys.stdout if verbose else None
+
+    async def run():
+        with sink:
+            return await run_benchmark(engines, questions, args.character_name, args.keep_history, progress)
+
+    records, wall_time_s = asyncio.run(run())
+    report = build_report(records, wall_time_s)
+    print_report(report)
+
+    errors = [r for r in records if r.error]
+    if errors and verbose:
+        print(f"\n⚠️  {len(errors)} queries failed, first error: {errors[0].error}")
+
+    revision = git_revision()
+    output_path = Path(args.output) if args.output else (
+        project_root / "benchmark_results" /
+        f"pipeline_{revision or 'unknown'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps({
+        'metadata': {
+            'git_revision': revision,
+            'timestamp': datetime.now().isoformat(),
+            'provider_mode': args.provider,
+            'router_llm_provider': cfg.router_llm_provider,
+            'final_response_llm_provider': cfg.final_response_llm_provider,
+            'router_model': cfg.get_router_model(),
+            'final_model': cfg.get_final_model(),
+            'embedding_provider': cfg.embedding_provider,
+            'concurrency': args.concurrency,
+            'question_files': question_files,
+            'args': vars(args),
+        },
+        'report': report,
+        'records': [asdict(r) for r in records],
+    }, indent=2, default=str), encoding='utf-8')
+    print(f"\n💾 Results saved to {output_path}")
+
+    if args.compare:
+        print_comparison(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
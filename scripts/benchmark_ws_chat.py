@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the chat WebSocket: frames per response and server CPU.
+
+A uvicorn server in this process serves:
+- /ws/chat-legacy: the previous endpoint loop (one send_json per chunk, one query at
+  a time per connection), copied below
+- /ws/chat:        the current endpoint (coalesced frames; ?protocol=2 runs a
+                   connection's queries concurrently)
+Both answer with a synthetic ChatService that streams --tokens chunks of a few
+characters, --token-ms apart, after the usual metadata events, so only the WebSocket
+layer is measured. Clients run in a subprocess so the CPU time of this process is
+the server's.
+
+Rounds:
+- legacy: /ws/chat-legacy
+- v1:     /ws/chat (queries of a connection one after another)
+- v2:     /ws/chat?protocol=2 (queries of a connection sent at once)
+
+Usage:
+    python scripts/benchmark_ws_chat.py
+    python scripts/benchmark_ws_chat.py --connections 8 --queries 4 --tokens 500 --token-ms 2
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+class SyntheticChatService:
+    """Stands in for ChatService: metadata events, then a token stream"""
+
+    tokens = 300
+    token_ms = 5.0
+
+    def clear_conversation_history(self, character_name):
+        pass
+
+    async def process_query_stream(self, user_query, character_name, metadata_callback=None):
+        if metadata_callback:
+            await metadata_callback('routing_metadata', {'tools_needed': []})
+            await metadata_callback('entities_metadata', {'entities': []})
+            await metadata_callback('context_sources', {})
+        for i in range(self.tokens):
+            if self.token_ms:
+                await asyncio.sleep(self.token_ms / 1000)
+            yield f" tok{i % 10}"
+        if metadata_callback:
+            await metadata_callback('performance_metrics', {'timing': {}})
+
+
+def make_app():
+    from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+    import api.routers.websocket as websocket_router
+    from src.utils.tracing import tracer, request_context
+
+    websocket_router.ChatService = SyntheticChatService
+    app = FastAPI()
+    app.include_router(websocket_router.router)
+
+    @app.websocket("/ws/chat-legacy")
+    async def legacy_endpoint(websocket: WebSocket):
+        """The endpoint loop before multiplexing and coalescing"""
+        await websocket.accept()
+        chat_service = SyntheticChatService()
+
+        async def emit_metadata(event_type: str, data: dict):
+            await websocket.send_json({'type': event_type, 'data': data})
+
+        try:
+            while True:
+                message_data = json.loads(await websocket.receive_text())
+                with request_context(message_data.get('request_id')) as request_id:
+                    await websocket.send_json({'type': 'message_received', 'request_id': request_id})
+                    with tracer.span("ws.send_stream") as span:
+                        chunks = 0
+                        async for chunk in chat_service.process_query_stream(
+                            message_data['message'], message_data['character_name'],
+                            metadata_callback=emit_metadata
+                        ):
+                            await websocket.send_json({'type': 'response_chunk', 'content': chunk})
+                            chunks += 1
+                        span.set_attribute("chunks", chunks)
+                    await websocket.send_json({'type': 'response_complete', 'request_id': request_id})
+        except WebSocketDisconnect:
+            pass
+
+    return app
+
+
+async def run_clients(url: str, connections: int, queries: int, concurrent: bool) -> dict:
+    """Client side (subprocess): every connection asks `queries` questions"""
+    import websockets
+
+    async def connection(index: int):
+        stats = []
+        async with websockets.connect(url, max_size=None) as ws:
+            async def ask(query: int):
+                request_id = f"c{index}q{query}"
+                await ws.send(json.dumps({
+                    'message': 'What is my AC?', 'character_name': 'Bench', 'request_id': request_id
+                }))
+                return request_id, time.perf_counter()
+
+            started = {}
+            if concurrent:
+                for query in range(queries):
+                    request_id, sent = await ask(query)
+                    started[request_id] = {'sent': sent, 'frames': 0, 'chars': 0}
+            pending = queries
+            next_query = 0
+            if not concurrent:
+                request_id, sent = await ask(next_query)
+                started[request_id] = {'sent': sent, 'frames': 0, 'chars': 0}
+                next_query += 1
+
+            current = next(iter(started))
+            while pending:
+                message = json.loads(await ws.recv())
+                request_id = message.get('request_id') or current
+                entry = started.get(request_id)
+                if message['type'] == 'response_chunk':
+                    entry['frames'] += 1
+                    entry['chars'] += len(message['content'])
+                    entry.setdefault('first_ms', (time.perf_counter() - entry['sent']) * 1000)
+                elif message['type'] == 'response_complete':
+                    entry['total_ms'] = (time.perf_counter() - entry['sent']) * 1000
+                    stats.append(entry)
+                    pending -= 1
+                    if not concurrent and next_query < queries:
+                        request_id, sent = await ask(next_query)
+                        started[request_id] = {'sent': sent, 'frames': 0, 'chars': 0}
+                        current = request_id
+                        next_query += 1
+        return stats
+
+    start = time.perf_counter()
+    results = [entry for stats in await asyncio.gather(*(connection(i) for i in range(connections))) for entry in stats]
+    return {
+        'wall_ms': (time.perf_counter() - start) * 1000,
+        'responses': len(results),
+        'frames': sum(r['frames'] for r in results),
+        'chars': sum(r['chars'] for r in results),
+        'first_ms': sorted(r['first_ms'] for r in results)[len(results) // 2],
+        'total_ms': sorted(r['total_ms'] for r in results)[len(results) // 2],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chat WebSocket (frames per response, server CPU)")
+    parser.add_argument("--connections", type=int, default=4, help="Client connections")
+    parser.add_argument("--queries", type=int, default=3, help="Queries per connection")
+    parser.add_argument("--tokens", type=int, default=300, help="Chunks per response")
+    parser.add_argument("--token-ms", type=float, default=5.0, help="Delay between chunks")
+    parser.add_argument("--client", help=argparse.SUPPRESS)  # Internal: run the client side against this URL
+    parser.add_argument("--concurrent", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.client:
+        print(json.dumps(asyncio.run(run_clients(args.client, args.connections, args.queries, args.concurrent))))
+        return
+
+    import uvicorn
+
+    SyntheticChatService.tokens = args.tokens
+    SyntheticChatService.token_ms = args.token_ms
+    server = uvicorn.Server(uvicorn.Config(make_app(), host="127.0.0.1", port=0, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    rounds = {
+        'legacy': (f"ws://127.0.0.1:{port}/ws/chat-legacy", False),
+        'v1': (f"ws://127.0.0.1:{port}/ws/chat", False),
+        'v2': (f"ws://127.0.0.1:{port}/ws/chat?protocol=2", True),
+    }
+    print("=" * 80)
+    print("CHAT WEBSOCKET BENCHMARK (synthetic token stream)")
+    print("=" * 80)
+    print(f"  Connections: {args.connections}  queries each: {args.queries}  "
+          f"chunks per response: {args.tokens} every {args.token_ms:g} ms")
+    print(f"  {'round':<8} {'wall ms':>9} {'frames/resp':>12} {'first ms':>9} {'resp p50 ms':>12} {'server CPU ms':>14}")
+    try:
+        for label, (url, concurrent) in rounds.items():
+            command = [sys.executable, __file__, "--client", url, "--connections", str(args.connections),
+                       "--queries", str(args.queries)] + (["--concurrent"] if concurrent else [])
+            cpu_start = time.process_time()
+            output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+            cpu_ms = (time.process_time() - cpu_start) * 1000
+            r = json.loads(output.strip().splitlines()[-1])
+            print(f"  {label:<8} {r['wall_ms']:>9.0f} {r['frames'] / r['responses']:>12.1f} "
+                  f"{r['first_ms']:>9.1f} {r['total_ms']:>12.0f} {cpu_ms:>14.0f}")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
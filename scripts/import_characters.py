@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Bulk-import characters into the database.
+
+Accepts files and directories (searched for *.json and *.pkl):
+- *.json: Character JSON, a D&D Beyond export, or a JSON list of either
+- *.pkl:  pickled Character objects (knowledge_base/saved_characters)
+
+Files are read in parallel, characters are parsed concurrently and upserted in
+chunks, one transaction per chunk (see api/services/character_import.py).
+
+Usage:
+    python scripts/import_characters.py knowledge_base/saved_characters
+    python scripts/import_characters.py exports/*.json --chunk-size 50 --skip-existing
+"""
+import argparse
+import asyncio
+import json
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, List, Tuple
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from api.database.connection import AsyncSessionLocal, init_db, close_db
+from api.services.character_import import CharacterImporter
+
+
+def collect_files(paths: List[str]) -> List[Path]:
+    files = []
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix in ('.json', '.pkl')))
+        else:
+            files.append(path)
+    return files
+
+
+def read_file(path: Path) -> List[Tuple[str, Any]]:
+    """(label, item) pairs from one file; unreadable files become a single error item"""
+    try:
+        if path.suffix == '.pkl':
+            with open(path, 'rb') as f:
+                return [(path.name, pickle.load(f))]
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        return [(path.name, e)]
+    if isinstance(data, list):
+        return [(f"{path.name}[{i}]", item) for i, item in enumerate(data)]
+    return [(path.name, data)]
+
+
+async def import_files(args) -> int:
+    files = collect_files(args.paths)
+    if not files:
+        print("No character files found.")
+        return 1
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        loaded = [pair for pairs in executor.map(read_file, files) for pair in pairs]
+    labels = [label for label, _ in loaded]
+    items = [item for _, item in loaded]
+    print(f"Importing {len(items)} characters from {len(files)} files...")
+
+    await init_db()
+    importer = CharacterImporter(
+        AsyncSessionLocal,
+        chunk_size=args.chunk_size,
+        parse_concurrency=args.concurrency,
+        skip_existing=args.skip_existing
+    )
+    try:
+        async for event in importer.run(items, labels=labels):
+            kind = event['type']
+            if kind == 'item_failed':
+                print(f"  ❌ {event['item']} ({event['stage']}): {event['error']}")
+            elif kind == 'item_saved' and not args.quiet:
+                icon = '⚠️ ' if event['status'] == 'skipped' else '✅'
+                print(f"  {icon} {event['name']} ({event['id']}): {event['status']}")
+            elif kind == 'chunk_committed' and not args.quiet:
+                print(f"  💾 Chunk {event['chunk']} committed ({event['size']} characters, {event['write_ms']:.0f} ms)")
+    finally:
+        await close_db()
+
+    summary = importer.summary.to_dict()
+    print(f"\n{'=' * 60}")
+    print("Import complete!")
+    print(f"  Created: {summary['created']}  Updated: {summary['updated']}  "
+          f"Skipped: {summary['skipped']}  Failed: {summary['failed']}")
+    print(f"  {summary['total_ms'] / 1000:.2f}s total, {summary['characters_per_second']} characters/s")
+    print(f"{'=' * 60}")
+    return 1 if summary['failed'] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import characters into the database")
+    parser.add_argument("paths", nargs="+", help="Character files or directories")
+    parser.add_argument("--chunk-size", type=int, default=25, help="Characters written per transaction")
+    parser.add_argument("--concurrency", type=int, default=8, help="Files read / characters parsed at once")
+    parser.add_argument("--skip-existing", action="store_true", help="Leave existing characters untouched")
+    parser.add_argument("--quiet", action="store_true", help="Only print failures and the summary")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(import_files(args)))
+
+
+if __name__ == "__main__":
+    main()
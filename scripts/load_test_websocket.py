@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Load test: websocket chat latency under concurrent first-time character loads.
+
+Starts the API in-process (uvicorn on a free port), seeds characters, then opens
+--clients chat websockets at once. Each client asks one question about one of
+--characters characters that no connection has loaded yet, so every client pays for
+a first-time character load (database read, decode, CentralEngine creation) while
+the others do the same. LLM and embedding calls use the deterministic local provider.
+
+Reported per client (ms from the start of the connect):
+- connect:      websocket handshake complete
+- ack:          message_received
+- first_event:  first metadata/response event (character loaded, engine created)
+- complete:     response_complete
+plus connection pool wait/checkout metrics from the /metrics registry.
+
+The default database is a temporary SQLite file (needs aiosqlite). To test MySQL, pass
+--database-url pointing at an EMPTY scratch database; the script refuses to seed a
+database that already contains characters, and removes its rows when done.
+
+Usage:
+    python scripts/load_test_websocket.py
+    python scripts/load_test_websocket.py --clients 100 --characters 20 --pool-size 5 --max-overflow 5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import pickle
+import re
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import uvicorn
+import websockets
+
+from benchmark_pipeline import summarize, configure_local_provider
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_client(url: str, character_name: str, question: str) -> dict:
+    start = time.perf_counter()
+    elapsed = lambda: (time.perf_counter() - start) * 1000
+    timings = {}
+    async with websockets.connect(url, max_size=None) as ws:
+        timings['connect'] = elapsed()
+        await ws.send(json.dumps({'message': question, 'character_name': character_name}))
+        while True:
+            event = json.loads(await ws.recv())
+            kind = event.get('type')
+            if kind == 'message_received':
+                timings['ack'] = elapsed()
+            elif kind == 'error':
+                raise RuntimeError(event.get('error'))
+            elif kind == 'response_complete':
+                timings['complete'] = elapsed()
+                return timings
+            elif 'first_event' not in timings:
+                timings['first_event'] = elapsed()
+
+
+def metric_lines(prefix: str) -> dict:
+    """name{labels} -> value for registry samples starting with prefix"""
+    from src.utils.metrics import registry
+    samples = {}
+    for line in registry.render().splitlines():
+        if line.startswith(prefix) and not re.search(r'_bucket\{', line):
+            name, _, value = line.rpartition(' ')
+            samples[name] = float(value)
+    return samples
+
+
+async def run(args) -> None:
+    from sqlalchemy import select, delete, func
+    from api.main import app
+    from api.database.connection import AsyncSessionLocal
+    from api.database.models import Character as CharacterModel
+    from api.database.repositories.character_repo import CharacterRepository
+    from api.config import config
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", ws_max_size=2 ** 24))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    names = [f"Load Test {i:04d}" for i in range(args.characters)]
+    try:
+        async with AsyncSessionLocal() as session:
+            existing = (await session.execute(select(func.count()).select_from(CharacterModel))).scalar_one()
+            if existing:
+                print(f"❌ {existing} characters already in the target database; use an empty scratch database")
+                return
+            with open(project_root / "knowledge_base" / "saved_characters" / f"{args.character}.pkl", "rb") as f:
+                template = pickle.load(f)
+            characters = []
+            for name in names:
+                character = pickle.loads(pickle.dumps(template))
+                character.character_base.name = name
+                characters.append(character)
+            await CharacterRepository(session).bulk_upsert(characters)
+            await session.commit()
+
+        url = f"ws://127.0.0.1:{port}/ws/chat"
+        print(f"Pool: size={config.DB_POOL_SIZE} overflow={config.DB_MAX_OVERFLOW}  "
+              f"Clients: {args.clients}  Characters: {args.characters}")
+        start = time.perf_counter()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output if not args.verbose else sys.stdout):
+            results = await asyncio.gather(
+                *(run_client(url, names[i % len(names)], args.question) for i in range(args.clients)),
+                return_exceptions=True
+            )
+        wall_ms = (time.perf_counter() - start) * 1000
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(CharacterModel).where(CharacterModel.name.in_(names)))
+            await session.commit()
+        server.should_exit = True
+        await server_task
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    timings = [r for r in results if not isinstance(r, BaseException)]
+
+    print()
+    print("=" * 70)
+    print("WEBSOCKET LOAD TEST (concurrent first-time character loads)")
+    print("=" * 70)
+    print(f"  Completed: {len(timings)}/{args.clients}  errors: {len(errors)}  wall: {wall_ms:.0f} ms")
+    for error in errors[:5]:
+        print(f"  ❌ {type(error).__name__}: {error}")
+    print(f"  {'ms':<14} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for key in ('connect', 'ack', 'first_event', 'complete'):
+        stats = summarize([t[key] for t in timings if key in t])
+        if stats['count']:
+            print(f"  {key:<14} {stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['p99']:>9.1f} {stats['max']:>9.1f}")
+    print()
+    for name, value in metric_lines("shadowscribe_db_pool").items():
+        print(f"  {name:<60} {value:>10.4g}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Websocket latency under concurrent first-time character loads")
+    parser.add_argument("--database-url", default=None, help="Empty scratch database (default: temporary SQLite)")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent websocket clients")
+    parser.add_argument("--characters", type=int, default=10, help="Distinct characters (clients share them)")
+    parser.add_argument("--character", default="Duskryn Nightwarden", help="Saved character used as the template")
+    parser.add_argument("--question", default="What is my armor class?")
+    parser.add_argument("--pool-size", type=int, default=None, help="Override DB_POOL_SIZE")
+    parser.add_argument("--max-overflow", type=int, default=None, help="Override DB_MAX_OVERFLOW")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline output")
+    # Local provider settings
+    parser.add_argument("--latency-distribution", default="fixed", choices=["fixed", "uniform", "normal", "lognormal"])
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--tail-probability", type=float, default=0.0)
+    parser.add_argument("--tail-latency-ms", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=5000.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # The engine is configured from the environment when api.database.connection is imported
+    tmpdir = None
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ['DATABASE_URL'] = f"sqlite+aiosqlite:///{tmpdir.name}/characters.db"
+    if args.pool_size is not None:
+        os.environ['DB_POOL_SIZE'] = str(args.pool_size)
+    if args.max_overflow is not None:
+        os.environ['DB_MAX_OVERFLOW'] = str(args.max_overflow)
+
+    configure_local_provider(args)
+    try:
+        asyncio.run(run(args))
+    finally:
+        if tmpdir:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
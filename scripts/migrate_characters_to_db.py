@@ -8,12 +8,12 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from api.database.connection import AsyncSessionLocal, init_db
-from api.database.repositories.character_repo import CharacterRepository
+from api.services.character_import import CharacterImporter
 from src.utils.character_manager import CharacterManager
 
 
 async def migrate_characters():
-    """Migrate characters from pickle files to database."""
+    """Migrate characters from pickle files to database (bulk import, existing characters kept)."""
     print("Starting character migration...")
     
     # Initialize database
@@ -36,48 +36,32 @@ async def migrate_characters():
         print("No character files to migrate.")
         return
     
-    # Migrate each character
-    migrated = 0
-    failed = 0
+    # Load pickles in parallel; unreadable files are reported by the importer
+    def load(pickle_file: Path):
+        try:
+            return character_manager.load_character(pickle_file.stem)
+        except Exception as e:
+            return e
     
-    async with AsyncSessionLocal() as session:
-        repo = CharacterRepository(session)
-        
-        for pickle_file in pickle_files:
-            try:
-                # Load character from pickle
-                character_name = pickle_file.stem
-                print(f"\nMigrating: {character_name}")
-                
-                character = character_manager.load_character(character_name)
-                if not character:
-                    print(f"  ❌ Could not load character: {character_name}")
-                    failed += 1
-                    continue
-                
-                # Check if already exists
-                existing = await repo.get_by_name(character.character_base.name)
-                if existing:
-                    print(f"  ⚠️  Character already exists in database: {character.character_base.name}")
-                    continue
-                
-                # Create in database
-                db_character = await repo.create(character)
-                await session.commit()
-                
-                print(f"  ✅ Migrated: {db_character.name} (ID: {db_character.id})")
-                print(f"     Race: {db_character.race}, Class: {db_character.character_class}, Level: {db_character.level}")
-                migrated += 1
-                
-            except Exception as e:
-                print(f"  ❌ Error migrating {pickle_file.name}: {e}")
-                failed += 1
-                await session.rollback()
+    characters = await asyncio.gather(*(asyncio.to_thread(load, f) for f in pickle_files))
     
+    # Upsert in chunks, one transaction per chunk
+    importer = CharacterImporter(AsyncSessionLocal, skip_existing=True)
+    async for event in importer.run(characters, labels=[f.stem for f in pickle_files]):
+        if event['type'] == 'item_failed':
+            print(f"  ❌ Error migrating {event['item']}: {event['error']}")
+        elif event['type'] == 'item_saved':
+            if event['status'] == 'skipped':
+                print(f"  ⚠️  Character already exists in database: {event['name']}")
+            else:
+                print(f"  ✅ Migrated: {event['name']} (ID: {event['id']})")
+    
+    summary = importer.summary
     print(f"\n{'='*60}")
     print(f"Migration complete!")
-    print(f"  Migrated: {migrated}")
-    print(f"  Failed: {failed}")
+    print(f"  Migrated: {summary.created}")
+    print(f"  Skipped: {summary.skipped}")
+    print(f"  Failed: {summary.failed}")
     print(f"{'='*60}")
 
 
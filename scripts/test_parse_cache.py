@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test that the LLM parse cache does not persist failed LLM responses.
+
+Clients report API failures (rate limits, timeouts) as {"error": ...} instead of
+raising. A transient failure must not be written to the cache: the next build has
+to call the LLM again, and a successful response is then cached as usual.
+
+Usage:
+    python scripts/test_parse_cache.py
+"""
+
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import RAGConfig, set_config
+
+
+class FlakyClient:
+    """Returns an error response for the first `failures` calls, then `response`."""
+
+    default_model = "flaky-test-model"
+
+    def __init__(self, response, failures: int = 1):
+        self.response = response
+        self.failures = failures
+        self.calls = 0
+
+    async def generate_json_response(self, prompt, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            return {"error": "Rate limit exceeded"}
+        return self.response
+
+
+def cache_files(directory: str) -> list:
+    return [p for p in Path(directory).rglob("*.json")]
+
+
+async def test_get_or_generate(directory: str) -> None:
+    from src.llm.parse_cache import LLMParseCache
+
+    print("\n1. get_or_generate with an error response")
+    cache = LLMParseCache(directory=directory, enabled=True)
+    client = FlakyClient({"value": 1})
+
+    async def call():
+        return await cache.get_or_generate(
+            "test", "section", 1, client, "prompt",
+            lambda: client.generate_json_response("prompt")
+        )
+
+    first = await call()
+    assert first == {"error": "Rate limit exceeded"}, first
+    assert not cache_files(directory), "error response was written to the cache"
+    print("   ✓ Error response returned but not stored")
+
+    second = await call()
+    assert second == {"value": 1} and client.calls == 2, (second, client.calls)
+    assert len(cache_files(directory)) == 1
+    print("   ✓ Next call retried the LLM and stored the good response")
+
+    third = await call()
+    assert third == {"value": 1} and client.calls == 2, (third, client.calls)
+    print("   ✓ Good response served from the cache")
+
+
+async def test_background_parser(directory: str) -> None:
+    from src.character_creation.parsing.parse_background_personality import DNDBeyondBackgroundParser
+
+    print("\n2. Background parser section with an error response")
+    parser = DNDBeyondBackgroundParser({"data": {}})
+    client = FlakyClient({"organizations": []})
+    parser.llm_client = client
+
+    try:
+        await parser._generate_json("organizations", "organizations prompt", ("organizations",))
+        raise AssertionError("error response did not raise")
+    except ValueError as e:
+        print(f"   ✓ Raised: {e}")
+    assert not cache_files(directory), "error response was written to the cache"
+
+    data = await parser._generate_json("organizations", "organizations prompt", ("organizations",))
+    assert data == {"organizations": []} and client.calls == 2, (data, client.calls)
+    print("   ✓ Next call retried the LLM")
+
+    missing = FlakyClient({"unexpected": True}, failures=0)
+    parser.llm_client = missing
+    try:
+        await parser._generate_json("allies", "allies prompt", ("allies",))
+        raise AssertionError("response without expected keys did not raise")
+    except ValueError as e:
+        print(f"   ✓ Response without expected keys raised: {e}")
+    assert len(cache_files(directory)) == 1
+
+
+async def test_item_spells(directory: str) -> None:
+    from src.character_creation.parsing.parse_actions import DNDBeyondActionsParser
+
+    print("\n3. Item spell extraction with an error response")
+    client = FlakyClient({"spells": [{"spell_name": "call lightning"}]})
+    parser = DNDBeyondActionsParser({"data": {}}, llm_client=client)
+
+    try:
+        await parser._request_spell_infos("Cast call lightning once per dawn.", "Storm Staff")
+        raise AssertionError("error response did not raise")
+    except ValueError as e:
+        print(f"   ✓ Raised: {e}")
+    assert not cache_files(directory), "error response was written to the cache"
+
+    spells = await parser._request_spell_infos("Cast call lightning once per dawn.", "Storm Staff")
+    assert [s["spell_name"] for s in spells] == ["call lightning"] and client.calls == 2, (spells, client.calls)
+    assert len(cache_files(directory)) == 1
+    print("   ✓ Next call retried the LLM and stored the spells")
+
+
+async def main() -> None:
+    print("=" * 60)
+    print("LLM PARSE CACHE - FAILED RESPONSES")
+    print("=" * 60)
+
+    for test in (test_get_or_generate, test_background_parser, test_item_spells):
+        with tempfile.TemporaryDirectory() as directory:
+            set_config(RAGConfig(
+                primary_llm_provider="local",
+                router_llm_provider="local",
+                final_response_llm_provider="local",
+                embedding_provider="local",
+                llm_parse_cache_enabled=True,
+                llm_parse_cache_dir=directory
+            ))
+            await test(directory)
+
+    print("\n✅ All parse cache tests passed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -11,11 +11,16 @@ Usage:
     # With custom character name
     python -m scripts.update_character_from_json <path_to_dndbeyond_json> --name "Custom Name"
     
+    # Batch rebuild (several files and/or directories of exports) on a process pool
+    python -m scripts.update_character_from_json exports/ --workers 8 --report backfill.json
+    
 Example:
     python -m scripts.update_character_from_json path/to/dndbeyond_export.json
 """
 
 import sys
+import json
+import asyncio
 import argparse
 from pathlib import Path
 
@@ -24,6 +29,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.character_creation.character_builder import CharacterBuilder
+from src.character_creation.batch_character_builder import BatchCharacterBuilder
 from src.utils.character_manager import CharacterManager
 
 
@@ -102,6 +108,72 @@ def update_character_from_json(json_path: str, character_name: str = None):
         return False
 
 
+def update_characters_batch(json_paths, workers: int = None, save: bool = True, report_path: str = None):
+    """
+    Rebuild many characters from D&D Beyond JSON files (offline backfills).
+    
+    Deterministic parsers run on a process pool, LLM-bound parsing on one shared
+    event loop (see BatchCharacterBuilder). Prints per-character timing and a
+    throughput summary.
+    
+    Args:
+        json_paths: Paths to D&D Beyond JSON export files
+        workers: Process pool size (default: CPU count)
+        save: Save built characters to the knowledge base
+        report_path: Optional path for a JSON report of results and summary
+    """
+    print("=" * 80)
+    print("🔄 CHARACTER BATCH UPDATE")
+    print("=" * 80)
+    builder = BatchCharacterBuilder(workers=workers)
+    print(f"📄 Source files: {len(json_paths)}  ⚙️  Workers: {builder.workers}")
+    
+    print("\n🏗️  Building characters...")
+    results, summary = asyncio.run(builder.build_many(json_paths))
+    
+    if save:
+        print(f"\n💾 Saving characters to knowledge base...")
+        manager = CharacterManager(save_directory="knowledge_base/saved_characters")
+        for result in results:
+            if not result.ok:
+                continue
+            try:
+                manager.save_character(result.character)
+            except Exception as e:
+                result.ok = False
+                result.error = f"save failed: {e}"
+    
+    print(f"\n⏱️  Per-character timing (ms):")
+    print(f"   {'character':<32} {'queued':>8} {'process':>8} {'worker':>8} {'llm':>8} {'total':>8}")
+    for result in results:
+        name = result.character_name or Path(result.source).name
+        if result.ok:
+            print(f"   {name[:32]:<32} {result.queued_ms:>8.0f} {result.process_ms:>8.0f} "
+                  f"{result.worker_ms:>8.0f} {result.llm_ms:>8.0f} {result.total_ms:>8.0f}")
+        else:
+            print(f"   {name[:32]:<32} ❌ {result.error}")
+    
+    print(f"\n📊 Throughput:")
+    print(f"   • Characters: {summary.succeeded}/{summary.characters} built ({summary.failed} failed)")
+    print(f"   • Wall time: {summary.wall_ms / 1000:.2f} s ({summary.characters_per_second:.2f} characters/s), "
+          f"worker startup {summary.startup_ms / 1000:.2f} s")
+    print(f"   • Per character: p50 {summary.total_ms_p50:.0f} ms, max {summary.total_ms_max:.0f} ms")
+    if summary.wall_ms:
+        print(f"   • Worker parallelism: {summary.worker_ms_sum / summary.wall_ms:.2f}x on {summary.workers} workers")
+    if summary.llm_usage and summary.llm_usage.calls:
+        print(f"   • LLM calls: {summary.llm_usage.calls} (${summary.llm_usage.cost_usd:.4f})")
+    
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'summary': summary.to_dict(),
+                'results': [result.to_dict() for result in results]
+            }, f, indent=2)
+        print(f"\n📝 Report written to: {report_path}")
+    
+    return all(result.ok for result in results)
+
+
 def main():
     """Main entry point for the script."""
     parser = argparse.ArgumentParser(
@@ -117,12 +189,16 @@ Examples:
   
   # Update from D&D Beyond JSON export
   python -m scripts.update_character_from_json DNDBEYONDEXAMPLE.json
+  
+  # Rebuild every export in a directory on 8 worker processes, without saving
+  python -m scripts.update_character_from_json exports/ --workers 8 --dry-run
         """
     )
     
     parser.add_argument(
-        'json_path',
-        help='Path to D&D Beyond JSON export file'
+        'json_paths',
+        nargs='+',
+        help='Path(s) to D&D Beyond JSON export files or directories of them'
     )
     
     parser.add_argument(
@@ -131,17 +207,53 @@ Examples:
         default=None
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Batch mode: build on a process pool of this size (default: CPU count)',
+        default=None
+    )
+    
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Batch mode: build characters without saving them'
+    )
+    
+    parser.add_argument(
+        '--report',
+        help='Batch mode: write per-character timing and the summary to this JSON file',
+        default=None
+    )
+    
     # Parse arguments
     args = parser.parse_args()
     
-    # Validate file exists
-    json_file = Path(args.json_path)
-    if not json_file.exists():
-        print(f"❌ Error: File not found: {args.json_path}")
+    # Validate files exist (directories contribute their *.json files)
+    json_files = []
+    for json_path in args.json_paths:
+        path = Path(json_path)
+        if path.is_dir():
+            json_files.extend(sorted(str(p) for p in path.glob('*.json')))
+        elif path.exists():
+            json_files.append(json_path)
+        else:
+            print(f"❌ Error: File not found: {json_path}")
+            sys.exit(1)
+    if not json_files:
+        print("❌ Error: No JSON files found")
         sys.exit(1)
     
-    # Update character
-    success = update_character_from_json(args.json_path, args.name)
+    batch = len(json_files) > 1 or args.workers or args.dry_run or args.report
+    if batch and args.name:
+        print("❌ Error: --name cannot be used in batch mode")
+        sys.exit(1)
+    
+    # Update character(s)
+    if batch:
+        success = update_characters_batch(json_files, args.workers, not args.dry_run, args.report)
+    else:
+        success = update_character_from_json(json_files[0], args.name)
     
     if success:
         print("\n" + "=" * 80)
@@ -6,14 +6,17 @@ Uses 2 parallel LLM calls (tool selector + entity extractor) to determine query
 """
 
 import asyncio
+import threading
 import time
-from typing import Dict, List, Optional, Any, Union
+from contextlib import aclosing, contextmanager
+from typing import Dict, List, Optional, Any, Union, Tuple
 from dataclasses import dataclass, field
 
 # Import LLM client abstraction
 from .llm.llm_client import LLMClient, LLMClientFactory
 from .config import get_config
 from .llm.json_repair import JSONRepair
+from .llm.usage import UsageSummary, track_usage, usage_stage
 
 # Import query router types
 from .rag.character.character_query_router import CharacterQueryRouter, CharacterQueryResult
@@ -26,6 +29,8 @@ from .rag.session_notes.session_types import QueryEngineResult
 
 # Import EntitySearchEngine for new architecture
 from .utils.entity_search_engine import EntitySearchEngine
+from .utils.tracing import tracer, debug_log, request_context, get_request_id, iterate_isolated
+from .utils.metrics import count_query, record_query
 
 
 # ===== ROUTER OUTPUT DATACLASSES =====
@@ -64,14 +69,23 @@ class CentralEngine:
         
         # Initialize EntitySearchEngine
         self.entity_search_engine = entity_search_engine or EntitySearchEngine()
+        if character:
+            # Build the character's entity name index once, up front
+            self.entity_search_engine.get_character_index(character).warm()
         
         # Initialize query routers with required storage instances
         self.character_router = CharacterQueryRouter(character) if character else None
         self.rulebook_router = RulebookQueryRouter(rulebook_storage) if rulebook_storage else None
         self.session_notes_router = SessionNotesQueryRouter(campaign_session_notes) if campaign_session_notes else None
+        # Rulebook queries run in worker threads; a cancelled query's thread may still be
+        # finishing when the next one starts, so they take turns on the router
+        self._rulebook_lock = threading.Lock()
         
         # Conversation history tracking
         self.conversation_history: List[Dict[str, str]] = []
+        
+        # LLM token/cost usage accumulated over this engine's session
+        self.session_usage = UsageSummary()
     
     @classmethod
     def create_from_config(cls, prompt_manager, character=None, 
@@ -80,6 +94,23 @@ class CentralEngine:
         llm_clients = LLMClientFactory.create_default_clients()
         return cls(llm_clients, prompt_manager, character, rulebook_storage, campaign_session_notes)
     
+    def replace_character(self, character):
+        """
+        Swap in an updated copy of the character. Queries in flight keep seeing whole
+        objects (old or new), never a half-updated one; cached serializations and entity
+        indexes of section objects the copy shares with the old character are kept.
+        """
+        self.character = character
+        if self.character_router:
+            self.character_router.set_character(character, keep_sections=True)
+        self.entity_search_engine.rebind_character_index(character)
+    
+    def invalidate_character_section(self, section: Optional[str] = None):
+        """Drop cached serialization and entity index of an edited character section (all if None)."""
+        if self.character_router:
+            self.character_router.invalidate_section(section)
+        self.entity_search_engine.invalidate_character_index(section)
+    
     def add_conversation_turn(self, role: str, content: str):
         """Add a turn to the conversation history.
         
@@ -92,6 +123,25 @@ class CentralEngine:
             "content": content
         })
     
+    @contextmanager
+    def _conversation_turn(self, user_query: str):
+        """
+        Yield (history, answer): the history before this query, and a list to put the answer in.
+        
+        Queries on one engine may run concurrently (multiplexed websocket), so each one works
+        from its own snapshot and its user and assistant turns are appended together once it
+        is answered. A cancelled or failed query leaves the history unchanged, since an
+        unanswered question would make the next answer respond to it as well.
+        """
+        history = self.get_conversation_history()
+        answer: List[str] = []
+        yield history, answer
+        if answer:
+            self.conversation_history.extend([
+                {"role": "user", "content": user_query},
+                {"role": "assistant", "content": answer[0]}
+            ])
+    
     def clear_conversation_history(self):
         """Clear all conversation history."""
         self.conversation_history = []
@@ -109,109 +159,48 @@ class CentralEngine:
         4. Execute needed query routers in parallel
         5. Generate final response
         """
-        print(f"🔧 DEBUG: Processing query: '{user_query}'")
-        
-        # Step 1: Make 2 parallel LLM calls
-        print("🔧 DEBUG: Step 1 - Making parallel LLM calls (tool selector + entity extractor)")
-        tool_selector_output, entity_extractor_output = await asyncio.gather(
-            self._call_tool_selector(user_query, character_name),
-            self._call_entity_extractor(user_query)
-        )
-        
-        print(f"🔧 DEBUG: Tool selector returned {len(tool_selector_output.tools_needed)} tools")
-        print(f"🔧 DEBUG: Entity extractor returned {len(entity_extractor_output.entities)} entities")
-        
-        # Step 2: Derive selected tools from tool selector output
-        selected_tools = [t["tool"] for t in tool_selector_output.tools_needed]
-        print(f"🔧 DEBUG: Step 2 - Selected tools: {selected_tools}")
-        
-        # Step 3: Resolve entities ONLY in selected tools
-        print(f"🔧 DEBUG: Step 3 - Resolving entities in selected tools...")
-        entity_results = {}
-        if entity_extractor_output.entities:
-            entity_results = self.entity_search_engine.resolve_entities(
-                entities=entity_extractor_output.entities,
-                selected_tools=selected_tools,
-                character=self.character,
-                session_notes_storage=self.campaign_session_notes,
-                rulebook_storage=self.rulebook_storage
+        with tracer.span("query", character=character_name, streaming=False), count_query(), \
+                track_usage() as query_usage:
+            debug_log(f"🔧 DEBUG: Processing query: '{user_query}'")
+            history = self.get_conversation_history()
+            
+            # Step 1: Make 2 parallel LLM calls
+            debug_log("🔧 DEBUG: Step 1 - Making parallel LLM calls (tool selector + entity extractor)")
+            tool_selector_output, entity_extractor_output = await asyncio.gather(
+                self._call_tool_selector(user_query, character_name, history),
+                self._call_entity_extractor(user_query, history)
             )
-            print(f"🔧 DEBUG: Entity resolution found {len(entity_results)} entities")
-            print(f"🔧 DEBUG: Entity results detail: {entity_results}")
-            
-            # Step 3.5: Fallback search for entities not found in selected tools
-            empty_entities = [name for name, results in entity_results.items() if not results]
-            if empty_entities:
-                print(f"🔧 DEBUG: Step 3.5 - Fallback search for entities not found: {empty_entities}")
-                all_tools = ['character_data', 'session_notes', 'rulebook']
-                unselected_tools = [t for t in all_tools if t not in selected_tools]
-                
-                if unselected_tools:
-                    fallback_results = self.entity_search_engine.resolve_entities(
-                        entities=[e for e in entity_extractor_output.entities if e.get('name') in empty_entities],
-                        selected_tools=unselected_tools,
-                        character=self.character,
-                        session_notes_storage=self.campaign_session_notes,
-                        rulebook_storage=self.rulebook_storage
-                    )
-                    
-                    # Merge fallback results
-                    for entity_name, results in fallback_results.items():
-                        if results:
-                            entity_results[entity_name] = results
-                            print(f"🔧 DEBUG: Found '{entity_name}' in fallback tools: {[r.found_in_sections for r in results]}")
-        else:
-            print("🔧 DEBUG: No entities to resolve")
-        
-        # Step 4: Distribute entities to RAG tools based on where they were found
-        print(f"🔧 DEBUG: Step 4 - Distributing entities to RAG tools...")
-        entity_distribution = self._distribute_entities_to_rag_queries(
-            entity_results, 
-            tool_selector_output.tools_needed
-        )
-        print(f"🔧 DEBUG: Entity distribution: {entity_distribution}")
-        print(f"🔧 DEBUG: Tools needed: {tool_selector_output.tools_needed}")
-        
-        # Step 4.5: Add fallback tools if entities were found there but tool wasn't selected
-        tools_with_entities = set(entity_distribution.keys())
-        selected_tool_names = {t["tool"] for t in tool_selector_output.tools_needed}
-        new_tools_needed = tools_with_entities - selected_tool_names
-        
-        if new_tools_needed:
-            print(f"🔧 DEBUG: Step 4.5 - Adding fallback tools with entities: {new_tools_needed}")
-            for tool in new_tools_needed:
-                # Add tool with a generic intention based on tool type
-                intention_map = {
-                    "character_data": "inventory_info",
-                    "session_notes": "general_history", 
-                    "rulebook": "general_info"
-                }
-                tool_selector_output.tools_needed.append({
-                    "tool": tool,
-                    "intention": intention_map.get(tool, "general_info"),
-                    "confidence": 0.75
-                })
-            print(f"🔧 DEBUG: Updated tools needed: {tool_selector_output.tools_needed}")
-        
-        # Step 5: Execute RAG queries for selected tools
-        print(f"🔧 DEBUG: Step 5 - Executing RAG queries...")
-        raw_results = await self._execute_rag_queries(
-            tool_selector_output.tools_needed,
-            entity_distribution,
-            entity_results,
-            user_query
-        )
-        
-        # Step 6: Generate final response
-        print(f"🔧 DEBUG: Step 6 - Generating final response...")
-        final_response = await self.generate_final_response(raw_results, user_query)
-        
-        return final_response
+            
+            debug_log(f"🔧 DEBUG: Tool selector returned {len(tool_selector_output.tools_needed)} tools")
+            debug_log(f"🔧 DEBUG: Entity extractor returned {len(entity_extractor_output.entities)} entities")
+            
+            # Steps 2-4: Resolve entities in selected tools and distribute them to RAG tools
+            entity_results, entity_distribution = self._resolve_and_distribute_entities(
+                tool_selector_output, entity_extractor_output
+            )
+            
+            # Step 5: Execute RAG queries for selected tools
+            debug_log(f"🔧 DEBUG: Step 5 - Executing RAG queries...")
+            raw_results = await self._execute_rag_queries(
+                tool_selector_output.tools_needed,
+                entity_distribution,
+                entity_results,
+                user_query
+            )
+            
+            # Step 6: Generate final response
+            debug_log(f"🔧 DEBUG: Step 6 - Generating final response...")
+            final_response = await self.generate_final_response(raw_results, user_query)
+            
+            self.session_usage.merge(query_usage.summary())
+            return final_response
     
     async def process_query_stream(self, user_query: str, character_name: str, metadata_callback=None):
         """
         Main processing pipeline with streaming final response.
         Performs all routing and RAG queries, then streams the final response.
+        Closing the stream (or cancelling the task iterating it) stops the pending LLM
+        calls and RAG queries and closes the provider's response stream.
         
         Args:
             user_query: User's question
@@ -222,157 +211,121 @@ class CentralEngine:
         Yields:
             str: Chunks of the final response as they are generated
         """
-        print(f"🔧 DEBUG: Processing query (streaming): '{user_query}'")
-        
-        # Track timing for performance metrics
-        start_time = time.time()
-        timing = {}
-        
-        # Add user query to conversation history
-        self.add_conversation_turn("user", user_query)
-        
-        # Step 1: Make 2 parallel LLM calls
-        print("🔧 DEBUG: Step 1 - Making parallel LLM calls (tool selector + entity extractor)")
-        step1_start = time.time()
-        tool_selector_output, entity_extractor_output = await asyncio.gather(
-            self._call_tool_selector(user_query, character_name),
-            self._call_entity_extractor(user_query)
-        )
-        timing['routing_and_entities'] = (time.time() - step1_start) * 1000  # Convert to ms
-        
-        print(f"🔧 DEBUG: Tool selector returned {len(tool_selector_output.tools_needed)} tools")
-        print(f"🔧 DEBUG: Entity extractor returned {len(entity_extractor_output.entities)} entities")
-        
-        # Emit routing metadata
-        if metadata_callback:
-            await metadata_callback('routing_metadata', {
-                'tools_needed': tool_selector_output.tools_needed
-            })
-        
-        # Step 2: Derive selected tools from tool selector output
-        selected_tools = [t["tool"] for t in tool_selector_output.tools_needed]
-        print(f"🔧 DEBUG: Step 2 - Selected tools: {selected_tools}")
-        
-        # Step 3: Resolve entities ONLY in selected tools
-        print(f"🔧 DEBUG: Step 3 - Resolving entities in selected tools...")
-        step3_start = time.time()
-        entity_results = {}
-        if entity_extractor_output.entities:
-            entity_results = self.entity_search_engine.resolve_entities(
-                entities=entity_extractor_output.entities,
-                selected_tools=selected_tools,
-                character=self.character,
-                session_notes_storage=self.campaign_session_notes,
-                rulebook_storage=self.rulebook_storage
+        # The pipeline's request id, span and usage tracker live in a private context, so
+        # they are not active in the consumer's context while it handles the chunks
+        async with aclosing(iterate_isolated(
+            self._process_query_stream(user_query, character_name, metadata_callback)
+        )) as stream:
+            async for chunk in stream:
+                yield chunk
+    
+    async def _process_query_stream(self, user_query: str, character_name: str, metadata_callback=None):
+        """process_query_stream's pipeline; run through iterate_isolated."""
+        # Reuse the caller's request id (e.g. set by the websocket) or start a new one
+        with request_context(get_request_id()) as request_id, \
+                tracer.span("query", character=character_name, streaming=True) as query_span, \
+                count_query(), track_usage() as query_usage, \
+                self._conversation_turn(user_query) as (history, answer):
+            debug_log(f"🔧 DEBUG: Processing query (streaming): '{user_query}'")
+            
+            # Track timing for performance metrics
+            start_time = time.time()
+            timing = {}
+            
+            # Step 1: Make 2 parallel LLM calls
+            debug_log("🔧 DEBUG: Step 1 - Making parallel LLM calls (tool selector + entity extractor)")
+            step1_start = time.time()
+            tool_selector_output, entity_extractor_output = await asyncio.gather(
+                self._call_tool_selector(user_query, character_name, history),
+                self._call_entity_extractor(user_query, history)
             )
-            print(f"🔧 DEBUG: Entity resolution found {len(entity_results)} entities")
-            print(f"🔧 DEBUG: Entity results detail: {entity_results}")
-            
-            # Step 3.5: Fallback search for entities not found in selected tools
-            empty_entities = [name for name, results in entity_results.items() if not results]
-            if empty_entities:
-                print(f"🔧 DEBUG: Step 3.5 - Fallback search for entities not found: {empty_entities}")
-                all_tools = ['character_data', 'session_notes', 'rulebook']
-                unselected_tools = [t for t in all_tools if t not in selected_tools]
-                
-                if unselected_tools:
-                    fallback_results = self.entity_search_engine.resolve_entities(
-                        entities=[e for e in entity_extractor_output.entities if e.get('name') in empty_entities],
-                        selected_tools=unselected_tools,
-                        character=self.character,
-                        session_notes_storage=self.campaign_session_notes,
-                        rulebook_storage=self.rulebook_storage
-                    )
-                    
-                    # Merge fallback results
-                    for entity_name, results in fallback_results.items():
-                        if results:
-                            entity_results[entity_name] = results
-                            print(f"🔧 DEBUG: Found '{entity_name}' in fallback tools: {[r.found_in_sections for r in results]}")
-        else:
-            print("🔧 DEBUG: No entities to resolve")
-        
-        # Step 4: Distribute entities to RAG tools based on where they were found
-        print(f"🔧 DEBUG: Step 4 - Distributing entities to RAG tools...")
-        entity_distribution = self._distribute_entities_to_rag_queries(
-            entity_results, 
-            tool_selector_output.tools_needed
-        )
-        print(f"🔧 DEBUG: Entity distribution: {entity_distribution}")
-        print(f"🔧 DEBUG: Tools needed: {tool_selector_output.tools_needed}")
-        
-        # Step 4.5: Add fallback tools if entities were found there but tool wasn't selected
-        tools_with_entities = set(entity_distribution.keys())
-        selected_tool_names = {t["tool"] for t in tool_selector_output.tools_needed}
-        new_tools_needed = tools_with_entities - selected_tool_names
-        
-        if new_tools_needed:
-            print(f"🔧 DEBUG: Step 4.5 - Adding fallback tools with entities: {new_tools_needed}")
-            for tool in new_tools_needed:
-                # Add tool with a generic intention based on tool type
-                intention_map = {
-                    "character_data": "inventory_info",
-                    "session_notes": "general_history", 
-                    "rulebook": "general_info"
-                }
-                tool_selector_output.tools_needed.append({
-                    "tool": tool,
-                    "intention": intention_map.get(tool, "general_info"),
-                    "confidence": 0.75
+            timing['routing_and_entities'] = (time.time() - step1_start) * 1000  # Convert to ms
+            
+            debug_log(f"🔧 DEBUG: Tool selector returned {len(tool_selector_output.tools_needed)} tools")
+            debug_log(f"🔧 DEBUG: Entity extractor returned {len(entity_extractor_output.entities)} entities")
+            
+            # Emit routing metadata
+            if metadata_callback:
+                await metadata_callback('routing_metadata', {
+                    'tools_needed': tool_selector_output.tools_needed
                 })
-            print(f"🔧 DEBUG: Updated tools needed: {tool_selector_output.tools_needed}")
-        
-        timing['entity_resolution'] = (time.time() - step3_start) * 1000
-        
-        # Emit entities metadata
-        if metadata_callback:
-            await metadata_callback('entities_metadata', {
-                'entities': [
-                    {
-                        'name': name,
-                        'found_in_sections': [r.found_in_sections for r in results],
-                        'match_confidence': [r.match_confidence for r in results],
-                        'match_strategy': [r.match_strategy for r in results]
-                    }
-                    for name, results in entity_results.items()
-                ]
+            
+            # Steps 2-4: Resolve entities in selected tools and distribute them to RAG tools
+            step3_start = time.time()
+            entity_results, entity_distribution = self._resolve_and_distribute_entities(
+                tool_selector_output, entity_extractor_output
+            )
+            timing['entity_resolution'] = (time.time() - step3_start) * 1000
+            
+            # Emit entities metadata
+            if metadata_callback:
+                await metadata_callback('entities_metadata', {
+                    'entities': [
+                        {
+                            'name': name,
+                            'found_in_sections': [r.found_in_sections for r in results],
+                            'match_confidence': [r.match_confidence for r in results],
+                            'match_strategy': [r.match_strategy for r in results]
+                        }
+                        for name, results in entity_results.items()
+                    ]
+                })
+            
+            # Step 5: Execute RAG queries for selected tools
+            debug_log(f"🔧 DEBUG: Step 5 - Executing RAG queries...")
+            step5_start = time.time()
+            rag_metrics: Dict[str, Any] = {}
+            raw_results = await self._execute_rag_queries(
+                tool_selector_output.tools_needed,
+                entity_distribution,
+                entity_results,
+                user_query,
+                rag_metrics=rag_metrics
+            )
+            timing['rag_queries'] = (time.time() - step5_start) * 1000
+            
+            # Emit context sources metadata
+            if metadata_callback:
+                context_sources = self._extract_context_sources(raw_results)
+                await metadata_callback('context_sources', context_sources)
+            
+            # Step 6: Stream final response
+            debug_log(f"🔧 DEBUG: Step 6 - Streaming final response...")
+            step6_start = time.time()
+            
+            # Capture the full response as we stream it
+            full_response = ""
+            async with aclosing(self.generate_final_response_stream(raw_results, user_query, history)) as response_stream:
+                async for chunk in response_stream:
+                    full_response += chunk
+                    yield chunk
+            
+            timing['response_generation'] = (time.time() - step6_start) * 1000
+            timing['total'] = (time.time() - start_time) * 1000
+            query_span.set_attributes({f"timing.{stage}_ms": value for stage, value in timing.items()})
+            record_query(timing, rag_metrics)
+            
+            # Roll up LLM usage for this query into the session totals
+            usage = query_usage.summary()
+            self.session_usage.merge(usage)
+            query_span.set_attributes({
+                'llm.input_tokens': usage.input_tokens,
+                'llm.output_tokens': usage.output_tokens,
+                'llm.cost_usd': usage.cost_usd
             })
-        
-        # Step 5: Execute RAG queries for selected tools
-        print(f"🔧 DEBUG: Step 5 - Executing RAG queries...")
-        step5_start = time.time()
-        raw_results = await self._execute_rag_queries(
-            tool_selector_output.tools_needed,
-            entity_distribution,
-            entity_results,
-            user_query
-        )
-        timing['rag_queries'] = (time.time() - step5_start) * 1000
-        
-        # Emit context sources metadata
-        if metadata_callback:
-            context_sources = self._extract_context_sources(raw_results)
-            await metadata_callback('context_sources', context_sources)
-        
-        # Step 6: Stream final response
-        print(f"🔧 DEBUG: Step 6 - Streaming final response...")
-        step6_start = time.time()
-        
-        # Capture the full response as we stream it
-        full_response = ""
-        async for chunk in self.generate_final_response_stream(raw_results, user_query):
-            full_response += chunk
-            yield chunk
-        
-        timing['response_generation'] = (time.time() - step6_start) * 1000
-        timing['total'] = (time.time() - start_time) * 1000
-        
-        # Emit performance metrics
-        if metadata_callback:
-            await metadata_callback('performance_metrics', {'timing': timing})
-        
-        # Add assistant response to conversation history
-        self.add_conversation_turn("assistant", full_response)
+            
+            # Emit performance metrics
+            if metadata_callback:
+                await metadata_callback('performance_metrics', {
+                    'request_id': request_id,
+                    'timing': timing,
+                    'rag_metrics': rag_metrics,
+                    'usage': usage.to_dict(),
+                    'session_usage': self.session_usage.to_dict()
+                })
+            
+            # Add this question and answer to conversation history
+            answer.append(full_response)
     
     async def generate_final_response(self, raw_results: Dict[str, Any], user_query: str) -> str:
         """
@@ -396,21 +349,21 @@ class CentralEngine:
                     return "Error: No suitable LLM client available for final response generation"
             
             # Select appropriate model based on provider
-            if provider == "openai":
-                model = self.config.openai_final_model
-            elif provider == "anthropic":
-                model = self.config.anthropic_final_model
+            if provider in ("openai", "anthropic", "local"):
+                model = self.config.get_final_model(provider)
             else:
                 model = None  # Use client default
             
             # Get LLM parameters from config
             llm_params = self.config.get_final_llm_params(model)
             
-            response = await final_client.generate_response(
-                final_prompt,
-                model=model,
-                **llm_params
-            )
+            with tracer.span("response_generation", provider=provider, model=model or "default",
+                             prompt_chars=len(final_prompt)), usage_stage("response_generation"):
+                response = await final_client.generate_response(
+                    final_prompt,
+                    model=model,
+                    **llm_params
+                )
             
             if response.success:
                 return response.content
@@ -419,10 +372,12 @@ class CentralEngine:
         except Exception as e:
             return f"Error generating final response: {str(e)}"
     
-    async def generate_final_response_stream(self, raw_results: Dict[str, Any], user_query: str):
+    async def generate_final_response_stream(self, raw_results: Dict[str, Any], user_query: str,
+                                             history: Optional[List[Dict[str, str]]] = None):
         """
         Get final response prompt from Prompt Manager and stream the LLM response.
-        Yields response chunks as they arrive.
+        Yields response chunks as they arrive. `history` holds the turns before this query
+        (default: the current conversation history).
         
         Yields:
             str: Chunks of the response as they are generated
@@ -444,10 +399,8 @@ class CentralEngine:
                     return
             
             # Select appropriate model based on provider
-            if provider == "openai":
-                model = self.config.openai_final_model
-            elif provider == "anthropic":
-                model = self.config.anthropic_final_model
+            if provider in ("openai", "anthropic", "local"):
+                model = self.config.get_final_model(provider)
             else:
                 model = None  # Use client default
             
@@ -455,13 +408,22 @@ class CentralEngine:
             llm_params = self.config.get_final_llm_params(model)
             
             # Stream the response with conversation history
-            async for chunk in final_client.generate_response_stream(
-                final_prompt,
-                model=model,
-                conversation_history=self.conversation_history[:-1],  # Exclude current user query (already in prompt)
-                **llm_params
-            ):
-                yield chunk
+            with tracer.span("response_generation", provider=provider, model=model or "default",
+                             prompt_chars=len(final_prompt), streaming=True) as span, \
+                    usage_stage("response_generation"):
+                chunks = 0
+                async with aclosing(final_client.generate_response_stream(
+                    final_prompt,
+                    model=model,
+                    conversation_history=self.get_conversation_history() if history is None else history,
+                    **llm_params
+                )) as response_stream:
+                    async for chunk in response_stream:
+                        if chunks == 0:
+                            span.add_event("first_chunk")
+                        chunks += 1
+                        yield chunk
+                span.set_attribute("chunks", chunks)
                 
         except Exception as e:
             yield f"\n[Error generating final response: {str(e)}]"
@@ -469,13 +431,16 @@ class CentralEngine:
     
     # ===== HELPER METHODS =====
     
-    async def _call_tool_selector(self, user_query: str, character_name: str) -> ToolSelectorOutput:
+    async def _call_tool_selector(self, user_query: str, character_name: str,
+                                  history: Optional[List[Dict[str, str]]] = None) -> ToolSelectorOutput:
         """
         Make LLM call for Tool & Intention Selector.
         Determines which RAG tools are needed and what intention to use for each.
+        `history` holds the turns before this query (default: the current conversation history).
         """
         try:
-            history = self.conversation_history[:-1] if len(self.conversation_history) > 0 else []
+            if history is None:
+                history = self.get_conversation_history()
             
             prompt = self.prompt_manager.get_tool_and_intention_selector_prompt(
                 user_query, 
@@ -490,40 +455,46 @@ class CentralEngine:
             if not client:
                 raise RuntimeError("No suitable LLM client available for tool selector")
             
-            model = self.config.openai_router_model if provider == "openai" else self.config.anthropic_router_model if provider == "anthropic" else None
+            model = self.config.get_router_model(provider) if provider in ("openai", "anthropic", "local") else None
             llm_params = self.config.get_router_llm_params(model)
             
-            response = await client.generate_json_response(prompt, model=model, **llm_params)
+            with tracer.span("tool_selector", provider=provider, model=model or "default", prompt_chars=len(prompt)), \
+                    usage_stage("tool_selector"):
+                response = await client.generate_json_response(prompt, model=model, **llm_params)
             
             # Debug: Print raw response
-            print(f"🔍 RAW TOOL SELECTOR RESPONSE:")
-            print(f"   Type: {type(response)}")
-            if hasattr(response, 'content'):
-                print(f"   Content: {response.content}")
-            elif isinstance(response, dict):
-                print(f"   Dict: {response}")
-            else:
-                print(f"   Value: {response}")
+            if tracer.debug_logging:
+                debug_log(f"🔍 RAW TOOL SELECTOR RESPONSE:")
+                debug_log(f"   Type: {type(response)}")
+                if hasattr(response, 'content'):
+                    debug_log(f"   Content: {response.content}")
+                elif isinstance(response, dict):
+                    debug_log(f"   Dict: {response}")
+                else:
+                    debug_log(f"   Value: {response}")
             
             repair_result = JSONRepair.repair_tool_selector_response(response)
             
             if repair_result.was_repaired:
-                print(f"🔧 JSON REPAIR: Tool selector response was repaired")
+                debug_log(f"🔧 JSON REPAIR: Tool selector response was repaired")
                 for detail in repair_result.repair_details:
-                    print(f"   • {detail}")
+                    debug_log(f"   • {detail}")
             
             return ToolSelectorOutput(tools_needed=repair_result.data.get("tools_needed", []))
             
         except Exception as e:
             raise RuntimeError(f"Tool selector LLM call failed: {str(e)}") from e
     
-    async def _call_entity_extractor(self, user_query: str) -> EntityExtractorOutput:
+    async def _call_entity_extractor(self, user_query: str,
+                                     history: Optional[List[Dict[str, str]]] = None) -> EntityExtractorOutput:
         """
         Make LLM call for Entity Extractor.
         Extracts entity names from the user query without guessing search contexts.
+        `history` holds the turns before this query (default: the current conversation history).
         """
         try:
-            history = self.conversation_history[:-1] if len(self.conversation_history) > 0 else []
+            if history is None:
+                history = self.get_conversation_history()
             
             prompt = self.prompt_manager.get_entity_extraction_prompt(user_query, conversation_history=history)
             
@@ -533,33 +504,126 @@ class CentralEngine:
             if not client:
                 raise RuntimeError("No suitable LLM client available for entity extractor")
             
-            model = self.config.openai_router_model if provider == "openai" else self.config.anthropic_router_model if provider == "anthropic" else None
+            model = self.config.get_router_model(provider) if provider in ("openai", "anthropic", "local") else None
             llm_params = self.config.get_router_llm_params(model)
             
-            response = await client.generate_json_response(prompt, model=model, **llm_params)
+            with tracer.span("entity_extractor", provider=provider, model=model or "default", prompt_chars=len(prompt)), \
+                    usage_stage("entity_extractor"):
+                response = await client.generate_json_response(prompt, model=model, **llm_params)
             
             # Debug: Print raw response
-            print(f"🔍 RAW ENTITY EXTRACTOR RESPONSE:")
-            print(f"   Type: {type(response)}")
-            if hasattr(response, 'content'):
-                print(f"   Content: {response.content}")
-            elif isinstance(response, dict):
-                print(f"   Dict: {response}")
-            else:
-                print(f"   Value: {response}")
+            if tracer.debug_logging:
+                debug_log(f"🔍 RAW ENTITY EXTRACTOR RESPONSE:")
+                debug_log(f"   Type: {type(response)}")
+                if hasattr(response, 'content'):
+                    debug_log(f"   Content: {response.content}")
+                elif isinstance(response, dict):
+                    debug_log(f"   Dict: {response}")
+                else:
+                    debug_log(f"   Value: {response}")
             
             repair_result = JSONRepair.repair_entity_extractor_response(response)
             
             if repair_result.was_repaired:
-                print(f"🔧 JSON REPAIR: Entity extractor response was repaired")
+                debug_log(f"🔧 JSON REPAIR: Entity extractor response was repaired")
                 for detail in repair_result.repair_details:
-                    print(f"   • {detail}")
+                    debug_log(f"   • {detail}")
             
             return EntityExtractorOutput(entities=repair_result.data.get("entities", []))
             
         except Exception as e:
             raise RuntimeError(f"Entity extractor LLM call failed: {str(e)}") from e
     
+    def _resolve_and_distribute_entities(
+        self,
+        tool_selector_output: ToolSelectorOutput,
+        entity_extractor_output: EntityExtractorOutput
+    ) -> Tuple[Dict[str, List[Any]], Dict[str, List[str]]]:
+        """
+        Resolve extracted entities in the selected tools (with fallback to the other tools),
+        distribute them to RAG queries, and add tools where entities were found but not selected.
+        
+        Returns:
+            (entity_results, entity_distribution). tool_selector_output.tools_needed is updated in place.
+        """
+        with tracer.span("entity_resolution", entities=len(entity_extractor_output.entities)) as span:
+            # Step 2: Derive selected tools from tool selector output
+            selected_tools = [t["tool"] for t in tool_selector_output.tools_needed]
+            debug_log(f"🔧 DEBUG: Step 2 - Selected tools: {selected_tools}")
+            
+            # Step 3: Resolve entities ONLY in selected tools
+            debug_log(f"🔧 DEBUG: Step 3 - Resolving entities in selected tools...")
+            entity_results = {}
+            if entity_extractor_output.entities:
+                entity_results = self.entity_search_engine.resolve_entities(
+                    entities=entity_extractor_output.entities,
+                    selected_tools=selected_tools,
+                    character=self.character,
+                    session_notes_storage=self.campaign_session_notes,
+                    rulebook_storage=self.rulebook_storage
+                )
+                debug_log(f"🔧 DEBUG: Entity resolution found {len(entity_results)} entities")
+                if tracer.debug_logging:
+                    debug_log(f"🔧 DEBUG: Entity results detail: {entity_results}")
+                
+                # Step 3.5: Fallback search for entities not found in selected tools
+                empty_entities = [name for name, results in entity_results.items() if not results]
+                if empty_entities:
+                    debug_log(f"🔧 DEBUG: Step 3.5 - Fallback search for entities not found: {empty_entities}")
+                    all_tools = ['character_data', 'session_notes', 'rulebook']
+                    unselected_tools = [t for t in all_tools if t not in selected_tools]
+                    
+                    if unselected_tools:
+                        fallback_results = self.entity_search_engine.resolve_entities(
+                            entities=[e for e in entity_extractor_output.entities if e.get('name') in empty_entities],
+                            selected_tools=unselected_tools,
+                            character=self.character,
+                            session_notes_storage=self.campaign_session_notes,
+                            rulebook_storage=self.rulebook_storage
+                        )
+                        
+                        # Merge fallback results
+                        for entity_name, results in fallback_results.items():
+                            if results:
+                                entity_results[entity_name] = results
+                                debug_log(f"🔧 DEBUG: Found '{entity_name}' in fallback tools: {[r.found_in_sections for r in results]}")
+            else:
+                debug_log("🔧 DEBUG: No entities to resolve")
+            
+            # Step 4: Distribute entities to RAG tools based on where they were found
+            debug_log(f"🔧 DEBUG: Step 4 - Distributing entities to RAG tools...")
+            entity_distribution = self._distribute_entities_to_rag_queries(
+                entity_results, 
+                tool_selector_output.tools_needed
+            )
+            debug_log(f"🔧 DEBUG: Entity distribution: {entity_distribution}")
+            debug_log(f"🔧 DEBUG: Tools needed: {tool_selector_output.tools_needed}")
+            
+            # Step 4.5: Add fallback tools if entities were found there but tool wasn't selected
+            tools_with_entities = set(entity_distribution.keys())
+            selected_tool_names = {t["tool"] for t in tool_selector_output.tools_needed}
+            new_tools_needed = tools_with_entities - selected_tool_names
+            
+            if new_tools_needed:
+                debug_log(f"🔧 DEBUG: Step 4.5 - Adding fallback tools with entities: {new_tools_needed}")
+                for tool in new_tools_needed:
+                    # Add tool with a generic intention based on tool type
+                    intention_map = {
+                        "character_data": "inventory_info",
+                        "session_notes": "general_history", 
+                        "rulebook": "general_info"
+                    }
+                    tool_selector_output.tools_needed.append({
+                        "tool": tool,
+                        "intention": intention_map.get(tool, "general_info"),
+                        "confidence": 0.75
+                    })
+                debug_log(f"🔧 DEBUG: Updated tools needed: {tool_selector_output.tools_needed}")
+            
+            span.set_attribute("entities_resolved", sum(1 for results in entity_results.values() if results))
+            span.set_attribute("tools", [t["tool"] for t in tool_selector_output.tools_needed])
+            return entity_results, entity_distribution
+    
     def _section_to_tool(self, section_name: str) -> str:
         """
         Map a section name to its parent tool.
@@ -651,60 +715,115 @@ class CentralEngine:
         tools_needed: List[Dict[str, Any]],
         entity_distribution: Dict[str, List[str]],
         entity_results: Dict[str, List[Any]],
-        user_query: str
+        user_query: str,
+        rag_metrics: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Execute RAG queries for selected tools with distributed entities.
         Includes auto-include sections derived from entity resolution results.
+        
+        If rag_metrics is provided, each router's performance metrics are stored in it
+        (keyed by tool name) as dictionaries.
+        
+        Rulebook queries (embedding API calls) run in a worker thread while the in-memory
+        character and session notes queries run; if the query is cancelled, the rulebook
+        query is no longer waited for and its thread is told to stop at its next step.
         """
         results = {}
-        
-        for tool_info in tools_needed:
-            tool = tool_info["tool"]
-            intention = tool_info["intention"]
-            entities = entity_distribution.get(tool, [])
-            
-            # Extract auto-include sections from entity resolution
-            auto_include_sections = self._extract_auto_include_sections(
-                entities, entity_results, tool
-            )
-            
-            print(f"🔧 DEBUG: Executing {tool} with intention='{intention}', entities={entities}")
-            if auto_include_sections:
-                print(f"🔧 DEBUG: Auto-include sections: {auto_include_sections}")
-            
-            if tool == "character_data" and self.character_router:
-                results["character"] = self.character_router.query_character(
-                    user_intentions=[intention],
-                    entities=[{"name": e, "confidence": 1.0} for e in entities],
-                    auto_include_sections=auto_include_sections
-                )
-                
-            elif tool == "session_notes" and self.session_notes_router:
-                results["session_notes"] = self.session_notes_router.query(
-                    character_name=self.character.character_base.name if self.character else "",
-                    original_query=user_query,
-                    intention=intention,
-                    entities=[{"name": e} for e in entities],
-                    context_hints=[],
-                    top_k=5
-                )
-                
-            elif tool == "rulebook" and self.rulebook_router:
-                try:
-                    intention_enum = RulebookQueryIntent(intention.lower())
-                    results["rulebook"], _ = self.rulebook_router.query(
-                        intention=intention_enum,
-                        user_query=user_query,
-                        entities=entities,
-                        context_hints=[],
-                        k=5
+        if rag_metrics is None:
+            rag_metrics = {}
+        rulebook_task: Optional[asyncio.Task] = None
+        rulebook_cancel: Optional[threading.Event] = None
+        
+        with tracer.span("rag_queries", tools=[t["tool"] for t in tools_needed]) as span:
+            try:
+                for tool_info in tools_needed:
+                    tool = tool_info["tool"]
+                    intention = tool_info["intention"]
+                    entities = entity_distribution.get(tool, [])
+                    
+                    # Extract auto-include sections from entity resolution
+                    auto_include_sections = self._extract_auto_include_sections(
+                        entities, entity_results, tool
                     )
-                except ValueError:
-                    print(f"🔧 WARNING: Invalid rulebook intention '{intention}', skipping")
+                    
+                    debug_log(f"🔧 DEBUG: Executing {tool} with intention='{intention}', entities={entities}")
+                    if auto_include_sections:
+                        debug_log(f"🔧 DEBUG: Auto-include sections: {auto_include_sections}")
+                    
+                    if tool == "character_data" and self.character_router:
+                        results["character"] = self.character_router.query_character(
+                            user_intentions=[intention],
+                            entities=[
+                                {
+                                    "name": e,
+                                    "confidence": 1.0,
+                                    # Exact names found during resolution, used to project matched entries
+                                    "matched_names": [r.matched_text for r in entity_results.get(e, []) if r.matched_text]
+                                }
+                                for e in entities
+                            ],
+                            auto_include_sections=auto_include_sections
+                        )
+                        if results["character"].performance_metrics:
+                            rag_metrics[tool] = results["character"].performance_metrics.to_dict()
+                    
+                    elif tool == "session_notes" and self.session_notes_router:
+                        results["session_notes"] = self.session_notes_router.query(
+                            character_name=self.character.character_base.name if self.character else "",
+                            original_query=user_query,
+                            intention=intention,
+                            entities=[{"name": e} for e in entities],
+                            context_hints=[],
+                            top_k=5
+                        )
+                        if results["session_notes"].performance_metrics:
+                            rag_metrics[tool] = results["session_notes"].performance_metrics.to_dict()
+                    
+                    elif tool == "rulebook" and self.rulebook_router:
+                        try:
+                            intention_enum = RulebookQueryIntent(intention.lower())
+                        except ValueError:
+                            print(f"🔧 WARNING: Invalid rulebook intention '{intention}', skipping")
+                            continue
+                        if rulebook_task is not None:
+                            # Same tool selected twice: the later query wins, as when run in order
+                            rulebook_cancel.set()
+                            rulebook_task.cancel()
+                        rulebook_cancel = threading.Event()
+                        rulebook_task = asyncio.create_task(asyncio.to_thread(
+                            self._query_rulebook, intention_enum, user_query, entities, rulebook_cancel
+                        ))
+                
+                if rulebook_task is not None:
+                    results["rulebook"], rulebook_performance = await rulebook_task
+                    rag_metrics["rulebook"] = rulebook_performance.to_dict()
+            finally:
+                if rulebook_task is not None:
+                    # Cancelling the task only stops waiting for the thread, which may still be
+                    # running even if the task is done (cancelled); a finished thread ignores this
+                    rulebook_cancel.set()
+                    if not rulebook_task.done():
+                        rulebook_task.cancel()
+        
+            for tool, metrics in rag_metrics.items():
+                span.set_attribute(f"{tool}.total_time_ms", metrics.get('total_time_ms', 0.0))
         
         return results
     
+    def _query_rulebook(self, intention: RulebookQueryIntent, user_query: str, entities: List[str],
+                        cancel_event: Optional[threading.Event] = None):
+        """Rulebook query for a worker thread (one at a time per engine); stops early once cancel_event is set."""
+        with self._rulebook_lock:
+            return self.rulebook_router.query(
+                intention=intention,
+                user_query=user_query,
+                entities=entities,
+                context_hints=[],
+                k=5,
+                cancel_event=cancel_event
+            )
+    
     def _extract_auto_include_sections(
         self,
         entity_names: List[str],
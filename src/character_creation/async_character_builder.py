@@ -20,12 +20,17 @@ Usage:
 """
 
 import asyncio
+import hashlib
+import json
 import time
-from typing import Dict, Any, Optional, Callable, Awaitable
+from typing import Dict, Any, Iterable, List, Optional, Callable, Awaitable, Tuple
 from datetime import datetime
 from dataclasses import asdict
 
+from src.llm.usage import UsageSummary, track_usage, usage_stage
+from src.llm.parse_cache import track_parse_cache
 from src.rag.character.character_types import Character, ActionEconomy, ObjectivesAndContracts
+from src.character_creation.parsing.dndbeyond_index import DndBeyondIndex
 from src.character_creation.parsing.parse_core_character import DNDBeyondCoreParser
 from src.character_creation.parsing.parse_background_personality import DNDBeyondBackgroundParser
 from src.character_creation.parsing.parse_features_traits import DNDBeyondFeaturesParser
@@ -37,6 +42,9 @@ from src.character_creation.parsing.parse_spelllist import DNDBeyondSpellParser
 # Type alias for progress callback
 ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
 
+# Type alias for section callback: (parser name, Character section name -> value)
+SectionCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
 
 class AsyncCharacterBuilder:
     """
@@ -46,6 +54,46 @@ class AsyncCharacterBuilder:
     real-time progress updates through callback functions.
     """
     
+    # Parser name -> (parser class, parse method)
+    PARSERS = {
+        'core': (DNDBeyondCoreParser, 'parse_all_core_data'),
+        'inventory': (DNDBeyondInventoryParser, 'parse_inventory'),
+        'spells': (DNDBeyondSpellParser, 'parse_all_spells'),
+        'features': (DNDBeyondFeaturesParser, 'parse_all_features'),
+        'background': (DNDBeyondBackgroundParser, 'parse_all_async'),  # Native async
+        'actions': (DNDBeyondActionsParser, 'parse_all_actions_async'),  # Native async (LLM item spells)
+    }
+    
+    # Character sections each parser produces
+    PARSER_SECTIONS = {
+        'core': ('character_base', 'characteristics', 'ability_scores', 'combat_stats',
+                 'proficiencies', 'damage_modifiers', 'passive_scores', 'senses'),
+        'inventory': ('inventory',),
+        'spells': ('spell_list',),
+        'features': ('features_and_traits',),
+        'background': ('background_info', 'personality', 'backstory', 'organizations', 'allies', 'enemies'),
+        'actions': ('action_economy',),
+    }
+    
+    # Top-level keys of the D&D Beyond "data" object each parser's sections depend on.
+    # Keep in sync with the parsers: a parser is skipped on re-sync when none of these changed.
+    PARSER_INPUTS = {
+        'core': ('age', 'alignmentId', 'background', 'baseHitPoints', 'bonusHitPoints', 'bonusStats',
+                 'classes', 'eyes', 'faith', 'gender', 'hair', 'height', 'inventory', 'lifestyleId',
+                 'modifiers', 'name', 'overrideHitPoints', 'overrideStats', 'race', 'skin', 'stats', 'weight'),
+        'inventory': ('inventory',),
+        'spells': ('background', 'classSpells', 'classes', 'overrideStats', 'spells', 'stats'),
+        'features': ('classes', 'feats', 'modifiers', 'race'),
+        'background': ('background', 'notes', 'traits'),
+        # action_economy.attacks_per_action comes from the features result
+        'actions': ('actions', 'inventory', 'spells', 'classes', 'feats', 'modifiers', 'race'),
+    }
+    
+    # Parsers whose results are needed to assemble another parser's sections
+    PARSER_REQUIRES = {
+        'actions': ('features',),
+    }
+    
     def __init__(self, json_data: Dict[str, Any]):
         """
         Initialize the async character builder.
@@ -55,10 +103,19 @@ class AsyncCharacterBuilder:
         """
         self.json_data = json_data
         self.data = json_data.get("data", {})
+        self._index: Optional[DndBeyondIndex] = None
+    
+    @property
+    def index(self) -> DndBeyondIndex:
+        """Shared index of the export, built on first use and passed to every parser"""
+        if self._index is None:
+            self._index = DndBeyondIndex(self.json_data)
+        return self._index
         
     async def build_async(
         self, 
-        progress_callback: Optional[ProgressCallback] = None
+        progress_callback: Optional[ProgressCallback] = None,
+        section_callback: Optional[SectionCallback] = None
     ) -> Character:
         """
         Build character asynchronously with progress updates.
@@ -69,7 +126,12 @@ class AsyncCharacterBuilder:
         Args:
             progress_callback: Optional async callback for progress events.
                               Receives dict with keys: type, parser, completed, total, 
-                              execution_time_ms (optional), message (optional)
+                              execution_time_ms (optional), message (optional),
+                              llm_cache (parser_complete of LLM-backed parsers: hits,
+                              misses, hit_sections and saved_ms of the parse cache)
+            section_callback: Optional async callback receiving each parser's Character
+                              sections as soon as they can be assembled (after the
+                              parser's parser_complete event; actions waits for features)
         
         Returns:
             Complete Character object
@@ -82,27 +144,95 @@ class AsyncCharacterBuilder:
             - creation_complete: Character creation finished
         """
         total_start = time.time()
-        timing = {}
         
-        # Parser definitions with names
-        parsers = [
-            ('core', DNDBeyondCoreParser, 'parse_all_core_data'),
-            ('inventory', DNDBeyondInventoryParser, 'parse_inventory'),
-            ('spells', DNDBeyondSpellParser, 'parse_all_spells'),
-            ('features', DNDBeyondFeaturesParser, 'parse_all_features'),
-            ('background', DNDBeyondBackgroundParser, 'parse_all_async'),  # Native async
-            ('actions', DNDBeyondActionsParser, 'parse_all_actions'),
-        ]
+        results, timing, llm_usage = await self._run_parsers(
+            list(self.PARSER_SECTIONS), progress_callback, section_callback
+        )
+        total = len(results)
+        
+        # Emit assembly started
+        if progress_callback:
+            await progress_callback({
+                'type': 'assembly_started',
+                'completed': total,
+                'total': total
+            })
+        
+        # Assemble the complete character
+        character = self._assemble_character(results)
+        
+        # Calculate total time
+        total_time = (time.time() - total_start) * 1000
+        
+        # Emit completion with performance metrics
+        if progress_callback:
+            await progress_callback({
+                'type': 'creation_complete',
+                'character_name': character.character_base.name,
+                'total_time_ms': round(total_time, 2),
+                'parser_times': {k: round(v, 2) for k, v in timing.items()},
+                'llm_usage': llm_usage.to_dict()
+            })
+        
+        return character
+    
+    async def build_sections_async(
+        self,
+        parser_names: Iterable[str],
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, float], UsageSummary]:
+        """
+        Run only the given parsers (plus the ones they require) and return the
+        Character sections they produce, for incremental re-syncs.
+        
+        Returns:
+            (section name -> value, parser name -> execution ms, LLM usage)
+        """
+        names = set(parser_names)
+        for name in list(names):
+            names.update(self.PARSER_REQUIRES.get(name, ()))
+        results, timing, llm_usage = await self._run_parsers(
+            [name for name in self.PARSER_SECTIONS if name in names], progress_callback
+        )
+        return self._sections_from_results(results), timing, llm_usage
+    
+    async def _run_parsers(
+        self,
+        parser_names: List[str],
+        progress_callback: Optional[ProgressCallback],
+        section_callback: Optional[SectionCallback] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, float], UsageSummary]:
+        """Run parsers in parallel with progress events; returns (results, timing ms, LLM usage)"""
+        timing = {}
+        parsers = [(name, *self.PARSERS[name]) for name in parser_names]
         
         total = len(parsers)
         completed = 0
         results = {}
+        sections_sent = set()
         
         # Helper to emit progress events
         async def emit_progress(event: Dict[str, Any]):
             if progress_callback:
                 await progress_callback(event)
         
+        # Hand every parser's sections to the section callback once it and the
+        # parsers it requires have finished
+        async def emit_sections():
+            if not section_callback:
+                return
+            ready = [
+                name for name in parser_names
+                if name in results and name not in sections_sent
+                and all(required in results for required in self.PARSER_REQUIRES.get(name, ()))
+            ]
+            sections_sent.update(ready)
+            for name in ready:
+                sections = self._sections_from_results({
+                    required: results[required] for required in (name, *self.PARSER_REQUIRES.get(name, ()))
+                })
+                await section_callback(name, {section: sections[section] for section in self.PARSER_SECTIONS[name]})
+        
         # Create tasks for all parsers
         async def run_parser(parser_name: str, parser_class, method_name: str):
             """Run a single parser with timing and progress tracking."""
@@ -120,19 +250,22 @@ class AsyncCharacterBuilder:
             
             try:
                 # Initialize parser
-                parser = parser_class(self.json_data)
+                parser = parser_class(self.json_data, index=self.index)
                 parse_method = getattr(parser, method_name)
                 
                 # Run parser (use asyncio.to_thread for sync methods)
-                if method_name == 'parse_all_async':
-                    # Background parser is already async
-                    result = await parse_method()
-                else:
-                    # Other parsers are sync, run in thread pool
-                    result = await asyncio.to_thread(parse_method)
+                # LLM calls made by the parser are attributed to it in the usage summary
+                with usage_stage(parser_name), track_parse_cache() as cache_stats:
+                    if asyncio.iscoroutinefunction(parse_method):
+                        # Background and actions parsers are already async
+                        result = await parse_method()
+                    else:
+                        # Other parsers are sync, run in thread pool
+                        result = await asyncio.to_thread(parse_method)
                 
                 parser_time = (time.time() - parser_start) * 1000  # Convert to ms
                 timing[parser_name] = parser_time
+                results[parser_name] = result
                 
                 # Emit completed event
                 completed += 1
@@ -141,11 +274,10 @@ class AsyncCharacterBuilder:
                     'parser': parser_name,
                     'completed': completed,
                     'total': total,
-                    'execution_time_ms': round(parser_time, 2)
+                    'execution_time_ms': round(parser_time, 2),
+                    'llm_cache': cache_stats.to_dict() if cache_stats.hits or cache_stats.misses else None
                 })
                 
-                return parser_name, result
-                
             except Exception as e:
                 # Emit error but let it propagate
                 await emit_progress({
@@ -156,41 +288,71 @@ class AsyncCharacterBuilder:
                     'error': str(e)
                 })
                 raise
+            
+            await emit_sections()
         
-        # Run all parsers in parallel using TaskGroup
-        async with asyncio.TaskGroup() as group:
-            tasks = [
-                group.create_task(run_parser(name, parser_cls, method))
-                for name, parser_cls, method in parsers
-            ]
+        # Run all parsers in parallel using TaskGroup (each stores its result in `results`)
+        with track_usage() as build_usage:
+            async with asyncio.TaskGroup() as group:
+                for name, parser_cls, method in parsers:
+                    group.create_task(run_parser(name, parser_cls, method))
         
-        # Collect results from completed tasks
-        for task in tasks:
-            parser_name, result = task.result()
-            results[parser_name] = result
+        # Keep the parser order regardless of completion order
+        return {name: results[name] for name in parser_names}, timing, build_usage.summary()
+    
+    def _sections_from_results(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Character sections (field name -> value) produced by the given parser results.
         
-        # Emit assembly started
-        await emit_progress({
-            'type': 'assembly_started',
-            'completed': total,
-            'total': total
-        })
+        Args:
+            results: Dictionary mapping parser names to their results (any subset)
+            
+        Returns:
+            Sections of every parser in `results` (see PARSER_SECTIONS)
+        """
+        sections = {}
         
-        # Assemble the complete character
-        character = self._assemble_character(results)
+        if "core" in results:
+            core_data = results["core"]
+            sections.update(
+                character_base=core_data.character_base,
+                characteristics=core_data.characteristics,
+                ability_scores=core_data.ability_scores,
+                combat_stats=core_data.combat_stats,
+                proficiencies=core_data.proficiencies,
+                damage_modifiers=core_data.damage_modifiers,
+                passive_scores=core_data.passive_scores,
+                senses=core_data.senses
+            )
         
-        # Calculate total time
-        total_time = (time.time() - total_start) * 1000
+        if "background" in results:
+            background_data = results["background"]
+            sections.update(
+                background_info=background_data["background_info"],
+                personality=background_data["personality_traits"],
+                backstory=background_data["backstory"],
+                organizations=background_data["organizations"],
+                allies=background_data["allies"],
+                enemies=background_data["enemies"]
+            )
         
-        # Emit completion with performance metrics
-        await emit_progress({
-            'type': 'creation_complete',
-            'character_name': character.character_base.name,
-            'total_time_ms': round(total_time, 2),
-            'parser_times': {k: round(v, 2) for k, v in timing.items()}
-        })
+        if "features" in results:
+            sections["features_and_traits"] = results["features"]
         
-        return character
+        if "inventory" in results:
+            sections["inventory"] = results["inventory"]
+        
+        if "spells" in results:
+            sections["spell_list"] = results["spells"]
+        
+        if "actions" in results:
+            # Create action economy from parsed actions
+            sections["action_economy"] = ActionEconomy(
+                attacks_per_action=self._calculate_attacks_per_action(results["features"]),
+                actions=results["actions"]
+            )
+        
+        return sections
     
     def _assemble_character(self, results: Dict[str, Any]) -> Character:
         """
@@ -202,55 +364,39 @@ class AsyncCharacterBuilder:
         Returns:
             Complete Character object
         """
-        # Extract parsed data
-        core_data = results["core"]
-        background_data = results["background"]
-        features_and_traits = results["features"]
-        inventory = results["inventory"]
-        actions = results["actions"]
-        spell_list = results["spells"]
-        
-        # Create action economy from parsed actions
-        action_economy = ActionEconomy(
-            attacks_per_action=self._calculate_attacks_per_action(features_and_traits),
-            actions=actions
-        )
-        
-        # Create empty objectives (not available in D&D Beyond exports)
-        objectives_and_contracts = ObjectivesAndContracts()
-        
-        # Assemble the complete character
-        character = Character(
-            # Required core fields
-            character_base=core_data.character_base,
-            characteristics=core_data.characteristics,
-            ability_scores=core_data.ability_scores,
-            combat_stats=core_data.combat_stats,
-            background_info=background_data["background_info"],
-            personality=background_data["personality_traits"],
-            backstory=background_data["backstory"],
+        return Character(
+            **self._sections_from_results(results),
             
-            # Optional fields
-            organizations=background_data["organizations"],
-            allies=background_data["allies"],
-            enemies=background_data["enemies"],
-            proficiencies=core_data.proficiencies,
-            damage_modifiers=core_data.damage_modifiers,
-            passive_scores=core_data.passive_scores,
-            senses=core_data.senses,
-            action_economy=action_economy,
-            features_and_traits=features_and_traits,
-            inventory=inventory,
-            spell_list=spell_list,
-            objectives_and_contracts=objectives_and_contracts,
+            # Create empty objectives (not available in D&D Beyond exports)
+            objectives_and_contracts=ObjectivesAndContracts(),
             
             # Metadata
             notes={},
             created_date=datetime.now(),
             last_updated=datetime.now()
         )
-        
-        return character
+    
+    @classmethod
+    def source_hashes(cls, json_data: Dict[str, Any]) -> Dict[str, str]:
+        """Content hash of every D&D Beyond input region the parsers read (see PARSER_INPUTS)"""
+        data = json_data.get("data", {})
+        regions = sorted({region for inputs in cls.PARSER_INPUTS.values() for region in inputs})
+        return {
+            region: hashlib.sha1(
+                json.dumps(data.get(region), sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            ).hexdigest()
+            for region in regions
+        }
+    
+    @classmethod
+    def changed_parsers(cls, old_hashes: Optional[Dict[str, str]], new_hashes: Dict[str, str]) -> List[str]:
+        """Parsers with at least one input region whose hash differs (all of them without old hashes)"""
+        if not old_hashes:
+            return list(cls.PARSER_SECTIONS)
+        return [
+            name for name, inputs in cls.PARSER_INPUTS.items()
+            if any(old_hashes.get(region) != new_hashes.get(region) for region in inputs)
+        ]
     
     def _calculate_attacks_per_action(self, features_and_traits) -> int:
         """
@@ -306,7 +452,9 @@ async def test_async_builder():
         
         elif event_type == 'parser_complete':
             time_ms = event.get('execution_time_ms', 0)
-            print(f"  ✓ [{event['completed']}/{event['total']}] {event['parser'].capitalize()} complete ({time_ms:.0f}ms)")
+            cache = event.get('llm_cache')
+            cache_note = f", {cache['hits']}/{cache['hits'] + cache['misses']} LLM sections cached" if cache else ""
+            print(f"  ✓ [{event['completed']}/{event['total']}] {event['parser'].capitalize()} complete ({time_ms:.0f}ms{cache_note})")
         
         elif event_type == 'parser_error':
             print(f"  ✗ {event['parser'].capitalize()} failed: {event['error']}")
@@ -321,7 +469,11 @@ async def test_async_builder():
             print(f"\n  Parser execution times:")
             for parser, time_ms in sorted(event['parser_times'].items(), key=lambda x: x[1], reverse=True):
                 print(f"     {parser}: {time_ms:.0f}ms")
-    
+            usage = event.get('llm_usage', {})
+            if usage.get('calls'):
+                print(f"\n  LLM usage: {usage['calls']} calls, {usage['input_tokens']} in / "
+                      f"{usage['output_tokens']} out tokens, ${usage['cost_usd']:.4f}")
+
     # Build character
     print("\n" + "="*80)
     print("ASYNC CHARACTER BUILDER - TEST")
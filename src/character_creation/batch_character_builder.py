@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Batch Character Builder
+
+Rebuilds many characters at once for offline backfills (e.g. after a schema
+change in character_types.py). CharacterBuilder and AsyncCharacterBuilder run the
+CPU-bound parsers in threads, so rebuilding many characters serializes on the GIL.
+BatchCharacterBuilder instead:
+- runs the deterministic parsers (core, inventory, spells, features and the
+  structured part of actions) of each character in a process pool worker
+- keeps the LLM-bound work (background parsing and item spell extraction) on the
+  caller's event loop, where all characters share the LLM clients and caches
+- assembles each Character in the main process like AsyncCharacterBuilder
+
+A character that fails to build is reported in its BatchBuildResult and does not
+stop the batch. Every result carries per-character timing; BatchBuildSummary
+aggregates throughput and LLM usage.
+
+Usage:
+    from src.character_creation.batch_character_builder import BatchCharacterBuilder
+
+    builder = BatchCharacterBuilder(workers=4)
+    results, summary = await builder.build_many(["a.json", "b.json"])
+    for result in results:
+        if result.ok:
+            save(result.character)
+    print(summary.to_dict())
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from src.llm.usage import UsageSummary, track_usage, usage_stage
+from src.rag.character.character_types import Character
+from src.character_creation.async_character_builder import AsyncCharacterBuilder
+from src.character_creation.parsing.dndbeyond_index import DndBeyondIndex
+from src.character_creation.parsing.parse_core_character import DNDBeyondCoreParser
+from src.character_creation.parsing.parse_background_personality import DNDBeyondBackgroundParser
+from src.character_creation.parsing.parse_features_traits import DNDBeyondFeaturesParser
+from src.character_creation.parsing.parse_inventory import DNDBeyondInventoryParser
+from src.character_creation.parsing.parse_actions import DNDBeyondActionsParser
+from src.character_creation.parsing.parse_spelllist import DNDBeyondSpellParser
+
+
+# A character to build: path to a D&D Beyond export, or the export itself
+CharacterSource = Union[str, Path, Dict[str, Any]]
+
+# Parsers run in the process pool (no LLM calls). 'actions' is only the structured
+# part; its item spell extraction runs on the event loop with background parsing.
+PROCESS_PARSERS = {
+    'core': (DNDBeyondCoreParser, 'parse_all_core_data'),
+    'inventory': (DNDBeyondInventoryParser, 'parse_inventory'),
+    'spells': (DNDBeyondSpellParser, 'parse_all_spells'),
+    'features': (DNDBeyondFeaturesParser, 'parse_all_features'),
+    'actions': (DNDBeyondActionsParser, '_parse_structured_actions'),
+}
+
+
+def _load_export(source: CharacterSource) -> Dict[str, Any]:
+    if isinstance(source, dict):
+        return source
+    with open(source, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _run_process_parsers(source: CharacterSource) -> Tuple[Dict[str, Any], Dict[str, float], int]:
+    """
+    Process pool entry point: run PROCESS_PARSERS on one export.
+
+    Paths are loaded in the worker so only the path is pickled on the way in.
+
+    Returns:
+        (parser name -> result, parser name -> execution ms, worker pid)
+    """
+    json_data = _load_export(source)
+    index = DndBeyondIndex(json_data)
+    results, timing = {}, {}
+    for name, (parser_class, method_name) in PROCESS_PARSERS.items():
+        start = time.perf_counter()
+        results[name] = getattr(parser_class(json_data, index=index), method_name)()
+        timing[name] = (time.perf_counter() - start) * 1000
+    return results, timing, os.getpid()
+
+
+@dataclass
+class BatchBuildResult:
+    """Outcome and timing of one character in a batch build"""
+    source: str
+    ok: bool
+    character: Optional[Character] = None
+    error: Optional[str] = None
+    queued_ms: float = 0.0  # Waiting for a build slot
+    process_ms: float = 0.0  # Process pool round trip (waiting for a worker, pickling, parsing)
+    worker_ms: float = 0.0  # Parsing inside the worker
+    llm_ms: float = 0.0  # Background parsing and item spell extraction on the event loop
+    total_ms: float = 0.0  # From build slot to assembled character
+    parser_times: Dict[str, float] = field(default_factory=dict)  # Inside the worker (and LLM parsers)
+    worker_pid: Optional[int] = None
+
+    @property
+    def character_name(self) -> Optional[str]:
+        return self.character.character_base.name if self.character else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'source': self.source,
+            'ok': self.ok,
+            'character_name': self.character_name,
+            'error': self.error,
+            'queued_ms': round(self.queued_ms, 2),
+            'process_ms': round(self.process_ms, 2),
+            'worker_ms': round(self.worker_ms, 2),
+            'llm_ms': round(self.llm_ms, 2),
+            'total_ms': round(self.total_ms, 2),
+            'parser_times': {k: round(v, 2) for k, v in self.parser_times.items()},
+            'worker_pid': self.worker_pid
+        }
+
+
+@dataclass
+class BatchBuildSummary:
+    """Throughput of a batch build"""
+    characters: int
+    succeeded: int
+    failed: int
+    workers: int
+    wall_ms: float
+    startup_ms: float = 0.0  # Until every pool worker was running (included in wall_ms)
+    total_ms_p50: float = 0.0
+    total_ms_max: float = 0.0
+    worker_ms_sum: float = 0.0  # Parsing time in the workers; / wall_ms is the effective parallelism
+    llm_usage: Optional[UsageSummary] = None
+
+    @property
+    def characters_per_second(self) -> float:
+        return self.succeeded / (self.wall_ms / 1000) if self.wall_ms else 0.0
+
+    @classmethod
+    def from_results(
+        cls,
+        results: List[BatchBuildResult],
+        workers: int,
+        wall_ms: float,
+        llm_usage: Optional[UsageSummary] = None
+    ) -> 'BatchBuildSummary':
+        totals = [r.total_ms for r in results if r.ok]
+        succeeded = len(totals)
+        return cls(
+            characters=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            workers=workers,
+            wall_ms=wall_ms,
+            total_ms_p50=statistics.median(totals) if totals else 0.0,
+            total_ms_max=max(totals, default=0.0),
+            worker_ms_sum=sum(r.worker_ms for r in results),
+            llm_usage=llm_usage
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'characters': self.characters,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'workers': self.workers,
+            'wall_ms': round(self.wall_ms, 2),
+            'startup_ms': round(self.startup_ms, 2),
+            'characters_per_second': round(self.characters_per_second, 2),
+            'total_ms_p50': round(self.total_ms_p50, 2),
+            'total_ms_max': round(self.total_ms_max, 2),
+            'worker_ms_sum': round(self.worker_ms_sum, 2),
+            'parallelism': round(self.worker_ms_sum / self.wall_ms, 2) if self.wall_ms else 0.0,
+            'llm_usage': self.llm_usage.to_dict() if self.llm_usage else None
+        }
+
+
+class BatchCharacterBuilder:
+    """
+    Builds many characters with the deterministic parsers in a process pool and
+    the LLM-bound parsers on the event loop.
+
+    The pool is created per build_many call (or reused when passed in). Workers are
+    spawned rather than forked, since the caller has an event loop and threads running.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        executor: Optional[ProcessPoolExecutor] = None
+    ):
+        """
+        Args:
+            workers: Process pool size (default: CPU count, at most one per character)
+            max_in_flight: Characters being built at once (default: 2 per worker), bounds
+                           memory and keeps LLM work from racing far ahead of the pool
+            executor: Existing process pool to use instead of creating one
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self._executor = executor
+
+    async def build_many(
+        self,
+        sources: Iterable[CharacterSource]
+    ) -> Tuple[List[BatchBuildResult], BatchBuildSummary]:
+        """
+        Build a character from every source.
+
+        Returns:
+            (one BatchBuildResult per source, in order, summary of the batch)
+        """
+        sources = list(sources)
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        workers = self.workers
+        executor = self._executor
+        startup = None
+        if executor is None:
+            workers = max(1, min(self.workers, len(sources)))
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+            async def start_workers() -> float:
+                # Spawn every worker up front (each imports the parsers) while the first
+                # characters' LLM parsing runs
+                await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(workers)))
+                return (time.perf_counter() - start) * 1000
+
+            startup = asyncio.create_task(start_workers())
+
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        try:
+            with track_usage() as batch_usage:
+                results = await asyncio.gather(*(
+                    self._build_one(source, executor, semaphore) for source in sources
+                ))
+            startup_ms = await startup if startup else 0.0
+        finally:
+            if executor is not self._executor:
+                await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+        wall_ms = (time.perf_counter() - start) * 1000
+        summary = BatchBuildSummary.from_results(results, workers, wall_ms, batch_usage.summary())
+        summary.startup_ms = startup_ms
+        return results, summary
+
+    async def _build_one(
+        self,
+        source: CharacterSource,
+        executor: ProcessPoolExecutor,
+        semaphore: asyncio.Semaphore
+    ) -> BatchBuildResult:
+        label = str(source) if not isinstance(source, dict) else str(source.get('data', {}).get('name', '<export>'))
+        result = BatchBuildResult(source=label, ok=False)
+        queued_start = time.perf_counter()
+
+        async with semaphore:
+            start = time.perf_counter()
+            result.queued_ms = (start - queued_start) * 1000
+            try:
+                json_data = await asyncio.to_thread(_load_export, source)
+                builder = AsyncCharacterBuilder(json_data)
+                actions_parser = DNDBeyondActionsParser(json_data, index=builder.index)
+
+                async def run_process_parsers():
+                    loop = asyncio.get_running_loop()
+                    process_start = time.perf_counter()
+                    # The worker loads paths itself; dicts are pickled as they are
+                    outcome = await loop.run_in_executor(executor, _run_process_parsers, source)
+                    result.process_ms = (time.perf_counter() - process_start) * 1000
+                    return outcome
+
+                (process_results, parser_times, result.worker_pid), llm_results = await asyncio.gather(
+                    run_process_parsers(), self._run_llm_parsers(builder, actions_parser, result)
+                )
+
+                results = dict(process_results)
+                background, item_spell_actions = llm_results
+                results['background'] = background
+                actions, item_section_actions = results['actions']
+                results['actions'] = actions_parser._merge_actions(
+                    actions + item_spell_actions + item_section_actions
+                )
+
+                result.character = builder._assemble_character(results)
+                result.parser_times.update(parser_times)
+                result.worker_ms = sum(parser_times.values())
+                result.ok = True
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+            result.total_ms = (time.perf_counter() - start) * 1000
+
+        status = f"✓ {result.character_name}" if result.ok else f"✗ {result.source}: {result.error}"
+        print(f"  {status} ({result.total_ms:.0f} ms)")
+        return result
+
+    async def _run_llm_parsers(
+        self,
+        builder: AsyncCharacterBuilder,
+        actions_parser: DNDBeyondActionsParser,
+        result: BatchBuildResult
+    ) -> Tuple[Dict[str, Any], List[Any]]:
+        """Background data and item spell actions of one character, on the event loop"""
+        start = time.perf_counter()
+
+        async def background():
+            parser_start = time.perf_counter()
+            with usage_stage('background'):
+                data = await DNDBeyondBackgroundParser(builder.json_data, index=builder.index).parse_all_async()
+            result.parser_times['background'] = (time.perf_counter() - parser_start) * 1000
+            return data
+
+        async def item_spells():
+            parser_start = time.perf_counter()
+            with usage_stage('actions'):
+                try:
+                    actions = await actions_parser.parse_item_spell_actions_async()
+                except Exception as e:
+                    # Same fallback as DNDBeyondActionsParser.parse_all_actions_async
+                    print(f"Warning: Failed to parse item spell actions: {e}")
+                    actions = []
+            result.parser_times['item_spells'] = (time.perf_counter() - parser_start) * 1000
+            return actions
+
+        outcome = await asyncio.gather(background(), item_spells())
+        result.llm_ms = (time.perf_counter() - start) * 1000
+        return outcome
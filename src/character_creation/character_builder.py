@@ -27,6 +27,7 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.rag.character.character_types import Character
+from src.character_creation.parsing.dndbeyond_index import DndBeyondIndex
 from src.character_creation.parsing.parse_core_character import DNDBeyondCoreParser
 from src.character_creation.parsing.parse_background_personality import DNDBeyondBackgroundParser
 from src.character_creation.parsing.parse_features_traits import DNDBeyondFeaturesParser
@@ -85,13 +86,14 @@ class CharacterBuilder:
         print("=" * 60)
         print("\nInitializing parsers...")
         
-        # Initialize all parsers
-        core_parser = DNDBeyondCoreParser(self.json_data)
-        background_parser = DNDBeyondBackgroundParser(self.json_data)
-        features_parser = DNDBeyondFeaturesParser(self.json_data)
-        inventory_parser = DNDBeyondInventoryParser(self.json_data)
-        actions_parser = DNDBeyondActionsParser(self.json_data)
-        spell_parser = DNDBeyondSpellParser(self.json_data)
+        # Initialize all parsers (sharing one index of the export)
+        index = DndBeyondIndex(self.json_data)
+        core_parser = DNDBeyondCoreParser(self.json_data, index=index)
+        background_parser = DNDBeyondBackgroundParser(self.json_data, index=index)
+        features_parser = DNDBeyondFeaturesParser(self.json_data, index=index)
+        inventory_parser = DNDBeyondInventoryParser(self.json_data, index=index)
+        actions_parser = DNDBeyondActionsParser(self.json_data, index=index)
+        spell_parser = DNDBeyondSpellParser(self.json_data, index=index)
         
         print("Parsing all data in parallel...")
         
@@ -0,0 +1,161 @@
+"""
+Shared index over a D&D Beyond character export.
+
+The parsers used to walk `modifiers`, `inventory`, `classes` and `spells` again for
+every lookup (AC bonuses, initiative, each passive score, proficiencies, ...).
+DndBeyondIndex walks each region once and keeps the lookups the parsers need:
+- modifiers by category, by type and by (type, subType), in category order
+- inventory items by id, equipped items, weapons and item names by definition id
+- classes by id, total level, and each class's features with their required level
+- class spell lists and spells by source (race, item, feat, background)
+- base and override ability scores by stat id
+
+AsyncCharacterBuilder and CharacterBuilder build one index per export and pass it
+to every parser; a parser constructed without one builds its own. The index holds
+references into the export, not copies - treat both as read-only.
+
+Usage:
+    index = DndBeyondIndex(json_data)
+    core = DNDBeyondCoreParser(json_data, index=index).parse_all_core_data()
+    ac_bonus = index.modifier_total('bonus', 'armor-class')
+"""
+
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# Modifier categories most lookups consider, in the order they are applied
+MODIFIER_CATEGORIES = ('race', 'class', 'background', 'item', 'feat')
+
+ModifierEntry = Tuple[str, Dict[str, Any]]  # (category, modifier)
+
+
+class DndBeyondIndex:
+    """Single-pass indexed view of a D&D Beyond character export."""
+
+    def __init__(self, json_data: Dict[str, Any]):
+        self.json_data = json_data
+        self.data = json_data.get('data', {})
+        self._index_modifiers()
+        self._index_inventory()
+        self._index_classes()
+        self._index_spells()
+        self._index_stats()
+
+    def _index_modifiers(self) -> None:
+        modifiers = self.data.get('modifiers') or {}
+        self.modifiers_by_category: Dict[str, List[Dict[str, Any]]] = {
+            category: mod_list for category, mod_list in modifiers.items() if isinstance(mod_list, list)
+        }
+        # (position, category, modifier); the position merges lookups of several types in order
+        self._modifiers_by_type: Dict[Any, List[Tuple[int, str, Dict[str, Any]]]] = {}
+        self._modifiers_by_type_subtype: Dict[Tuple[Any, Any], List[Tuple[int, str, Dict[str, Any]]]] = {}
+
+        # The usual categories first (in MODIFIER_CATEGORIES order), then any others
+        order = [c for c in MODIFIER_CATEGORIES if c in self.modifiers_by_category]
+        order += [c for c in self.modifiers_by_category if c not in MODIFIER_CATEGORIES]
+        position = 0
+        for category in order:
+            for mod in self.modifiers_by_category[category]:
+                entry = (position, category, mod)
+                position += 1
+                mod_type = mod.get('type')
+                self._modifiers_by_type.setdefault(mod_type, []).append(entry)
+                self._modifiers_by_type_subtype.setdefault((mod_type, mod.get('subType')), []).append(entry)
+
+    def _index_inventory(self) -> None:
+        self.inventory: List[Dict[str, Any]] = self.data.get('inventory') or []
+        self.items_by_id: Dict[Any, Dict[str, Any]] = {}
+        self.equipped_items: List[Dict[str, Any]] = []
+        self.weapons: List[Dict[str, Any]] = []  # Items with an attack type, equipped or not
+        self.item_names_by_definition_id: Dict[Any, str] = {}
+
+        for item in self.inventory:
+            definition = item.get('definition') or {}
+            if item.get('id') is not None:
+                self.items_by_id[item['id']] = item
+            if item.get('equipped'):
+                self.equipped_items.append(item)
+            if definition.get('attackType'):
+                self.weapons.append(item)
+            if definition.get('id') and definition.get('name'):
+                self.item_names_by_definition_id[definition['id']] = definition['name']
+
+    def _index_classes(self) -> None:
+        self.classes: List[Dict[str, Any]] = self.data.get('classes') or []
+        self.classes_by_id: Dict[Any, Dict[str, Any]] = {}
+        self.total_level = 0
+        # (class entry, [(requiredLevel, feature definition), ...]): base class features
+        # then subclass features, in export order
+        self.class_features: List[Tuple[Dict[str, Any], List[Tuple[int, Dict[str, Any]]]]] = []
+
+        for class_data in self.classes:
+            if class_data.get('id'):
+                self.classes_by_id[class_data['id']] = class_data
+            self.total_level += class_data.get('level', 1)
+
+            features = []
+            feature_lists = [(class_data.get('definition') or {}).get('classFeatures') or []]
+            if class_data.get('subclassDefinition'):
+                feature_lists.append(class_data['subclassDefinition'].get('classFeatures') or [])
+            for feature_list in feature_lists:
+                for feature in feature_list:
+                    # Class features may have definition nested or be direct
+                    definition = feature['definition'] if 'definition' in feature else feature
+                    features.append((definition.get('requiredLevel', 1), definition))
+            self.class_features.append((class_data, features))
+
+    def _index_spells(self) -> None:
+        # [{'characterClassId': ..., 'spells': [...]}, ...]; classes_by_id resolves the class
+        self.class_spells: List[Dict[str, Any]] = self.data.get('classSpells') or []
+        self.spells_by_source: Dict[str, List[Dict[str, Any]]] = {
+            source: spells or [] for source, spells in (self.data.get('spells') or {}).items()
+        }
+
+    def _index_stats(self) -> None:
+        # First entry per stat id wins, as in a linear scan
+        self.stats_by_id: Dict[int, Dict[str, Any]] = {}
+        for stat in self.data.get('stats') or []:
+            self.stats_by_id.setdefault(stat.get('id'), stat)
+        self.override_stats_by_id: Dict[int, Dict[str, Any]] = {}
+        for stat in self.data.get('overrideStats') or []:
+            if stat and stat.get('value') is not None:
+                self.override_stats_by_id.setdefault(stat.get('id'), stat)
+
+    def modifier_entries(
+        self,
+        mod_type: Union[str, Tuple[str, ...]],
+        sub_type: Optional[str] = None,
+        categories: Optional[Iterable[str]] = MODIFIER_CATEGORIES
+    ) -> List[ModifierEntry]:
+        """
+        (category, modifier) pairs of the given type (or any of a tuple of types) and
+        subType, if given, in category order. `categories=None` includes every
+        category (e.g. "condition").
+        """
+        mod_types = mod_type if isinstance(mod_type, tuple) else (mod_type,)
+        if sub_type is None:
+            lists = [self._modifiers_by_type.get(t, []) for t in mod_types]
+        else:
+            lists = [self._modifiers_by_type_subtype.get((t, sub_type), []) for t in mod_types]
+        entries = lists[0] if len(lists) == 1 else heapq.merge(*lists)
+        if categories is not None:
+            categories = set(categories)
+        return [(category, mod) for _, category, mod in entries if categories is None or category in categories]
+
+    def modifiers_of(
+        self,
+        mod_type: Union[str, Tuple[str, ...]],
+        sub_type: Optional[str] = None,
+        categories: Optional[Iterable[str]] = MODIFIER_CATEGORIES
+    ) -> List[Dict[str, Any]]:
+        """Modifiers of the given type (and subType), see modifier_entries"""
+        return [mod for _, mod in self.modifier_entries(mod_type, sub_type, categories)]
+
+    def modifier_total(
+        self,
+        mod_type: str,
+        sub_type: str,
+        categories: Optional[Iterable[str]] = MODIFIER_CATEGORIES
+    ) -> int:
+        """Sum of the values of matching modifiers (modifiers without a value count 0)"""
+        return sum(mod.get('value') or 0 for mod in self.modifiers_of(mod_type, sub_type, categories))
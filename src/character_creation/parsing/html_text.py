@@ -0,0 +1,105 @@
+"""
+HTML-to-text normalization for D&D Beyond descriptions.
+
+D&D Beyond stores spell, feat, item and feature descriptions as HTML snippets. The
+parsers each had their own cleaning chain (strip tags, replace entities one by one,
+collapse whitespace with another regex). html_to_text does the same with:
+- precompiled patterns, and each step skipped when the text has no '<' or '&'
+- one substitution for all entities of a set instead of a replace() per entity
+- whitespace collapsed with str.split() instead of a regex
+- results memoized by content, since the same descriptions (SRD spells, common
+  items and class features) repeat across a character and across characters
+
+The entity sets reproduce what each parser decoded before, including the
+sequential replace() quirk that "&amp;lt;" became "<":
+- ENTITIES_NONE:     no decoding (inventory)
+- ENTITIES_BASIC:    &amp; &lt; &gt; &nbsp; &rsquo; &ldquo; &rdquo; (actions, features)
+- ENTITIES_EXTENDED: basic plus &mdash; &ndash; &hellip; (background)
+- ENTITIES_ALL:      html.unescape (spells)
+
+Usage:
+    from src.character_creation.parsing.html_text import html_to_text, ENTITIES_ALL
+
+    text = html_to_text(definition.get('description'))
+    text = html_to_text(spell['definition']['description'], ENTITIES_ALL)
+"""
+
+import re
+from functools import lru_cache
+from html import unescape
+from typing import Dict, Optional
+
+ENTITIES_NONE = 'none'
+ENTITIES_BASIC = 'basic'
+ENTITIES_EXTENDED = 'extended'
+ENTITIES_ALL = 'all'
+
+# Distinct (text, entity set) results kept; descriptions are at most a few KB each
+HTML_TEXT_CACHE_SIZE = 8192
+
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+_BASIC_ENTITIES = {
+    'amp': '&', 'lt': '<', 'gt': '>', 'nbsp': ' ',
+    'rsquo': "'", 'ldquo': '"', 'rdquo': '"',
+}
+_EXTENDED_ENTITIES = {**_BASIC_ENTITIES, 'mdash': '—', 'ndash': '–', 'hellip': '...'}
+
+
+def _entity_pattern(entities: Dict[str, str]) -> re.Pattern:
+    # "&amp;" was replaced first, so "&amp;name;" of any other entity decoded fully;
+    # "&amp;amp;" only lost one level
+    names = '|'.join(name for name in entities if name != 'amp')
+    return re.compile(rf'&(?:amp;)?({names});|&amp;')
+
+
+def _entity_decoder(entities: Dict[str, str]):
+    pattern = _entity_pattern(entities)
+
+    def decode(text: str) -> str:
+        return pattern.sub(lambda match: entities[match.group(1) or 'amp'], text)
+
+    return decode
+
+
+_DECODERS = {
+    ENTITIES_NONE: None,
+    ENTITIES_BASIC: _entity_decoder(_BASIC_ENTITIES),
+    ENTITIES_EXTENDED: _entity_decoder(_EXTENDED_ENTITIES),
+    ENTITIES_ALL: unescape,
+}
+
+
+@lru_cache(maxsize=HTML_TEXT_CACHE_SIZE)
+def _normalize(text: str, entities: str) -> str:
+    if '<' in text:
+        text = _TAG_PATTERN.sub('', text)
+    decode = _DECODERS[entities]
+    if decode and '&' in text:
+        text = decode(text)
+    # Same as re.sub(r'\s+', ' ', text).strip(): both use Unicode whitespace
+    return ' '.join(text.split())
+
+
+def html_to_text(text: Optional[str], entities: str = ENTITIES_BASIC) -> str:
+    """
+    Plain single-spaced text of an HTML description ("" for empty input).
+
+    Args:
+        text: HTML snippet
+        entities: Entity set to decode (ENTITIES_NONE / _BASIC / _EXTENDED / _ALL)
+    """
+    if not text:
+        return ""
+    if entities not in _DECODERS:
+        raise ValueError(f"Unknown entity set: {entities}")
+    return _normalize(text, entities)
+
+
+def cache_info():
+    """Memoization statistics (hits, misses, maxsize, currsize)"""
+    return _normalize.cache_info()
+
+
+def clear_cache() -> None:
+    _normalize.cache_clear()
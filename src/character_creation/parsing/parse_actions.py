@@ -12,11 +12,19 @@ Usage:
 import json
 import re
 import asyncio
-from typing import Dict, List, Optional, Union, Any
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Union, Any
 from pathlib import Path
 
+from src.config import get_config
+from src.character_creation.parsing.dndbeyond_index import DndBeyondIndex
+from src.character_creation.parsing.html_text import html_to_text
 from src.llm.llm_client import LLMClientFactory
 from src.llm.json_repair import JSONRepair
+from src.llm.parse_cache import llm_parse_cache
+from src.utils.metrics import ITEM_SPELL_CACHE_TOTAL
 from src.rag.character.character_types import (
     ActionActivation,
     ActionUsage,
@@ -27,9 +35,81 @@ from src.rag.character.character_types import (
 )
 
 
+class ItemSpellCache:
+    """
+    Process-wide LRU cache of LLM-extracted item spells.
+    
+    Keyed by a hash of the item content (name, cleaned description, spell hints) and
+    the router model, so a common item (e.g. a Staff of Power) is extracted once no
+    matter how many characters carry it. Concurrent extractions of the same item on
+    one event loop share a single LLM call. Failed extractions are not cached.
+    """
+    
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, List[Dict[str, Any]]]' = OrderedDict()
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(item_name: str, text: str, spell_names: Optional[List[str]] = None) -> str:
+        cfg = get_config()
+        payload = json.dumps([cfg.router_llm_provider, cfg.get_router_model(), item_name, text, sorted(spell_names or [])])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    async def get_or_extract(
+        self,
+        key: str,
+        extract: Callable[[], Awaitable[List[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """Cached spell dicts for `key`, running `extract()` on a miss"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                result = "hit"
+            else:
+                task = self._inflight.get((loop, key))
+                result = "shared" if task is not None else "miss"
+                if task is None:
+                    task = loop.create_task(extract())
+                    self._inflight[(loop, key)] = task
+                    task.add_done_callback(lambda done: self._finish(loop, key, done))
+        ITEM_SPELL_CACHE_TOTAL.inc(result=result)
+        if cached is not None:
+            return cached
+        # Shielded so one cancelled caller does not fail the others sharing the task
+        return await asyncio.shield(task)
+    
+    def _finish(self, loop: asyncio.AbstractEventLoop, key: str, task: asyncio.Task) -> None:
+        with self._lock:
+            self._inflight.pop((loop, key), None)
+            if task.cancelled() or task.exception() is not None:
+                return
+            max_size = self.max_size if self.max_size is not None else get_config().item_spell_cache_size
+            if max_size <= 0:
+                return
+            self._entries[key] = task.result()
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by all parser instances (and threads) in this process
+item_spell_cache = ItemSpellCache()
+
+
 class DNDBeyondActionsParser:
     """Parser for extracting all character actions from D&D Beyond JSON."""
     
+    # Bump when the handling of LLM item spell responses changes (see LLMParseCache)
+    PROMPT_VERSION = 2  # 2: error responses are no longer cached
+    
     # Action type mappings
     ACTION_TYPE_MAP = {
         1: "action",
@@ -60,29 +140,15 @@ class DNDBeyondActionsParser:
         6: "Charisma"
     }
     
-    def __init__(self, json_data: Dict[str, Any]):
-        """Initialize parser with D&D Beyond JSON data."""
+    def __init__(self, json_data: Dict[str, Any], llm_client=None, index: Optional[DndBeyondIndex] = None):
+        """Initialize parser with D&D Beyond JSON data (and optionally the LLM client and a shared index to use)."""
         self.data = json_data.get("data", {})
+        self.index = index or DndBeyondIndex(json_data)
+        self._llm_client = llm_client
         
     def clean_html_description(self, description: str) -> str:
         """Clean HTML tags and format text."""
-        if not description:
-            return ""
-            
-        # Remove HTML tags
-        clean_text = re.sub(r'<[^>]+>', '', description)
-        
-        # Replace HTML entities
-        replacements = {
-            '&amp;': '&', '&lt;': '<', '&gt;': '>', '&nbsp;': ' ',
-            '&rsquo;': "'", '&ldquo;': '"', '&rdquo;': '"'
-        }
-        for old, new in replacements.items():
-            clean_text = clean_text.replace(old, new)
-        
-        # Clean up whitespace
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-        return clean_text
+        return html_to_text(description)
     
     def parse_activation(self, activation_data: Dict[str, Any], action_type: int) -> ActionActivation:
         """Parse activation information."""
@@ -254,13 +320,11 @@ class DNDBeyondActionsParser:
         """Parse weapon attacks from inventory (equipped weapons only)."""
         actions = []
         
-        inventory = self.data.get("inventory", [])
-        
-        for item_data in inventory:
+        for item_data in self.index.weapons:
             definition = item_data.get("definition", {})
             
-            # Skip non-weapons or unequipped weapons
-            if not definition.get("attackType") or not item_data.get("equipped"):
+            # Skip unequipped weapons
+            if not item_data.get("equipped"):
                 continue
             
             action = CharacterAction(
@@ -310,20 +374,14 @@ class DNDBeyondActionsParser:
         
         return actions
     
-    async def _extract_spell_actions_from_text(self, text: str, item_name: str, spell_names: List[str] = None) -> List[CharacterAction]:
-        """
-        Use LLM to extract spell actions from item description text.
-        
-        Args:
-            text: The item description containing spell information
-            item_name: The name of the item granting the spells
-            spell_names: Optional list of known spell names to look for
-        
-        Returns:
-            List of CharacterAction objects for each spell found
-        """
-        llm_client = LLMClientFactory.create_router_client()
-        
+    def _get_llm_client(self):
+        """Router client shared by every item-spell extraction of this parser"""
+        if self._llm_client is None:
+            self._llm_client = LLMClientFactory.create_router_client()
+        return self._llm_client
+    
+    async def _request_spell_infos(self, text: str, item_name: str, spell_names: List[str] = None) -> List[Dict[str, Any]]:
+        """Ask the LLM for the spells an item grants; returns the validated spell dicts"""
         # Build prompt for LLM
         spell_hint = ""
         if spell_names:
@@ -356,79 +414,120 @@ Example output:
   ]
 }}"""
         
-        try:
+        llm_client = self._get_llm_client()
+        
+        async def generate() -> Any:
             response = await llm_client.generate_json_response(prompt, max_tokens=800)
             
             # Repair and validate response
             repair_result = JSONRepair.repair_json_string(json.dumps(response))
-            data = repair_result.data
+            # Validated here so the parse cache never stores an error response
+            self._spell_list(repair_result.data, item_name)
+            return repair_result.data
+        
+        # Persisted across processes; ItemSpellCache above it avoids the file read
+        data = await llm_parse_cache.get_or_generate(
+            "actions", "item_spells", self.PROMPT_VERSION, llm_client, prompt, generate
+        )
+        
+        return [
+            spell_info for spell_info in self._spell_list(data, item_name)
+            if isinstance(spell_info, dict) and "spell_name" in spell_info
+        ]
+    
+    @staticmethod
+    def _spell_list(data: Any, item_name: str) -> List[Any]:
+        """
+        The "spells" list of an extraction response. Clients report API failures as
+        {"error": ...}, so raise for those (and anything without the list) to keep them
+        out of the parse cache and ItemSpellCache.
+        """
+        if not isinstance(data, dict) or not isinstance(data.get("spells"), list):
+            detail = data.get("error") if isinstance(data, dict) and "error" in data else "no spells list"
+            raise ValueError(f"Spell extraction for {item_name} failed: {detail}")
+        return data["spells"]
+    
+    def _build_spell_actions(self, spell_infos: List[Dict[str, Any]], item_name: str) -> List[CharacterAction]:
+        """CharacterAction objects from extracted spell dicts"""
+        actions = []
+        for spell_info in spell_infos:
+            action = CharacterAction(
+                name=spell_info["spell_name"],
+                description=f"Cast from {item_name}",
+                source="item",
+                sourceFeature=item_name,
+                actionCategory="spell"
+            )
             
-            if "spells" not in data or not isinstance(data["spells"], list):
-                return []
+            # Parse activation
+            activation_type = spell_info.get("activation_type", "action")
+            action.activation = ActionActivation(activationType=activation_type)
             
-            actions = []
-            for spell_info in data["spells"]:
-                if not isinstance(spell_info, dict) or "spell_name" not in spell_info:
-                    continue
-                
-                action = CharacterAction(
-                    name=spell_info["spell_name"],
-                    description=f"Cast from {item_name}",
-                    source="item",
-                    sourceFeature=item_name,
-                    actionCategory="spell"
-                )
-                
-                # Parse activation
-                activation_type = spell_info.get("activation_type", "action")
-                action.activation = ActionActivation(activationType=activation_type)
-                
-                # Parse usage limitations
-                uses_per_rest = spell_info.get("uses_per_rest")
-                reset_type = spell_info.get("reset_type")
-                
-                if uses_per_rest or reset_type:
-                    usage = ActionUsage()
-                    
-                    # Extract max uses from text like "once" or "3 charges"
-                    if uses_per_rest:
-                        if "once" in str(uses_per_rest).lower():
-                            usage.maxUses = 1
-                        else:
-                            # Try to extract number
-                            match = re.search(r'(\d+)', str(uses_per_rest))
-                            if match:
-                                usage.maxUses = int(match.group(1))
-                    
-                    if reset_type:
-                        usage.resetType = reset_type
-                    
-                    action.usage = usage
-                
-                # Parse save DC
-                save_dc = spell_info.get("save_dc")
-                if save_dc:
-                    action.save = ActionSave(saveDC=save_dc)
-                
-                actions.append(action)
+            # Parse usage limitations
+            uses_per_rest = spell_info.get("uses_per_rest")
+            reset_type = spell_info.get("reset_type")
             
-            return actions
+            if uses_per_rest or reset_type:
+                usage = ActionUsage()
+                
+                # Extract max uses from text like "once" or "3 charges"
+                if uses_per_rest:
+                    if "once" in str(uses_per_rest).lower():
+                        usage.maxUses = 1
+                    else:
+                        # Try to extract number
+                        match = re.search(r'(\d+)', str(uses_per_rest))
+                        if match:
+                            usage.maxUses = int(match.group(1))
+                
+                if reset_type:
+                    usage.resetType = reset_type
+                
+                action.usage = usage
+            
+            # Parse save DC
+            save_dc = spell_info.get("save_dc")
+            if save_dc:
+                action.save = ActionSave(saveDC=save_dc)
             
+            actions.append(action)
+        
+        return actions
+    
+    async def _extract_spell_actions_from_text(self, text: str, item_name: str, spell_names: List[str] = None) -> List[CharacterAction]:
+        """
+        Use LLM to extract spell actions from item description text.
+        
+        Results are cached per process by item content (see ItemSpellCache), so an item
+        seen before (on this or another character) costs no LLM call.
+        
+        Args:
+            text: The item description containing spell information
+            item_name: The name of the item granting the spells
+            spell_names: Optional list of known spell names to look for
+        
+        Returns:
+            List of CharacterAction objects for each spell found
+        """
+        key = item_spell_cache.key(item_name, text, spell_names)
+        try:
+            spell_infos = await item_spell_cache.get_or_extract(
+                key, lambda: self._request_spell_infos(text, item_name, spell_names)
+            )
         except Exception as e:
             print(f"Warning: Failed to extract spell actions from {item_name}: {e}")
             return []
+        return self._build_spell_actions(spell_infos, item_name)
     
     def parse_unequipped_weapon_actions(self) -> List[CharacterAction]:
         """Parse unequipped weapon attacks from inventory (requires drawing first)."""
         actions = []
         
-        inventory = self.data.get("inventory", [])
-        
-        for item_data in inventory:
+        for item_data in self.index.weapons:
             definition = item_data.get("definition", {})
             
             # Only include unequipped weapons
-            if not definition.get("attackType") or item_data.get("equipped"):
+            if item_data.get("equipped"):
                 continue
             
             action = CharacterAction(
@@ -479,44 +578,47 @@ Example output:
         
         return actions
     
-    def parse_item_spell_actions(self) -> List[CharacterAction]:
+    def _spell_granting_items(self) -> List[tuple]:
+        """(item name, cleaned description) of equipped items whose description mentions spells"""
+        items = []
+        for item_data in self.index.equipped_items:
+            definition = item_data.get("definition", {})
+            description = definition.get("description", "")
+            
+            # Skip if no description
+            if not description:
+                continue
+            
+            # Look for spell-related keywords in description
+            lower_desc = description.lower()
+            if any(keyword in lower_desc for keyword in ["spell", "cast", "spells."]):
+                items.append((definition.get("name", "Unknown Item"), self.clean_html_description(description)))
+        return items
+    
+    async def parse_item_spell_actions_async(self) -> List[CharacterAction]:
         """
         Parse spell actions granted by magic items.
-        Uses LLM to extract spell information from item descriptions.
+        Uses LLM to extract spell information from item descriptions, with up to
+        config.item_spell_concurrency extractions in flight at once.
         """
-        actions = []
-        inventory = self.data.get("inventory", [])
-        
-        # Run async extraction in event loop
-        async def extract_all_item_spells():
-            all_actions = []
-            for item_data in inventory:
-                definition = item_data.get("definition", {})
-                description = definition.get("description", "")
-                item_name = definition.get("name", "Unknown Item")
-                
-                # Skip if no description or item not equipped
-                if not description or not item_data.get("equipped"):
-                    continue
-                
-                # Look for spell-related keywords in description
-                lower_desc = description.lower()
-                if any(keyword in lower_desc for keyword in ["spell", "cast", "spells."]):
-                    # Extract spell actions using LLM
-                    item_actions = await self._extract_spell_actions_from_text(
-                        self.clean_html_description(description),
-                        item_name
-                    )
-                    all_actions.extend(item_actions)
-            
-            return all_actions
+        semaphore = asyncio.Semaphore(max(1, get_config().item_spell_concurrency))
+        
+        async def extract(item_name: str, text: str) -> List[CharacterAction]:
+            async with semaphore:
+                return await self._extract_spell_actions_from_text(text, item_name)
         
+        results = await asyncio.gather(
+            *(extract(item_name, text) for item_name, text in self._spell_granting_items())
+        )
+        return [action for item_actions in results for action in item_actions]
+    
+    def parse_item_spell_actions(self) -> List[CharacterAction]:
+        """Synchronous wrapper for parse_item_spell_actions_async."""
         try:
-            actions = asyncio.run(extract_all_item_spells())
+            return asyncio.run(self.parse_item_spell_actions_async())
         except Exception as e:
             print(f"Warning: Failed to parse item spell actions: {e}")
-        
-        return actions
+            return []
     
     def parse_spell_section_actions(self) -> List[CharacterAction]:
         """
@@ -524,20 +626,13 @@ Example output:
         These are spells granted by items and already have structured data.
         """
         actions = []
-        spells_data = self.data.get("spells", {})
-        item_spells = spells_data.get("item", [])
+        item_spells = self.index.spells_by_source.get("item", [])
         
         if not item_spells:
             return actions
         
-        # Build a mapping of item definition IDs to item names
-        item_id_to_name = {}
-        inventory = self.data.get("inventory", [])
-        for item in inventory:
-            item_def_id = item.get("definition", {}).get("id")
-            item_name = item.get("definition", {}).get("name")
-            if item_def_id and item_name:
-                item_id_to_name[item_def_id] = item_name
+        # Item definition IDs -> item names
+        item_id_to_name = self.index.item_names_by_definition_id
         
         for spell_data in item_spells:
             try:
@@ -610,22 +705,19 @@ Example output:
         
         return actions
     
-    def parse_all_actions(self) -> List[CharacterAction]:
-        """Parse all non-spell character actions."""
-        all_actions = []
-        
-        # Parse different action sources
-        all_actions.extend(self.parse_basic_actions())
-        all_actions.extend(self.parse_weapon_actions())
-        all_actions.extend(self.parse_unequipped_weapon_actions())
-        
-        # Parse item-granted spells (uses LLM to extract from descriptions)
-        all_actions.extend(self.parse_item_spell_actions())
-        
-        # Parse item spells from structured spell data
-        all_actions.extend(self.parse_spell_section_actions())
-        
-        # Remove duplicates (case-insensitive name matching) and sort by name
+    def _parse_structured_actions(self) -> tuple:
+        """
+        Actions parsed directly from the JSON (no LLM), as (attack and ability
+        actions, item spells from the structured spell data)
+        """
+        actions = []
+        actions.extend(self.parse_basic_actions())
+        actions.extend(self.parse_weapon_actions())
+        actions.extend(self.parse_unequipped_weapon_actions())
+        return actions, self.parse_spell_section_actions()
+    
+    def _merge_actions(self, all_actions: List[CharacterAction]) -> List[CharacterAction]:
+        """Remove duplicates (case-insensitive name matching) and sort by name"""
         unique_actions = {}
         for action in all_actions:
             # Use lowercase name for deduplication to catch case variations
@@ -644,6 +736,34 @@ Example output:
         
         return sorted(unique_actions.values(), key=lambda x: x.name.lower())
     
+    def parse_all_actions(self) -> List[CharacterAction]:
+        """Parse all non-spell character actions."""
+        actions, item_section_actions = self._parse_structured_actions()
+        
+        # Parse item-granted spells (uses LLM to extract from descriptions)
+        return self._merge_actions(actions + self.parse_item_spell_actions() + item_section_actions)
+    
+    async def parse_all_actions_async(self) -> List[CharacterAction]:
+        """
+        Parse all non-spell character actions on the running event loop.
+        
+        LLM extraction of item spells runs natively on the loop while the
+        structured parsing runs in a worker thread.
+        """
+        item_spell_actions, structured = await asyncio.gather(
+            self.parse_item_spell_actions_async(),
+            asyncio.to_thread(self._parse_structured_actions),
+            return_exceptions=True
+        )
+        if isinstance(structured, BaseException):
+            raise structured
+        if isinstance(item_spell_actions, BaseException):
+            print(f"Warning: Failed to parse item spell actions: {item_spell_actions}")
+            item_spell_actions = []
+
+        actions, item_section_actions = structured
+        return self._merge_actions(actions + item_spell_actions + item_section_actions)
+    
     def print_actions_summary(self, actions: List[CharacterAction]):
         """Print a summary of all character actions."""
         print("\\n" + "="*60)
@@ -21,14 +21,15 @@ Output:
 
 import json
 import sys
-import re
 import asyncio
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import asdict
 from pathlib import Path
 
 from src.llm.llm_client import LLMClientFactory
 from src.llm.json_repair import JSONRepair
+from src.llm.parse_cache import llm_parse_cache
+from src.character_creation.parsing.html_text import html_to_text, ENTITIES_EXTENDED
 from src.rag.character.character_types import (
     BackgroundInfo,
     BackgroundFeature,
@@ -45,32 +46,49 @@ from src.rag.character.character_types import (
 class DNDBeyondBackgroundParser:
     """Parser for extracting background and personality information from D&D Beyond JSON."""
     
-    def __init__(self, json_data: Dict[str, Any]):
-        """Initialize parser with D&D Beyond JSON data."""
+    # Bump when the handling of LLM responses changes so cached parse results are not reused
+    # (prompt text changes already produce new cache keys)
+    PROMPT_VERSION = 2  # 2: error responses are no longer cached
+    
+    def __init__(self, json_data: Dict[str, Any], index: Optional[Any] = None):
+        """
+        Initialize parser with D&D Beyond JSON data.
+        
+        `index` (a DndBeyondIndex) is accepted like by the other parsers but not needed:
+        background, traits and notes are read directly.
+        """
         self.data = json_data.get("data", {})
         self.llm_client = LLMClientFactory.create_router_client()
         
     def clean_html_description(self, description: str) -> str:
         """Clean HTML tags and format text."""
-        if not description:
-            return ""
+        return html_to_text(description, ENTITIES_EXTENDED)
+    
+    async def _generate_json(self, section: str, prompt: str, expected_keys: Tuple[str, ...]) -> Dict[str, Any]:
+        """
+        LLM JSON response for a section prompt, served from the parse cache when the prompt is unchanged.
+        Raises ValueError (and caches nothing) when the client reports an error or the
+        response has none of `expected_keys`.
+        """
+        async def generate() -> Dict[str, Any]:
+            response = await self.llm_client.generate_json_response(prompt)
             
-        # Remove HTML tags
-        clean_text = re.sub(r'<[^>]+>', '', description)
-        
-        # Replace HTML entities
-        replacements = {
-            '&amp;': '&', '&lt;': '<', '&gt;': '>', '&nbsp;': ' ',
-            '&rsquo;': "'", '&ldquo;': '"', '&rdquo;': '"',
-            '&mdash;': '—', '&ndash;': '–', '&hellip;': '...',
-            '\u003C': '<', '\u003E': '>', '\r\n': '\n'
-        }
-        for old, new in replacements.items():
-            clean_text = clean_text.replace(old, new)
-        
-        # Clean up whitespace
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-        return clean_text
+            # Repair and validate response
+            if isinstance(response, str):
+                repair_result = JSONRepair.repair_json_string(response)
+            else:
+                repair_result = JSONRepair.repair_json_string(json.dumps(response))
+            data = repair_result.data
+            if not isinstance(data, dict) or "error" in data:
+                detail = data.get("error") if isinstance(data, dict) else "not a JSON object"
+                raise ValueError(f"LLM {section} response failed: {detail}")
+            if not any(key in data for key in expected_keys):
+                raise ValueError(f"LLM {section} response has none of {', '.join(expected_keys)}")
+            return data
+        
+        return await llm_parse_cache.get_or_generate(
+            "background", section, self.PROMPT_VERSION, self.llm_client, prompt, generate
+        )
     
     def parse_background_info_basic(self) -> BackgroundInfo:
         """
@@ -147,14 +165,7 @@ If there are no specific languages mentioned (e.g., "Two of your choice"), retur
 Parse equipment descriptions into individual items, preserving their exact names."""
 
         try:
-            response = await self.llm_client.generate_json_response(prompt)
-            
-            # Repair and validate response
-            if isinstance(response, str):
-                repair_result = JSONRepair.repair_json_string(response)
-            else:
-                repair_result = JSONRepair.repair_json_string(json.dumps(response))
-            data = repair_result.data
+            data = await self._generate_json("background_info", prompt, ("languages", "equipment"))
             
             languages = data.get("languages", [])
             equipment = data.get("equipment", [])
@@ -206,14 +217,7 @@ Return JSON in this exact format:
 Split on newlines and clean up whitespace, but preserve the complete original text of each entry."""
 
         try:
-            response = await self.llm_client.generate_json_response(prompt)
-            
-            # Repair and validate response
-            if isinstance(response, str):
-                repair_result = JSONRepair.repair_json_string(response)
-            else:
-                repair_result = JSONRepair.repair_json_string(json.dumps(response))
-            data = repair_result.data
+            data = await self._generate_json("personality", prompt, ("personality_traits", "ideals", "bonds", "flaws"))
             
             return PersonalityTraits(
                 personality_traits=data.get("personality_traits", []),
@@ -284,14 +288,7 @@ Organize the rest into logical sections.
 PRESERVE ALL ORIGINAL TEXT - copy it exactly, do not summarize or paraphrase."""
 
         try:
-            response = await self.llm_client.generate_json_response(prompt)
-            
-            # Repair and validate response
-            if isinstance(response, str):
-                repair_result = JSONRepair.repair_json_string(response)
-            else:
-                repair_result = JSONRepair.repair_json_string(json.dumps(response))
-            data = repair_result.data
+            data = await self._generate_json("backstory", prompt, ("title", "family_backstory", "sections"))
             
             # Parse family backstory
             family_data = data.get("family_backstory", {})
@@ -362,14 +359,7 @@ Extract the character's role/rank in each organization.
 Include the COMPLETE original text describing the organization's purpose and the character's involvement."""
 
         try:
-            response = await self.llm_client.generate_json_response(prompt)
-            
-            # Repair and validate response
-            if isinstance(response, str):
-                repair_result = JSONRepair.repair_json_string(response)
-            else:
-                repair_result = JSONRepair.repair_json_string(json.dumps(response))
-            data = repair_result.data
+            data = await self._generate_json("organizations", prompt, ("organizations",))
             
             organizations = []
             for org_data in data.get("organizations", []):
@@ -421,14 +411,7 @@ Extract any titles (like "High Acolyte", "Captain", etc.) into the title field.
 Include the COMPLETE original description of their relationship and role - do not shorten it."""
 
         try:
-            response = await self.llm_client.generate_json_response(prompt)
-            
-            # Repair and validate response
-            if isinstance(response, str):
-                repair_result = JSONRepair.repair_json_string(response)
-            else:
-                repair_result = JSONRepair.repair_json_string(json.dumps(response))
-            data = repair_result.data
+            data = await self._generate_json("allies", prompt, ("allies",))
             
             allies = []
             for ally_data in data.get("allies", []):
@@ -480,14 +463,7 @@ Preserve the complete original text - do not shorten descriptions.
 If no description is provided, leave the description field empty."""
 
         try:
-            response = await self.llm_client.generate_json_response(prompt)
-            
-            # Repair and validate response
-            if isinstance(response, str):
-                repair_result = JSONRepair.repair_json_string(response)
-            else:
-                repair_result = JSONRepair.repair_json_string(json.dumps(response))
-            data = repair_result.data
+            data = await self._generate_json("enemies", prompt, ("enemies",))
             
             enemies = []
             for enemy_data in data.get("enemies", []):
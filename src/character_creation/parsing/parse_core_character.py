@@ -24,6 +24,7 @@ from typing import Dict, List, Optional, Any, Union, Literal
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from src.character_creation.parsing.dndbeyond_index import DndBeyondIndex
 from src.rag.character.character_types import (
     AbilityScores, CharacterBase, PhysicalCharacteristics, CombatStats,
     Proficiency, DamageModifier, PassiveScores, Senses
@@ -36,6 +37,11 @@ ALIGNMENT_MAP = {
     7: "Lawful Evil", 8: "Neutral Evil", 9: "Chaotic Evil"
 }
 
+ABILITY_SCORE_SUBTYPES = (
+    'strength-score', 'dexterity-score', 'constitution-score',
+    'intelligence-score', 'wisdom-score', 'charisma-score'
+)
+
 SIZE_MAP = {
     1: "Tiny", 2: "Small", 3: "Medium", 4: "Large", 5: "Huge", 6: "Gargantuan"
 }
@@ -48,10 +54,14 @@ LIFESTYLE_MAP = {
 class DNDBeyondCoreParser:
     """Parser for D&D Beyond character JSON core data."""
     
-    def __init__(self, json_data: Dict[str, Any]):
-        """Initialize parser with JSON data."""
+    def __init__(self, json_data: Dict[str, Any], index: Optional[DndBeyondIndex] = None):
+        """Initialize parser with JSON data (and optionally a shared index of it)."""
         self.json_data = json_data
         self.data = json_data.get('data', {})
+        self.index = index or DndBeyondIndex(json_data)
+        # Computed once, reused by AC, initiative and passive scores
+        self._scores: Optional[List[int]] = None
+        self._proficiencies: Optional[List[Proficiency]] = None
         
     def parse_ability_scores(self) -> AbilityScores:
         """Parse the six core ability scores from D&D Beyond JSON.
@@ -62,6 +72,21 @@ class DNDBeyondCoreParser:
         - overrideStats[0-5].value for manual overrides
         - Apply modifiers from equipment/features
         """
+        if self._scores is None:
+            self._scores = self._calculate_ability_scores()
+        scores = self._scores
+        
+        return AbilityScores(
+            strength=scores[0],
+            dexterity=scores[1], 
+            constitution=scores[2],
+            intelligence=scores[3],
+            wisdom=scores[4],
+            charisma=scores[5]
+        )
+    
+    def _calculate_ability_scores(self) -> List[int]:
+        """STR-CHA scores: base, bonus and override stats plus score modifiers."""
         # Get base stats (should be 6 entries for STR, DEX, CON, INT, WIS, CHA)
         stats = self.data.get('stats', [])
         bonus_stats = self.data.get('bonusStats', [])
@@ -86,31 +111,10 @@ class DNDBeyondCoreParser:
                 scores[i] = override['value']
         
         # Apply ability score modifiers from equipment, feats, etc.
-        modifiers = self.data.get('modifiers', {})
-        for category in ['race', 'class', 'background', 'item', 'feat']:
-            mod_list = modifiers.get(category, [])
-            if isinstance(mod_list, list):
-                for mod in mod_list:
-                    if (mod.get('type') == 'bonus' and 
-                        mod.get('subType') in ['strength-score', 'dexterity-score', 'constitution-score', 
-                                              'intelligence-score', 'wisdom-score', 'charisma-score']):
-                        ability_index = {
-                            'strength-score': 0, 'dexterity-score': 1, 'constitution-score': 2,
-                            'intelligence-score': 3, 'wisdom-score': 4, 'charisma-score': 5
-                        }.get(mod['subType'])
-                        if ability_index is not None:
-                            value = mod.get('value')
-                            if value is not None:
-                                scores[ability_index] += value
+        for ability_index, sub_type in enumerate(ABILITY_SCORE_SUBTYPES):
+            scores[ability_index] += self.index.modifier_total('bonus', sub_type)
         
-        return AbilityScores(
-            strength=scores[0],
-            dexterity=scores[1], 
-            constitution=scores[2],
-            intelligence=scores[3],
-            wisdom=scores[4],
-            charisma=scores[5]
-        )
+        return scores
     
     def parse_character_base(self) -> CharacterBase:
         """Parse basic character information.
@@ -296,15 +300,11 @@ class DNDBeyondCoreParser:
         dex_mod = self._get_ability_modifier('dexterity')
         
         # Look for equipped armor and shields
-        inventory = self.data.get('inventory', [])
         armor_ac = None
         shield_ac = 0
         max_dex_bonus = None
         
-        for item in inventory:
-            if not item.get('equipped'):
-                continue
-                
+        for item in self.index.equipped_items:
             item_def = item.get('definition', {})
             item_ac = item_def.get('armorClass')
             
@@ -355,16 +355,7 @@ class DNDBeyondCoreParser:
         dex_mod = self._get_ability_modifier('dexterity')
         
         # Add initiative bonuses from modifiers
-        init_bonuses = 0
-        modifiers = self.data.get('modifiers', {})
-        for category in ['race', 'class', 'background', 'item', 'feat']:
-            mod_list = modifiers.get(category, [])
-            if isinstance(mod_list, list):
-                for mod in mod_list:
-                    if mod.get('type') == 'bonus' and mod.get('subType') == 'initiative':
-                        value = mod.get('value', 0)
-                        if value is not None:
-                            init_bonuses += value
+        init_bonuses = self.index.modifier_total('bonus', 'initiative')
         
         return dex_mod + init_bonuses
     
@@ -392,35 +383,34 @@ class DNDBeyondCoreParser:
         - Use friendlySubtypeName for display name
         - Apply filtering rules to remove duplicates and non-informative entries
         """
+        if self._proficiencies is not None:
+            return list(self._proficiencies)
+        
         proficiencies = []
         seen_proficiencies = set()  # Track duplicates
-        modifiers = self.data.get('modifiers', {})
-        
-        for category in ['race', 'class', 'background', 'item', 'feat']:
-            mod_list = modifiers.get(category, [])
-            if isinstance(mod_list, list):
-                for mod in mod_list:
-                    if mod.get('type') == 'proficiency':
-                        sub_type = mod.get('subType', '')
-                        friendly_name = mod.get('friendlySubtypeName', sub_type)
-                        
-                        # Apply filtering rules
-                        if not self._should_include_proficiency(friendly_name, sub_type, category):
-                            continue
-                        
-                        # Map subType to proficiency type
-                        prof_type = self._map_proficiency_type(sub_type)
-                        if prof_type:
-                            # Create a unique key to prevent duplicates
-                            prof_key = (prof_type, friendly_name.lower())
-                            if prof_key not in seen_proficiencies:
-                                seen_proficiencies.add(prof_key)
-                                proficiencies.append(Proficiency(
-                                    type=prof_type,
-                                    name=friendly_name
-                                ))
-        
-        return proficiencies
+        
+        for category, mod in self.index.modifier_entries('proficiency'):
+            sub_type = mod.get('subType', '')
+            friendly_name = mod.get('friendlySubtypeName', sub_type)
+            
+            # Apply filtering rules
+            if not self._should_include_proficiency(friendly_name, sub_type, category):
+                continue
+            
+            # Map subType to proficiency type
+            prof_type = self._map_proficiency_type(sub_type)
+            if prof_type:
+                # Create a unique key to prevent duplicates
+                prof_key = (prof_type, friendly_name.lower())
+                if prof_key not in seen_proficiencies:
+                    seen_proficiencies.add(prof_key)
+                    proficiencies.append(Proficiency(
+                        type=prof_type,
+                        name=friendly_name
+                    ))
+        
+        self._proficiencies = proficiencies
+        return list(proficiencies)
     
     def _should_include_proficiency(self, friendly_name: str, sub_type: str, category: str) -> bool:
         """Determine if a proficiency should be included based on filtering rules."""
@@ -507,19 +497,13 @@ class DNDBeyondCoreParser:
         - modifier_type: modifier.type
         """
         damage_modifiers = []
-        modifiers = self.data.get('modifiers', {})
-        
-        for category in ['race', 'class', 'background', 'item', 'feat']:
-            mod_list = modifiers.get(category, [])
-            if isinstance(mod_list, list):
-                for mod in mod_list:
-                    mod_type = mod.get('type')
-                    if mod_type in ['resistance', 'immunity', 'vulnerability']:
-                        damage_type = mod.get('subType', 'unknown')
-                        damage_modifiers.append(DamageModifier(
-                            damage_type=damage_type,
-                            modifier_type=mod_type
-                        ))
+        
+        for mod in self.index.modifiers_of(('resistance', 'immunity', 'vulnerability')):
+            damage_type = mod.get('subType', 'unknown')
+            damage_modifiers.append(DamageModifier(
+                damage_type=damage_type,
+                modifier_type=mod.get('type')
+            ))
         
         return damage_modifiers
     
@@ -571,49 +555,37 @@ class DNDBeyondCoreParser:
     
     def _has_perception_proficiency(self) -> bool:
         """Check if character has Perception proficiency from any source."""
-        modifiers = self.data.get('modifiers', {})
-        
-        for category in modifiers:
-            if isinstance(modifiers[category], list):
-                for mod in modifiers[category]:
-                    if (mod.get('type') == 'proficiency' and 
-                        'perception' in mod.get('subType', '').lower()):
-                        return True
-        return False
+        return any(
+            'perception' in mod.get('subType', '').lower()
+            for mod in self.index.modifiers_of('proficiency', categories=None)
+        )
     
     def _get_passive_bonus(self, skill_name: str) -> int:
         """Get additional bonuses to passive abilities from feats, items, etc."""
         bonus = 0
-        modifiers = self.data.get('modifiers', {})
-        
-        for category in modifiers:
-            if isinstance(modifiers[category], list):
-                for mod in modifiers[category]:
-                    mod_type = mod.get('type', '')
-                    sub_type = mod.get('subType', '').lower()
-                    value = mod.get('value', 0)
-                    
-                    # Check for direct passive bonuses
-                    if (mod_type == 'bonus' and 
-                        f'passive-{skill_name}' in sub_type):
-                        bonus += value or 0
-                    
-                    # Check for general skill bonuses
-                    elif (mod_type == 'bonus' and skill_name in sub_type):
-                        bonus += value or 0
-                        
-                    # Check for Wisdom ability bonuses (affects perception/insight)
-                    elif (mod_type == 'bonus' and 
-                          sub_type == 'wisdom-ability-checks' and 
-                          skill_name in ['perception', 'insight']):
-                        bonus += value or 0
-                        
-                    # Check for Intelligence ability bonuses (affects investigation)
-                    elif (mod_type == 'bonus' and 
-                          sub_type == 'intelligence-ability-checks' and 
-                          skill_name == 'investigation'):
-                        bonus += value or 0
-                        
+        
+        for mod in self.index.modifiers_of('bonus', categories=None):
+            sub_type = mod.get('subType', '').lower()
+            value = mod.get('value', 0)
+            
+            # Check for direct passive bonuses
+            if f'passive-{skill_name}' in sub_type:
+                bonus += value or 0
+            
+            # Check for general skill bonuses
+            elif skill_name in sub_type:
+                bonus += value or 0
+                
+            # Check for Wisdom ability bonuses (affects perception/insight)
+            elif (sub_type == 'wisdom-ability-checks' and 
+                  skill_name in ['perception', 'insight']):
+                bonus += value or 0
+                
+            # Check for Intelligence ability bonuses (affects investigation)
+            elif (sub_type == 'intelligence-ability-checks' and 
+                  skill_name == 'investigation'):
+                bonus += value or 0
+                
         return bonus
     
     def parse_senses(self) -> Senses:
@@ -625,23 +597,18 @@ class DNDBeyondCoreParser:
         - Value is typically range in feet
         """
         senses = {}
-        modifiers = self.data.get('modifiers', {})
-        
-        for category in ['race', 'class', 'background', 'item', 'feat']:
-            mod_list = modifiers.get(category, [])
-            if isinstance(mod_list, list):
-                for mod in mod_list:
-                    if mod.get('type') == 'set-base':
-                        sub_type = mod.get('subType', '').lower()
-                        value = mod.get('value')
-                        
-                        # Check for known sense types
-                        if any(sense in sub_type for sense in ['darkvision', 'blindsight', 'tremorsense', 'truesight']):
-                            sense_name = sub_type.replace('-', '_')
-                            if value:
-                                senses[sense_name] = value
-                            else:
-                                senses[sense_name] = "Present"
+        
+        for mod in self.index.modifiers_of('set-base'):
+            sub_type = mod.get('subType', '').lower()
+            value = mod.get('value')
+            
+            # Check for known sense types
+            if any(sense in sub_type for sense in ['darkvision', 'blindsight', 'tremorsense', 'truesight']):
+                sense_name = sub_type.replace('-', '_')
+                if value:
+                    senses[sense_name] = value
+                else:
+                    senses[sense_name] = "Present"
         
         return Senses(senses=senses)
     
@@ -695,20 +662,7 @@ class DNDBeyondCoreParser:
     
     def _get_ac_bonuses(self) -> int:
         """Get AC bonuses from modifiers."""
-        ac_bonus = 0
-        modifiers = self.data.get('modifiers', {})
-        
-        for category in ['race', 'class', 'background', 'item', 'feat']:
-            mod_list = modifiers.get(category, [])
-            if isinstance(mod_list, list):
-                for mod in mod_list:
-                    if (mod.get('type') == 'bonus' and 
-                        mod.get('subType') == 'armor-class'):
-                        value = mod.get('value', 0)
-                        if value is not None:
-                            ac_bonus += value
-        
-        return ac_bonus
+        return self.index.modifier_total('bonus', 'armor-class')
     
     def parse_all_core_data(self):
         """
@@ -11,11 +11,12 @@ Usage:
 """
 
 import json
-import re
 from typing import Dict, List, Optional, Union, Any
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from src.character_creation.parsing.dndbeyond_index import DndBeyondIndex
+from src.character_creation.parsing.html_text import html_to_text
 from src.rag.character.character_types import (
     FeatureActivation,
     LimitedUse,
@@ -86,32 +87,14 @@ class DNDBeyondFeaturesParser:
         9: "other"
     }
     
-    def __init__(self, json_data: Dict[str, Any]):
-        """Initialize parser with D&D Beyond JSON data."""
+    def __init__(self, json_data: Dict[str, Any], index: Optional[DndBeyondIndex] = None):
+        """Initialize parser with D&D Beyond JSON data (and optionally a shared index of it)."""
         self.data = json_data.get("data", {})
+        self.index = index or DndBeyondIndex(json_data)
         
     def clean_html_description(self, description: str) -> str:
         """Clean HTML tags and format text for readable description."""
-        if not description:
-            return ""
-            
-        # Remove HTML tags
-        clean_text = re.sub(r'<[^>]+>', '', description)
-        
-        # Replace HTML entities
-        clean_text = clean_text.replace('&amp;', '&')
-        clean_text = clean_text.replace('&lt;', '<')
-        clean_text = clean_text.replace('&gt;', '>')
-        clean_text = clean_text.replace('&nbsp;', ' ')
-        clean_text = clean_text.replace('&rsquo;', "'")
-        clean_text = clean_text.replace('&ldquo;', '"')
-        clean_text = clean_text.replace('&rdquo;', '"')
-        
-        # Clean up whitespace
-        clean_text = re.sub(r'\s+', ' ', clean_text)
-        clean_text = clean_text.strip()
-        
-        return clean_text
+        return html_to_text(description)
     
     def parse_racial_traits(self) -> List[RacialTrait]:
         """Parse racial traits from race.racialTraits[]."""
@@ -195,30 +178,16 @@ class DNDBeyondFeaturesParser:
         """Parse class features from classes[] data."""
         class_features_dict = {}
         
-        classes = self.data.get("classes", [])
-        
-        for class_data in classes:
+        # Base class then subclass features of each class, with their required level
+        for class_data, class_features in self.index.class_features:
             class_def = class_data.get("definition", {})
-            subclass_def = class_data.get("subclassDefinition")
             
             class_name = class_def.get("name", "Unknown Class")
             class_level = class_data.get("level", 1)
             
             # Organize features by level they're gained
             features_by_level = {}
-            
-            # Parse base class features
-            class_feature_list = class_def.get("classFeatures", [])
-            self._process_class_feature_list(
-                class_feature_list, features_by_level, class_level
-            )
-            
-            # Parse subclass features if they exist
-            if subclass_def:
-                subclass_feature_list = subclass_def.get("classFeatures", [])
-                self._process_class_feature_list(
-                    subclass_feature_list, features_by_level, class_level
-                )
+            self._process_class_feature_list(class_features, features_by_level, class_level)
             
             class_features_dict[class_name] = features_by_level
             
@@ -226,20 +195,13 @@ class DNDBeyondFeaturesParser:
     
     def _process_class_feature_list(
         self, 
-        feature_list: List[Dict[str, Any]], 
+        feature_list: List[tuple], 
         features_by_level: Dict[int, List[ClassFeature]], 
         max_level: int
     ):
-        """Process a list of class features and organize by level."""
-        for feature_data in feature_list:
-            # Class features may have definition nested or be direct
-            if "definition" in feature_data:
-                definition = feature_data["definition"]
-            else:
-                definition = feature_data
-            
-            required_level = definition.get("requiredLevel", 1)
-            
+        """Process (required level, definition) pairs of class features and organize by level."""
+        seen_names = {}  # level -> feature names already added
+        for required_level, definition in feature_list:
             # Only include features the character has access to
             if required_level > max_level:
                 continue
@@ -250,13 +212,13 @@ class DNDBeyondFeaturesParser:
             if "ability score improvement" in name.lower():
                 continue
                 
-            description = self.clean_html_description(definition.get("description"))
-            
             # Check if we already have this feature at this level to avoid duplicates
-            if required_level in features_by_level:
-                existing_names = [f.name for f in features_by_level[required_level]]
-                if name in existing_names:
-                    continue
+            level_names = seen_names.setdefault(required_level, set())
+            if name in level_names:
+                continue
+            level_names.add(name)
+            
+            description = self.clean_html_description(definition.get("description"))
             
             feature = ClassFeature(
                 name=name,
@@ -272,10 +234,8 @@ class DNDBeyondFeaturesParser:
         """Parse modifiers from modifiers data."""
         parsed_modifiers = {}
         
-        modifiers_data = self.data.get("modifiers", {})
-        
         for category in ["race", "class", "background", "item", "feat", "condition"]:
-            modifiers_list = modifiers_data.get(category, [])
+            modifiers_list = self.index.modifiers_by_category.get(category)
             if not modifiers_list:  # Skip if None or empty
                 continue
             category_modifiers = []
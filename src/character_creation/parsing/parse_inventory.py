@@ -6,11 +6,11 @@ This script creates InventoryItem objects from the character JSON and outputs th
 """
 
 import json
-import re
 from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass, field
 from pathlib import Path
 
+from src.character_creation.parsing.html_text import html_to_text, ENTITIES_NONE
 from src.rag.character.character_types import (
     ItemModifier,
     LimitedUse,
@@ -23,8 +23,13 @@ from src.rag.character.character_types import (
 class DNDBeyondInventoryParser:
     """Parser for D&D Beyond inventory data."""
     
-    def __init__(self, json_data: Dict[str, Any]):
-        """Initialize with D&D Beyond JSON data."""
+    def __init__(self, json_data: Dict[str, Any], index: Optional[Any] = None):
+        """
+        Initialize with D&D Beyond JSON data.
+        
+        `index` (a DndBeyondIndex) is accepted like by the other parsers but not needed:
+        the inventory is read in a single pass.
+        """
         self.json_data = json_data
     
     def parse_inventory(self) -> Inventory:
@@ -172,16 +177,7 @@ def clean_html(text: str) -> str:
     """Clean HTML tags and formatting from text."""
     if not text:
         return text
-    
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    
-    # Clean up extra whitespace and line breaks
-    text = re.sub(r'\r\n', ' ', text)
-    text = re.sub(r'\n', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
-    
-    return text.strip()
+    return html_to_text(text, ENTITIES_NONE)
 
 
 def should_include_field(key: str, value: Any) -> bool:
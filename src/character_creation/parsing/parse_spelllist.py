@@ -17,10 +17,10 @@ Features:
 import json
 from pathlib import Path
 from typing import Dict, List, Optional, Union, Any
-import re
-from html import unescape
 
 # Import the character types
+from src.character_creation.parsing.dndbeyond_index import DndBeyondIndex
+from src.character_creation.parsing.html_text import html_to_text, ENTITIES_ALL
 from src.rag.character.character_types import (
     SpellComponents, SpellRite, Spell, SpellcastingInfo, SpellList
 )
@@ -74,10 +74,11 @@ class DNDBeyondSpellParser:
         "Transmutation": "Transmutation"
     }
     
-    def __init__(self, json_data: Dict[str, Any]):
-        """Initialize with D&D Beyond JSON data."""
+    def __init__(self, json_data: Dict[str, Any], index: Optional[DndBeyondIndex] = None):
+        """Initialize with D&D Beyond JSON data (and optionally a shared index of it)."""
         self.json_data = json_data
         self.data = json_data.get("data", {})
+        self.index = index or DndBeyondIndex(json_data)
     
     def parse_all_spells(self) -> SpellList:
         """Parse all spells from D&D Beyond JSON and return SpellList object."""
@@ -85,16 +86,7 @@ class DNDBeyondSpellParser:
     
     def _clean_html(self, text: str) -> str:
         """Clean HTML tags and decode HTML entities from text."""
-        if not text:
-            return ""
-        
-        # Remove HTML tags
-        clean = re.sub(r'<[^>]+>', '', text)
-        # Decode HTML entities
-        clean = unescape(clean)
-        # Clean up extra whitespace
-        clean = re.sub(r'\s+', ' ', clean).strip()
-        return clean
+        return html_to_text(text, ENTITIES_ALL)
     
     def _parse_spell_components(self, components: List[int], components_description: str = "") -> SpellComponents:
         """Parse spell components from component array and description."""
@@ -287,16 +279,14 @@ class DNDBeyondSpellParser:
     def _get_ability_score(self, ability_id: int) -> int:
         """Get ability score, checking overrides first."""
         # Check overrideStats first
-        override_stats = self.data.get("overrideStats", [])
-        for stat in override_stats:
-            if stat.get("id") == ability_id and stat.get("value") is not None:
-                return stat["value"]
+        override = self.index.override_stats_by_id.get(ability_id)
+        if override is not None:
+            return override["value"]
         
         # Fall back to base stats
-        stats = self.data.get("stats", [])
-        for stat in stats:
-            if stat.get("id") == ability_id:
-                return stat.get("value", 10)
+        stat = self.index.stats_by_id.get(ability_id)
+        if stat is not None:
+            return stat.get("value", 10)
         
         return 10  # Default
     
@@ -320,7 +310,7 @@ class DNDBeyondSpellParser:
         ability_modifier = self._calculate_ability_modifier(ability_score)
         
         # Calculate total level for proficiency bonus
-        total_level = sum(cls.get("level", 1) for cls in self.data.get("classes", []))
+        total_level = self.index.total_level
         proficiency_bonus = self._calculate_proficiency_bonus(total_level)
         
         # Calculate save DC and attack bonus
@@ -396,16 +386,9 @@ class DNDBeyondSpellParser:
         """Parse D&D Beyond JSON data and create SpellList object."""
         # Parse spellcasting info for each class
         spellcasting_info = {}
-        classes = self.data.get("classes", [])
-        
-        # Create class ID to name mapping
-        class_id_to_name = {}
-        for class_data in classes:
-            class_def = class_data.get("definition", {})
-            class_name = class_def.get("name", "Unknown")
-            class_id = class_data.get("id")
-            if class_id:
-                class_id_to_name[class_id] = class_name
+        
+        for class_data in self.index.classes:
+            class_name = class_data.get("definition", {}).get("name", "Unknown")
             
             # Parse spellcasting info if class can cast spells
             spell_info = self._parse_spellcasting_info(class_data)
@@ -416,11 +399,9 @@ class DNDBeyondSpellParser:
         spells_by_class = {}
         
         # Get spells from classSpells section (most accurate for class organization)
-        class_spells_data = self.data.get("classSpells", [])
-        
-        for class_spell_data in class_spells_data:
-            character_class_id = class_spell_data.get("characterClassId")
-            class_name = class_id_to_name.get(character_class_id, "Unknown")
+        for class_spell_data in self.index.class_spells:
+            class_data = self.index.classes_by_id.get(class_spell_data.get("characterClassId"))
+            class_name = class_data.get("definition", {}).get("name", "Unknown") if class_data else "Unknown"
             
             # Only process if this class can cast spells
             if class_name not in spellcasting_info:
@@ -463,10 +444,10 @@ class DNDBeyondSpellParser:
         
         # Also parse spells from other sources (race, item, feat, background)
         other_spells = []
-        spells_data = self.data.get("spells", {})
+        spells_by_source = self.index.spells_by_source
         
         for source in ["race", "item", "feat"]:
-            source_spells = spells_data.get(source, [])
+            source_spells = spells_by_source.get(source, [])
             for spell_data in source_spells:
                 try:
                     spell = self._parse_spell_from_definition(spell_data)
@@ -481,7 +462,7 @@ class DNDBeyondSpellParser:
                     continue
         
         # Background spells (may be null)
-        bg_spells = spells_data.get("background")
+        bg_spells = spells_by_source.get("background")
         if bg_spells:
             for spell_data in bg_spells:
                 try:
@@ -5,6 +5,7 @@ Centralized configuration for embedding models, API keys, and system settings
 from typing import Literal, Optional
 from dataclasses import dataclass
 import os
+import re
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -61,6 +62,48 @@ AnthropicModel = Literal[
     "claude-3-haiku-20240307"     # Claude 3 Haiku
 ]
 
+# Model pricing in USD per 1M tokens: (input, cached input, output)
+# Matched by exact name, or by name plus a snapshot suffix (-2024-08-06, -20250929,
+# -0613, -latest). Other names are unpriced rather than priced like a shorter name
+# (gpt-4.1-mini is not gpt-4). Local models ("local-*") are free.
+# Anthropic cache writes are billed as regular input here.
+MODEL_PRICING = {
+    # OpenAI
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4-turbo": (10.00, 10.00, 30.00),
+    "gpt-4": (30.00, 30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 0.50, 1.50),
+    "gpt-3.5-turbo-16k": (3.00, 3.00, 4.00),
+    "o1": (15.00, 7.50, 60.00),
+    "o1-mini": (1.10, 0.55, 4.40),
+    "o3": (2.00, 0.50, 8.00),
+    "o3-mini": (1.10, 0.55, 4.40),
+    "o4-mini": (1.10, 0.275, 4.40),
+    "gpt-5": (1.25, 0.125, 10.00),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    # Anthropic
+    "claude-opus-4-1": (15.00, 1.50, 75.00),
+    "claude-opus-4-0": (15.00, 1.50, 75.00),
+    "claude-opus-4": (15.00, 1.50, 75.00),
+    "claude-haiku-4-5": (1.00, 0.10, 5.00),
+    "claude-sonnet-4-5": (3.00, 0.30, 15.00),
+    "claude-sonnet-4-0": (3.00, 0.30, 15.00),
+    "claude-sonnet-4": (3.00, 0.30, 15.00),
+    "claude-3-7-sonnet": (3.00, 0.30, 15.00),
+    "claude-3-5-haiku": (0.80, 0.08, 4.00),
+    "claude-3-5-sonnet": (3.00, 0.30, 15.00),
+    "claude-3-opus": (15.00, 1.50, 75.00),
+    "claude-3-haiku": (0.25, 0.03, 1.25),
+}
+LOCAL_MODEL_PRICING = (0.0, 0.0, 0.0)
+
+_SNAPSHOT_SUFFIX = re.compile(r'-(?:\d{4}-\d{2}-\d{2}|\d{8}|\d{4}|latest)$')
+
 
 @dataclass
 class RAGConfig:
@@ -71,7 +114,7 @@ class RAGConfig:
     anthropic_api_key: Optional[str] = None
     
     # LLM Client Settings
-    primary_llm_provider: str = "anthropic"  # "openai" or "anthropic"
+    primary_llm_provider: str = "anthropic"  # "openai", "anthropic" or "local"
     router_llm_provider: str = "anthropic"   # Provider for router decisions
     final_response_llm_provider: str = "anthropic"  # Provider for final response
 
@@ -84,8 +127,13 @@ class RAGConfig:
     anthropic_router_model: str = "claude-haiku-4-5"   # Latest Claude 4.5 Haiku - Fast, cost-effective for routing
     anthropic_final_model: str = "claude-sonnet-4-5"    # Latest Claude 4.5 Sonnet - Default response model
     
+    # Local Models (deterministic stand-ins, no API key or network needed)
+    local_router_model: str = "local-router"
+    local_final_model: str = "local-final"
+    
     # Embedding Model Settings
     embedding_model: EmbeddingModel = "text-embedding-3-small"  # Default: fast and good
+    embedding_provider: str = "openai"  # "openai" or "local" (hashed bag-of-words vectors)
     
     # LLM Generation Settings
     # Router LLM Settings (fast, cheaper models for routing decisions)
@@ -106,9 +154,33 @@ class RAGConfig:
     # Caching Settings
     embedding_cache_size: int = 1000
     
+    # Character Creation Settings
+    item_spell_concurrency: int = 4             # Concurrent LLM extractions of magic-item spells per character
+    item_spell_cache_size: int = 512            # Extracted item spells kept per process (keyed by item content)
+    llm_parse_cache_enabled: bool = True        # Reuse LLM parse results of unchanged character sections
+    llm_parse_cache_dir: str = "knowledge_base/llm_parse_cache"
+    
     # Local Model Settings (if using local models)
     local_model_device: str = "cpu"  # or "cuda" if GPU available
     
+    # Local Provider Latency Simulation (used by the "local" LLM provider)
+    local_latency_distribution: str = "normal"  # "fixed", "uniform", "normal" or "lognormal"
+    local_latency_ms: float = 300.0             # Median time to first token / full JSON response
+    local_latency_jitter_ms: float = 75.0       # Spread around local_latency_ms
+    local_tail_probability: float = 0.0         # Chance of adding local_tail_latency_ms (simulated slow requests)
+    local_tail_latency_ms: float = 1500.0
+    local_tokens_per_second: float = 60.0       # Streaming rate for generate_response_stream
+    local_response_tokens: int = 120            # Approximate length of generated final responses
+    local_embedding_latency_ms: float = 0.0     # Per-call latency for local embeddings
+    local_seed: int = 0                         # Seed for the latency generator
+    
+    # Tracing & Debug Output
+    tracing_exporters: str = ""                 # Comma-separated: "memory", "jsonl", "otlp" (empty = disabled)
+    tracing_jsonl_path: str = "logs/traces.jsonl"
+    tracing_otlp_path: str = "logs/traces.otlp.jsonl"
+    tracing_ring_buffer_size: int = 2000
+    debug_logging: bool = False                 # Print pipeline debug lines (🔧 DEBUG ...)
+    
     def __post_init__(self):
         """Validate API keys after initialization"""
         # Only require the API key for the providers you're actually using
@@ -145,9 +217,12 @@ class RAGConfig:
             openai_final_model=os.getenv('RAG_OPENAI_FINAL_MODEL', 'gpt-4o'),
             anthropic_router_model=os.getenv('RAG_ANTHROPIC_ROUTER_MODEL', 'claude-haiku-4-5'),
             anthropic_final_model=os.getenv('RAG_ANTHROPIC_FINAL_MODEL', 'claude-sonnet-4-5'),
+            local_router_model=os.getenv('RAG_LOCAL_ROUTER_MODEL', 'local-router'),
+            local_final_model=os.getenv('RAG_LOCAL_FINAL_MODEL', 'local-final'),
             
             # Embedding and Query Settings
             embedding_model=os.getenv('RAG_EMBEDDING_MODEL', 'text-embedding-3-small'),
+            embedding_provider=os.getenv('RAG_EMBEDDING_PROVIDER', 'openai'),
             
             # LLM Generation Settings
             router_temperature=float(os.getenv('RAG_ROUTER_TEMPERATURE', '0.3')),
@@ -161,7 +236,29 @@ class RAGConfig:
             entity_boost_weight=float(os.getenv('RAG_ENTITY_BOOST_WEIGHT', '0.25')),
             context_hint_weight=float(os.getenv('RAG_CONTEXT_HINT_WEIGHT', '0.15')),
             embedding_cache_size=int(os.getenv('RAG_CACHE_SIZE', '1000')),
-            local_model_device=os.getenv('RAG_LOCAL_DEVICE', 'cpu')
+            item_spell_concurrency=int(os.getenv('RAG_ITEM_SPELL_CONCURRENCY', '4')),
+            item_spell_cache_size=int(os.getenv('RAG_ITEM_SPELL_CACHE_SIZE', '512')),
+            llm_parse_cache_enabled=os.getenv('RAG_LLM_PARSE_CACHE', 'true').lower() in ('1', 'true', 'yes'),
+            llm_parse_cache_dir=os.getenv('RAG_LLM_PARSE_CACHE_DIR', 'knowledge_base/llm_parse_cache'),
+            local_model_device=os.getenv('RAG_LOCAL_DEVICE', 'cpu'),
+            
+            # Local Provider Latency Simulation
+            local_latency_distribution=os.getenv('RAG_LOCAL_LATENCY_DISTRIBUTION', 'normal'),
+            local_latency_ms=float(os.getenv('RAG_LOCAL_LATENCY_MS', '300')),
+            local_latency_jitter_ms=float(os.getenv('RAG_LOCAL_LATENCY_JITTER_MS', '75')),
+            local_tail_probability=float(os.getenv('RAG_LOCAL_TAIL_PROBABILITY', '0')),
+            local_tail_latency_ms=float(os.getenv('RAG_LOCAL_TAIL_LATENCY_MS', '1500')),
+            local_tokens_per_second=float(os.getenv('RAG_LOCAL_TOKENS_PER_SECOND', '60')),
+            local_response_tokens=int(os.getenv('RAG_LOCAL_RESPONSE_TOKENS', '120')),
+            local_embedding_latency_ms=float(os.getenv('RAG_LOCAL_EMBEDDING_LATENCY_MS', '0')),
+            local_seed=int(os.getenv('RAG_LOCAL_SEED', '0')),
+            
+            # Tracing & Debug Output
+            tracing_exporters=os.getenv('RAG_TRACING_EXPORTERS', ''),
+            tracing_jsonl_path=os.getenv('RAG_TRACING_JSONL_PATH', 'logs/traces.jsonl'),
+            tracing_otlp_path=os.getenv('RAG_TRACING_OTLP_PATH', 'logs/traces.otlp.jsonl'),
+            tracing_ring_buffer_size=int(os.getenv('RAG_TRACING_RING_BUFFER_SIZE', '2000')),
+            debug_logging=os.getenv('RAG_DEBUG_LOGGING', 'false').lower() in ('1', 'true', 'yes')
         )
     
     @classmethod
@@ -244,12 +341,38 @@ class RAGConfig:
             ]
         }
     
+    def get_model_pricing(self, model: Optional[str]) -> Optional[tuple]:
+        """Get (input, cached input, output) USD per 1M tokens for a model, or None if unknown"""
+        if not model:
+            return None
+        if model in MODEL_PRICING:
+            return MODEL_PRICING[model]
+        if model.startswith("local-"):
+            return LOCAL_MODEL_PRICING
+        # Dated snapshot of a known model
+        return MODEL_PRICING.get(_SNAPSHOT_SUFFIX.sub('', model))
+
+    def get_router_model(self, provider: Optional[str] = None) -> str:
+        """Get the router model name for a provider (defaults to router_llm_provider)"""
+        provider = provider or self.router_llm_provider
+        if provider == "openai":
+            return self.openai_router_model
+        if provider == "local":
+            return self.local_router_model
+        return self.anthropic_router_model
+    
+    def get_final_model(self, provider: Optional[str] = None) -> str:
+        """Get the final response model name for a provider (defaults to final_response_llm_provider)"""
+        provider = provider or self.final_response_llm_provider
+        if provider == "openai":
+            return self.openai_final_model
+        if provider == "local":
+            return self.local_final_model
+        return self.anthropic_final_model
+    
     def get_router_llm_params(self, model: Optional[str] = None) -> dict:
         """Get LLM parameters for router calls (fast, cheaper models)"""
-        model = model or (
-            self.openai_router_model if self.router_llm_provider == "openai" 
-            else self.anthropic_router_model
-        )
+        model = model or self.get_router_model()
         
         if self.is_reasoning_model(model):
             # Reasoning models don't support temperature
@@ -265,10 +388,7 @@ class RAGConfig:
     
     def get_final_llm_params(self, model: Optional[str] = None) -> dict:
         """Get LLM parameters for final response calls (higher quality models)"""
-        model = model or (
-            self.openai_final_model if self.final_response_llm_provider == "openai" 
-            else self.anthropic_final_model
-        )
+        model = model or self.get_final_model()
         
         if self.is_reasoning_model(model):
             # Reasoning models don't support temperature
@@ -341,7 +341,10 @@ IMPORTANT: Return valid JSON only. Empty array [] if no entities found. No expla
         if "character" in raw_results and raw_results["character"]:
             char_result = raw_results["character"]
             
-            if hasattr(char_result, 'character_data') and char_result.character_data:
+            if getattr(char_result, 'character_json', None):
+                # Prebuilt compact JSON from the character snapshot - no re-serialization per query
+                context_sections.append(f"CHARACTER INFORMATION:\n{char_result.character_json}")
+            elif hasattr(char_result, 'character_data') and char_result.character_data:
                 try:
                     def custom_serializer(obj):
                         """Custom serializer for complex objects"""
@@ -9,6 +9,9 @@ from openai import AsyncOpenAI
 from anthropic import AsyncAnthropic
 
 from ..config import get_config
+from ..utils.tracing import traced
+from ..utils.metrics import measured_llm_call
+from .usage import LLMUsage, conversation_text
 
 
 @dataclass
@@ -17,6 +20,7 @@ class LLMResponse:
     success: bool = True
     error: Optional[str] = None
     model_used: Optional[str] = None
+    usage: Optional[LLMUsage] = None
 
 
 class LLMClient(ABC):
@@ -51,7 +55,10 @@ class OpenAILLMClient(LLMClient):
             
         self.client = AsyncOpenAI(api_key=self.api_key)
 
+    @traced("llm.generate_response", provider="openai")
+    @measured_llm_call("generate_response", "openai")
     async def generate_response(self, prompt: str, **kwargs) -> LLMResponse:
+        usage = LLMUsage.start("openai", kwargs.get("model", self.default_model), "generate_response")
         try:
             model = kwargs.get("model", self.default_model)
             cfg = get_config()
@@ -83,11 +90,15 @@ class OpenAILLMClient(LLMClient):
                     base_params["stop"] = stop
 
             resp = await self.client.chat.completions.create(**base_params)
+            usage.add_tokens_from(resp.usage)
             content = resp.choices[0].message.content or ""
-            return LLMResponse(content=content, model_used=model)
+            return LLMResponse(content=content, model_used=model, usage=usage.finish())
         except Exception as e:
-            return LLMResponse(content="", success=False, error=str(e), model_used=kwargs.get("model", self.default_model))
+            return LLMResponse(content="", success=False, error=str(e), model_used=kwargs.get("model", self.default_model),
+                               usage=usage.finish())
 
+    @traced("llm.generate_response_stream", provider="openai")
+    @measured_llm_call("generate_response_stream", "openai")
     async def generate_response_stream(self, prompt: str, **kwargs) -> AsyncGenerator[str, None]:
         """
         Stream response chunks from OpenAI.
@@ -98,6 +109,10 @@ class OpenAILLMClient(LLMClient):
             conversation_history: Optional list of previous conversation turns
             **kwargs: Additional parameters
         """
+        usage = LLMUsage.start("openai", kwargs.get("model", self.default_model), "generate_response_stream")
+        output = []
+        reported = False
+        max_output_tokens = None
         try:
             model = kwargs.get("model", self.default_model)
             cfg = get_config()
@@ -120,7 +135,8 @@ class OpenAILLMClient(LLMClient):
             base_params = {
                 "model": model,
                 "messages": messages,
-                "stream": True
+                "stream": True,
+                "stream_options": {"include_usage": True}  # Final chunk carries token usage
             }
             
             # Add parameters based on model type
@@ -128,7 +144,7 @@ class OpenAILLMClient(LLMClient):
                 # Reasoning models - no temperature/max_tokens
                 max_completion_tokens = kwargs.get("max_completion_tokens", 2000)
                 if max_completion_tokens:
-                    base_params["max_completion_tokens"] = max_completion_tokens
+                    base_params["max_completion_tokens"] = max_output_tokens = max_completion_tokens
                     
                 stop = kwargs.get("stop")
                 if stop:
@@ -136,20 +152,36 @@ class OpenAILLMClient(LLMClient):
             else:
                 # Standard models - support temperature and max_tokens
                 base_params["temperature"] = kwargs.get("temperature", 0.3)
-                base_params["max_tokens"] = kwargs.get("max_tokens", 2000)
+                base_params["max_tokens"] = max_output_tokens = kwargs.get("max_tokens", 2000)
                 
                 stop = kwargs.get("stop")
                 if stop:
                     base_params["stop"] = stop
 
             stream = await self.client.chat.completions.create(**base_params)
-            async for chunk in stream:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+            # Closing the response when the caller stops early makes OpenAI stop generating
+            async with stream:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        usage.mark_first_token()
+                        output.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+                    if getattr(chunk, "usage", None):
+                        reported = usage.add_tokens_from(chunk.usage)
                     
+        except (GeneratorExit, asyncio.CancelledError):
+            # The provider says nothing about the rest of the answer: estimate it from completed streams
+            usage.cancel(max_output_tokens=max_output_tokens)
+            raise
         except Exception as e:
             yield f"\n[Error: {str(e)}]"
+        finally:
+            if not reported:
+                usage.estimate_tokens(conversation_text(prompt, kwargs.get("conversation_history")), "".join(output))
+            usage.finish()
 
+    @traced("llm.generate_json_response", provider="openai")
+    @measured_llm_call("generate_json_response", "openai")
     async def generate_json_response(self, prompt: str, **kwargs) -> Dict[str, Any]:
         """
         Prefer OpenAI JSON mode for well-formed JSON.
@@ -158,6 +190,7 @@ class OpenAILLMClient(LLMClient):
         """
         model = kwargs.get("model", self.default_model)
         cfg = get_config()
+        usage = LLMUsage.start("openai", model, "generate_json_response")
         
         try:
             # Base parameters
@@ -179,6 +212,7 @@ class OpenAILLMClient(LLMClient):
                 base_params["temperature"] = kwargs.get("temperature", 0)
 
             resp = await self.client.chat.completions.create(**base_params)
+            usage.add_tokens_from(resp.usage)
             raw = resp.choices[0].message.content or "{}"
             return json.loads(raw)
         except Exception:
@@ -199,9 +233,12 @@ class OpenAILLMClient(LLMClient):
                     fallback_params["temperature"] = kwargs.get("temperature", 0)
                 
                 fallback = await self.client.chat.completions.create(**fallback_params)
+                usage.add_tokens_from(fallback.usage)
                 return json.loads(fallback.choices[0].message.content or "{}")
             except Exception as e2:
                 return {"error": str(e2)}
+        finally:
+            usage.finish()
 
 
 class AnthropicLLMClient(LLMClient):
@@ -227,7 +264,10 @@ class AnthropicLLMClient(LLMClient):
             
         self.client = AsyncAnthropic(api_key=self.api_key)
 
+    @traced("llm.generate_response", provider="anthropic")
+    @measured_llm_call("generate_response", "anthropic")
     async def generate_response(self, prompt: str, **kwargs) -> LLMResponse:
+        usage = LLMUsage.start("anthropic", kwargs.get("model", self.default_model), "generate_response")
         try:
             model = kwargs.get("model", self.default_model)
             max_tokens = kwargs.get("max_tokens", 2000)
@@ -241,16 +281,20 @@ class AnthropicLLMClient(LLMClient):
                 stop_sequences=stop if isinstance(stop, list) else ([stop] if stop else None),
                 messages=[{"role": "user", "content": prompt}]
             )
+            usage.add_tokens_from(msg.usage)
             # Claude returns a list of content blocks; pick first text block
             text = ""
             for block in msg.content:
                 if getattr(block, "type", None) == "text" and hasattr(block, "text"):
                     text = block.text
                     break
-            return LLMResponse(content=text, model_used=model)
+            return LLMResponse(content=text, model_used=model, usage=usage.finish())
         except Exception as e:
-            return LLMResponse(content="", success=False, error=str(e), model_used=kwargs.get("model", self.default_model))
+            return LLMResponse(content="", success=False, error=str(e), model_used=kwargs.get("model", self.default_model),
+                               usage=usage.finish())
 
+    @traced("llm.generate_response_stream", provider="anthropic")
+    @measured_llm_call("generate_response_stream", "anthropic")
     async def generate_response_stream(self, prompt: str, **kwargs) -> AsyncGenerator[str, None]:
         """
         Stream response chunks from Anthropic.
@@ -261,9 +305,12 @@ class AnthropicLLMClient(LLMClient):
             conversation_history: Optional list of previous conversation turns
             **kwargs: Additional parameters
         """
+        usage = LLMUsage.start("anthropic", kwargs.get("model", self.default_model), "generate_response_stream")
+        output = []
+        reported = False
+        max_tokens = kwargs.get("max_tokens", 2000)
         try:
             model = kwargs.get("model", self.default_model)
-            max_tokens = kwargs.get("max_tokens", 2000)
             temperature = kwargs.get("temperature", 0.3)
             stop = kwargs.get("stop")
             conversation_history = kwargs.get("conversation_history", [])
@@ -288,12 +335,26 @@ class AnthropicLLMClient(LLMClient):
                 stop_sequences=stop if isinstance(stop, list) else ([stop] if stop else None),
                 messages=messages
             ) as stream:
+                # Leaving the block early closes the response, which stops the generation
                 async for text in stream.text_stream:
+                    usage.mark_first_token()
+                    output.append(text)
                     yield text
+                final_message = await stream.get_final_message()
+                reported = usage.add_tokens_from(final_message.usage)
                     
+        except (GeneratorExit, asyncio.CancelledError):
+            usage.cancel(max_output_tokens=max_tokens)
+            raise
         except Exception as e:
             yield f"\n[Error: {str(e)}]"
+        finally:
+            if not reported:
+                usage.estimate_tokens(conversation_text(prompt, kwargs.get("conversation_history")), "".join(output))
+            usage.finish()
 
+    @traced("llm.generate_json_response", provider="anthropic")
+    @measured_llm_call("generate_json_response", "anthropic")
     async def generate_json_response(self, prompt: str, **kwargs) -> Dict[str, Any]:
         """
         Defaults to tool-based structured output for reliable JSON (recommended).
@@ -304,6 +365,7 @@ class AnthropicLLMClient(LLMClient):
         json_schema = kwargs.get("json_schema")
         max_tokens = kwargs.get("max_tokens", 2000)
         use_prompt_only = kwargs.get("use_prompt_only", False)
+        usage = LLMUsage.start("anthropic", model, "generate_json_response")
 
         try:
             if not use_prompt_only:
@@ -330,6 +392,7 @@ class AnthropicLLMClient(LLMClient):
                     tool_choice=tool_choice,
                     messages=[{"role": "user", "content": prompt}]
                 )
+                usage.add_tokens_from(msg.usage)
                 # Extract tool call arguments
                 for block in msg.content:
                     if block.type == "tool_use" and block.name == "return_json":
@@ -347,6 +410,7 @@ class AnthropicLLMClient(LLMClient):
                 temperature=0,
                 messages=[{"role": "user", "content": f"{prompt}\n\n{strict_prompt}"}]
             )
+            usage.add_tokens_from(msg.usage)
             raw = ""
             for block in msg.content:
                 if getattr(block, "type", None) == "text":
@@ -355,6 +419,8 @@ class AnthropicLLMClient(LLMClient):
             return json.loads(raw)
         except Exception as e:
             return {"error": str(e)}
+        finally:
+            usage.finish()
 
 
 class LLMClientFactory:
@@ -364,7 +430,7 @@ class LLMClientFactory:
         Create an LLM client with config-driven model selection.
         
         Args:
-            provider: "openai" or "anthropic"
+            provider: "openai", "anthropic" or "local" (deterministic, no API key)
             use_router_model: If True, use router model from config, otherwise use final model
             **kwargs: Additional arguments to pass to client constructor
         """
@@ -373,6 +439,9 @@ class LLMClientFactory:
             return OpenAILLMClient(use_router_model=use_router_model, **kwargs)
         if p == "anthropic":
             return AnthropicLLMClient(use_router_model=use_router_model, **kwargs)
+        if p == "local":
+            from .local_llm_client import LocalLLMClient  # Import here to avoid circular import
+            return LocalLLMClient(use_router_model=use_router_model, **kwargs)
         raise ValueError(f"Unsupported LLM provider: {provider}")
 
     @staticmethod
@@ -404,5 +473,10 @@ class LLMClientFactory:
         if cfg.anthropic_api_key:
             out["anthropic"] = AnthropicLLMClient(use_router_model=False)  # Final model
             out["anthropic_router"] = AnthropicLLMClient(use_router_model=True)  # Router model
+        
+        providers = {cfg.primary_llm_provider, cfg.router_llm_provider, cfg.final_response_llm_provider}
+        if "local" in providers:
+            out["local"] = LLMClientFactory.create_client("local", use_router_model=False)
+            out["local_router"] = LLMClientFactory.create_client("local", use_router_model=True)
             
         return out
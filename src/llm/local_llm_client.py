@@ -0,0 +1,306 @@
+"""
+Local LLM Client
+
+Deterministic, network-free stand-in for the OpenAI/Anthropic clients.
+Produces schema-valid tool selector and entity extractor JSON, synthetic final
+responses and hashed bag-of-words embeddings, with configurable latency and
+streaming rates so the full pipeline can be load tested offline.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Any, AsyncGenerator, List, Tuple
+
+from .llm_client import LLMClient, LLMResponse
+from .usage import LLMUsage, conversation_text, estimate_tokens
+from ..config import get_config
+from ..utils.tracing import traced
+from ..utils.metrics import measured_llm_call
+
+
+# Prompt markers used by CentralPromptManager
+_CURRENT_QUERY_RE = re.compile(r'^Current Query: "(.*)"\s*$', re.MULTILINE)
+_USER_QUESTION_RE = re.compile(r'^USER QUESTION: (.*)$', re.MULTILINE)
+_AVAILABLE_INFO_RE = re.compile(r'AVAILABLE INFORMATION:\n(.*?)\n\nUSER QUESTION:', re.DOTALL)
+
+# Capitalized phrases ("Eldaryth of Regret", "Elara") and quoted names
+_ENTITY_RE = re.compile(r"\b[A-Z][\w'\-]*(?:\s+(?:of|the|de|von)\s+[A-Z][\w'\-]*|\s+[A-Z][\w'\-]*)*")
+_QUOTED_RE = re.compile(r'"([^"]{2,60})"|\'([^\']{2,60})\'')
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+_ENTITY_STOPWORDS = {
+    "what", "how", "who", "whom", "where", "when", "why", "which", "tell", "i", "i'm", "i've",
+    "can", "could", "does", "do", "did", "is", "are", "was", "were", "the", "my", "remind",
+    "give", "list", "show", "explain", "describe", "ac", "hp", "xp", "dc", "d&d", "dnd",
+    "please", "should", "would", "will", "if", "and", "or", "a", "an", "any", "all",
+}
+
+# (tool, keywords, default intention, [(intention, keywords), ...]) - first keyword hit wins
+_TOOL_RULES: List[Tuple[str, Tuple[str, ...], str, List[Tuple[str, Tuple[str, ...]]]]] = [
+    ("character_data",
+     ("my ", " i ", "i'm", " me ", "inventory", "character", "stats", "level"),
+     "character_basics",
+     [
+         ("inventory_info", ("inventory", "item", "carry", "weapon", "gold", "equipment", "backpack", "armor i")),
+         ("magic_info", ("spell", "cantrip", "slot", "magic")),
+         ("combat_info", (" ac", "armor class", "attack", " hp", "hit points", "damage", "initiative", "combat")),
+         ("abilities_info", ("ability", "abilities", "skill", "proficien", "feature", "trait", "strength",
+                             "dexterity", "constitution", "intelligence", "wisdom", "charisma")),
+         ("story_info", ("backstory", "family", "past", "history", "story")),
+         ("social_info", ("ally", "allies", "enemy", "enemies", "organization", "faction")),
+         ("progress_info", ("objective", "contract", "quest", "experience", "xp")),
+     ]),
+    ("session_notes",
+     ("session", "last time", "happened", "remember", "remind", "who is", "who was", "npc",
+      "we ", "party", "campaign"),
+     "event_sequence",
+     [
+         ("npc_info", ("who is", "who was", "npc")),
+         ("location_details", ("where", "location", "city", "town")),
+         ("quest_tracking", ("quest", "mission")),
+         ("combat_recap", ("fight", "battle", "combat")),
+         ("loot_rewards", ("loot", "reward", "treasure")),
+     ]),
+    ("rulebook",
+     ("how does", "how do", "rule", "what happens", "work", "mechanic", "condition",
+      "can a", "difference between", "what does"),
+     "rule_mechanics",
+     [
+         ("condition_effects", ("poisoned", "stunned", "prone", "grappled", "frightened", "charmed",
+                                "paralyzed", "restrained", "blinded", "condition")),
+         ("rest_mechanics", ("short rest", "long rest", "resting")),
+         ("spell_details", ("spell", "cantrip")),
+         ("compare_entities", ("difference between", " vs ", "versus")),
+         ("action_options", ("my turn", "bonus action", "reaction", "action")),
+         ("saving_throws", ("saving throw", "save")),
+         ("multiclass_rules", ("multiclass",)),
+     ]),
+]
+
+
+@dataclass
+class LocalLatencyProfile:
+    """Latency model for the local provider (all values in milliseconds)"""
+    distribution: str = "normal"    # "fixed", "uniform", "normal" or "lognormal"
+    latency_ms: float = 300.0       # Median latency
+    jitter_ms: float = 75.0         # Spread around latency_ms
+    tail_probability: float = 0.0   # Chance of adding tail_latency_ms
+    tail_latency_ms: float = 1500.0
+    tokens_per_second: float = 60.0
+
+    @classmethod
+    def from_config(cls) -> 'LocalLatencyProfile':
+        cfg = get_config()
+        return cls(
+            distribution=cfg.local_latency_distribution,
+            latency_ms=cfg.local_latency_ms,
+            jitter_ms=cfg.local_latency_jitter_ms,
+            tail_probability=cfg.local_tail_probability,
+            tail_latency_ms=cfg.local_tail_latency_ms,
+            tokens_per_second=cfg.local_tokens_per_second,
+        )
+
+    def sample_ms(self, rng: random.Random) -> float:
+        """Draw one latency sample"""
+        if self.distribution == "fixed" or self.jitter_ms <= 0:
+            value = self.latency_ms
+        elif self.distribution == "uniform":
+            value = rng.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+        elif self.distribution == "lognormal" and self.latency_ms > 0:
+            value = rng.lognormvariate(math.log(self.latency_ms), self.jitter_ms / self.latency_ms)
+        else:
+            value = rng.gauss(self.latency_ms, self.jitter_ms)
+        if self.tail_probability > 0 and rng.random() < self.tail_probability:
+            value += self.tail_latency_ms
+        return max(0.0, value)
+
+
+class LocalEmbeddingClient:
+    """
+    Deterministic embeddings via feature hashing.
+    Texts sharing words get similar vectors, so cosine ranking stays meaningful enough
+    for load tests without calling an embedding API.
+    """
+
+    def __init__(self, dimensions: Optional[int] = None, latency_ms: Optional[float] = None):
+        cfg = get_config()
+        self.dimensions = dimensions or cfg.get_embedding_dimensions()
+        self.latency_ms = cfg.local_embedding_latency_ms if latency_ms is None else latency_ms
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], 'little') % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm:
+            vector = [v / norm for v in vector]
+        return vector
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts (one simulated API call)"""
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+        return [self.embed_one(text) for text in texts]
+
+
+class LocalLLMClient(LLMClient):
+    """
+    Local deterministic client (async).
+    - Tool selector / entity extractor prompts get schema-valid JSON derived from the query text.
+    - Final response prompts get a synthetic answer seeded by the prompt hash.
+    - Latency and streaming rate come from LocalLatencyProfile (config.py local_* settings).
+    """
+    def __init__(self, default_model: Optional[str] = None, use_router_model: bool = False,
+                 latency: Optional[LocalLatencyProfile] = None, seed: Optional[int] = None):
+        cfg = get_config()
+        if default_model:
+            self.default_model = default_model
+        elif use_router_model:
+            self.default_model = cfg.local_router_model
+        else:
+            self.default_model = cfg.local_final_model
+
+        self.latency = latency or LocalLatencyProfile.from_config()
+        self.response_tokens = cfg.local_response_tokens
+        self._rng = random.Random(cfg.local_seed if seed is None else seed)
+        self._embedder: Optional[LocalEmbeddingClient] = None
+
+    @traced("llm.generate_response", provider="local")
+    @measured_llm_call("generate_response", "local")
+    async def generate_response(self, prompt: str, **kwargs) -> LLMResponse:
+        model = kwargs.get("model") or self.default_model
+        usage = LLMUsage.start("local", model, "generate_response")
+        content = self._build_text_response(prompt)
+        # Non-streaming calls wait for first token plus the full generation time
+        delay_ms = self.latency.sample_ms(self._rng) + self._generation_ms(content)
+        await asyncio.sleep(delay_ms / 1000)
+        usage.estimate_tokens(prompt, content)
+        return LLMResponse(content=content, model_used=model, usage=usage.finish())
+
+    @traced("llm.generate_response_stream", provider="local")
+    @measured_llm_call("generate_response_stream", "local")
+    async def generate_response_stream(self, prompt: str, **kwargs) -> AsyncGenerator[str, None]:
+        """
+        Stream a synthetic response at `tokens_per_second`.
+        Chunks are grouped so the event loop is not woken more than ~50 times per second.
+        """
+        usage = LLMUsage.start("local", kwargs.get("model") or self.default_model, "generate_response_stream")
+        output = []
+        content = ""
+        try:
+            content = self._build_text_response(prompt)
+            await asyncio.sleep(self.latency.sample_ms(self._rng) / 1000)
+
+            tokens = re.findall(r'\S+\s*', content)
+            rate = self.latency.tokens_per_second
+            tokens_per_chunk = max(1, int(rate * 0.02)) if rate > 0 else len(tokens) or 1
+            for i in range(0, len(tokens), tokens_per_chunk):
+                chunk = tokens[i:i + tokens_per_chunk]
+                if rate > 0:
+                    await asyncio.sleep(len(chunk) / rate)
+                usage.mark_first_token()
+                output.append("".join(chunk))
+                yield output[-1]
+        except (GeneratorExit, asyncio.CancelledError):
+            # The whole answer is known here, so the rest of it is what was avoided
+            usage.cancel(estimate_tokens(content))
+            raise
+        finally:
+            usage.estimate_tokens(conversation_text(prompt, kwargs.get("conversation_history")), "".join(output))
+            usage.finish()
+
+    @traced("llm.generate_json_response", provider="local")
+    @measured_llm_call("generate_json_response", "local")
+    async def generate_json_response(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        usage = LLMUsage.start("local", kwargs.get("model") or self.default_model, "generate_json_response")
+        await asyncio.sleep(self.latency.sample_ms(self._rng) / 1000)
+        query = self._extract_query(prompt)
+        if '"tools_needed"' in prompt:
+            result = {"tools_needed": self.select_tools(query)}
+        elif '"entities"' in prompt:
+            result = {"entities": self.extract_entities(query)}
+        else:
+            result = {}
+        usage.estimate_tokens(prompt, json.dumps(result))
+        usage.finish()
+        return result
+
+    async def generate_embeddings(self, texts: List[str], **kwargs) -> List[List[float]]:
+        """Embed texts with the local hashing embedder (runs off the event loop)"""
+        if self._embedder is None:
+            self._embedder = LocalEmbeddingClient(dimensions=kwargs.get("dimensions"))
+        return await asyncio.to_thread(self._embedder.embed, texts)
+
+    # ===== DETERMINISTIC OUTPUT HELPERS =====
+
+    @staticmethod
+    def select_tools(query: str) -> List[Dict[str, Any]]:
+        """Keyword routing into the tool/intention schema expected by the tool selector"""
+        text = f" {query.lower()} "
+        tools = []
+        for tool, triggers, default_intention, intention_rules in _TOOL_RULES:
+            if not any(trigger in text for trigger in triggers):
+                continue
+            intention = next(
+                (name for name, keywords in intention_rules if any(k in text for k in keywords)),
+                default_intention
+            )
+            tools.append({"tool": tool, "intention": intention, "confidence": 0.9})
+        if not tools:
+            tools.append({"tool": "character_data", "intention": "character_basics", "confidence": 0.6})
+        return tools
+
+    @staticmethod
+    def extract_entities(query: str) -> List[Dict[str, Any]]:
+        """Capitalized phrases and quoted names, in order of appearance"""
+        names: List[str] = []
+        for match in _QUOTED_RE.finditer(query):
+            names.append((match.group(1) or match.group(2)).strip())
+        for match in _ENTITY_RE.finditer(query):
+            words = match.group(0).split()
+            while words and words[0].lower() in _ENTITY_STOPWORDS:
+                words.pop(0)
+            if words:
+                name = " ".join(words)
+                names.append(name[:-2] if name.endswith("'s") else name)
+
+        entities = []
+        seen = set()
+        for name in names:
+            key = name.lower()
+            if key in seen or key in _ENTITY_STOPWORDS:
+                continue
+            seen.add(key)
+            entities.append({"name": name, "confidence": 1.0})
+        return entities
+
+    @staticmethod
+    def _extract_query(prompt: str) -> str:
+        match = _CURRENT_QUERY_RE.search(prompt) or _USER_QUESTION_RE.search(prompt)
+        return match.group(1).strip() if match else prompt[-500:]
+
+    def _build_text_response(self, prompt: str) -> str:
+        """Synthetic answer: echoes the question, then words drawn from the provided context"""
+        seed = int.from_bytes(hashlib.sha256(prompt.encode('utf-8')).digest()[:8], 'little')
+        rng = random.Random(seed)
+        question = self._extract_query(prompt)
+
+        context_match = _AVAILABLE_INFO_RE.search(prompt)
+        vocabulary = re.findall(r"[A-Za-z][A-Za-z'\-]{2,}", context_match.group(1) if context_match else prompt)
+        if not vocabulary:
+            vocabulary = ["local", "response"]
+
+        words = [rng.choice(vocabulary) for _ in range(max(0, self.response_tokens - 8))]
+        return f"[local] Answer to: {question}\n\n" + " ".join(words) + "."
+
+    def _generation_ms(self, content: str) -> float:
+        rate = self.latency.tokens_per_second
+        return (len(content.split()) / rate) * 1000 if rate > 0 else 0.0
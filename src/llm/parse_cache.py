@@ -0,0 +1,182 @@
+"""
+Persistent LLM Parse Cache
+
+Stores the JSON returned for character-creation parsing prompts so that sections of
+a re-imported character whose text did not change skip the LLM entirely.
+- Entries are keyed by (parser, section, prompt version, model, hash of the prompt);
+  the prompt embeds the section's input text, so any edit to it is a miss
+- One JSON file per entry under config.llm_parse_cache_dir, written atomically, so
+  concurrent builds (threads or processes) can share the directory
+- Only usable results are stored: clients report API failures as {"error": ...}
+  rather than raising, and those (or whatever `should_cache` rejects) are returned
+  but not written, so a transient failure is retried on the next build
+- `track_parse_cache()` collects hits and misses of lookups made in the current
+  context (including asyncio tasks started from it), e.g. for one parser run
+
+Usage:
+    from src.llm.parse_cache import llm_parse_cache, track_parse_cache
+
+    with track_parse_cache() as stats:
+        data = await llm_parse_cache.get_or_generate(
+            "background", "personality", 1, client, prompt,
+            lambda: client.generate_json_response(prompt)
+        )
+    print(stats.to_dict())
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from ..config import get_config
+from ..utils.metrics import LLM_PARSE_CACHE_TOTAL
+
+
+@dataclass
+class ParseCacheStats:
+    """Hits and misses of parse cache lookups"""
+    hits: int = 0
+    misses: int = 0
+    hit_sections: List[str] = field(default_factory=list)
+    saved_ms: float = 0.0   # LLM time the hits originally took
+
+    def record(self, section: str, hit: bool, saved_ms: float = 0.0) -> None:
+        if hit:
+            self.hits += 1
+            self.hit_sections.append(section)
+            self.saved_ms += saved_ms
+        else:
+            self.misses += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_sections': list(self.hit_sections),
+            'saved_ms': round(self.saved_ms, 2)
+        }
+
+
+_parse_cache_stats: ContextVar[Optional[ParseCacheStats]] = ContextVar('shadowscribe_parse_cache_stats', default=None)
+
+
+@contextmanager
+def track_parse_cache() -> Iterator[ParseCacheStats]:
+    """Collect parse cache hits and misses of lookups made in this context"""
+    stats = ParseCacheStats()
+    token = _parse_cache_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        try:
+            _parse_cache_stats.reset(token)
+        except ValueError:
+            pass
+
+
+def is_cacheable(data: Any) -> bool:
+    """Default check before storing: a dict or list that is not a client error response"""
+    if isinstance(data, dict):
+        return "error" not in data
+    return isinstance(data, list)
+
+
+class LLMParseCache:
+    """On-disk cache of parsed LLM JSON responses"""
+
+    def __init__(self, directory: Optional[str] = None, enabled: Optional[bool] = None):
+        # None = read from config on use, so set_config() after import is honored
+        self._directory = directory
+        self._enabled = enabled
+
+    @property
+    def directory(self) -> Path:
+        return Path(self._directory or get_config().llm_parse_cache_dir)
+
+    @property
+    def enabled(self) -> bool:
+        return get_config().llm_parse_cache_enabled if self._enabled is None else self._enabled
+
+    @staticmethod
+    def make_key(parser: str, section: str, prompt_version: int, model: str, prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        return hashlib.sha256(f"{parser}\0{section}\0{prompt_version}\0{model}\0{prompt_hash}".encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached entry ({'data': ..., 'llm_ms': ..., ...}) or None"""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Missing, or a partial/corrupt file - treat as a miss
+            return None
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not write LLM parse cache entry {path}: {e}")
+
+    async def get_or_generate(
+        self,
+        parser: str,
+        section: str,
+        prompt_version: int,
+        client: Any,
+        prompt: str,
+        generate: Callable[[], Awaitable[Any]],
+        should_cache: Callable[[Any], bool] = is_cacheable
+    ) -> Any:
+        """
+        Cached data for this prompt, or `await generate()`, stored if `should_cache(data)`
+        (by default a dict or list without an "error" key).
+        Exceptions from `generate` propagate and nothing is cached.
+        """
+        stats = _parse_cache_stats.get()
+        if not self.enabled:
+            return await generate()
+
+        model = getattr(client, 'default_model', None) or type(client).__name__
+        key = self.make_key(parser, section, prompt_version, model, prompt)
+        entry = self.get(key)
+        if entry is not None and 'data' in entry:
+            LLM_PARSE_CACHE_TOTAL.inc(parser=parser, result="hit")
+            if stats is not None:
+                stats.record(section, True, entry.get('llm_ms', 0.0))
+            return entry['data']
+
+        LLM_PARSE_CACHE_TOTAL.inc(parser=parser, result="miss")
+        if stats is not None:
+            stats.record(section, False)
+        start = time.perf_counter()
+        data = await generate()
+        if should_cache(data):
+            self.put(key, {
+                'parser': parser,
+                'section': section,
+                'prompt_version': prompt_version,
+                'model': model,
+                'llm_ms': round((time.perf_counter() - start) * 1000, 2),
+                'created': time.time(),
+                'data': data
+            })
+        return data
+
+
+# Shared instance (directory and on/off switch come from the global config)
+llm_parse_cache = LLMParseCache()
@@ -0,0 +1,329 @@
+"""
+LLM Usage Accounting
+
+Token, latency and cost accounting for LLMClient calls.
+- Every client call produces an `LLMUsage` (attached to `LLMResponse.usage` where the
+  return type allows it, and always emitted to the active usage tracker)
+- `track_usage()` collects the usage of all calls made in the current context,
+  including asyncio tasks and threads started from it
+- `usage_stage()` labels calls with the pipeline stage that made them
+  (tool_selector, entity_extractor, response_generation, parser names, ...)
+- Streams closed or cancelled before the end are marked `cancelled`, with an estimate
+  of the output tokens that were not generated (`tokens_avoided`): the mean output of
+  this process's completed calls of the same model and operation (`output_token_means`),
+  minus what was generated before the cancel. No estimate until one has completed
+
+Usage:
+    from src.llm.usage import track_usage, usage_stage
+
+    with track_usage() as tracker:
+        with usage_stage("tool_selector"):
+            await client.generate_json_response(prompt)
+    print(tracker.summary().to_dict())
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Iterator
+
+from ..config import get_config
+from ..utils.metrics import record_llm_tokens, record_llm_tokens_avoided
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) when the provider reports none"""
+    return max(1, len(text) // 4) if text else 0
+
+
+def conversation_text(prompt: str, conversation_history: Optional[List[Dict[str, str]]] = None) -> str:
+    """Prompt plus prior conversation turns, as sent to the model (for token estimates)"""
+    return "".join(turn.get("content", "") for turn in conversation_history or []) + prompt
+
+
+class OutputTokenMeans:
+    """Running mean of output tokens per (provider, model, operation) over completed calls"""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # Calls finish on the event loop and in worker threads
+        self._totals: Dict[tuple, List[int]] = {}  # key -> [calls, output tokens]
+
+    def add(self, provider: str, model: str, operation: str, output_tokens: int) -> None:
+        with self._lock:
+            totals = self._totals.setdefault((provider, model, operation), [0, 0])
+            totals[0] += 1
+            totals[1] += output_tokens
+
+    def mean(self, provider: str, model: str, operation: str) -> Optional[int]:
+        """Mean output tokens, or None before the first completed call"""
+        with self._lock:
+            totals = self._totals.get((provider, model, operation))
+        return round(totals[1] / totals[0]) if totals else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+output_token_means = OutputTokenMeans()
+
+
+@dataclass
+class LLMUsage:
+    """Usage of a single LLM call"""
+    provider: str
+    model: str
+    operation: str
+    stage: Optional[str] = None
+    input_tokens: int = 0       # Includes cached input tokens
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    ttft_ms: Optional[float] = None  # Streaming calls only
+    total_time_ms: float = 0.0
+    estimated: bool = False     # Token counts estimated locally rather than reported by the provider
+    cost_usd: Optional[float] = None
+    cancelled: bool = False     # Stream closed or cancelled before the model finished
+    tokens_avoided: int = 0     # Cancelled streams: expected output tokens not generated
+    start_time: float = field(default=0.0, repr=False)
+    expected_output_tokens: Optional[int] = field(default=None, repr=False)
+
+    @staticmethod
+    def start(provider: str, model: Optional[str], operation: str) -> 'LLMUsage':
+        """Begin timing a call (the stage is taken from the current usage_stage)"""
+        return LLMUsage(
+            provider=provider,
+            model=model or "default",
+            operation=operation,
+            stage=_usage_stage.get(),
+            start_time=time.perf_counter()
+        )
+
+    def mark_first_token(self) -> None:
+        if self.ttft_ms is None:
+            self.ttft_ms = (time.perf_counter() - self.start_time) * 1000
+
+    def add_tokens(self, input_tokens: Optional[int] = None, output_tokens: Optional[int] = None,
+                   cached_tokens: Optional[int] = None) -> None:
+        self.input_tokens += input_tokens or 0
+        self.output_tokens += output_tokens or 0
+        self.cached_tokens += cached_tokens or 0
+
+    def add_tokens_from(self, usage: Any) -> bool:
+        """
+        Add an OpenAI or Anthropic usage object (calls with retries accumulate).
+        Returns False if the provider did not report usage.
+        """
+        if usage is None:
+            return False
+        if hasattr(usage, "prompt_tokens"):
+            # OpenAI: prompt_tokens already includes cached tokens
+            details = getattr(usage, "prompt_tokens_details", None)
+            self.add_tokens(
+                usage.prompt_tokens,
+                usage.completion_tokens,
+                getattr(details, "cached_tokens", None) if details else None
+            )
+        else:
+            # Anthropic: input_tokens excludes cache reads and writes
+            cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+            cache_write = getattr(usage, "cache_creation_input_tokens", None) or 0
+            self.add_tokens(
+                (getattr(usage, "input_tokens", None) or 0) + cache_read + cache_write,
+                getattr(usage, "output_tokens", None),
+                cache_read
+            )
+        return True
+
+    def estimate_tokens(self, prompt: str, output: str) -> None:
+        """Fallback when the provider reported nothing (e.g. a stream closed before its usage chunk)"""
+        self.add_tokens(estimate_tokens(prompt), estimate_tokens(output))
+        self.estimated = True
+
+    def cancel(self, expected_output_tokens: Optional[int] = None, max_output_tokens: Optional[int] = None) -> None:
+        """
+        Mark the call as cancelled. `expected_output_tokens` is what the full answer would
+        have produced; when the client does not know it, the mean output of completed calls
+        of this model and operation is used, capped at the call's `max_output_tokens`.
+        finish() reports the part not generated as tokens_avoided.
+        """
+        self.cancelled = True
+        if expected_output_tokens is None:
+            expected_output_tokens = output_token_means.mean(self.provider, self.model, self.operation)
+            if expected_output_tokens is not None and max_output_tokens:
+                expected_output_tokens = min(expected_output_tokens, max_output_tokens)
+        self.expected_output_tokens = expected_output_tokens
+
+    def finish(self) -> 'LLMUsage':
+        """Stop the clock, price the call and emit it to the active tracker and metrics"""
+        self.total_time_ms = (time.perf_counter() - self.start_time) * 1000
+        if self.cancelled and self.expected_output_tokens:
+            self.tokens_avoided = max(self.expected_output_tokens - self.output_tokens, 0)
+        elif not self.cancelled and self.output_tokens:
+            output_token_means.add(self.provider, self.model, self.operation, self.output_tokens)
+        pricing = get_config().get_model_pricing(self.model)
+        if pricing:
+            input_price, cached_price, output_price = pricing
+            uncached = max(self.input_tokens - self.cached_tokens, 0)
+            self.cost_usd = (
+                uncached * input_price + self.cached_tokens * cached_price + self.output_tokens * output_price
+            ) / 1_000_000
+        record_usage(self)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'provider': self.provider,
+            'model': self.model,
+            'operation': self.operation,
+            'stage': self.stage,
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'cached_tokens': self.cached_tokens,
+            'ttft_ms': self.ttft_ms,
+            'total_time_ms': self.total_time_ms,
+            'estimated': self.estimated,
+            'cost_usd': self.cost_usd,
+            'cancelled': self.cancelled,
+            'tokens_avoided': self.tokens_avoided
+        }
+
+
+@dataclass
+class UsageSummary:
+    """Aggregated usage over many calls (a query, a session, a character build)"""
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    cost_usd: float = 0.0
+    unpriced_calls: int = 0     # Calls whose model has no entry in MODEL_PRICING
+    llm_time_ms: float = 0.0    # Sum of call durations (calls may overlap)
+    cancelled_calls: int = 0
+    tokens_avoided: int = 0     # Output tokens cancelled streams did not generate (estimate)
+    by_stage: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def add(self, usage: LLMUsage) -> None:
+        self.calls += 1
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+        self.cached_tokens += usage.cached_tokens
+        self.llm_time_ms += usage.total_time_ms
+        self.cancelled_calls += usage.cancelled
+        self.tokens_avoided += usage.tokens_avoided
+        if usage.cost_usd is None:
+            self.unpriced_calls += 1
+        else:
+            self.cost_usd += usage.cost_usd
+
+        stage = self.by_stage.setdefault(usage.stage or usage.operation, {
+            'calls': 0, 'models': [], 'input_tokens': 0, 'output_tokens': 0,
+            'cached_tokens': 0, 'cost_usd': 0.0, 'time_ms': 0.0, 'ttft_ms': None
+        })
+        stage['calls'] += 1
+        if usage.model not in stage['models']:
+            stage['models'].append(usage.model)
+        stage['input_tokens'] += usage.input_tokens
+        stage['output_tokens'] += usage.output_tokens
+        stage['cached_tokens'] += usage.cached_tokens
+        stage['cost_usd'] += usage.cost_usd or 0.0
+        stage['time_ms'] += usage.total_time_ms
+        if usage.ttft_ms is not None and stage['ttft_ms'] is None:
+            stage['ttft_ms'] = usage.ttft_ms
+
+    def merge(self, other: 'UsageSummary') -> None:
+        """Fold another summary into this one (e.g. a query into its session)"""
+        self.calls += other.calls
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cached_tokens += other.cached_tokens
+        self.cost_usd += other.cost_usd
+        self.unpriced_calls += other.unpriced_calls
+        self.llm_time_ms += other.llm_time_ms
+        self.cancelled_calls += other.cancelled_calls
+        self.tokens_avoided += other.tokens_avoided
+        for name, other_stage in other.by_stage.items():
+            stage = self.by_stage.setdefault(name, dict(other_stage, calls=0, models=[], input_tokens=0,
+                                                        output_tokens=0, cached_tokens=0, cost_usd=0.0, time_ms=0.0))
+            stage['models'] += [m for m in other_stage['models'] if m not in stage['models']]
+            for key in ('calls', 'input_tokens', 'output_tokens', 'cached_tokens', 'cost_usd', 'time_ms'):
+                stage[key] += other_stage[key]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'cached_tokens': self.cached_tokens,
+            'total_tokens': self.input_tokens + self.output_tokens,
+            'cost_usd': round(self.cost_usd, 6),
+            'unpriced_calls': self.unpriced_calls,
+            'llm_time_ms': self.llm_time_ms,
+            'cancelled_calls': self.cancelled_calls,
+            'tokens_avoided': self.tokens_avoided,
+            'by_stage': {
+                name: dict(stage, cost_usd=round(stage['cost_usd'], 6))
+                for name, stage in self.by_stage.items()
+            }
+        }
+
+
+class UsageTracker:
+    """Collects LLMUsage records; nested trackers also forward to their parent"""
+
+    def __init__(self, parent: Optional['UsageTracker'] = None):
+        self.parent = parent
+        self.records: List[LLMUsage] = []  # list.append is atomic, so threads can record concurrently
+
+    def record(self, usage: LLMUsage) -> None:
+        self.records.append(usage)
+        if self.parent is not None:
+            self.parent.record(usage)
+
+    def summary(self) -> UsageSummary:
+        summary = UsageSummary()
+        for usage in list(self.records):
+            summary.add(usage)
+        return summary
+
+
+_usage_tracker: ContextVar[Optional[UsageTracker]] = ContextVar('shadowscribe_usage_tracker', default=None)
+_usage_stage: ContextVar[Optional[str]] = ContextVar('shadowscribe_usage_stage', default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[UsageTracker]:
+    """Collect usage of all LLM calls made in this context"""
+    tracker = UsageTracker(parent=_usage_tracker.get())
+    token = _usage_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        try:
+            _usage_tracker.reset(token)
+        except ValueError:
+            # Context changed (e.g. async generator closed from another task) - nothing to restore
+            pass
+
+
+@contextmanager
+def usage_stage(stage: str) -> Iterator[None]:
+    """Label LLM calls made in this context with a pipeline stage"""
+    token = _usage_stage.set(stage)
+    try:
+        yield
+    finally:
+        try:
+            _usage_stage.reset(token)
+        except ValueError:
+            pass
+
+
+def record_usage(usage: LLMUsage) -> None:
+    """Emit a finished call to the active tracker and the metrics registry"""
+    tracker = _usage_tracker.get()
+    if tracker is not None:
+        tracker.record(usage)
+    record_llm_tokens(usage.provider, usage.model, usage.input_tokens, usage.output_tokens, usage.cached_tokens)
+    record_llm_tokens_avoided(usage.provider, usage.model, usage.tokens_avoided)
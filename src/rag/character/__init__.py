@@ -37,6 +37,8 @@ from .character_types import (
 )
 from .character_manager import CharacterManager
 from .character_query_router import CharacterQueryRouter
+from .character_snapshot import CharacterSnapshot, SectionSnapshot
+from .character_codec import character_from_dict, character_to_dict, CharacterDecodeError
 from .character_query_types import (
     UserIntention, IntentionCategory, QueryEntity, SearchContext,
     CharacterInformationResult, CharacterPromptHelper
@@ -74,9 +76,9 @@ __all__ = [
     'Proficiency', 'DamageModifier', 'PassiveScores', 'Senses',
     
     # Character management
-    'CharacterManager',
+    'CharacterManager', 'character_from_dict', 'character_to_dict', 'CharacterDecodeError',
     
     # Query system
-    'CharacterQueryRouter', 'UserIntention', 'IntentionCategory', 'QueryEntity', 
+    'CharacterQueryRouter', 'CharacterSnapshot', 'SectionSnapshot', 'UserIntention', 'IntentionCategory', 'QueryEntity', 
     'SearchContext', 'CharacterInformationResult', 'CharacterPromptHelper'
 ]
@@ -0,0 +1,323 @@
+"""
+Character Codec
+
+Schema-driven decoder/encoder for the Character dataclass tree (character_types.py).
+For every dataclass a specialised decode and encode function is generated from its
+type hints on first use and compiled once, so loading a character from the database
+JSON column is a straight run of constructor calls instead of generic reflection.
+
+Decoding (JSON-compatible dict -> dataclasses):
+- Nested dataclasses, List/Dict/Optional containers and Union[Quest, Contract]
+- `Dict[int, ...]` keys are converted back from JSON strings to ints
+- `datetime` fields are parsed from ISO strings
+- Missing fields take the dataclass default; unknown keys are ignored
+- Primitive values are not type-checked (same leniency as dacite check_types=False)
+
+Encoding (dataclasses -> JSON-compatible dict) produces exactly what
+`json.loads(json.dumps(asdict(obj), default=isoformat))` did, without the round trip.
+
+Usage:
+    from src.rag.character.character_codec import character_from_dict, character_to_dict
+
+    data = character_to_dict(character)     # store in the JSON column
+    character = character_from_dict(data)   # load it back
+"""
+
+import dataclasses
+import typing
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Literal, Type, TypeVar, Union
+
+from .character_types import Character
+
+
+T = TypeVar('T')
+
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+class CharacterDecodeError(ValueError):
+    """Raised when data cannot be decoded into a Character dataclass"""
+
+
+# ===== GENERIC VALUE CONVERSION =====
+
+def _parse_datetime(value: Any) -> Any:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _json_key(key: Any) -> str:
+    """Dict key as json.dumps writes it"""
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    return str(key)
+
+
+def _int_key(key: Any) -> Any:
+    try:
+        return int(key)
+    except (TypeError, ValueError):
+        return key
+
+
+def encode_any(value: Any) -> Any:
+    """JSON-compatible copy of an untyped value (Any fields, or data not matching its annotation)"""
+    if isinstance(value, _PRIMITIVES):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {_json_key(key): encode_any(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_any(item) for item in value]
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return _codec_for(type(value)).encode(value)
+    raise TypeError(f"Type {type(value)} not serializable")
+
+
+# ===== CODE GENERATION =====
+
+def _is_trivial(tp: Any) -> bool:
+    """Types whose JSON value is used as-is when decoding and encoding"""
+    if tp is Any or tp in _PRIMITIVES:
+        return True
+    origin = typing.get_origin(tp)
+    if origin is Literal:
+        return True
+    if origin is Union:
+        return all(_is_trivial(arg) for arg in typing.get_args(tp))
+    return False
+
+
+class _Generator:
+    """Builds the source of one class's decode/encode functions"""
+
+    def __init__(self, namespace: Dict[str, Any]):
+        self.namespace = namespace
+        self._counter = 0
+
+    def _name(self, prefix: str) -> str:
+        self._counter += 1
+        return f"{prefix}{self._counter}"
+
+    def bind(self, prefix: str, value: Any) -> str:
+        """Expose a value (class, default, helper) to the generated code under a fresh name"""
+        name = self._name(prefix)
+        self.namespace[name] = value
+        return name
+
+    def bind_codec(self, prefix: str, cls: type, kind: str) -> str:
+        """
+        Reference another class's generated function. Nested codecs may not be compiled yet
+        (recursive types), so the name starts as a stub that compiles on first call and then
+        rebinds itself to the compiled function.
+        """
+        name = self._name(prefix)
+        namespace = self.namespace
+        codec = _codec_for(cls)
+
+        def first_call(value: Any) -> Any:
+            function = codec.compiled(kind)
+            namespace[name] = function
+            return function(value)
+
+        namespace[name] = first_call
+        return name
+
+    def decode_expr(self, tp: Any, var: str, depth: int = 0) -> str:
+        if _is_trivial(tp):
+            return var
+        if tp is datetime:
+            return f"_parse_datetime({var})"
+        if dataclasses.is_dataclass(tp):
+            return f"{self.bind_codec('_dec_', tp, 'decode')}({var})"
+
+        origin, args = typing.get_origin(tp), typing.get_args(tp)
+        item = f"_v{depth}"
+        if origin in (list, List):
+            inner = args[0] if args else Any
+            if _is_trivial(inner):
+                return f"(None if {var} is None else list({var}))"
+            return f"(None if {var} is None else [{self.decode_expr(inner, item, depth + 1)} for {item} in {var}])"
+        if origin in (dict, Dict):
+            key_tp, value_tp = args if args else (Any, Any)
+            key = f"_k{depth}"
+            key_expr = f"_int_key({key})" if key_tp is int else key
+            if key_expr == key and _is_trivial(value_tp):
+                return f"(None if {var} is None else dict({var}))"
+            value_expr = self.decode_expr(value_tp, item, depth + 1)
+            return (f"(None if {var} is None else "
+                    f"{{{key_expr}: {value_expr} for {key}, {item} in {var}.items()}})")
+        if origin is Union:
+            members = [arg for arg in args if arg is not type(None)]
+            if len(members) == 1:
+                inner = self.decode_expr(members[0], var, depth)
+                return inner if inner == var else f"(None if {var} is None else {inner})"
+            if all(dataclasses.is_dataclass(member) for member in members):
+                return f"{self.bind('_union_', _union_decoder(members))}({var})"
+        # Anything else is passed through untouched
+        return var
+
+    def encode_expr(self, tp: Any, var: str, depth: int = 0) -> str:
+        if tp is Any:
+            return f"_encode_any({var})"
+        if _is_trivial(tp):
+            return var
+        if tp is datetime:
+            return f"(None if {var} is None else {var}.isoformat())"
+        if dataclasses.is_dataclass(tp):
+            return f"{self.bind_codec('_enc_', tp, 'encode')}({var})"
+
+        origin, args = typing.get_origin(tp), typing.get_args(tp)
+        item = f"_v{depth}"
+        if origin in (list, List):
+            inner = args[0] if args else Any
+            if _is_trivial(inner):
+                return f"(None if {var} is None else list({var}))"
+            return f"(None if {var} is None else [{self.encode_expr(inner, item, depth + 1)} for {item} in {var}])"
+        if origin in (dict, Dict):
+            key_tp, value_tp = args if args else (Any, Any)
+            key = f"_k{depth}"
+            key_expr = key if key_tp is str else f"_json_key({key})"
+            value_expr = self.encode_expr(value_tp, item, depth + 1)
+            return (f"(None if {var} is None else "
+                    f"{{{key_expr}: {value_expr} for {key}, {item} in {var}.items()}})")
+        if origin is Union:
+            members = [arg for arg in args if arg is not type(None)]
+            if len(members) == 1:
+                inner = self.encode_expr(members[0], var, depth)
+                return inner if inner == var else f"(None if {var} is None else {inner})"
+        return f"_encode_any({var})"
+
+
+def _union_decoder(members: List[type]) -> Callable[[Any], Any]:
+    """Decode a dict into the union member whose fields cover the most keys (first wins ties)"""
+    field_names = [{f.name for f in dataclasses.fields(member)} for member in members]
+
+    def decode(data: Any) -> Any:
+        if data is None or not isinstance(data, dict):
+            return data
+        scores = [len(names.intersection(data)) for names in field_names]
+        best = scores.index(max(scores))
+        return _codec_for(members[best]).decode(data)
+
+    return decode
+
+
+class _ClassCodec:
+    """Generated decode/encode pair for one dataclass"""
+
+    def __init__(self, cls: type):
+        self.cls = cls
+        self._decode = None
+        self._encode = None
+
+    def compiled(self, kind: str) -> Callable[[Any], Any]:
+        """Generated 'decode' or 'encode' function (compiled on first use)"""
+        if self._decode is None:
+            self._compile()
+        return self._decode if kind == 'decode' else self._encode
+
+    def decode(self, data: Any) -> Any:
+        return self.compiled('decode')(data)
+
+    def encode(self, obj: Any) -> Any:
+        return self.compiled('encode')(obj)
+
+    def _compile(self) -> None:
+        cls = self.cls
+        namespace: Dict[str, Any] = {
+            '_cls': cls,
+            '_parse_datetime': _parse_datetime,
+            '_int_key': _int_key,
+            '_json_key': _json_key,
+            '_encode_any': encode_any,
+            'CharacterDecodeError': CharacterDecodeError,
+        }
+        gen = _Generator(namespace)
+        hints = typing.get_type_hints(cls)
+        fields = [f for f in dataclasses.fields(cls) if f.init]
+
+        decode_lines = []
+        encode_items = []
+        for f in fields:
+            tp = hints[f.name]
+            local = f"f_{f.name}"
+            value = gen.decode_expr(tp, "_y")
+            if f.default is not dataclasses.MISSING:
+                missing = gen.bind('_default_', f.default)
+            elif f.default_factory is not dataclasses.MISSING:
+                missing = f"{gen.bind('_factory_', f.default_factory)}()"
+            else:
+                missing = None
+
+            if missing is None:
+                # Required: a KeyError is turned into CharacterDecodeError below
+                decode_lines.append(f"        _y = _data[{f.name!r}]")
+                decode_lines.append(f"        {local} = {value}")
+            else:
+                decode_lines.append(f"        _y = _data.get({f.name!r}, _missing)")
+                decode_lines.append(f"        {local} = {missing} if _y is _missing else {value}")
+            encode_items.append(f"        {f.name!r}: {gen.encode_expr(tp, f'_obj.{f.name}')},")
+
+        namespace['_missing'] = object()
+        source = "\n".join([
+            "def decode(_data):",
+            "    if isinstance(_data, _cls) or _data is None:",
+            "        return _data",
+            "    if not isinstance(_data, dict):",
+            f"        raise CharacterDecodeError('{cls.__name__}: expected an object, got ' + type(_data).__name__)",
+            "    try:",
+            *decode_lines,
+            "    except KeyError as e:",
+            f"        raise CharacterDecodeError('{cls.__name__}: missing required field ' + str(e)) from None",
+            "    return _cls(" + ", ".join(f"{f.name}=f_{f.name}" for f in fields) + ")",
+            "",
+            "def encode(_obj):",
+            "    if type(_obj) is not _cls:",
+            "        return _encode_any(_obj)",
+            "    return {",
+            *encode_items,
+            "    }",
+        ])
+        exec(compile(source, f"<character_codec:{cls.__name__}>", "exec"), namespace)
+        self._decode = namespace['decode']
+        self._encode = namespace['encode']
+
+
+_CODECS: Dict[type, _ClassCodec] = {}
+
+
+def _codec_for(cls: type) -> _ClassCodec:
+    codec = _CODECS.get(cls)
+    if codec is None:
+        codec = _CODECS[cls] = _ClassCodec(cls)
+    return codec
+
+
+# ===== PUBLIC API =====
+
+def from_dict(cls: Type[T], data: Dict[str, Any]) -> T:
+    """Decode JSON-compatible data into dataclass `cls` (nested types included)"""
+    return _codec_for(cls).decode(data)
+
+
+def to_dict(obj: Any) -> Dict[str, Any]:
+    """Encode a dataclass into JSON-compatible data (datetimes as ISO strings)"""
+    return _codec_for(type(obj)).encode(obj)
+
+
+def character_from_dict(data: Dict[str, Any]) -> Character:
+    """Decode a Character stored as JSON (database column, API payload)"""
+    return from_dict(Character, data)
+
+
+def character_to_dict(character: Character) -> Dict[str, Any]:
+    """Encode a Character for JSON storage"""
+    return to_dict(character)
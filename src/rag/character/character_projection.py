@@ -0,0 +1,210 @@
+"""
+Character Projection
+
+Field-level projection of serialized character sections (see CharacterSnapshot).
+Instead of sending a whole section to the prompt, only the paths declared in
+`IntentionMapping.nested_requirements` are kept, plus the full entries of items the
+user actually asked about (entity matches).
+
+Path syntax (relative to the section root):
+- `a.b.c`      nested keys
+- `*`          every key of a dict / every element of a list
+- `{a,b,c}`    several keys at one level
+
+Examples:
+    project(inventory_data, ['total_weight', 'equipped_items.*.*.{quantity,equipped}'])
+    filter_entities(spell_list_data, {'fireball'})
+
+Projection never mutates its input (snapshot data is shared between queries).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .character_snapshot import to_compact_json
+
+
+# Returned instead of a value when a path does not exist in the data
+_MISSING = object()
+
+# Key under which entity-matched items are attached to a projected section
+MATCHED_ENTITIES_KEY = 'matched_entities'
+
+
+def _split_path(path: str) -> List[Tuple[str, ...]]:
+    """'a.{b,c}.*' -> [('a',), ('b', 'c'), ('*',)]"""
+    # Split on dots that are not inside {...}
+    raw_segments, current, depth = [], '', 0
+    for char in path:
+        if char == '.' and depth == 0:
+            raw_segments.append(current)
+            current = ''
+            continue
+        depth += (char == '{') - (char == '}')
+        current += char
+    raw_segments.append(current)
+    return [tuple(key.strip() for key in segment.strip('{}').split(',')) for segment in raw_segments]
+
+
+def _project(data: Any, segments: Sequence[Tuple[str, ...]]) -> Any:
+    """Value of `data` restricted to one parsed path (_MISSING if nothing matched)"""
+    if not segments:
+        return data
+
+    keys, rest = segments[0], segments[1:]
+    if isinstance(data, list):
+        if keys != ('*',):
+            return _MISSING
+        projected = [_project(item, rest) for item in data]
+        return [item for item in projected if item is not _MISSING]
+
+    if isinstance(data, dict):
+        selected = data.keys() if keys == ('*',) else [key for key in keys if key in data]
+        result = {}
+        for key in selected:
+            value = _project(data[key], rest)
+            if value is not _MISSING:
+                result[key] = value
+        return result if result or keys == ('*',) else _MISSING
+
+    return _MISSING
+
+
+def _merge(target: Any, value: Any) -> Any:
+    """Merge two projections of the same source (lists element-wise); builds new containers"""
+    if isinstance(target, dict) and isinstance(value, dict):
+        merged = dict(target)
+        for key, item in value.items():
+            merged[key] = _merge(merged[key], item) if key in merged else item
+        return merged
+    if isinstance(target, list) and isinstance(value, list) and len(target) == len(value):
+        return [_merge(a, b) for a, b in zip(target, value)]
+    return value
+
+
+def project(data: Any, paths: Iterable[str]) -> Any:
+    """Copy of `data` containing only the given paths (missing paths are skipped)"""
+    result: Any = _MISSING
+    for path in paths:
+        value = _project(data, _split_path(path))
+        if value is _MISSING:
+            continue
+        result = value if result is _MISSING else _merge(result, value)
+    return {} if result is _MISSING else result
+
+
+def entry_name(entry: Any) -> Optional[str]:
+    """Display name of a serialized item, spell, feature... (definition.name first, like EntitySearchEngine)"""
+    if not isinstance(entry, dict):
+        return None
+    definition = entry.get('definition')
+    if isinstance(definition, dict) and isinstance(definition.get('name'), str):
+        return definition['name']
+    name = entry.get('name')
+    return name if isinstance(name, str) else None
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(text.lower().split())
+
+
+def matches_entity(name: Optional[str], entity_names: Set[str]) -> bool:
+    """Entry name equals or contains one of the normalized entity names"""
+    if not name:
+        return False
+    normalized = _normalize(name)
+    return any(entity in normalized for entity in entity_names)
+
+
+def find_entities(data: Any, entity_names: Set[str]) -> List[Any]:
+    """Full serialized entries (anywhere in the section) whose name matches an entity"""
+    found = []
+    if isinstance(data, dict):
+        for value in data.values():
+            found.extend(find_entities(value, entity_names))
+    elif isinstance(data, list):
+        for entry in data:
+            if matches_entity(entry_name(entry), entity_names):
+                found.append(entry)
+            else:
+                found.extend(find_entities(entry, entity_names))
+    return found
+
+
+def filter_entities(data: Any, entity_names: Set[str]) -> Any:
+    """
+    Copy of a section keeping only list entries that match an entity, with their
+    surrounding structure (e.g. inventory.equipped_items.Weapon[...]).
+    Returns None if nothing matched.
+    """
+    if isinstance(data, list):
+        kept = []
+        for entry in data:
+            if matches_entity(entry_name(entry), entity_names):
+                kept.append(entry)
+                continue
+            filtered = filter_entities(entry, entity_names)
+            if filtered is not None:
+                kept.append(filtered)
+        return kept or None
+
+    if isinstance(data, dict):
+        kept = {}
+        for key, value in data.items():
+            filtered = filter_entities(value, entity_names)
+            if filtered is not None:
+                kept[key] = filtered
+        return kept or None
+
+    return None
+
+
+@dataclass
+class ProjectionResult:
+    """Projected section data plus its compact JSON"""
+    data: Any
+    json: str
+    projected: bool           # False when the full section was kept
+    entity_matches: int = 0
+
+
+def project_section(
+    section: Any,
+    paths: Optional[Sequence[str]],
+    entity_names: Set[str],
+    entities_only: bool = False
+) -> ProjectionResult:
+    """
+    Project one SectionSnapshot for a query.
+
+    - paths:          declared nested requirements (None = the query needs the full section)
+    - entity_names:   normalized names of the entities the user asked about
+    - entities_only:  section was pulled in only because an entity was found there,
+                      so keep just the matching entries (full section if none match)
+    """
+    if entities_only:
+        filtered = filter_entities(section.data, entity_names) if entity_names else None
+        if filtered is None:
+            return ProjectionResult(section.data, section.json, projected=False)
+        return ProjectionResult(filtered, to_compact_json(filtered), projected=True,
+                                entity_matches=len(find_entities(filtered, entity_names)))
+
+    if paths is None:
+        return ProjectionResult(section.data, section.json, projected=False)
+
+    data = project(section.data, paths)
+    matches = find_entities(section.data, entity_names) if entity_names else []
+    if matches and isinstance(data, dict):
+        data = dict(data)
+        data[MATCHED_ENTITIES_KEY] = matches
+    return ProjectionResult(data, to_compact_json(data), projected=True, entity_matches=len(matches))
+
+
+def normalize_entity_names(entities: Iterable[Dict[str, Any]]) -> Set[str]:
+    """Entity names (and names they were matched to during resolution) for matching"""
+    names = set()
+    for entity in entities:
+        for name in [entity.get('name'), *entity.get('matched_names', [])]:
+            if isinstance(name, str) and name.strip():
+                names.add(_normalize(name))
+    return names
@@ -10,6 +10,9 @@ from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 
 from .character_types import Character
+from .character_snapshot import CharacterSnapshot
+from .character_projection import normalize_entity_names, project_section
+from ...utils.tracing import traced
 from .character_query_types import (
     UserIntention, IntentionDataMapper, CharacterQueryPerformanceMetrics
 )
@@ -23,6 +26,7 @@ class CharacterQueryResult:
     warnings: List[str] = field(default_factory=list)  # Any warnings or issues
     entity_matches: List[Dict[str, Any]] = field(default_factory=list)  # Entity match details
     performance_metrics: Optional[CharacterQueryPerformanceMetrics] = None  # Performance timing data
+    character_json: Optional[str] = None  # Compact JSON of character_data, assembled from prebuilt section strings
 
 
 class CharacterQueryRouter:
@@ -36,15 +40,35 @@ class CharacterQueryRouter:
     Returns: All relevant character data and nested objects
     """
     
-    def __init__(self, character: Optional[Character] = None):
+    def __init__(self, character: Optional[Character] = None, projection: bool = True):
         """Initialize the query router with a character object.
         
         Args:
             character: Character object to query
+            projection: Reduce sections to their declared nested paths and matched entities
         """
         self.character = character
+        self.projection = projection
+        self.snapshot = CharacterSnapshot(character) if character else None
         self.intention_mapper = IntentionDataMapper()
     
+    def set_character(self, character: Optional[Character], keep_sections: bool = False):
+        """
+        Swap in a new character (e.g. after a reload); discards all cached sections, or with
+        `keep_sections` only those whose section objects the new character does not share.
+        """
+        if keep_sections and character and self.snapshot:
+            self.snapshot.rebind(character)
+        else:
+            self.snapshot = CharacterSnapshot(character) if character else None
+        self.character = character
+    
+    def invalidate_section(self, section: Optional[str] = None):
+        """Drop the cached serialization of an edited section (all sections if None)."""
+        if self.snapshot:
+            self.snapshot.invalidate(section)
+    
+    @traced("rag.character")
     def query_character(
         self, 
         user_intentions: List[str], 
@@ -79,7 +103,7 @@ class CharacterQueryRouter:
         performance.entities_processed = len(entities)
         
         # 1. Check if character is available
-        if not self.character:
+        if not self.character or not self.snapshot:
             performance.total_time_ms = (time.perf_counter() - start_time) * 1000
             return CharacterQueryResult(
                 character_data={},
@@ -89,78 +113,99 @@ class CharacterQueryRouter:
         
         character = self.character
         
-        # 2. Map user intentions to UserIntention enums and get mappings
+        # 2. Map user intentions to UserIntention enums (mappings are precompiled tables)
         intention_start = time.perf_counter()
         intention_enums = []
-        individual_mappings = []
         mappings = self.intention_mapper.get_mappings()
         
         for user_intention in user_intentions:
             try:
                 intention_enum = UserIntention(user_intention.lower())
-                intention_enums.append(intention_enum)
                 
                 if intention_enum not in mappings:
                     warnings.append(f"No mapping found for intention: {user_intention}")
                     continue
                     
-                individual_mappings.append(mappings[intention_enum])
+                intention_enums.append(intention_enum)
                 
             except ValueError:
                 warnings.append(f"Unknown user intention: {user_intention}")
         
         # If no valid mappings found, return basic character info as fallback
-        if not individual_mappings:
+        if not intention_enums:
             fallback_start = time.perf_counter()
-            basic_data = {
-                "character_base": character.character_base.__dict__,
-                "ability_scores": character.ability_scores.__dict__
-            }
+            basic_sections = self.snapshot.get_sections(["character_base", "ability_scores"])
+            basic_data = {name: section.data for name, section in basic_sections.items()}
             fallback_end = time.perf_counter()
             performance.serialization_ms = (fallback_end - fallback_start) * 1000
             performance.total_time_ms = (time.perf_counter() - start_time) * 1000
-            performance.fields_extracted = 2
+            performance.fields_extracted = len(basic_data)
+            character_json = CharacterSnapshot.join_json(basic_sections)
+            performance.payload_bytes = performance.payload_bytes_full = len(character_json.encode('utf-8'))
             return CharacterQueryResult(
                 character_data=basic_data,
                 warnings=warnings,
-                performance_metrics=performance
+                performance_metrics=performance,
+                character_json=character_json
             )
         
-        # 3. Combine mappings if multiple intentions
-        mapping_start = time.perf_counter()
-        if len(individual_mappings) == 1:
-            combined_mapping = individual_mappings[0]
-        else:
-            combined_mapping = self.intention_mapper.combine_mappings(individual_mappings)
-        
-        mapping_end = time.perf_counter()
+        # 3. Look up the combined mapping (1 or 2 intentions) in the precomputed table
+        combined_mapping = self.intention_mapper.lookup(intention_enums)
         intention_end = time.perf_counter()
         performance.intention_mapping_ms = (intention_end - intention_start) * 1000
         
         # 4. Merge auto-include sections with intention-based fields
         # Auto-include sections are passed from entity resolution in CentralEngine
-        all_fields = combined_mapping.required_fields.union(combined_mapping.optional_fields)
+        all_fields = combined_mapping.all_fields
         
         # Add auto-include sections to the fields set (avoid duplicates)
         if auto_include_sections:
-            for section in auto_include_sections:
-                all_fields.add(section)
+            all_fields = all_fields.union(auto_include_sections)
         
         # 5. Extract required character data (including optional fields and auto-includes)
+        # Sections come from the snapshot: serialized on first use, then reused until edited
         extract_start = time.perf_counter()
-        character_data = self._extract_character_data(character, all_fields)
+        builds_before = self.snapshot.builds
+        sections = self.snapshot.get_sections(sorted(all_fields))
+        character_data = {name: section.data for name, section in sections.items()}
         extract_end = time.perf_counter()
         performance.data_extraction_ms = (extract_end - extract_start) * 1000
         performance.fields_extracted = len(character_data)
-        
-        # NOTE: Entity resolution and auto-include logic removed.
-        # Phase 3 CentralEngine will handle entity resolution and pass auto_include sections.
-        
-        # 6. Finalize performance metrics
+        performance.sections_built = self.snapshot.builds - builds_before
+        performance.sections_reused = len(sections) - performance.sections_built
+        
+        # 6. Field-level projection: declared nested paths plus entries matching the query entities.
+        # Auto-included sections (pulled in only by entity resolution) keep just the matching entries.
+        projection_start = time.perf_counter()
+        section_json: Dict[str, Any] = dict(sections)
+        if self.projection:
+            entity_names = normalize_entity_names(entities)
+            for name, section in sections.items():
+                projected = project_section(
+                    section,
+                    combined_mapping.nested_requirements.get(name),
+                    entity_names,
+                    entities_only=name not in combined_mapping.all_fields
+                )
+                performance.entity_matches_found += projected.entity_matches
+                if projected.projected:
+                    character_data[name] = projected.data
+                    section_json[name] = projected.json
+                    performance.sections_projected += 1
+        projection_end = time.perf_counter()
+        performance.projection_ms = (projection_end - projection_start) * 1000
+        
+        # 7. Finalize performance metrics
         serialization_start = time.perf_counter()
-        # Count serialized objects (approximate by counting nested dictionaries)
-        performance.objects_serialized = self._count_serialized_objects(character_data)
+        # Object counts and JSON strings were computed once per section
+        performance.objects_serialized = sum(section.object_count for section in sections.values())
         performance.total_character_fields = len(character.__dict__)
+        character_json = CharacterSnapshot.join_json(section_json)
+        performance.payload_bytes = len(character_json.encode('utf-8'))
+        performance.payload_bytes_full = (
+            len(CharacterSnapshot.join_json(sections).encode('utf-8'))
+            if performance.sections_projected else performance.payload_bytes
+        )
         serialization_end = time.perf_counter()
         performance.serialization_ms += (serialization_end - serialization_start) * 1000
         
@@ -176,45 +221,6 @@ class CharacterQueryRouter:
                 "auto_include_sections": auto_include_sections
             },
             warnings=warnings,
-            performance_metrics=performance
+            performance_metrics=performance,
+            character_json=character_json
         )
-    
-    def _extract_character_data(self, character: Character, required_fields: set) -> Dict[str, Any]:
-        """Extract the required fields from character with all nested objects."""
-        result = {}
-        
-        for field_name in required_fields:
-            if hasattr(character, field_name):
-                field_value = getattr(character, field_name)
-                if field_value is not None:
-                    result[field_name] = self._serialize_object(field_value)
-        
-        return result
-    
-    def _count_serialized_objects(self, data: Any) -> int:
-        """Count the number of objects that were serialized (approximate)"""
-        count = 0
-        if isinstance(data, dict):
-            count += 1  # The dict itself
-            for value in data.values():
-                count += self._count_serialized_objects(value)
-        elif isinstance(data, list):
-            for item in data:
-                count += self._count_serialized_objects(item)
-        return count
-    
-    def _serialize_object(self, obj: Any) -> Any:
-        """Convert dataclass objects to dictionaries recursively."""
-        if hasattr(obj, '__dict__'):
-            # It's a dataclass or similar object
-            result = {}
-            for key, value in obj.__dict__.items():
-                result[key] = self._serialize_object(value)
-            return result
-        elif isinstance(obj, list):
-            return [self._serialize_object(item) for item in obj]
-        elif isinstance(obj, dict):
-            return {key: self._serialize_object(value) for key, value in obj.items()}
-        else:
-            # Primitive type
-            return obj
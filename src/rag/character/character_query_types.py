@@ -6,10 +6,12 @@ It maps user intentions to required character data and provides a structured
 way to return relevant information.
 """
 
-from typing import Dict, List, Optional, Union, Any, Literal, Set
+from typing import Dict, List, Optional, Union, Any, Literal, Set, FrozenSet, Mapping, Sequence, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from itertools import product
+from types import MappingProxyType
 
 
 # ===== SEARCH CONTEXT TYPES =====
@@ -126,6 +128,7 @@ class EntitySearchResult:
     match_confidence: float  # Confidence score (0.0-1.0) of the match
     matched_text: Optional[str] = None  # Actual text that matched in the data
     match_strategy: Optional[str] = None  # How the match was found (exact, substring, fuzzy)
+    object_path: Optional[str] = None  # Path of the matched object within its section (e.g. "backpack[3]")
     
     def was_found(self) -> bool:
         """Check if the entity was found in any section."""
@@ -138,206 +141,241 @@ class EntitySearchResult:
 
 # ===== INTENTION MAPPING =====
 
-@dataclass
+@dataclass(frozen=True)
 class IntentionMapping:
-    """Maps user intentions to required character data."""
+    """
+    Maps user intentions to required character data.
+    Immutable: field sets are frozen and nested requirements become read-only tuples,
+    so compiled mappings can be shared by every query.
+    """
     intention: UserIntention
     category: IntentionCategory
-    required_fields: Set[str]
-    optional_fields: Set[str] = field(default_factory=set)
-    nested_requirements: Dict[str, List[str]] = field(default_factory=dict)
+    required_fields: FrozenSet[str]
+    optional_fields: FrozenSet[str] = frozenset()
+    nested_requirements: Mapping[str, Tuple[str, ...]] = field(default_factory=dict)  # Projection paths; other sections are sent whole
     calculation_required: bool = False
     aggregation_required: bool = False
+    all_fields: FrozenSet[str] = field(init=False)  # required ∪ optional
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'required_fields', frozenset(self.required_fields))
+        object.__setattr__(self, 'optional_fields', frozenset(self.optional_fields))
+        object.__setattr__(self, 'nested_requirements', MappingProxyType({
+            name: tuple(paths) for name, paths in self.nested_requirements.items()
+        }))
+        object.__setattr__(self, 'all_fields', self.required_fields | self.optional_fields)
 
 
 # ===== INTENTION TO DATA MAPPINGS =====
 
+# Projection paths (see character_projection) shared by the nested requirements below
+_ITEM_SUMMARY_FIELDS = '{quantity,equipped,isAttuned,limitedUse}'
+_ITEM_DEFINITION_SUMMARY_FIELDS = (
+    '{name,type,rarity,weight,magic,canAttune,attunementDescription,damage,damageType,'
+    'attackType,range,longRange,isContainer}'
+)
+_SPELL_SUMMARY_FIELDS = (
+    '{name,level,school,casting_time,range,components,duration,concentration,ritual,area,charges}'
+)
+
+
+def _build_mappings() -> Dict[UserIntention, IntentionMapping]:
+    """Comprehensive mapping of intentions to data requirements (compiled once at import)."""
+    return {
+        # Core Character Information - basic character identity and stats
+        UserIntention.CHARACTER_BASICS: IntentionMapping(
+            intention=UserIntention.CHARACTER_BASICS,
+            category=IntentionCategory.CHARACTER_SHEET,
+            required_fields={'character_base', 'characteristics', 'ability_scores'},
+            calculation_required=True
+        ),
+        
+        # Combat & Defense - everything needed for combat
+        UserIntention.COMBAT_INFO: IntentionMapping(
+            intention=UserIntention.COMBAT_INFO,
+            category=IntentionCategory.COMBAT,
+            required_fields={'combat_stats', 'damage_modifiers', 'passive_scores', 'action_economy'},
+            optional_fields={'ability_scores', 'inventory', 'features_and_traits', 'proficiencies'},
+            calculation_required=True,
+            aggregation_required=True
+        ),
+        
+        # Skills & Abilities - all character capabilities and traits
+        UserIntention.ABILITIES_INFO: IntentionMapping(
+            intention=UserIntention.ABILITIES_INFO,
+            category=IntentionCategory.ABILITIES,
+            required_fields={'proficiencies', 'passive_scores', 'senses', 'features_and_traits'},
+            optional_fields={'ability_scores', 'character_base', 'background_info'},
+            aggregation_required=True
+        ),
+        
+        # Equipment & Inventory - all items, weapons, armor, etc.
+        UserIntention.INVENTORY_INFO: IntentionMapping(
+            intention=UserIntention.INVENTORY_INFO,
+            category=IntentionCategory.INVENTORY,
+            required_fields={'inventory'},
+            optional_fields={'ability_scores', 'proficiencies'},  # For carrying capacity and proficiency
+            # Item summaries only; full entries (descriptions, modifiers) are added for matched entities.
+            # Currency and carrying capacity are not stored on Inventory (capacity derives from ability_scores).
+            nested_requirements={
+                'inventory': ['total_weight', 'weight_unit', 'valuables',
+                              'equipped_items.*.*.' + _ITEM_SUMMARY_FIELDS,
+                              'equipped_items.*.*.definition.' + _ITEM_DEFINITION_SUMMARY_FIELDS,
+                              'backpack.*.' + _ITEM_SUMMARY_FIELDS,
+                              'backpack.*.definition.' + _ITEM_DEFINITION_SUMMARY_FIELDS]
+            },
+            calculation_required=True,
+            aggregation_required=True
+        ),
+        
+        # Magic & Spellcasting - all spell-related data
+        UserIntention.MAGIC_INFO: IntentionMapping(
+            intention=UserIntention.MAGIC_INFO,
+            category=IntentionCategory.MAGIC,
+            required_fields={'spell_list'},
+            optional_fields={'ability_scores', 'character_base', 'features_and_traits'},
+            # Spell slots and cantrips live inside spellcasting; descriptions only for matched spells
+            nested_requirements={
+                'spell_list': ['spellcasting', 'spells.*.*.*.' + _SPELL_SUMMARY_FIELDS]
+            },
+            calculation_required=True,
+            aggregation_required=True
+        ),
+        
+        # Character Story - all narrative and background
+        UserIntention.STORY_INFO: IntentionMapping(
+            intention=UserIntention.STORY_INFO,
+            category=IntentionCategory.BACKSTORY,
+            required_fields={'background_info', 'personality', 'backstory'},
+            aggregation_required=True
+        ),
+        
+        # Social & Relationships - all connections and organizations
+        UserIntention.SOCIAL_INFO: IntentionMapping(
+            intention=UserIntention.SOCIAL_INFO,
+            category=IntentionCategory.SOCIAL,
+            required_fields={'organizations', 'allies', 'enemies'},
+            optional_fields={'personality', 'background_info'},
+            aggregation_required=True
+        ),
+        
+        # Progress & Objectives - all goals, quests, and advancement
+        UserIntention.PROGRESS_INFO: IntentionMapping(
+            intention=UserIntention.PROGRESS_INFO,
+            category=IntentionCategory.PROGRESSION,
+            required_fields={'objectives_and_contracts'},
+            optional_fields={'character_base', 'notes'},
+            nested_requirements={
+                'objectives_and_contracts': ['current_objectives', 'active_contracts', 'completed_objectives']
+            },
+            calculation_required=True,
+            aggregation_required=True
+        ),
+        
+        # Complete Character - absolutely everything
+        UserIntention.FULL_CHARACTER: IntentionMapping(
+            intention=UserIntention.FULL_CHARACTER,
+            category=IntentionCategory.CHARACTER_SHEET,
+            required_fields={
+                'character_base', 'characteristics', 'ability_scores', 'combat_stats',
+                'background_info', 'personality', 'backstory', 'organizations', 'allies',
+                'enemies', 'proficiencies', 'damage_modifiers', 'passive_scores', 'senses',
+                'action_economy', 'features_and_traits', 'inventory', 'spell_list',
+                'objectives_and_contracts', 'notes'
+            },
+            calculation_required=True,
+            aggregation_required=True
+        ),
+        
+        # Character Summary - essential overview only
+        UserIntention.CHARACTER_SUMMARY: IntentionMapping(
+            intention=UserIntention.CHARACTER_SUMMARY,
+            category=IntentionCategory.CHARACTER_SHEET,
+            required_fields={'character_base', 'ability_scores', 'combat_stats'},
+            optional_fields={'background_info', 'personality'},
+            calculation_required=True,
+            aggregation_required=True
+        )
+    }
+
+
+def _combine(mappings: Sequence[IntentionMapping]) -> IntentionMapping:
+    """Union of several mappings; the first mapping provides intention and category."""
+    if not mappings:
+        raise ValueError("Cannot combine empty list of mappings")
+    
+    if len(mappings) == 1:
+        return mappings[0]
+    
+    # Merge nested requirements, keeping declaration order and dropping duplicates
+    combined_nested_requirements: Dict[str, List[str]] = {}
+    for mapping in mappings:
+        for name, paths in mapping.nested_requirements.items():
+            merged = combined_nested_requirements.setdefault(name, [])
+            merged.extend(path for path in paths if path not in merged)
+    
+    # A section stays projected only if no mapping needs it whole
+    for name in list(combined_nested_requirements):
+        if any(name in m.all_fields and name not in m.nested_requirements for m in mappings):
+            del combined_nested_requirements[name]
+    
+    base_mapping = mappings[0]
+    return IntentionMapping(
+        intention=base_mapping.intention,  # Use first intention as primary
+        category=base_mapping.category,    # Use first category as primary
+        required_fields=frozenset().union(*(m.required_fields for m in mappings)),
+        optional_fields=frozenset().union(*(m.optional_fields for m in mappings)),
+        nested_requirements=combined_nested_requirements,
+        calculation_required=any(m.calculation_required for m in mappings),
+        aggregation_required=any(m.aggregation_required for m in mappings)
+    )
+
+
+# Compiled once at import: single intentions, plus every ordered 1- and 2-intention combination
+INTENTION_MAPPINGS: Mapping[UserIntention, IntentionMapping] = MappingProxyType(_build_mappings())
+COMBINED_INTENTION_MAPPINGS: Mapping[Tuple[UserIntention, ...], IntentionMapping] = MappingProxyType({
+    **{(intention,): mapping for intention, mapping in INTENTION_MAPPINGS.items()},
+    **{
+        (first, second): _combine([INTENTION_MAPPINGS[first], INTENTION_MAPPINGS[second]])
+        for first, second in product(INTENTION_MAPPINGS, repeat=2)
+    }
+})
+
+
 class IntentionDataMapper:
-    """Maps all user intentions to their data requirements."""
+    """Maps all user intentions to their data requirements (backed by the compiled tables)."""
     
     @staticmethod
-    def get_mappings() -> Dict[UserIntention, IntentionMapping]:
-        """Returns comprehensive mapping of intentions to data requirements."""
-        return {
-            # Core Character Information - basic character identity and stats
-            UserIntention.CHARACTER_BASICS: IntentionMapping(
-                intention=UserIntention.CHARACTER_BASICS,
-                category=IntentionCategory.CHARACTER_SHEET,
-                required_fields={'character_base', 'characteristics', 'ability_scores'},
-                calculation_required=True
-            ),
-            
-            # Combat & Defense - everything needed for combat
-            UserIntention.COMBAT_INFO: IntentionMapping(
-                intention=UserIntention.COMBAT_INFO,
-                category=IntentionCategory.COMBAT,
-                required_fields={'combat_stats', 'damage_modifiers', 'passive_scores', 'action_economy'},
-                optional_fields={'ability_scores', 'inventory', 'features_and_traits', 'proficiencies'},
-                calculation_required=True,
-                aggregation_required=True
-            ),
-            
-            # Skills & Abilities - all character capabilities and traits
-            UserIntention.ABILITIES_INFO: IntentionMapping(
-                intention=UserIntention.ABILITIES_INFO,
-                category=IntentionCategory.ABILITIES,
-                required_fields={'proficiencies', 'passive_scores', 'senses', 'features_and_traits'},
-                optional_fields={'ability_scores', 'character_base', 'background_info'},
-                aggregation_required=True
-            ),
-            
-            # Equipment & Inventory - all items, weapons, armor, etc.
-            UserIntention.INVENTORY_INFO: IntentionMapping(
-                intention=UserIntention.INVENTORY_INFO,
-                category=IntentionCategory.INVENTORY,
-                required_fields={'inventory'},
-                optional_fields={'ability_scores', 'proficiencies'},  # For carrying capacity and proficiency
-                nested_requirements={
-                    'inventory': ['equipped_items', 'backpack', 'carrying_capacity', 'currency']
-                },
-                calculation_required=True,
-                aggregation_required=True
-            ),
-            
-            # Magic & Spellcasting - all spell-related data
-            UserIntention.MAGIC_INFO: IntentionMapping(
-                intention=UserIntention.MAGIC_INFO,
-                category=IntentionCategory.MAGIC,
-                required_fields={'spell_list'},
-                optional_fields={'ability_scores', 'character_base', 'features_and_traits'},
-                nested_requirements={
-                    'spell_list': ['spells', 'spellcasting', 'spell_slots', 'cantrips']
-                },
-                calculation_required=True,
-                aggregation_required=True
-            ),
-            
-            # Character Story - all narrative and background
-            UserIntention.STORY_INFO: IntentionMapping(
-                intention=UserIntention.STORY_INFO,
-                category=IntentionCategory.BACKSTORY,
-                required_fields={'background_info', 'personality', 'backstory'},
-                aggregation_required=True
-            ),
-            
-            # Social & Relationships - all connections and organizations
-            UserIntention.SOCIAL_INFO: IntentionMapping(
-                intention=UserIntention.SOCIAL_INFO,
-                category=IntentionCategory.SOCIAL,
-                required_fields={'organizations', 'allies', 'enemies'},
-                optional_fields={'personality', 'background_info'},
-                aggregation_required=True
-            ),
-            
-            # Progress & Objectives - all goals, quests, and advancement
-            UserIntention.PROGRESS_INFO: IntentionMapping(
-                intention=UserIntention.PROGRESS_INFO,
-                category=IntentionCategory.PROGRESSION,
-                required_fields={'objectives_and_contracts'},
-                optional_fields={'character_base', 'notes'},
-                nested_requirements={
-                    'objectives_and_contracts': ['current_objectives', 'active_contracts', 'completed_objectives']
-                },
-                calculation_required=True,
-                aggregation_required=True
-            ),
-            
-            # Complete Character - absolutely everything
-            UserIntention.FULL_CHARACTER: IntentionMapping(
-                intention=UserIntention.FULL_CHARACTER,
-                category=IntentionCategory.CHARACTER_SHEET,
-                required_fields={
-                    'character_base', 'characteristics', 'ability_scores', 'combat_stats',
-                    'background_info', 'personality', 'backstory', 'organizations', 'allies',
-                    'enemies', 'proficiencies', 'damage_modifiers', 'passive_scores', 'senses',
-                    'action_economy', 'features_and_traits', 'inventory', 'spell_list',
-                    'objectives_and_contracts', 'notes'
-                },
-                calculation_required=True,
-                aggregation_required=True
-            ),
-            
-            # Character Summary - essential overview only
-            UserIntention.CHARACTER_SUMMARY: IntentionMapping(
-                intention=UserIntention.CHARACTER_SUMMARY,
-                category=IntentionCategory.CHARACTER_SHEET,
-                required_fields={'character_base', 'ability_scores', 'combat_stats'},
-                optional_fields={'background_info', 'personality'},
-                calculation_required=True,
-                aggregation_required=True
-            )
-        }
+    def get_mappings() -> Mapping[UserIntention, IntentionMapping]:
+        """Returns comprehensive mapping of intentions to data requirements (read-only, shared)."""
+        return INTENTION_MAPPINGS
+    
+    @staticmethod
+    def lookup(intentions: Sequence[UserIntention]) -> Optional[IntentionMapping]:
+        """Precomputed mapping for 1 or 2 intentions (in order), or None if there is none."""
+        return COMBINED_INTENTION_MAPPINGS.get(tuple(intentions))
     
     @staticmethod
     def get_data_requirements(intentions: List[UserIntention]) -> DataRequirement:
         """Combine data requirements for multiple intentions."""
-        all_mappings = IntentionDataMapper.get_mappings()
-        
-        primary_fields = set()
-        nested_objects = {}
-        
-        for intention in intentions:
-            if intention in all_mappings:
-                mapping = all_mappings[intention]
-                primary_fields.update(mapping.required_fields)
-                primary_fields.update(mapping.optional_fields)
-                
-                for field, nested in mapping.nested_requirements.items():
-                    if field not in nested_objects:
-                        nested_objects[field] = []
-                    nested_objects[field].extend(nested)
+        known = [INTENTION_MAPPINGS[i] for i in intentions if i in INTENTION_MAPPINGS]
+        if not known:
+            return DataRequirement(primary_fields=set(), include_relationships=True)
         
+        mapping = IntentionDataMapper.lookup([m.intention for m in known]) or _combine(known)
         return DataRequirement(
-            primary_fields=primary_fields,
-            nested_objects=nested_objects,
+            primary_fields=set(mapping.all_fields),
+            nested_objects={name: list(paths) for name, paths in mapping.nested_requirements.items()},
             include_relationships=True
         )
     
     @staticmethod
     def combine_mappings(mappings: List[IntentionMapping]) -> IntentionMapping:
         """Combine multiple IntentionMapping objects into a single mapping."""
-        if not mappings:
-            raise ValueError("Cannot combine empty list of mappings")
-        
-        if len(mappings) == 1:
-            return mappings[0]
-        
-        # Merge all fields and properties
-        combined_required_fields = set()
-        combined_optional_fields = set()
-        combined_nested_requirements = {}
-        combined_calculation_required = False
-        combined_aggregation_required = False
-        
-        # Use the first mapping's intention and category as base
-        base_mapping = mappings[0]
-        
-        for mapping in mappings:
-            combined_required_fields.update(mapping.required_fields)
-            combined_optional_fields.update(mapping.optional_fields)
-            
-            # Merge nested requirements
-            for field, nested_list in mapping.nested_requirements.items():
-                if field not in combined_nested_requirements:
-                    combined_nested_requirements[field] = []
-                combined_nested_requirements[field].extend(nested_list)
-            
-            # Set flags if any mapping requires them
-            if mapping.calculation_required:
-                combined_calculation_required = True
-            if mapping.aggregation_required:
-                combined_aggregation_required = True
-        
-        # Create combined mapping
-        return IntentionMapping(
-            intention=base_mapping.intention,  # Use first intention as primary
-            category=base_mapping.category,    # Use first category as primary
-            required_fields=combined_required_fields,
-            optional_fields=combined_optional_fields,
-            nested_requirements=combined_nested_requirements,
-            calculation_required=combined_calculation_required,
-            aggregation_required=combined_aggregation_required
-        )
+        precomputed = IntentionDataMapper.lookup([m.intention for m in mappings])
+        if precomputed is not None and all(m is INTENTION_MAPPINGS.get(m.intention) for m in mappings):
+            return precomputed
+        return _combine(mappings)
 
 
 @dataclass
@@ -349,6 +387,7 @@ class CharacterQueryPerformanceMetrics:
     data_extraction_ms: float = 0.0
     entity_filtering_ms: float = 0.0
     serialization_ms: float = 0.0
+    projection_ms: float = 0.0
     
     # Entity processing metrics
     entities_processed: int = 0
@@ -359,6 +398,15 @@ class CharacterQueryPerformanceMetrics:
     fields_extracted: int = 0
     objects_serialized: int = 0
     
+    # Snapshot cache metrics
+    sections_built: int = 0      # Sections serialized by this query
+    sections_reused: int = 0     # Sections served from the character snapshot
+    payload_bytes: int = 0       # Size of the compact character JSON sent to the prompt
+    
+    # Field-level projection metrics
+    payload_bytes_full: int = 0  # Size the payload would have had with whole sections
+    sections_projected: int = 0  # Sections reduced to declared paths / matched entities
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary for analysis"""
         return {
@@ -368,7 +416,8 @@ class CharacterQueryPerformanceMetrics:
                 'intention_mapping_ms': self.intention_mapping_ms,
                 'data_extraction_ms': self.data_extraction_ms,
                 'entity_filtering_ms': self.entity_filtering_ms,
-                'serialization_ms': self.serialization_ms
+                'serialization_ms': self.serialization_ms,
+                'projection_ms': self.projection_ms
             },
             'entity_processing': {
                 'entities_processed': self.entities_processed,
@@ -377,7 +426,18 @@ class CharacterQueryPerformanceMetrics:
             'data_scope': {
                 'total_character_fields': self.total_character_fields,
                 'fields_extracted': self.fields_extracted,
-                'objects_serialized': self.objects_serialized
+                'objects_serialized': self.objects_serialized,
+                'payload_bytes': self.payload_bytes
+            },
+            'snapshot': {
+                'sections_built': self.sections_built,
+                'sections_reused': self.sections_reused
+            },
+            'projection': {
+                'sections_projected': self.sections_projected,
+                'payload_bytes_full': self.payload_bytes_full,
+                'payload_bytes': self.payload_bytes,
+                'bytes_saved': self.payload_bytes_full - self.payload_bytes
             }
         }
 
@@ -0,0 +1,141 @@
+"""
+Character Snapshot
+
+Per-section serialization cache for a Character.
+Each top-level section (inventory, spell_list, features_and_traits, ...) is serialized
+once into a plain dict/list form and a compact JSON string, then reused by every query
+until the section is edited.
+
+- Sections are rebuilt automatically when the section object on the Character is replaced
+- In-place edits must call `invalidate(section)` (or `invalidate()` for everything)
+- Every invalidation bumps `version`; each cached section records the version it was built at
+- Cached data is shared between queries and must be treated as read-only
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, List, Optional
+
+from .character_types import Character
+
+
+@dataclass
+class SectionSnapshot:
+    """Serialized form of one top-level Character section"""
+    name: str
+    data: Any                 # Plain dict/list/primitive form (read-only)
+    json: str                 # Compact JSON of `data`
+    object_count: int         # Number of dicts in `data` (serialized objects)
+    version: int              # Snapshot version the section was built at
+    source: Any = field(default=None, repr=False)  # Section object it was built from
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.json.encode('utf-8'))
+
+
+def serialize_object(obj: Any) -> Any:
+    """Convert dataclass objects to dictionaries recursively."""
+    if hasattr(obj, '__dict__'):
+        # It's a dataclass or similar object
+        return {key: serialize_object(value) for key, value in obj.__dict__.items()}
+    elif isinstance(obj, list):
+        return [serialize_object(item) for item in obj]
+    elif isinstance(obj, dict):
+        return {key: serialize_object(value) for key, value in obj.items()}
+    else:
+        # Primitive type
+        return obj
+
+
+def count_serialized_objects(data: Any) -> int:
+    """Count the number of objects that were serialized (approximate by counting nested dictionaries)"""
+    count = 0
+    if isinstance(data, dict):
+        count += 1  # The dict itself
+        for value in data.values():
+            count += count_serialized_objects(value)
+    elif isinstance(data, list):
+        for item in data:
+            count += count_serialized_objects(item)
+    return count
+
+
+def to_compact_json(data: Any) -> str:
+    """Compact JSON used for prompts (non-JSON values such as datetimes become strings)"""
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+class CharacterSnapshot:
+    """Versioned, lazily built per-section serialization of a Character"""
+
+    def __init__(self, character: Character):
+        self.character = character
+        self.version = 0
+        self.builds = 0  # Sections serialized so far (cache misses)
+        self._sections: Dict[str, SectionSnapshot] = {}
+
+    @property
+    def section_names(self) -> List[str]:
+        return list(self.character.__dict__.keys())
+
+    def get_section(self, name: str) -> Optional[SectionSnapshot]:
+        """Serialized section, built on first use (None if missing or unset on the character)"""
+        value = getattr(self.character, name, None)
+        if value is None:
+            return None
+
+        cached = self._sections.get(name)
+        if cached is not None and cached.source is value:
+            return cached
+
+        data = serialize_object(value)
+        snapshot = SectionSnapshot(
+            name=name,
+            data=data,
+            json=to_compact_json(data),
+            object_count=count_serialized_objects(data),
+            version=self.version,
+            source=value
+        )
+        self._sections[name] = snapshot
+        self.builds += 1
+        return snapshot
+
+    def get_sections(self, names: Iterable[str]) -> Dict[str, SectionSnapshot]:
+        """Serialized sections for the given names, skipping missing/unset ones"""
+        result = {}
+        for name in names:
+            section = self.get_section(name)
+            if section is not None:
+                result[name] = section
+        return result
+
+    def invalidate(self, section: Optional[str] = None) -> None:
+        """Drop a cached section (or all of them) after an in-place edit"""
+        self.version += 1
+        if section is None:
+            self._sections.clear()
+        else:
+            self._sections.pop(section, None)
+
+    def rebind(self, character: Character) -> None:
+        """Point at a new Character (e.g. an updated copy); cached sections whose objects it shares are kept"""
+        self.character = character
+        self.version += 1
+
+    def warm(self) -> None:
+        """Serialize every section up front (e.g. right after loading a character)"""
+        self.get_sections(self.section_names)
+
+    @staticmethod
+    def join_json(sections: Dict[str, Any]) -> str:
+        """
+        Compact JSON object built from prebuilt section strings.
+        Values may be SectionSnapshots or JSON strings.
+        """
+        parts = []
+        for name, section in sections.items():
+            section_json = section.json if isinstance(section, SectionSnapshot) else section
+            parts.append(f"{json.dumps(name)}:{section_json}")
+        return "{" + ",".join(parts) + "}"
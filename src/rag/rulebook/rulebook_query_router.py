@@ -4,6 +4,7 @@ Intelligent semantic search with intention-based filtering and multi-stage scori
 """
 
 import re
+import threading
 import time
 import numpy as np
 from typing import List, Dict, Tuple, Optional
@@ -15,6 +16,7 @@ from .rulebook_types import (
     RulebookCategory, INTENTION_CATEGORY_MAP, QueryPerformanceMetrics
 )
 from ...config import get_config
+from ...utils.tracing import traced
 
 # Note: dotenv is loaded in config.py
 
@@ -76,29 +78,43 @@ class RulebookQueryRouter:
         self.config = get_config()
         self.embedding_model = self.config.embedding_model
         self.embedding_cache = EmbeddingCache(max_size=self.config.embedding_cache_size)
-        
-        # Initialize OpenAI with API key from config
-        openai.api_key = self.config.openai_api_key
-        if not self.config.validate_openai_key():
-            raise ValueError("Invalid or missing OpenAI API key in configuration")
+        self.local_embedder = None
+        
+        if self.config.embedding_provider == "local":
+            # Deterministic offline embeddings sized to match the stored section vectors
+            from ...llm.local_llm_client import LocalEmbeddingClient
+            stored_vector = next((s.vector for s in storage.sections.values() if s.vector is not None), None)
+            self.local_embedder = LocalEmbeddingClient(dimensions=len(stored_vector) if stored_vector is not None else None)
+        else:
+            # Initialize OpenAI with API key from config
+            openai.api_key = self.config.openai_api_key
+            if not self.config.validate_openai_key():
+                raise ValueError("Invalid or missing OpenAI API key in configuration")
     
+    @traced("rag.rulebook")
     def query(
         self,
         intention: RulebookQueryIntent,
         user_query: str,
         entities: List[str],
         context_hints: List[str] = None,
-        k: int = 5
+        k: int = 5,
+        cancel_event: Optional[threading.Event] = None
     ) -> Tuple[List[SearchResult], QueryPerformanceMetrics]:
         """
         Perform intelligent query against rulebook sections.
         
+        The query runs in a worker thread when called from the engine, where cancelling
+        the awaiting task does not stop it; setting `cancel_event` makes it return no
+        results at the next step (before and after the query embedding).
+        
         Args:
             intention: Query intent to determine search categories
             user_query: Original user query string
             entities: Normalized entities extracted from query
             context_hints: Additional phrases to enhance search
             k: Number of results to return
+            cancel_event: Set to stop the query early
             
         Returns:
             Tuple of (SearchResult list, QueryPerformanceMetrics)
@@ -120,16 +136,19 @@ class RulebookQueryRouter:
         performance.intention_filtering_ms = (filter_end - filter_start) * 1000
         performance.sections_after_filtering = len(candidate_sections)
         
-        if not candidate_sections:
+        if not candidate_sections or (cancel_event is not None and cancel_event.is_set()):
             performance.total_time_ms = (time.perf_counter() - start_time) * 1000
             return [], performance
         
         # 2. Perform semantic search
         semantic_start = time.perf_counter()
-        semantic_results = self._semantic_search(user_query, candidate_sections, performance)
+        semantic_results = self._semantic_search(user_query, candidate_sections, performance, cancel_event)
         semantic_end = time.perf_counter()
         
         performance.semantic_search_ms = (semantic_end - semantic_start) * 1000
+        if cancel_event is not None and cancel_event.is_set():
+            performance.total_time_ms = (time.perf_counter() - start_time) * 1000
+            return [], performance
         
         # 3. Apply entity boosting
         entity_start = time.perf_counter()
@@ -200,8 +219,9 @@ class RulebookQueryRouter:
         
         return candidate_sections
     
-    def _semantic_search(self, query: str, candidate_sections: List[RulebookSection], performance: QueryPerformanceMetrics) -> List[Tuple[RulebookSection, float]]:
-        """Perform semantic search using embeddings"""
+    def _semantic_search(self, query: str, candidate_sections: List[RulebookSection], performance: QueryPerformanceMetrics,
+                         cancel_event: Optional[threading.Event] = None) -> List[Tuple[RulebookSection, float]]:
+        """Perform semantic search using embeddings (no results if `cancel_event` is set once the query is embedded)"""
         if not candidate_sections:
             return []
         
@@ -214,6 +234,8 @@ class RulebookQueryRouter:
         embed_end = time.perf_counter()
         
         performance.embedding_total_ms += (embed_end - embed_start) * 1000
+        if cancel_event is not None and cancel_event.is_set():
+            return []
         
         results = []
         for section in candidate_sections:
@@ -360,11 +382,14 @@ class RulebookQueryRouter:
         performance.embedding_api_calls += 1
         
         try:
-            response = openai.embeddings.create(
-                model=self.embedding_model,
-                input=text
-            )
-            embedding = response.data[0].embedding
+            if self.local_embedder:
+                embedding = self.local_embedder.embed([text])[0]
+            else:
+                response = openai.embeddings.create(
+                    model=self.embedding_model,
+                    input=text
+                )
+                embedding = response.data[0].embedding
             
             # Store in cache
             self.embedding_cache.put(text, embedding)
@@ -400,15 +425,18 @@ class RulebookQueryRouter:
             performance.embedding_api_calls += 1  # One batch API call
                 
             try:
-                response = openai.embeddings.create(
-                    model=self.embedding_model,
-                    input=texts_to_embed
-                )
+                if self.local_embedder:
+                    batch = self.local_embedder.embed(texts_to_embed)
+                else:
+                    response = openai.embeddings.create(
+                        model=self.embedding_model,
+                        input=texts_to_embed
+                    )
+                    batch = [embedding_data.embedding for embedding_data in response.data]
                 
                 # Fill in the embeddings and cache them
-                for j, embedding_data in enumerate(response.data):
+                for j, embedding in enumerate(batch):
                     text = texts_to_embed[j]
-                    embedding = embedding_data.embedding
                     index = indices_to_embed[j]
                     
                     embeddings[index] = embedding
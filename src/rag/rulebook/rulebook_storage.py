@@ -39,10 +39,16 @@ class RulebookStorage:
         # Initialize categorizer with the same logic as check_category_coverage.py
         self.categorizer = RulebookCategorizer()
         
-        # Initialize OpenAI with API key from config
-        openai.api_key = self.config.openai_api_key
-        if not self.config.validate_openai_key():
-            raise ValueError("Invalid or missing OpenAI API key in configuration")
+        self.local_embedder = None
+        if self.config.embedding_provider == "local":
+            # Deterministic offline embeddings (see RulebookQueryRouter); no API key needed
+            from ...llm.local_llm_client import LocalEmbeddingClient
+            self.local_embedder = LocalEmbeddingClient()
+        else:
+            # Initialize OpenAI with API key from config
+            openai.api_key = self.config.openai_api_key
+            if not self.config.validate_openai_key():
+                raise ValueError("Invalid or missing OpenAI API key in configuration")
     
     def parse_markdown(self, markdown_path: str) -> None:
         """Parse the D&D 5e rulebook markdown into sections using two-phase approach"""
@@ -202,14 +208,18 @@ class RulebookStorage:
             
             try:
                 # Generate embeddings
-                response = openai.embeddings.create(
-                    model=self.embedding_model,
-                    input=texts
-                )
+                if self.local_embedder:
+                    vectors = self.local_embedder.embed(texts)
+                else:
+                    response = openai.embeddings.create(
+                        model=self.embedding_model,
+                        input=texts
+                    )
+                    vectors = [embedding_data.embedding for embedding_data in response.data]
                 
                 # Store embeddings
-                for j, section in enumerate(batch):
-                    section.vector = response.data[j].embedding
+                for section, vector in zip(batch, vectors):
+                    section.vector = vector
                     print(f"  Generated embedding for: {section.title}")
                 
                 # Small delay to avoid rate limits
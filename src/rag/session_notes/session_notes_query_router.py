@@ -18,6 +18,7 @@ from .session_types import (
 )
 from .session_notes_storage import SessionNotesStorage
 from .campaign_session_notes_storage import CampaignSessionNotesStorage
+from ...utils.tracing import traced
 
 
 class SessionNotesQueryRouter:
@@ -27,6 +28,7 @@ class SessionNotesQueryRouter:
         self.campaign_storage = campaign_storage
         self.fuzzy_threshold = 0.6  # Lower threshold for better partial matching
         
+    @traced("rag.session_notes")
     def query(self, character_name: str, original_query: str, intention: str, 
               entities: List[Dict[str, str]], context_hints: List[str], top_k: int = 5) -> QueryEngineResult:
         """Main query method that orchestrates the entire search process"""
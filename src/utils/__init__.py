@@ -7,5 +7,6 @@ Character management, inspection, and entity search utilities.
 from .character_manager import CharacterManager
 from .character_inspector import CharacterInspector
 from .entity_search_engine import EntitySearchEngine
+from .character_entity_index import CharacterEntityIndex
 
-__all__ = ['CharacterManager', 'CharacterInspector', 'EntitySearchEngine']
+__all__ = ['CharacterManager', 'CharacterInspector', 'EntitySearchEngine', 'CharacterEntityIndex']
@@ -0,0 +1,220 @@
+"""
+Character Entity Index
+
+Per-character lookup tables for EntitySearchEngine, built once when a character is
+loaded instead of walking the character on every entity of every query.
+
+- Name index per section (inventory, spell_list, features_and_traits, proficiencies):
+  normalized name -> original name and object path, in the same order the old list
+  walks produced, so match results are unchanged
+- Backstory index: normalized title/headings/content plus a content token set used to
+  reject sections before the substring scan
+
+Sections are re-indexed automatically when the section object on the Character is
+replaced; in-place edits must call `invalidate(section)` (or `invalidate()`).
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterator, List, Mapping, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.rag.character.character_types import Character
+
+
+# Cached match results kept per section index before the cache is reset
+MAX_CACHED_MATCHES = 1024
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for comparison (lowercase, remove special chars)."""
+    return re.sub(r'[^\w\s]', '', text.lower().strip())
+
+
+@dataclass(frozen=True)
+class IndexedName:
+    """One named object (item, spell, feature, proficiency) in a character section"""
+    name: str           # Original display name
+    normalized: str     # normalize_text(name)
+    path: str           # Object path within the section, e.g. "equipped_items.Weapon[0]"
+    char_counts: Mapping[str, int] = field(default_factory=dict, compare=False, hash=False)  # For similarity bounds
+
+
+@dataclass
+class SectionNameIndex:
+    """Named objects of one section, in walk order, plus an exact-match table"""
+    section: str
+    entries: List[IndexedName] = field(default_factory=list)
+    exact: Dict[str, IndexedName] = field(default_factory=dict)  # First entry per normalized name
+    source: Any = field(default=None, repr=False)  # Section object the index was built from
+    # Best match per (normalized entity, threshold); lives and dies with the index
+    matches: Dict[Tuple[str, float], Optional[tuple]] = field(default_factory=dict, repr=False)
+
+    def add(self, name: Optional[str], path: str) -> None:
+        if not name:
+            return
+        normalized = normalize_text(name)
+        entry = IndexedName(name=name, normalized=normalized, path=path, char_counts=Counter(normalized))
+        self.entries.append(entry)
+        self.exact.setdefault(entry.normalized, entry)
+
+
+@dataclass(frozen=True)
+class IndexedBackstorySection:
+    index: int
+    heading: Optional[str]
+    heading_normalized: str
+    content_normalized: Optional[str]  # None when the section has no content
+    content_tokens: FrozenSet[str]
+
+    def may_contain(self, entity_normalized: str) -> bool:
+        """
+        Cheap pre-check for `entity_normalized in content_normalized`.
+        Interior words of the entity are whitespace-delimited, so they must appear as
+        whole tokens in the content (the first and last words may be partial).
+        """
+        interior = entity_normalized.split()[1:-1]
+        return all(token in self.content_tokens for token in interior)
+
+
+@dataclass
+class BackstoryIndex:
+    title: Optional[str] = None
+    title_normalized: str = ''
+    sections: List[IndexedBackstorySection] = field(default_factory=list)
+    source: Any = field(default=None, repr=False)
+    # Best match per (normalized entity, threshold); lives and dies with the index
+    matches: Dict[Tuple[str, float], Optional[tuple]] = field(default_factory=dict, repr=False)
+
+
+def _item_name(item: Any) -> Optional[str]:
+    """definition.name for D&D Beyond inventory items, otherwise name (dataclass or dict)"""
+    definition = getattr(item, 'definition', None)
+    if definition is not None and hasattr(definition, 'name'):
+        return definition.name
+    if hasattr(item, 'name'):
+        return item.name
+    if isinstance(item, dict):
+        definition = item.get('definition')
+        if isinstance(definition, dict) and 'name' in definition:
+            return definition['name']
+        return item.get('name')
+    return None
+
+
+def _walk_inventory(inventory: Any) -> Iterator[Tuple[Any, str]]:
+    for slot, slot_items in (inventory.equipped_items or {}).items():
+        for i, item in enumerate(slot_items):
+            yield item, f"equipped_items.{slot}[{i}]"
+    for i, item in enumerate(inventory.backpack or []):
+        yield item, f"backpack[{i}]"
+
+
+def _walk_spells(spell_list: Any) -> Iterator[Tuple[Any, str]]:
+    for class_name, spell_levels in (spell_list.spells or {}).items():
+        for level_name, spells in spell_levels.items():
+            for i, spell in enumerate(spells):
+                yield spell, f"spells.{class_name}.{level_name}[{i}]"
+
+
+def _walk_features(features: Any) -> Iterator[Tuple[Any, str]]:
+    for i, trait in enumerate(features.racial_traits or []):
+        yield trait, f"racial_traits[{i}]"
+    for class_name, level_dict in (features.class_features or {}).items():
+        for level, feature_list in level_dict.items():
+            for i, feature in enumerate(feature_list):
+                yield feature, f"class_features.{class_name}.{level}[{i}]"
+    for i, feat in enumerate(features.feats or []):
+        yield feat, f"feats[{i}]"
+
+
+def _walk_proficiencies(proficiencies: Any) -> Iterator[Tuple[Any, str]]:
+    if isinstance(proficiencies, list):
+        for i, proficiency in enumerate(proficiencies):
+            yield proficiency, f"[{i}]"
+
+
+# Section name -> walker over (object, path); order matches the original per-query list walks
+_SECTION_WALKERS = {
+    'inventory': _walk_inventory,
+    'spell_list': _walk_spells,
+    'features_and_traits': _walk_features,
+    'proficiencies': _walk_proficiencies,
+}
+
+
+class CharacterEntityIndex:
+    """Name and backstory lookup tables for one Character, built lazily per section"""
+
+    NAME_SECTIONS = tuple(_SECTION_WALKERS)
+
+    def __init__(self, character: 'Character'):
+        self.character = character
+        self.builds = 0  # Sections indexed so far
+        self._names: Dict[str, SectionNameIndex] = {}
+        self._backstory: Optional[BackstoryIndex] = None
+
+    def names(self, section: str) -> Optional[SectionNameIndex]:
+        """Name index of a section (None if the section is unset on the character)"""
+        value = getattr(self.character, section, None)
+        if not value:
+            return None
+
+        cached = self._names.get(section)
+        if cached is not None and cached.source is value:
+            return cached
+
+        index = SectionNameIndex(section=section, source=value)
+        for obj, path in _SECTION_WALKERS[section](value):
+            index.add(_item_name(obj), path)
+        self._names[section] = index
+        self.builds += 1
+        return index
+
+    def backstory(self) -> Optional[BackstoryIndex]:
+        """Backstory index (None if the character has no backstory)"""
+        value = getattr(self.character, 'backstory', None)
+        if not value:
+            return None
+
+        if self._backstory is not None and self._backstory.source is value:
+            return self._backstory
+
+        index = BackstoryIndex(
+            title=value.title,
+            title_normalized=normalize_text(value.title) if value.title else '',
+            source=value
+        )
+        for i, section in enumerate(value.sections or []):
+            content = normalize_text(section.content) if section.content else None
+            index.sections.append(IndexedBackstorySection(
+                index=i,
+                heading=section.heading,
+                heading_normalized=normalize_text(section.heading) if section.heading else '',
+                content_normalized=content,
+                content_tokens=frozenset(content.split()) if content else frozenset()
+            ))
+        self._backstory = index
+        self.builds += 1
+        return index
+
+    def rebind(self, character: 'Character') -> None:
+        """Point at a new Character (e.g. an updated copy); indexes of section objects it shares are kept"""
+        self.character = character
+
+    def warm(self) -> None:
+        """Index every section up front (e.g. right after loading a character)"""
+        for section in self.NAME_SECTIONS:
+            self.names(section)
+        self.backstory()
+
+    def invalidate(self, section: Optional[str] = None) -> None:
+        """Drop an index after an in-place edit of a section (all sections if None)"""
+        if section is None:
+            self._names.clear()
+            self._backstory = None
+        elif section == 'backstory':
+            self._backstory = None
+        else:
+            self._names.pop(section, None)
@@ -10,10 +10,10 @@ import pickle
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
-from dataclasses import asdict
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.rag.character.character_types import Character
+from src.rag.character.character_codec import character_from_dict
 
 
 class CharacterManager:
@@ -41,15 +41,15 @@ class CharacterManager:
             from api.database.repositories.character_repo import CharacterRepository
             self._repository = CharacterRepository(db_session)
     
-    async def load_character_from_db(self, name: str) -> Optional[Character]:
+    async def load_character_data_from_db(self, name: str) -> Optional[dict]:
         """
-        Load a Character object from the database.
+        Load a character's stored JSON data from the database.
         
         Args:
             name: The character name to load
             
         Returns:
-            The loaded Character object or None if not found
+            Character data (as stored, see character_from_data) or None if not found
         """
         if not self._repository:
             return None
@@ -57,48 +57,33 @@ class CharacterManager:
         db_character = await self._repository.get_by_name(name)
         if not db_character:
             return None
-        
-        # Convert database model to Character dataclass
-        from src.rag.character.character_types import (
-            CharacterBase, PhysicalCharacteristics, AbilityScores, CombatStats,
-            BackgroundInfo, PersonalityTraits, Backstory, Organization,
-            Ally, Enemy, Proficiency, DamageModifier, PassiveScores,
-            Senses, ActionEconomy, FeaturesAndTraits, Inventory, SpellList,
-            ObjectivesAndContracts
-        )
-        
-        data = db_character.data
-        
-        # Reconstruct Character from JSON data
-        # Most fields can be reconstructed using dacite or manual construction
-        # Lists and optional fields need special handling
-        character = Character(
-            character_base=CharacterBase(**data['character_base']),
-            characteristics=PhysicalCharacteristics(**data['characteristics']),
-            ability_scores=AbilityScores(**data['ability_scores']),
-            combat_stats=CombatStats(**data['combat_stats']),
-            background_info=BackgroundInfo(**data['background_info']),
-            personality=PersonalityTraits(**data['personality']),
-            backstory=Backstory(**data['backstory']) if data.get('backstory') else None,
-            organizations=[Organization(**org) for org in data.get('organizations', [])],
-            allies=[Ally(**ally) for ally in data.get('allies', [])],
-            enemies=[Enemy(**enemy) for enemy in data.get('enemies', [])],
-            proficiencies=[Proficiency(**prof) for prof in data.get('proficiencies', [])],
-            damage_modifiers=[DamageModifier(**mod) for mod in data.get('damage_modifiers', [])],
-            passive_scores=PassiveScores(**data['passive_scores']) if data.get('passive_scores') else None,
-            senses=Senses(**data['senses']) if data.get('senses') else None,
-            action_economy=ActionEconomy(**data['action_economy']) if data.get('action_economy') else None,
-            features_and_traits=FeaturesAndTraits(**data['features_and_traits']) if data.get('features_and_traits') else None,
-            inventory=Inventory(**data['inventory']) if data.get('inventory') else None,
-            spell_list=SpellList(**data['spell_list']) if data.get('spell_list') else None,
-            objectives_and_contracts=ObjectivesAndContracts(**data['objectives_and_contracts']) if data.get('objectives_and_contracts') else None,
-            notes=data.get('notes', {}),
-            created_date=datetime.fromisoformat(data['created_date']) if data.get('created_date') else None,
-            last_updated=datetime.fromisoformat(data['last_updated']) if data.get('last_updated') else datetime.now()
-        )
-        
+        return db_character.section_data()
+    
+    @staticmethod
+    def character_from_data(data: dict) -> Character:
+        """Build a Character from stored JSON data (e.g. load_character_data_from_db)."""
+        # Generated decoder builds the full nested dataclass tree, including
+        # Dict[int, ...] keys and datetimes
+        character = character_from_dict(data)
+        if character.last_updated is None:
+            character.last_updated = datetime.now()
         return character
     
+    async def load_character_from_db(self, name: str) -> Optional[Character]:
+        """
+        Load a Character object from the database.
+        
+        Args:
+            name: The character name to load
+            
+        Returns:
+            The loaded Character object or None if not found
+        """
+        data = await self.load_character_data_from_db(name)
+        if data is None:
+            return None
+        return self.character_from_data(data)
+    
     async def save_character_to_db(self, character: Character) -> str:
         """
         Save a Character object to the database.
@@ -116,7 +101,7 @@ class CharacterManager:
         character.last_updated = datetime.now()
         
         # Check if character exists
-        existing = await self._repository.get_by_name(character.character_base.name)
+        existing = await self._repository.get_by_name(character.character_base.name, sections=())
         
         if existing:
             # Update existing character
@@ -10,8 +10,13 @@ Provides consistent fuzzy matching and result formatting across all sources.
 """
 
 import re
+from collections import Counter
 from typing import List, Optional, Dict, TYPE_CHECKING
 from difflib import SequenceMatcher
+from .tracing import traced
+from .character_entity_index import (
+    CharacterEntityIndex, SectionNameIndex, BackstoryIndex, MAX_CACHED_MATCHES, normalize_text
+)
 
 if TYPE_CHECKING:
     from src.rag.character.character_types import Character
@@ -39,9 +44,29 @@ class EntitySearchEngine:
         """
         self.threshold = threshold
         self._rulebook_cache: Dict[str, List['EntitySearchResult']] = {}  # Cache for rulebook lookups
+        self._character_index: Optional[CharacterEntityIndex] = None  # Name/backstory index of the current character
+    
+    # ===== CHARACTER INDEX =====
+    
+    def get_character_index(self, character: 'Character') -> CharacterEntityIndex:
+        """Entity index for a character, created on first use and kept until the character changes."""
+        if self._character_index is None or self._character_index.character is not character:
+            self._character_index = CharacterEntityIndex(character)
+        return self._character_index
+    
+    def rebind_character_index(self, character: 'Character'):
+        """Move the index to an updated copy of its character, keeping sections the copy shares."""
+        if self._character_index is not None:
+            self._character_index.rebind(character)
+    
+    def invalidate_character_index(self, section: Optional[str] = None):
+        """Re-index a character section after an in-place edit (all sections if None)."""
+        if self._character_index is not None:
+            self._character_index.invalidate(section)
     
     # ===== HIGH-LEVEL ENTITY RESOLUTION =====
     
+    @traced("entity_search.resolve_entities")
     def resolve_entities(
         self,
         entities: List[Dict[str, any]],
@@ -115,7 +140,7 @@ class EntitySearchEngine:
     @staticmethod
     def normalize_text(text: str) -> str:
         """Normalize text for comparison (lowercase, remove special chars)."""
-        return re.sub(r'[^\w\s]', '', text.lower().strip())
+        return normalize_text(text)
     
     @staticmethod
     def calculate_similarity(text1: str, text2: str) -> float:
@@ -140,12 +165,25 @@ class EntitySearchEngine:
         Returns:
             Tuple of (confidence, strategy, matched_text) if match found, None otherwise
         """
+        return self._match_normalized(
+            self.normalize_text(entity_name),
+            candidate_name,
+            self.normalize_text(candidate_name) if candidate_name else '',
+            threshold
+        )
+    
+    def _match_normalized(
+        self,
+        normalized_search: str,
+        candidate_name: str,
+        normalized_candidate: str,
+        threshold: Optional[float] = None
+    ) -> Optional[tuple]:
+        """match_entity_name with both names already normalized (e.g. from the character index)."""
         if not candidate_name:
             return None
         
         threshold = threshold or self.threshold
-        normalized_search = self.normalize_text(entity_name)
-        normalized_candidate = self.normalize_text(candidate_name)
         
         # Strategy 1: Exact match (case-insensitive)
         if normalized_search == normalized_candidate:
@@ -155,8 +193,11 @@ class EntitySearchEngine:
         if normalized_search in normalized_candidate or normalized_candidate in normalized_search:
             return (0.9, "substring", candidate_name)
         
-        # Strategy 3: Fuzzy similarity match
-        similarity = self.calculate_similarity(entity_name, candidate_name)
+        # Strategy 3: Fuzzy similarity match (cheap upper bounds first; ratio() never exceeds them)
+        matcher = SequenceMatcher(None, normalized_search, normalized_candidate)
+        if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+            return None
+        similarity = matcher.ratio()
         if similarity >= threshold:
             return (similarity, "fuzzy", candidate_name)
         
@@ -170,28 +211,7 @@ class EntitySearchEngine:
         entity_name: str
     ) -> Optional['EntitySearchResult']:
         """Search character inventory for an entity."""
-        from src.rag.character.character_query_types import EntitySearchResult
-        
-        if not character.inventory:
-            return None
-        
-        items = self._get_all_inventory_items(character)
-        best_match = self._find_best_match_in_items(
-            entity_name,
-            items
-        )
-        
-        if best_match:
-            confidence, strategy, matched_text = best_match
-            return EntitySearchResult(
-                entity_name=entity_name,
-                found_in_sections=['inventory'],
-                match_confidence=confidence,
-                matched_text=matched_text,
-                match_strategy=strategy
-            )
-        
-        return None
+        return self._search_character_section(character, 'inventory', entity_name)
     
     def search_character_spells(
         self,
@@ -199,25 +219,7 @@ class EntitySearchEngine:
         entity_name: str
     ) -> Optional['EntitySearchResult']:
         """Search character spell list for an entity."""
-        from src.rag.character.character_query_types import EntitySearchResult
-        
-        if not character.spell_list or not character.spell_list.spells:
-            return None
-        
-        spells = self._get_all_spells(character)
-        best_match = self._find_best_match_in_items(entity_name, spells)
-        
-        if best_match:
-            confidence, strategy, matched_text = best_match
-            return EntitySearchResult(
-                entity_name=entity_name,
-                found_in_sections=['spell_list'],
-                match_confidence=confidence,
-                matched_text=matched_text,
-                match_strategy=strategy
-            )
-        
-        return None
+        return self._search_character_section(character, 'spell_list', entity_name)
     
     def search_character_features(
         self,
@@ -225,25 +227,7 @@ class EntitySearchEngine:
         entity_name: str
     ) -> Optional['EntitySearchResult']:
         """Search character features and traits for an entity."""
-        from src.rag.character.character_query_types import EntitySearchResult
-        
-        if not character.features_and_traits:
-            return None
-        
-        features = self._get_all_features_traits(character)
-        best_match = self._find_best_match_in_items(entity_name, features)
-        
-        if best_match:
-            confidence, strategy, matched_text = best_match
-            return EntitySearchResult(
-                entity_name=entity_name,
-                found_in_sections=['features_and_traits'],
-                match_confidence=confidence,
-                matched_text=matched_text,
-                match_strategy=strategy
-            )
-        
-        return None
+        return self._search_character_section(character, 'features_and_traits', entity_name)
     
     def search_character_proficiencies(
         self,
@@ -251,22 +235,32 @@ class EntitySearchEngine:
         entity_name: str
     ) -> Optional['EntitySearchResult']:
         """Search character proficiencies for an entity."""
+        return self._search_character_section(character, 'proficiencies', entity_name)
+    
+    def _search_character_section(
+        self,
+        character: 'Character',
+        section: str,
+        entity_name: str
+    ) -> Optional['EntitySearchResult']:
+        """Search one indexed character section (inventory, spell_list, features_and_traits, proficiencies)."""
         from src.rag.character.character_query_types import EntitySearchResult
         
-        if not hasattr(character, 'proficiencies') or not character.proficiencies:
+        index = self.get_character_index(character).names(section)
+        if index is None:
             return None
         
-        proficiencies = character.proficiencies if isinstance(character.proficiencies, list) else []
-        best_match = self._find_best_match_in_items(entity_name, proficiencies)
+        best_match = self._find_best_match_in_index(entity_name, index)
         
         if best_match:
-            confidence, strategy, matched_text = best_match
+            confidence, strategy, matched_text, object_path = best_match
             return EntitySearchResult(
                 entity_name=entity_name,
-                found_in_sections=['proficiencies'],
+                found_in_sections=[section],
                 match_confidence=confidence,
                 matched_text=matched_text,
-                match_strategy=strategy
+                match_strategy=strategy,
+                object_path=object_path
             )
         
         return None
@@ -279,18 +273,41 @@ class EntitySearchEngine:
         """Search character backstory entities for a match."""
         from src.rag.character.character_query_types import EntitySearchResult
         
-        if not character.backstory:
+        index = self.get_character_index(character).backstory()
+        if index is None:
             return None
         
-        # Search within backstory sections
-        # Actual Backstory fields: title (str), family_backstory (FamilyBackstory), sections (List[BackstorySection])
+        normalized_entity = self.normalize_text(entity_name)
+        cache_key = (normalized_entity, self.threshold)
+        if cache_key not in index.matches:
+            if len(index.matches) >= MAX_CACHED_MATCHES:
+                index.matches.clear()
+            index.matches[cache_key] = self._find_best_match_in_backstory(normalized_entity, index)
+        best = index.matches[cache_key]
+        
+        # Return result if confidence above threshold
+        if best:
+            best_match, best_confidence, best_section, best_strategy = best
+            return EntitySearchResult(
+                entity_name=entity_name,
+                found_in_sections=[best_section],
+                match_confidence=best_confidence,
+                matched_text=best_match,
+                match_strategy=best_strategy
+            )
+        
+        return None
+    
+    def _find_best_match_in_backstory(self, normalized_entity: str, index: BackstoryIndex) -> Optional[tuple]:
+        """Best backstory match as (matched_text, confidence, section, strategy), or None below threshold."""
+        # Search within backstory sections (normalized title, headings and content are precomputed)
         best_match = None
         best_confidence = 0.0
         best_section = None
         best_strategy = None
         
         # Search in backstory title
-        match_result = self.match_entity_name(entity_name, character.backstory.title)
+        match_result = self._match_normalized(normalized_entity, index.title, index.title_normalized)
         if match_result:
             confidence, strategy, matched_text = match_result
             if confidence > best_confidence:
@@ -300,42 +317,32 @@ class EntitySearchEngine:
                 best_strategy = strategy
         
         # Search in backstory sections
-        if character.backstory.sections:
-            for idx, section in enumerate(character.backstory.sections):
-                # Search in section heading
-                if section.heading:
-                    match_result = self.match_entity_name(entity_name, section.heading)
-                    if match_result:
-                        confidence, strategy, matched_text = match_result
-                        if confidence > best_confidence:
-                            best_match = matched_text
-                            best_confidence = confidence
-                            best_section = f'backstory.sections[{idx}].heading'
-                            best_strategy = strategy
-                
-                # Search in section content
-                if section.content:
-                    # Check if entity_name appears in content
-                    normalized_entity = self.normalize_text(entity_name)
-                    normalized_content = self.normalize_text(section.content)
-                    if normalized_entity in normalized_content:
-                        confidence = 0.85  # High confidence for content matches
-                        if confidence > best_confidence:
-                            best_match = section.heading or f"Section {idx}"
-                            best_confidence = confidence
-                            best_section = f'backstory.sections[{idx}].content'
-                            best_strategy = "content_match"
+        for section in index.sections:
+            idx = section.index
+            
+            # Search in section heading
+            if section.heading:
+                match_result = self._match_normalized(normalized_entity, section.heading, section.heading_normalized)
+                if match_result:
+                    confidence, strategy, matched_text = match_result
+                    if confidence > best_confidence:
+                        best_match = matched_text
+                        best_confidence = confidence
+                        best_section = f'backstory.sections[{idx}].heading'
+                        best_strategy = strategy
+            
+            # Search in section content (token set rejects most sections before the substring scan)
+            if section.content_normalized is not None and section.may_contain(normalized_entity):
+                if normalized_entity in section.content_normalized:
+                    confidence = 0.85  # High confidence for content matches
+                    if confidence > best_confidence:
+                        best_match = section.heading or f"Section {idx}"
+                        best_confidence = confidence
+                        best_section = f'backstory.sections[{idx}].content'
+                        best_strategy = "content_match"
         
-        # Return result if confidence above threshold
         if best_match and best_confidence >= self.threshold:
-            return EntitySearchResult(
-                entity_name=entity_name,
-                found_in_sections=[best_section],
-                match_confidence=best_confidence,
-                matched_text=best_match,
-                match_strategy=best_strategy
-            )
-        
+            return (best_match, best_confidence, best_section, best_strategy)
         return None
     
     def search_all_character_sections(
@@ -547,48 +554,65 @@ class EntitySearchEngine:
         
         return best_match
     
-    def _get_all_inventory_items(self, character: 'Character') -> List[any]:
-        """Get all inventory items (equipped and backpack)."""
-        items = []
-        
-        if character.inventory.equipped_items:
-            for slot, slot_items in character.inventory.equipped_items.items():
-                items.extend(slot_items)
-        
-        if character.inventory.backpack:
-            items.extend(character.inventory.backpack)
-        
-        return items
-    
-    def _get_all_spells(self, character: 'Character') -> List[any]:
-        """Get all spells from spell list."""
-        spells = []
+    def _find_best_match_in_index(
+        self,
+        entity_name: str,
+        index: SectionNameIndex
+    ) -> Optional[tuple]:
+        """Find best match among the named objects of an indexed section.
         
-        for class_name, spell_levels in character.spell_list.spells.items():
-            for level_name, spell_list in spell_levels.items():
-                spells.extend(spell_list)
+        Same result as _find_best_match_in_items over the section's objects, but exact
+        matches are a dict lookup, fuzzy candidates that cannot beat the current best are
+        skipped using upper bounds on SequenceMatcher.ratio(), and results are cached
+        on the index until the section is re-indexed.
         
-        return spells
-    
-    def _get_all_features_traits(self, character: 'Character') -> List[any]:
-        """Get all features and traits."""
-        features = []
+        Returns tuple of (confidence, strategy, matched_text, object_path) or None.
+        """
+        normalized_search = self.normalize_text(entity_name)
         
-        # Add racial traits
-        if character.features_and_traits.racial_traits:
-            features.extend(character.features_and_traits.racial_traits)
+        exact = index.exact.get(normalized_search)
+        if exact is not None:
+            return (1.0, "exact", exact.name, exact.path)
         
-        # Add class features
-        if character.features_and_traits.class_features:
-            for class_name, level_dict in character.features_and_traits.class_features.items():
-                for level, feature_list in level_dict.items():
-                    features.extend(feature_list)
+        cache_key = (normalized_search, self.threshold)
+        if cache_key in index.matches:
+            return index.matches[cache_key]
         
-        # Add feats
-        if character.features_and_traits.feats:
-            features.extend(character.features_and_traits.feats)
+        best_match = None
+        best_confidence = 0.0
+        search_length = len(normalized_search)
+        search_counts = Counter(normalized_search).items()
+        
+        for entry in index.entries:
+            candidate = entry.normalized
+            if normalized_search in candidate or candidate in normalized_search:
+                confidence, strategy = 0.9, "substring"
+            else:
+                # ratio() <= quick_ratio() = 2*|common chars|/total length: skip candidates that
+                # cannot reach the threshold or beat the current best
+                floor = max(self.threshold, best_confidence)
+                total_length = search_length + len(candidate)
+                if 2.0 * min(search_length, len(candidate)) / total_length < floor:
+                    continue
+                common = 0
+                for char, count in search_counts:
+                    other = entry.char_counts.get(char)
+                    if other:
+                        common += count if count < other else other
+                if 2.0 * common / total_length < floor:
+                    continue
+                confidence, strategy = SequenceMatcher(None, normalized_search, candidate).ratio(), "fuzzy"
+                if confidence < self.threshold:
+                    continue
+            
+            if confidence > best_confidence:
+                best_match = (confidence, strategy, entry.name, entry.path)
+                best_confidence = confidence
         
-        return features
+        if len(index.matches) >= MAX_CACHED_MATCHES:
+            index.matches.clear()
+        index.matches[cache_key] = best_match
+        return best_match
     
     def _extract_rulebook_entity_names(self, section: 'RulebookSection') -> List[str]:
         """Extract potential entity names from a rulebook section."""
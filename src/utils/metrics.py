@@ -0,0 +1,422 @@
+"""
+Pipeline Metrics
+
+In-process metrics registry rendered in the Prometheus text exposition format.
+- Counters and histograms write to per-thread shards (no locks on the hot path);
+  shards are summed when the registry is scraped, and the shard of a finished thread
+  (e.g. a per-build ThreadPoolExecutor worker) is folded into a base total
+- Gauges hold the last value set, or are computed at scrape time from a callback
+- Helper functions translate CentralEngine timings, router metric dataclasses and
+  LLM client calls into metric samples
+
+Usage:
+    from src.utils.metrics import registry, record_llm_call
+
+    record_llm_call("openai", "gpt-4o-mini", "generate_json_response", 0.42, success=True)
+    text = registry.render()  # Served by the API at /metrics
+"""
+
+import asyncio
+import bisect
+import functools
+import inspect
+import math
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import aclosing, contextmanager
+from typing import Deque, Dict, Any, List, Optional, Tuple, Callable, Sequence
+
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _ShardOwner:
+    """Per-thread object whose collection (when its thread ends) retires the thread's shard"""
+    __slots__ = ('__weakref__',)
+
+
+class _Metric:
+    """Shared bookkeeping for sharded metrics"""
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[LabelValues, Any]] = []
+        self._base: Dict[LabelValues, Any] = {}  # Folded shards of finished threads
+        self._retired: Deque[Dict[LabelValues, Any]] = deque()  # Shards of finished threads, not yet folded
+        self._shards_lock = threading.Lock()  # Taken when a thread creates its shard and on scrape
+
+    def _shard(self) -> Dict[LabelValues, Any]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = {}
+            owner = _ShardOwner()
+            self._local.shard, self._local.owner = shard, owner
+            # Thread-local values are dropped when the thread ends. deque.append is atomic,
+            # so the callback needs no lock, whichever thread runs it
+            finalizer = weakref.finalize(owner, self._retired.append, shard)
+            finalizer.atexit = False
+            with self._shards_lock:
+                self._fold_retired()
+                self._shards.append(shard)
+        return shard
+
+    def _fold_retired(self) -> None:
+        """Merge retired shards into the base total (caller holds _shards_lock)"""
+        if not self._retired:
+            return
+        retired = []
+        while self._retired:
+            retired.append(self._retired.popleft())
+        retired_ids = {id(shard) for shard in retired}
+        self._shards = [shard for shard in self._shards if id(shard) not in retired_ids]
+        for shard in retired:
+            self._merge(self._base, shard)
+
+    def _collect(self) -> Dict[LabelValues, Any]:
+        """Base total plus the live shards"""
+        totals: Dict[LabelValues, Any] = {}
+        with self._shards_lock:
+            self._fold_retired()
+            self._merge(totals, self._base)
+            for shard in self._shards:
+                self._merge(totals, shard.copy())
+        return totals
+
+    @staticmethod
+    def _merge(totals: Dict[LabelValues, Any], shard: Dict[LabelValues, Any]) -> None:
+        raise NotImplementedError
+
+    def _label_values(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        shard = self._shard()
+        key = self._label_values(labels) if labels else ()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    @staticmethod
+    def _merge(totals: Dict[LabelValues, float], shard: Dict[LabelValues, float]) -> None:
+        for key, value in shard.items():
+            totals[key] = totals.get(key, 0.0) + value
+
+    def collect(self) -> Dict[LabelValues, float]:
+        return self._collect()
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self.collect().items())
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds"""
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        shard = self._shard()
+        key = self._label_values(labels) if labels else ()
+        state = shard.get(key)
+        if state is None:
+            # [bucket counts..., +Inf count, sum]
+            state = [0] * (len(self.buckets) + 1) + [0.0]
+            shard[key] = state
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    @staticmethod
+    def _merge(totals: Dict[LabelValues, List[float]], shard: Dict[LabelValues, List[float]]) -> None:
+        for key, state in shard.items():
+            merged = totals.setdefault(key, [0] * len(state))
+            for i, value in enumerate(list(state)):
+                merged[i] += value
+
+    def collect(self) -> Dict[LabelValues, List[float]]:
+        return self._collect()
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, state in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state[:-1]):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Point-in-time value; either set directly or computed by a callback at scrape time"""
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], Any]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._label_values(labels) if labels else ()] = value
+
+    def set_callback(self, callback: Callable[[], Any]) -> None:
+        """Callback returns a number, or a dict of {label values tuple: number} for labelled gauges"""
+        self.callback = callback
+
+    def collect(self) -> Dict[LabelValues, float]:
+        values = dict(self._values)
+        if self.callback:
+            try:
+                result = self.callback()
+            except Exception:
+                result = None
+            if isinstance(result, dict):
+                values.update(result)
+            elif result is not None:
+                values[()] = result
+        return values
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self.collect().items())
+        ]
+
+
+class MetricsRegistry:
+    """Holds all metrics and renders them for scraping"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              callback: Optional[Callable[[], Any]] = None) -> Gauge:
+        gauge = self._register(Gauge(name, documentation, labelnames))
+        if callback:
+            gauge.set_callback(callback)
+        return gauge
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry instance
+registry = MetricsRegistry()
+
+
+# ===== PIPELINE METRICS =====
+
+QUERIES_TOTAL = registry.counter(
+    "shadowscribe_queries_total", "Queries processed by CentralEngine", ["status"])
+QUERY_STAGE_SECONDS = registry.histogram(
+    "shadowscribe_query_stage_seconds", "CentralEngine stage latency", ["stage"])
+RAG_ROUTER_SECONDS = registry.histogram(
+    "shadowscribe_rag_router_seconds", "RAG router query latency", ["router"])
+RAG_RESULTS_TOTAL = registry.counter(
+    "shadowscribe_rag_results_total", "Results (or character fields) returned by RAG routers", ["router"])
+EMBEDDING_CACHE_TOTAL = registry.counter(
+    "shadowscribe_embedding_cache_total", "Rulebook embedding cache lookups", ["result"])
+EMBEDDING_API_CALLS_TOTAL = registry.counter(
+    "shadowscribe_embedding_api_calls_total", "Embedding API calls made by the rulebook router")
+ITEM_SPELL_CACHE_TOTAL = registry.counter(
+    "shadowscribe_item_spell_cache_total", "Magic-item spell extraction cache lookups", ["result"])
+LLM_PARSE_CACHE_TOTAL = registry.counter(
+    "shadowscribe_llm_parse_cache_total", "Persistent LLM parse cache lookups", ["parser", "result"])
+
+LLM_REQUESTS_TOTAL = registry.counter(
+    "shadowscribe_llm_requests_total", "LLM client calls", ["provider", "model", "operation", "status"])
+LLM_REQUEST_SECONDS = registry.histogram(
+    "shadowscribe_llm_request_seconds", "LLM client call latency", ["provider", "model", "operation"])
+LLM_TOKENS_TOTAL = registry.counter(
+    "shadowscribe_llm_tokens_total", "LLM tokens consumed", ["provider", "model", "kind"])
+LLM_TOKENS_AVOIDED_TOTAL = registry.counter(
+    "shadowscribe_llm_tokens_avoided_total",
+    "Output tokens not generated because a stream was cancelled "
+    "(estimated from the mean output of completed streams)", ["provider", "model"])
+
+
+@contextmanager
+def count_query():
+    """Count a CentralEngine query by outcome: success, error, or cancelled (stream closed early)"""
+    try:
+        yield
+    except (GeneratorExit, asyncio.CancelledError):
+        QUERIES_TOTAL.inc(status="cancelled")
+        raise
+    except BaseException:
+        QUERIES_TOTAL.inc(status="error")
+        raise
+    QUERIES_TOTAL.inc(status="success")
+
+
+def record_query(timing: Dict[str, float], rag_metrics: Dict[str, Dict[str, Any]]) -> None:
+    """Record stage latencies of one CentralEngine query (timing values in ms, rag_metrics from router to_dict())"""
+    for stage, value_ms in timing.items():
+        QUERY_STAGE_SECONDS.observe(value_ms / 1000, stage=stage)
+
+    for router, metrics in rag_metrics.items():
+        total_ms = metrics.get('total_time_ms')
+        if total_ms is not None:
+            RAG_ROUTER_SECONDS.observe(total_ms / 1000, router=router)
+
+        scope = metrics.get('search_scope') or metrics.get('data_scope') or {}
+        returned = scope.get('results_returned', scope.get('fields_extracted'))
+        if returned:
+            RAG_RESULTS_TOTAL.inc(returned, router=router)
+
+        embedding = metrics.get('embedding_performance')
+        if embedding:
+            EMBEDDING_CACHE_TOTAL.inc(embedding.get('cache_hits', 0), result="hit")
+            EMBEDDING_CACHE_TOTAL.inc(embedding.get('cache_misses', 0), result="miss")
+            EMBEDDING_API_CALLS_TOTAL.inc(embedding.get('api_calls', 0))
+
+
+def record_llm_call(provider: str, model: Optional[str], operation: str, duration_s: float,
+                    success: bool = True, cancelled: bool = False) -> None:
+    """Record the latency and outcome (success, error or cancelled) of one LLM client call"""
+    model = model or "default"
+    status = "cancelled" if cancelled else "success" if success else "error"
+    LLM_REQUESTS_TOTAL.inc(provider=provider, model=model, operation=operation, status=status)
+    LLM_REQUEST_SECONDS.observe(duration_s, provider=provider, model=model, operation=operation)
+
+
+def record_llm_tokens(provider: str, model: Optional[str], input_tokens: Optional[int] = None,
+                      output_tokens: Optional[int] = None, cached_tokens: Optional[int] = None) -> None:
+    """Record token usage reported by a provider"""
+    model = model or "default"
+    if input_tokens:
+        LLM_TOKENS_TOTAL.inc(input_tokens, provider=provider, model=model, kind="input")
+    if output_tokens:
+        LLM_TOKENS_TOTAL.inc(output_tokens, provider=provider, model=model, kind="output")
+    if cached_tokens:
+        LLM_TOKENS_TOTAL.inc(cached_tokens, provider=provider, model=model, kind="cached")
+
+
+def record_llm_tokens_avoided(provider: str, model: Optional[str], tokens: int) -> None:
+    """Record output tokens a cancelled stream did not generate"""
+    if tokens > 0:
+        LLM_TOKENS_AVOIDED_TOTAL.inc(tokens, provider=provider, model=model or "default")
+
+
+def _llm_call_failed(result: Any) -> bool:
+    if isinstance(result, dict):
+        return "error" in result
+    return getattr(result, 'success', True) is False
+
+
+def measured_llm_call(operation: str, provider: str):
+    """
+    Decorator for LLMClient methods: records latency and success per provider/model.
+    Streams count as failed when they yield the clients' "[Error: ...]" marker, and as
+    cancelled when closed early or cancelled (the wrapped stream is closed right away).
+    """
+    def decorator(func):
+        def model_of(args, kwargs) -> Optional[str]:
+            return kwargs.get("model") or getattr(args[0], 'default_model', None)
+
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def asyncgen_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                success = True
+                cancelled = False
+                try:
+                    async with aclosing(func(*args, **kwargs)) as stream:
+                        async for item in stream:
+                            if isinstance(item, str) and item.startswith("\n[Error"):
+                                success = False
+                            yield item
+                except (GeneratorExit, asyncio.CancelledError):
+                    cancelled = True
+                    raise
+                except BaseException:
+                    success = False
+                    raise
+                finally:
+                    record_llm_call(provider, model_of(args, kwargs), operation, time.perf_counter() - start,
+                                    success, cancelled)
+            return asyncgen_wrapper
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            success = False
+            cancelled = False
+            try:
+                result = await func(*args, **kwargs)
+                success = not _llm_call_failed(result)
+                return result
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                record_llm_call(provider, model_of(args, kwargs), operation, time.perf_counter() - start,
+                                success, cancelled)
+        return async_wrapper
+    return decorator
@@ -0,0 +1,462 @@
+"""
+Request Tracing
+
+Lightweight span-based tracing for the query pipeline.
+- Request ids propagate through asyncio tasks and threads via contextvars
+- Spans nest automatically (the active span becomes the parent of new spans)
+- Finished spans go to pluggable exporters: in-memory ring buffer, JSONL file, OTLP/JSON file
+- When tracing is disabled, `tracer.span()` returns a shared no-op object (no allocation, no clock reads)
+
+Usage:
+    from src.utils.tracing import tracer, request_context, debug_log
+
+    with request_context("req-123"):
+        with tracer.span("tool_selector", model=model) as span:
+            ...
+            span.set_attribute("tools", 2)
+        debug_log("🔧 DEBUG: only printed when RAG_DEBUG_LOGGING is enabled")
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import secrets
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import aclosing, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, List, Optional, Iterator, TypeVar
+
+
+_current_span: ContextVar[Optional['Span']] = ContextVar('shadowscribe_current_span', default=None)
+_request_id: ContextVar[Optional[str]] = ContextVar('shadowscribe_request_id', default=None)
+
+
+def new_request_id() -> str:
+    """Generate a request id (32 hex chars, usable as an OpenTelemetry trace id)"""
+    return uuid.uuid4().hex
+
+
+def get_request_id() -> Optional[str]:
+    """Request id of the current context, if any"""
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id: Optional[str] = None) -> Iterator[str]:
+    """Bind a request id to the current context (generated if not provided)"""
+    request_id = request_id or new_request_id()
+    token = _request_id.set(request_id)
+    try:
+        yield request_id
+    finally:
+        try:
+            _request_id.reset(token)
+        except ValueError:
+            # Context changed (e.g. async generator closed from another task) - nothing to restore
+            pass
+
+
+@dataclass
+class Span:
+    """A timed unit of work within a request"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time_ns: int = 0
+    end_time_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    status: str = "ok"  # "ok" or "error"
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_time_ns - self.start_time_ns) / 1_000_000 if self.end_time_ns else 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes) -> None:
+        self.events.append({'name': name, 'time_ns': time.time_ns(), 'attributes': attributes})
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_time_ns': self.start_time_ns,
+            'end_time_ns': self.end_time_ns,
+            'duration_ms': self.duration_ms,
+            'attributes': self.attributes,
+            'events': self.events,
+            'status': self.status,
+            'error': self.error
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert to the OTLP/JSON span representation"""
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id or "",
+            'name': self.name,
+            'kind': 1,  # SPAN_KIND_INTERNAL
+            'startTimeUnixNano': str(self.start_time_ns),
+            'endTimeUnixNano': str(self.end_time_ns),
+            'attributes': [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            'events': [
+                {
+                    'timeUnixNano': str(event['time_ns']),
+                    'name': event['name'],
+                    'attributes': [_otlp_attribute(k, v) for k, v in event['attributes'].items()]
+                }
+                for event in self.events
+            ],
+            'status': {'code': 2, 'message': self.error} if self.status == "error" else {'code': 1}
+        }
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    if isinstance(value, (list, tuple)):
+        return {'key': key, 'value': {'arrayValue': {'values': [_otlp_attribute('', v)['value'] for v in value]}}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+# ===== EXPORTERS =====
+
+class SpanExporter:
+    """Base class for span exporters"""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class RingBufferExporter(SpanExporter):
+    """Keeps the most recent spans in memory (deque appends are thread-safe)"""
+
+    def __init__(self, capacity: int = 2000):
+        self.spans: deque = deque(maxlen=capacity)
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def get_spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        spans = list(self.spans)
+        if trace_id:
+            spans = [s for s in spans if s.trace_id == trace_id]
+        return spans
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class JSONLFileExporter(SpanExporter):
+    """Appends one JSON object per finished span"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def _serialize(self, span: Span) -> str:
+        return json.dumps(span.to_dict(), default=str)
+
+    def export(self, span: Span) -> None:
+        line = self._serialize(span)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class OTLPJsonFileExporter(JSONLFileExporter):
+    """
+    Writes spans in OTLP/JSON (one ExportTraceServiceRequest per line), the format read by
+    the OpenTelemetry Collector's otlpjsonfile receiver.
+    """
+
+    def __init__(self, path: str, service_name: str = "shadowscribe"):
+        super().__init__(path)
+        self.service_name = service_name
+
+    def _serialize(self, span: Span) -> str:
+        return json.dumps({
+            'resourceSpans': [{
+                'resource': {'attributes': [_otlp_attribute('service.name', self.service_name)]},
+                'scopeSpans': [{
+                    'scope': {'name': 'src.utils.tracing'},
+                    'spans': [span.to_otlp()]
+                }]
+            }]
+        }, default=str)
+
+
+# ===== TRACER =====
+
+class _NoOpSpan:
+    """Shared stand-in returned when tracing is disabled"""
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoOpSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoOpSpan()
+
+
+class _SpanScope:
+    """Context manager that activates a span and exports it on exit"""
+    __slots__ = ('tracer', 'span', 'token')
+
+    def __init__(self, tracer: 'Tracer', span: Span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _current_span.set(self.span)
+        self.start()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            _current_span.reset(self.token)
+        except ValueError:
+            pass
+        self.end(exc)
+        return False
+
+    def start(self) -> None:
+        """Start the span without making it the active span"""
+        self.span.start_time_ns = time.time_ns()
+
+    def end(self, exc: Optional[BaseException] = None) -> None:
+        self.span.end_time_ns = time.time_ns()
+        if exc is not None:
+            self.span.record_exception(exc)
+        self.tracer._export(self.span)
+
+
+class Tracer:
+    """Creates spans and fans finished spans out to exporters"""
+
+    def __init__(self):
+        self.exporters: List[SpanExporter] = []
+        self.enabled = False
+        self.debug_logging = False
+        self._configured = False
+
+    def configure(self, exporters: Optional[List[SpanExporter]] = None, debug_logging: Optional[bool] = None) -> None:
+        """Replace exporters (tracing is enabled when at least one exporter is set)"""
+        for exporter in self.exporters:
+            exporter.shutdown()
+        self.exporters = list(exporters or [])
+        self.enabled = bool(self.exporters)
+        if debug_logging is not None:
+            self.debug_logging = debug_logging
+        self._configured = True
+
+    def configure_from_config(self) -> None:
+        """Configure exporters from RAGConfig (RAG_TRACING_EXPORTERS=memory,jsonl,otlp)"""
+        from ..config import get_config  # Import here to avoid circular import
+        cfg = get_config()
+        exporters: List[SpanExporter] = []
+        for name in (n.strip().lower() for n in cfg.tracing_exporters.split(',')):
+            if name == "memory":
+                exporters.append(RingBufferExporter(cfg.tracing_ring_buffer_size))
+            elif name == "jsonl":
+                exporters.append(JSONLFileExporter(cfg.tracing_jsonl_path))
+            elif name == "otlp":
+                exporters.append(OTLPJsonFileExporter(cfg.tracing_otlp_path))
+            elif name:
+                print(f"⚠️  Unknown tracing exporter '{name}' (expected memory, jsonl or otlp)")
+        self.configure(exporters, debug_logging=cfg.debug_logging)
+
+    def _ensure_configured(self) -> None:
+        if not self._configured:
+            self.configure_from_config()
+
+    def span(self, name: str, **attributes):
+        """Start a child span of the active span (or a root span for the current request)"""
+        if not self._configured:
+            self._ensure_configured()
+        if not self.enabled:
+            return _NOOP_SPAN
+
+        parent = _current_span.get()
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = _request_id.get() or new_request_id(), None
+        return _SpanScope(self, Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent_id,
+            attributes=attributes
+        ))
+
+    def current_span(self):
+        """The active span, or the no-op span if there is none"""
+        return _current_span.get() or _NOOP_SPAN
+
+    def get_exporter(self, exporter_type: type) -> Optional[SpanExporter]:
+        self._ensure_configured()
+        return next((e for e in self.exporters if isinstance(e, exporter_type)), None)
+
+    def _export(self, span: Span) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                print(f"⚠️  Span exporter {type(exporter).__name__} failed: {e}")
+
+
+# Global tracer instance
+tracer = Tracer()
+
+
+def traced(name: str, **static_attributes):
+    """
+    Decorator that wraps a sync function, coroutine function or async generator in a span.
+    For async generators the span covers the whole iteration but is only the active span
+    while the generator runs, so spans the consumer opens between items are not nested
+    under it. Closing the wrapper closes the wrapped generator.
+    """
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def asyncgen_wrapper(*args, **kwargs):
+                scope = tracer.span(name, **static_attributes)
+                if scope is _NOOP_SPAN:
+                    async with aclosing(func(*args, **kwargs)) as stream:
+                        async for item in stream:
+                            yield item
+                    return
+
+                scope.start()
+                error = None
+                try:
+                    async with aclosing(func(*args, **kwargs)) as stream:
+                        while True:
+                            # Generators run in the consumer's context: activate the span per step
+                            token = _current_span.set(scope.span)
+                            try:
+                                item = await anext(stream)
+                            except StopAsyncIteration:
+                                break
+                            finally:
+                                _current_span.reset(token)
+                            yield item
+                except GeneratorExit:
+                    raise  # Closed early by the consumer, not a failure
+                except BaseException as e:
+                    error = e
+                    raise
+                finally:
+                    scope.end(error)
+            return asyncgen_wrapper
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(name, **static_attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            with tracer.span(name, **static_attributes):
+                return func(*args, **kwargs)
+        return sync_wrapper
+    return decorator
+
+
+T = TypeVar('T')
+_END = object()
+
+
+async def iterate_isolated(stream: AsyncIterator[T]) -> AsyncIterator[T]:
+    """
+    Iterate an async generator with every step (and its closing) run as a task in one
+    private copy of the current context. Context the generator sets up around its yields
+    (request ids, spans, usage trackers) stays active for it across items, but never in
+    the consumer's context, and is reset in the context that set it. Cancelling the
+    consumer cancels the running step; closing the wrapper closes the generator.
+    """
+    context = contextvars.copy_context()
+
+    async def step():
+        try:
+            return await anext(stream)
+        except StopAsyncIteration:
+            return _END
+
+    try:
+        while True:
+            item = await asyncio.create_task(step(), context=context)
+            if item is _END:
+                return
+            yield item
+    finally:
+        await asyncio.create_task(stream.aclose(), context=context)
+
+
+def debug_log(message: str) -> None:
+    """
+    Replacement for unconditional debug prints.
+    Printed only when debug logging is enabled; attached to the active span as an event when tracing.
+    """
+    if not tracer._configured:
+        tracer._ensure_configured()
+    if tracer.debug_logging:
+        request_id = _request_id.get()
+        print(f"[{request_id[:8]}] {message}" if request_id else message)
+    if tracer.enabled:
+        span = _current_span.get()
+        if span is not None:
+            span.add_event("log", message=message)